@@ -3,7 +3,7 @@ from .models import (
     Player, Coach, Team, Match, Attendance, Leaderboard, User,
     Manager, Admin, ManagerSport, TeamProposal, TeamAssignmentRequest,
     Tournament, TournamentTeam, TournamentMatch, CricketMatchState, MatchPlayerStats, TournamentPoints,
-    Sport, PromotionRequest, CoachPlayerLinkRequest, Notification, PlayerSportProfile
+    Sport, PromotionRequest, CoachPlayerLinkRequest, Notification, PlayerSportProfile, Job
 )
 from django.contrib.auth.admin import UserAdmin
 
@@ -171,3 +171,10 @@ class NotificationAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'type', 'title', 'created_at', 'read_at')
     list_filter = ('type', 'created_at', 'read_at')
     search_fields = ('user__username', 'title', 'message')
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'queue', 'status', 'attempts', 'run_at', 'finished_at')
+    list_filter = ('status', 'queue', 'name')
+    search_fields = ('name', 'idempotency_key')
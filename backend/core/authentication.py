@@ -0,0 +1,223 @@
+# backend/core/authentication.py
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils.functional import SimpleLazyObject
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.models import Coach, Manager, ManagerSport, Player, User
+
+# Claim names kept short: they travel on every request
+CLAIMS_VERSION = "cv"
+ROLE = "role"
+PLAYER = "player"
+COACH = "coach"
+MANAGER = "manager"
+SPORTS = "sports"
+
+
+class Principal:
+    """
+    Who is calling, as carried in the JWT: role, the Player/Coach/Manager
+    primary key that goes with it and, for managers, the managed sport ids.
+    """
+
+    __slots__ = ("user_id", "role", "player_id", "coach_id", "manager_id", "managed_sport_ids")
+
+    def __init__(self, user_id, role, player_id=None, coach_id=None, manager_id=None, managed_sport_ids=()):
+        self.user_id = user_id
+        self.role = role
+        self.player_id = player_id
+        self.coach_id = coach_id
+        self.manager_id = manager_id
+        self.managed_sport_ids = frozenset(managed_sport_ids)
+
+    def manages_sport(self, sport_id):
+        return sport_id is not None and sport_id in self.managed_sport_ids
+
+    def claims(self):
+        return {
+            ROLE: self.role,
+            PLAYER: self.player_id,
+            COACH: self.coach_id,
+            MANAGER: self.manager_id,
+            SPORTS: sorted(self.managed_sport_ids),
+        }
+
+    def to_dict(self):
+        return {
+            "user_id": self.user_id,
+            "role": self.role,
+            "player_id": self.player_id,
+            "coach_id": self.coach_id,
+            "manager_id": self.manager_id,
+            "managed_sport_ids": sorted(self.managed_sport_ids),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    @classmethod
+    def from_claims(cls, token):
+        return cls(
+            user_id=token[api_settings.USER_ID_CLAIM],
+            role=token.get(ROLE),
+            player_id=token.get(PLAYER),
+            coach_id=token.get(COACH),
+            manager_id=token.get(MANAGER),
+            managed_sport_ids=token.get(SPORTS) or (),
+        )
+
+    @classmethod
+    def for_user(cls, user):
+        """Look the principal up for a loaded User (at token issue, or for session/token auth)."""
+        data = {"user_id": user.pk, "role": user.role}
+        if user.role == User.Roles.PLAYER:
+            data["player_id"] = Player.objects.filter(user_id=user.pk).values_list("id", flat=True).first()
+        elif user.role == User.Roles.COACH:
+            data["coach_id"] = Coach.objects.filter(user_id=user.pk).values_list("id", flat=True).first()
+        elif user.role == User.Roles.MANAGER:
+            data["manager_id"] = Manager.objects.filter(user_id=user.pk).values_list("id", flat=True).first()
+            data["managed_sport_ids"] = list(
+                ManagerSport.objects.filter(manager__user_id=user.pk).values_list("sport_id", flat=True)
+            )
+        return cls(**data)
+
+
+def get_principal(user):
+    """
+    Principal for request.user: free for claim-bearing JWTs, otherwise the one
+    in the user's cached AccessContext (core.services.access).
+    """
+    principal = user.__dict__.get("principal")
+    if principal is None:
+        from core.services.access import get_access_context
+        principal = get_access_context(user).principal
+    return principal
+
+
+class ClaimsUser(SimpleLazyObject):
+    """
+    request.user for claim-bearing JWTs. id, role and the principal come from
+    the token; any other attribute, relation or use as a foreign-key value loads
+    the User row on first access, like Django's own lazy request.user.
+    """
+
+    _local = ("principal", "_access_context")
+    _access_context = None
+
+    def __init__(self, principal):
+        self.__dict__["principal"] = principal
+        super().__init__(lambda: User.objects.get(pk=principal.user_id))
+
+    def __setattr__(self, name, value):
+        if name in self._local:
+            self.__dict__[name] = value
+        else:
+            super().__setattr__(name, value)
+
+    @property
+    def pk(self):
+        return self.principal.user_id
+
+    id = pk
+
+    @property
+    def role(self):
+        return self.principal.role
+
+    @property
+    def Roles(self):
+        return User.Roles
+
+    def __bool__(self):
+        # Permission classes test `request.user and ...`; don't load the row for that
+        return True
+
+    is_authenticated = True
+    is_anonymous = False
+    # Inactive users are rejected by the claims-version check
+    is_active = True
+
+
+def _version_key(user_id):
+    return f"jwt:cv:{user_id}"
+
+
+def current_claims_version(user_id):
+    """(claims_version, is_active) for user_id, cached for JWT_CLAIMS_CHECK_TTL seconds."""
+    key = _version_key(user_id)
+    state = cache.get(key)
+    if state is None:
+        row = User.objects.filter(pk=user_id).values_list("claims_version", "is_active").first()
+        state = tuple(row) if row else (None, False)
+        cache.set(key, state, settings.JWT_CLAIMS_CHECK_TTL)
+    return state
+
+
+def bump_claims_version(*user_ids):
+    """Make every access token already issued to these users stale (role or access changed)."""
+    user_ids = {user_id for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return
+    User.objects.filter(pk__in=user_ids).update(claims_version=F("claims_version") + 1)
+    keys = [_version_key(user_id) for user_id in user_ids]
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def add_claims(token, user):
+    token[CLAIMS_VERSION] = user.claims_version
+    for name, value in Principal.for_user(user).claims().items():
+        token[name] = value
+    return token
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that trusts the role/profile claims instead of loading the
+    User on every request. The only per-request check is the user's claims
+    version (cached), so tokens issued before a role change, a managed-sport
+    change or a deactivation are refused with code "claims_outdated" /
+    "user_inactive" and the client refreshes. Tokens issued without claims are
+    authenticated the usual way.
+    """
+
+    def get_user(self, validated_token):
+        if CLAIMS_VERSION not in validated_token:
+            return super().get_user(validated_token)
+
+        principal = Principal.from_claims(validated_token)
+        version, is_active = current_claims_version(principal.user_id)
+        if version is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        if not is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        if version != validated_token[CLAIMS_VERSION]:
+            raise AuthenticationFailed("Role or access changed; refresh the token", code="claims_outdated")
+        return ClaimsUser(principal)
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        return add_claims(super().get_token(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh re-reads the claims, so a refreshed access token reflects the current role."""
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        access = AccessToken(data["access"])
+        user = User.objects.filter(pk=access[api_settings.USER_ID_CLAIM], is_active=True).first()
+        if user is None:
+            raise AuthenticationFailed("User not found or inactive", code="user_inactive")
+        data["access"] = str(add_claims(access, user))
+        return data
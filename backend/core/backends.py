@@ -0,0 +1,45 @@
+# backend/core/backends.py
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from core.services.login import aburn_hash, averify_password, burn_hash, verify_password
+
+
+class HashPoolModelBackend(ModelBackend):
+    """
+    ModelBackend whose password checks run on the bounded login hash pool.
+
+    Used by every login path (auth/login/, token/, the admin) through
+    AUTHENTICATION_BACKENDS; `aauthenticate` lets async views await the check
+    without blocking the event loop.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            burn_hash(password)
+            return None
+        if verify_password(user, password) and self.user_can_authenticate(user):
+            return user
+        return None
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = await UserModel._default_manager.aget_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            await aburn_hash(password)
+            return None
+        if await averify_password(user, password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,53 @@
+# backend/core/hashers.py
+"""
+Password hashers whose cost comes from settings instead of Django's defaults,
+so it can be tuned per deployment (and lowered for load tests).
+
+Changing a cost setting does not invalidate existing passwords: Django sees
+`must_update()` on the next successful login and re-hashes with the new cost.
+"""
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    BCryptSHA256PasswordHasher,
+    PBKDF2PasswordHasher,
+)
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    # Same algorithm name as Django's hasher, so stored hashes stay compatible
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class TunableArgon2PasswordHasher(Argon2PasswordHasher):
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+
+class TunableBCryptSHA256PasswordHasher(BCryptSHA256PasswordHasher):
+    @property
+    def rounds(self):
+        return settings.PASSWORD_BCRYPT_ROUNDS
+
+
+def hasher_available(name):
+    """Whether the optional library behind `name` (argon2 / bcrypt) is installed."""
+    try:
+        if name == "argon2":
+            import argon2  # noqa: F401
+        elif name == "bcrypt":
+            import bcrypt  # noqa: F401
+    except ImportError:
+        return False
+    return True
@@ -0,0 +1,151 @@
+import re
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Sum
+from django.utils import timezone
+
+from core.models import (
+    Player,
+    Coach,
+    Sport,
+    Team,
+    PlayerSportProfile,
+    PerformanceScore,
+    DailyPerformanceScore,
+    Notification,
+    Tournament,
+    MatchPlayerStats,
+    CoachPlayerLinkRequest,
+    PromotionRequest,
+    Leaderboard,
+    User,
+)
+
+
+# SQLite: "SCAN core_x" (full scan) vs "SEARCH core_x USING INDEX ..."; PostgreSQL: "Seq Scan on core_x"
+SCAN_PATTERNS = [
+    re.compile(r"\bSCAN (?P<table>\w+)\b(?! USING (?:COVERING )?INDEX)"),
+    re.compile(r"Seq Scan on (?P<table>\w+)"),
+]
+# An explicit sort step means no index delivers the requested order
+SORT_PATTERNS = [
+    re.compile(r"USE TEMP B-TREE FOR ORDER BY"),
+    re.compile(r"^\s*(?:->\s*)?Sort\b", re.MULTILINE),
+]
+
+
+def _sample_id(model):
+    return model.objects.order_by("id").values_list("id", flat=True).first() or 0
+
+
+def build_catalog():
+    """Hot querysets taken from core/views.py, bound to sample ids from the current database."""
+    coach_id = _sample_id(Coach)
+    sport_id = _sample_id(Sport)
+    team_id = _sample_id(Team)
+    player_id = _sample_id(Player)
+    user_id = _sample_id(User)
+    tournament_id = _sample_id(Tournament)
+    today = timezone.now().date()
+
+    return [
+        ("upload_csv: allowed players", lambda: PlayerSportProfile.objects.filter(
+            coach_id=coach_id, sport_id=sport_id, is_active=True, player__is_active=True,
+        ).values_list("player__player_id", flat=True)),
+        ("coach_dashboard: students", lambda: PlayerSportProfile.objects.filter(
+            coach_id=coach_id, is_active=True,
+        ).select_related("player__user", "sport", "team")),
+        ("match scoring: team roster", lambda: PlayerSportProfile.objects.filter(
+            team_id=team_id, sport_id=sport_id, is_active=True,
+        ).values_list("player_id", flat=True)),
+        ("performance series: weekly rollup range", lambda: PerformanceScore.objects.filter(
+            player_id__in=[player_id], week_start__gte=today - timezone.timedelta(days=365), week_start__lte=today,
+        ).values_list("player_id", "week_start", "rating_sum", "sessions").order_by("week_start")),
+        ("attendance rollup: daily upsert", lambda: DailyPerformanceScore.objects.filter(
+            player_id=player_id, date=today,
+        )),
+        ("notifications: latest for user", lambda: Notification.objects.filter(
+            user_id=user_id,
+        ).order_by("-created_at", "-id")[:10]),
+        ("tournament leaderboard: top scorer", lambda: MatchPlayerStats.objects.filter(
+            match__tournament_id=tournament_id,
+        ).values("player").annotate(total_runs=Sum("runs_scored")).order_by("-total_runs")[:1]),
+        ("link requests: pending for player", lambda: CoachPlayerLinkRequest.objects.filter(
+            player_id=player_id, status=CoachPlayerLinkRequest.Status.PENDING,
+        )),
+        ("link requests: pending for coach", lambda: CoachPlayerLinkRequest.objects.filter(
+            coach_id=coach_id, status=CoachPlayerLinkRequest.Status.PENDING,
+            direction=CoachPlayerLinkRequest.Direction.PLAYER_TO_COACH,
+        )),
+        ("promotions: pending for sport", lambda: PromotionRequest.objects.filter(
+            status=PromotionRequest.Status.PENDING, sport_id=sport_id,
+        )),
+        ("leaderboard: top page", lambda: Leaderboard.objects.order_by("-score", "id")[:10]),
+    ]
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN over the app's hot querysets, flag full table scans and time each query"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Number of executions averaged for the timing column",
+        )
+        parser.add_argument(
+            "--plan",
+            action="store_true",
+            help="Print the full query plan under each entry",
+        )
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Use EXPLAIN ANALYZE (PostgreSQL only)",
+        )
+
+    def handle(self, *args, **options):
+        repeat = max(1, options["repeat"])
+        explain_options = {}
+        if options["analyze"] and connection.vendor == "postgresql":
+            explain_options["analyze"] = True
+
+        self.stdout.write(f"Database: {connection.vendor}; timings are the mean of {repeat} runs")
+        flagged = 0
+        for name, make_qs in build_catalog():
+            qs = make_qs()
+            plan = qs.explain(**explain_options)
+            scanned = sorted({
+                m.group("table")
+                for pattern in SCAN_PATTERNS
+                for m in pattern.finditer(plan)
+            })
+            sorted_in_memory = any(pattern.search(plan) for pattern in SORT_PATTERNS)
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                list(make_qs())
+            avg_ms = (time.perf_counter() - started) * 1000 / repeat
+
+            problems = []
+            if scanned:
+                problems.append(f"SCAN {', '.join(scanned)}")
+            if sorted_in_memory:
+                problems.append("SORT")
+            if problems:
+                flagged += 1
+                verdict = self.style.WARNING(" + ".join(problems))
+            else:
+                verdict = self.style.SUCCESS("indexed")
+            self.stdout.write(f"{name:<40} {avg_ms:>9.3f} ms  {verdict}")
+            if options["plan"]:
+                for line in plan.splitlines():
+                    self.stdout.write(f"    {line}")
+
+        if flagged:
+            self.stdout.write(self.style.WARNING(f"{flagged} queryset(s) scan a full table or sort without an index"))
+        else:
+            self.stdout.write(self.style.SUCCESS("All catalogued querysets are served by an index"))
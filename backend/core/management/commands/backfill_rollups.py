@@ -0,0 +1,46 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Player
+from core.services.performance_rollups import backfill
+
+
+def _date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}' (expected YYYY-MM-DD)")
+
+
+class Command(BaseCommand):
+    help = "Rebuild daily, weekly and monthly performance rollups from session attendance"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", default=None, help="First day to rebuild (YYYY-MM-DD); default: all time")
+        parser.add_argument("--end", default=None, help="Last day to rebuild (YYYY-MM-DD); default: all time")
+        parser.add_argument(
+            "--player",
+            action="append",
+            default=None,
+            help="Player ID (e.g. P2500001) to rebuild; repeatable. Default: every player",
+        )
+
+    def handle(self, *args, **options):
+        start = _date(options["start"]) if options["start"] else None
+        end = _date(options["end"]) if options["end"] else None
+        if start and end and start > end:
+            raise CommandError("--start must not be after --end")
+
+        player_ids = None
+        if options["player"]:
+            found = dict(Player.objects.filter(player_id__in=options["player"]).values_list("player_id", "id"))
+            missing = sorted(set(options["player"]) - set(found))
+            if missing:
+                raise CommandError(f"Unknown player(s): {', '.join(missing)}")
+            player_ids = list(found.values())
+
+        written = backfill(start=start, end=end, player_ids=player_ids)
+        self.stdout.write(self.style.SUCCESS(
+            "Rebuilt " + ", ".join(f"{count} {level} rows" for level, count in written.items())
+        ))
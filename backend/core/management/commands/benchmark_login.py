@@ -0,0 +1,70 @@
+import os
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import get_hashers, make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.authtoken.models import Token
+
+from core.models import User
+from core.services.login import _verify, hash_pool, login_payload
+
+
+class Command(BaseCommand):
+    help = "Measure password-check throughput per hasher and the cost of a full login"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--logins", type=int, default=100, help="Password checks per hasher")
+        parser.add_argument(
+            "--hasher",
+            action="append",
+            default=None,
+            help="Algorithm to measure (argon2, bcrypt_sha256, pbkdf2_sha256); repeatable. Default: all installed",
+        )
+
+    def handle(self, *args, **options):
+        logins = max(1, options["logins"])
+        workers = max(1, settings.LOGIN_HASH_WORKERS)
+        cores = min(workers, os.cpu_count() or 1)
+        algorithms = options["hasher"] or [h.algorithm for h in get_hashers() if _usable(h)]
+        password = "Bench-" + uuid.uuid4().hex
+
+        self.stdout.write(f"preferred hasher: {get_hashers()[0].algorithm}; pool: {workers} threads on {cores} core(s)")
+        for algorithm in algorithms:
+            encoded = make_password(password, hasher=algorithm)
+            start = time.perf_counter()
+            results = list(hash_pool().map(_verify, [password] * logins, [encoded] * logins))
+            elapsed = time.perf_counter() - start
+            assert all(ok for ok, _ in results)
+            rate = logins / elapsed
+            self.stdout.write(
+                f"{algorithm:>16}: {elapsed / logins * 1000 * workers:7.1f} ms/check  "
+                f"{rate:8.1f} checks/s  {rate / cores:8.1f} checks/s/core"
+            )
+
+        # Full path once the hash is in the preferred format: authenticate + token + payload.
+        # Run in a transaction that is rolled back, so the throwaway manager (and the
+        # sport assignments its signals add) never reach the database.
+        username = f"bench-{uuid.uuid4().hex[:12]}"
+        with transaction.atomic():
+            User.objects.create_user(username=username, password=password, role=User.Roles.MANAGER)
+            rounds = min(logins, 20)
+            start = time.perf_counter()
+            for _ in range(rounds):
+                authed = authenticate(username=username, password=password)
+                Token.objects.get_or_create(user=authed)
+                login_payload(authed)
+            elapsed = time.perf_counter() - start
+            transaction.set_rollback(True)
+        self.stdout.write(f"full login (sequential): {elapsed / rounds * 1000:.1f} ms/login")
+
+def _usable(hasher):
+    # Library-backed hashers are listed even when their library is missing
+    try:
+        hasher._load_library()
+    except ValueError:
+        return hasher.library is None
+    return True
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.performance_rollups import compact
+
+
+class Command(BaseCommand):
+    help = "Drop old daily (and optionally weekly) performance rows that the coarser rollups already cover"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-daily-days",
+            type=int,
+            default=400,
+            help="Daily rows newer than this many days are kept (rounded back to a month start)",
+        )
+        parser.add_argument(
+            "--keep-weekly-days",
+            type=int,
+            default=None,
+            help="Also drop weekly rows older than this many days; default: keep all weekly rows",
+        )
+
+    def handle(self, *args, **options):
+        keep_daily, keep_weekly = options["keep_daily_days"], options["keep_weekly_days"]
+        if keep_daily < 0 or (keep_weekly is not None and keep_weekly < keep_daily):
+            raise CommandError("--keep-daily-days must be >= 0 and --keep-weekly-days >= --keep-daily-days")
+
+        removed = compact(keep_daily, keep_weekly)
+        self.stdout.write(self.style.SUCCESS(
+            "Removed " + ", ".join(f"{count} {level} rows" for level, count in removed.items())
+        ))
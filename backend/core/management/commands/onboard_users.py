@@ -0,0 +1,33 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.registration import register_users_bulk, RegistrationError
+
+
+class Command(BaseCommand):
+    help = "Register users in bulk from a CSV roster (columns: username, email, role, sport, college, password)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file with a header row")
+        parser.add_argument(
+            "--default-password",
+            default=None,
+            help="Password for rows without one (otherwise those accounts get an unusable password)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], newline="", encoding="utf-8-sig") as fh:
+                rows = list(csv.DictReader(fh))
+        except OSError as e:
+            raise CommandError(str(e))
+
+        try:
+            user_ids = register_users_bulk(rows, default_password=options["default_password"])
+        except RegistrationError as e:
+            for number, problems in sorted(e.errors.items()):
+                self.stderr.write(f"row {number}: {problems}")
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(f"Registered {len(user_ids)} users"))
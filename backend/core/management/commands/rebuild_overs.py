@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Delivery, TournamentMatch
+from core.services.overs import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-over totals and bowlers' overs/maidens from the ball-by-ball delivery log"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--match",
+            action="append",
+            type=int,
+            default=None,
+            help="Tournament match id to rebuild; repeatable. Default: every match with deliveries",
+        )
+
+    def handle(self, *args, **options):
+        if options["match"]:
+            matches = list(TournamentMatch.objects.filter(pk__in=options["match"]))
+            missing = sorted(set(options["match"]) - {match.pk for match in matches})
+            if missing:
+                raise CommandError(f"Unknown match(es): {', '.join(map(str, missing))}")
+        else:
+            matches = list(TournamentMatch.objects.filter(pk__in=Delivery.objects.values("match_id")))
+
+        total = 0
+        for match in matches:
+            total += rebuild(match)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} overs across {len(matches)} matches"))
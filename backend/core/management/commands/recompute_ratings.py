@@ -0,0 +1,17 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.services.ratings import recompute
+
+
+class Command(BaseCommand):
+    help = "Rebuild all Elo ratings and rating history from completed matches and tournament matches"
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        result = recompute()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rated {result['matches']} matches ({result['teams']} teams, {result['players']} players) "
+            f"in {result['rounds']} rounds, {time.perf_counter() - started:.2f}s"
+        ))
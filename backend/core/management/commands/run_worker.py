@@ -0,0 +1,153 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+# core.* is imported lazily: spawned worker processes import this module
+# before django.setup() has run.
+
+
+def _queues_from_tasks():
+    from core.services.jobs import registered_tasks
+    return sorted({spec["queue"] for spec in registered_tasks().values()})
+
+
+class Worker:
+    """Polls the job table and runs claimed jobs on a thread pool."""
+
+    def __init__(self, queues, threads, poll_interval, burst=False, log=print):
+        self.queues = queues
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.burst = burst
+        self.log = log
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.stopping = threading.Event()
+        self._inflight = 0
+        self._lock = threading.Lock()
+
+    def stop(self, *args):
+        self.stopping.set()
+
+    def _run_job(self, job):
+        from core.services.jobs import execute
+
+        try:
+            ok = execute(job)
+            self.log(f"[{self.worker_id}] {job.name}#{job.id} {'done' if ok else 'failed (attempt %d/%d)' % (job.attempts, job.max_attempts)}")
+        finally:
+            close_old_connections()
+            with self._lock:
+                self._inflight -= 1
+
+    def run(self):
+        from core.services.jobs import claim, requeue_stale
+
+        self.log(f"[{self.worker_id}] queues={','.join(self.queues)} threads={self.threads}")
+        with ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="job") as pool:
+            while not self.stopping.is_set():
+                close_old_connections()
+                requeue_stale()
+                claimed_any = False
+                for queue in self.queues:
+                    with self._lock:
+                        free = self.threads - self._inflight
+                    if free <= 0:
+                        break
+                    for job in claim(queue, self.worker_id, free):
+                        claimed_any = True
+                        with self._lock:
+                            self._inflight += 1
+                        pool.submit(self._run_job, job)
+
+                if not claimed_any:
+                    with self._lock:
+                        idle = self._inflight == 0
+                    if self.burst and idle:
+                        break
+                    self.stopping.wait(self.poll_interval)
+        # Leaving the `with` block waits for in-flight jobs to finish
+        self.log(f"[{self.worker_id}] stopped")
+
+
+def _process_main(queues, threads, poll_interval, burst):
+    """Entry point for child processes started with the spawn context."""
+    import django
+    django.setup()
+    worker = Worker(queues, threads, poll_interval, burst=burst)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+
+
+class Command(BaseCommand):
+    help = "Run background jobs from the database queue (no external broker needed)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--queues",
+            default="",
+            help="Comma-separated queues to serve (default: every queue with a registered task)",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=settings.JOB_WORKER_THREADS,
+            help="Jobs run concurrently per process",
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=1,
+            help="Worker processes to start, each with its own thread pool",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=settings.JOB_POLL_INTERVAL,
+            help="Seconds to sleep when no job is ready",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Exit once no job is ready (e.g. for a cron entry)",
+        )
+
+    def handle(self, *args, **options):
+        queues = [q.strip() for q in options["queues"].split(",") if q.strip()] or _queues_from_tasks()
+        threads = max(1, options["threads"])
+        processes = max(1, options["processes"])
+        poll_interval = max(0.1, options["poll_interval"])
+
+        if processes == 1:
+            worker = Worker(queues, threads, poll_interval, burst=options["burst"], log=self.stdout.write)
+            signal.signal(signal.SIGTERM, worker.stop)
+            signal.signal(signal.SIGINT, worker.stop)
+            worker.run()
+            return
+
+        ctx = multiprocessing.get_context("spawn")
+        children = [
+            ctx.Process(target=_process_main, args=(queues, threads, poll_interval, options["burst"]))
+            for _ in range(processes)
+        ]
+        for child in children:
+            child.start()
+        self.stdout.write(f"Started {processes} worker processes x {threads} threads")
+
+        def forward(signum, frame):
+            for child in children:
+                if child.is_alive():
+                    os.kill(child.pid, signal.SIGTERM)
+
+        signal.signal(signal.SIGTERM, forward)
+        signal.signal(signal.SIGINT, forward)
+        while any(child.is_alive() for child in children):
+            time.sleep(0.5)
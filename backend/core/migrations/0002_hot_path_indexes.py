@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-19 14:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='leaderboard',
+            name='core_leader_score_15e31e_idx',
+        ),
+        migrations.AddIndex(
+            model_name='coachingsession',
+            index=models.Index(fields=['session_date'], name='session_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coachplayerlinkrequest',
+            index=models.Index(fields=['player', 'status'], name='link_player_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='coachplayerlinkrequest',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['coach', 'direction'], name='link_coach_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboard',
+            index=models.Index(fields=['-score', 'id'], name='leaderboard_score_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='notification_user_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playersportprofile',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['coach', 'sport'], name='psp_coach_sport_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playersportprofile',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['team', 'sport'], name='psp_team_sport_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='promotionrequest',
+            index=models.Index(fields=['status', 'sport'], name='promotion_status_sport_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sessionattendance',
+            index=models.Index(fields=['player', 'attended'], name='sessatt_player_attended_idx'),
+        ),
+    ]
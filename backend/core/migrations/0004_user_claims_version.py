@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_job_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='claims_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
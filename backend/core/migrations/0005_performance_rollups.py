@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_user_claims_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailyperformancescore',
+            name='rating_sum',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='dailyperformancescore',
+            name='sessions',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='performancescore',
+            name='rating_sum',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='performancescore',
+            name='sessions',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='MonthlyPerformanceScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month_start', models.DateField(help_text='First day of the month')),
+                ('score', models.FloatField(default=0.0)),
+                ('rating_sum', models.FloatField(default=0.0)),
+                ('sessions', models.PositiveIntegerField(default=0)),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_performance_scores', to='core.player')),
+            ],
+            options={
+                'ordering': ['-month_start'],
+                'unique_together': {('player', 'month_start')},
+            },
+        ),
+    ]
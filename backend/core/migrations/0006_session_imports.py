@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_performance_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(help_text='SHA-256 of the uploaded file', max_length=64)),
+                ('filename', models.CharField(blank=True, default='', max_length=255)),
+                ('status', models.CharField(choices=[('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='running', max_length=20)),
+                ('end_sessions', models.BooleanField(default=False, help_text='End the imported sessions once the file is done')),
+                ('session_ids', models.JSONField(blank=True, default=list, help_text='Sessions the file has touched so far')),
+                ('rows_processed', models.PositiveIntegerField(default=0)),
+                ('rows_updated', models.PositiveIntegerField(default=0)),
+                ('error_count', models.PositiveIntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('coach', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='session_imports', to='core.coach')),
+                ('session', models.ForeignKey(blank=True, help_text='Target session; empty for multi-session files with a session_id column', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='imports', to='core.coachingsession')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['coach', 'fingerprint'], name='sessimport_coach_fp_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_session_imports'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Delivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('over', models.PositiveIntegerField(help_text='Over the ball belongs to (0-indexed)')),
+                ('ball', models.PositiveIntegerField(help_text='Ball within the over (1-6)')),
+                ('runs', models.PositiveIntegerField(default=0)),
+                ('is_wicket', models.BooleanField(default=False)),
+                ('sequence', models.PositiveIntegerField(blank=True, help_text='Client sequence number (batch submissions)', null=True)),
+                ('idempotency_key', models.CharField(blank=True, max_length=100, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('batting_team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.team')),
+                ('bowler', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.player')),
+                ('bowling_team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.team')),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='core.tournamentmatch')),
+                ('next_batsman', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.player')),
+                ('striker', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.player')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['match', 'id'], name='delivery_match_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('idempotency_key__isnull', False)), fields=('match', 'idempotency_key'), name='delivery_match_key_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_deliveries'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='matchplayerstats',
+            name='balls_bowled',
+            field=models.PositiveIntegerField(default=0, help_text='Balls this player bowled; overs_bowled follows from it'),
+        ),
+        migrations.CreateModel(
+            name='OverSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('over', models.PositiveIntegerField(help_text='Over number (0-indexed)')),
+                ('runs', models.PositiveIntegerField(default=0)),
+                ('wickets', models.PositiveIntegerField(default=0)),
+                ('balls', models.PositiveIntegerField(default=0)),
+                ('is_maiden', models.BooleanField(default=False)),
+                ('batting_team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.team')),
+                ('bowler', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.player')),
+                ('match', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='over_summaries', to='core.tournamentmatch')),
+            ],
+            options={
+                'ordering': ['id'],
+                'constraints': [models.UniqueConstraint(fields=('match', 'batting_team', 'over'), name='oversummary_innings_over_uniq')],
+            },
+        ),
+    ]
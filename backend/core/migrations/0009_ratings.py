@@ -0,0 +1,66 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_over_summaries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Rating',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('team', 'Team'), ('player', 'Player')], max_length=10)),
+                ('rating', models.FloatField(default=1500.0)),
+                ('matches', models.PositiveIntegerField(default=0, help_text='Rated matches played')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('player', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ratings', to='core.player')),
+                ('sport', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ratings', to='core.sport')),
+                ('team', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ratings', to='core.team')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RatingHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('match', 'Match'), ('tournament_match', 'Tournament match')], max_length=20)),
+                ('match_id', models.PositiveIntegerField(help_text='Match or TournamentMatch id, per source')),
+                ('played_at', models.DateTimeField()),
+                ('before', models.FloatField()),
+                ('after', models.FloatField()),
+                ('rating', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='history', to='core.rating')),
+            ],
+            options={
+                'ordering': ['played_at', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='rating',
+            index=models.Index(fields=['kind', 'sport', '-rating', 'id'], name='rating_board_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='rating',
+            constraint=models.UniqueConstraint(condition=models.Q(('kind', 'team')), fields=('team',), name='rating_team_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='rating',
+            constraint=models.UniqueConstraint(condition=models.Q(('kind', 'player')), fields=('player', 'sport'), name='rating_player_sport_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='ratinghistory',
+            index=models.Index(fields=['source', 'match_id'], name='ratinghistory_source_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ratinghistory',
+            index=models.Index(fields=['rating', 'played_at', 'id'], name='ratinghistory_chart_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='ratinghistory',
+            constraint=models.UniqueConstraint(fields=('rating', 'source', 'match_id'), name='ratinghistory_match_uniq'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_ratings'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dailyperformancescore',
+            index=models.Index(fields=['date', 'player'], name='dailyperf_date_player_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='playersportprofile',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['sport', '-career_score', 'player'], name='psp_sport_score_idx'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+import datetime
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+
+def week_start(day):
+    return day - datetime.timedelta(days=day.weekday())
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def backfill_rollups(apps, schema_editor):
+    """
+    Fill the rollups 0005 added from existing attendance, like
+    `manage.py backfill_rollups` with no range (kept here so the migration
+    does not depend on the current models).
+    """
+    SessionAttendance = apps.get_model("core", "SessionAttendance")
+    levels = {
+        "date": (apps.get_model("core", "DailyPerformanceScore"), lambda day: day),
+        "week_start": (apps.get_model("core", "PerformanceScore"), week_start),
+        "month_start": (apps.get_model("core", "MonthlyPerformanceScore"), month_start),
+    }
+
+    daily = (
+        SessionAttendance.objects.filter(attended=True)
+        .annotate(day=TruncDate("session__session_date"))
+        .values("player_id", "day")
+        .annotate(rating_sum=Coalesce(Sum("rating"), 0), sessions=Count("id"))
+        .order_by()
+    )
+    totals = {field: defaultdict(lambda: [0.0, 0]) for field in levels}
+    for row in daily.iterator():
+        for field, (_, bucket) in levels.items():
+            acc = totals[field][(row["player_id"], bucket(row["day"]))]
+            acc[0] += float(row["rating_sum"])
+            acc[1] += row["sessions"]
+
+    for field, (model, _) in levels.items():
+        model.objects.all().delete()
+        model.objects.bulk_create(
+            [
+                model(player_id=player_id, score=round(s / n, 4), rating_sum=s, sessions=n, **{field: period})
+                for (player_id, period), (s, n) in totals[field].items()
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_leaderboard_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
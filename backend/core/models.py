@@ -26,6 +26,9 @@ class User(AbstractUser):
         choices=Roles.choices,
         default=Roles.PLAYER,
     )
+    # Bumped when JWT claims (role, profile ids, managed sports) go stale;
+    # access tokens carrying an older value are rejected
+    claims_version = models.PositiveIntegerField(default=0)
 
     # remove is_player/is_coach/is_admin fields afterwards
     def is_player(self):
@@ -101,6 +104,16 @@ class PlayerSportProfile(models.Model):
 
     class Meta:
         unique_together = ("player", "sport")
+        indexes = [
+            # A coach's active students (optionally per sport): CSV upload, end session, coach dashboard
+            models.Index(fields=["coach", "sport"], condition=models.Q(is_active=True), name="psp_coach_sport_active_idx"),
+            # Active roster of a team: match start and batsman/bowler validation
+            models.Index(fields=["team", "sport"], condition=models.Q(is_active=True), name="psp_team_sport_active_idx"),
+            # Per-sport leaderboards: top pages and rank counts
+            models.Index(
+                fields=["sport", "-career_score", "player"], condition=models.Q(is_active=True), name="psp_sport_score_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.player.user.username} - {self.sport.name if self.sport else 'Unknown'}"
@@ -314,7 +327,7 @@ class Leaderboard(models.Model):
 
     class Meta:
         indexes = [
-            models.Index(fields=["-score"]),
+            models.Index(fields=["-score", "id"], name="leaderboard_score_id_idx"),
         ]
 
 # -----------------------------
@@ -324,6 +337,9 @@ class PerformanceScore(models.Model):
     player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="performance_scores")
     week_start = models.DateField(help_text="Start of ISO week (Monday)")
     score = models.FloatField(default=0.0)
+    # Running totals behind `score` so rollups can be updated incrementally
+    rating_sum = models.FloatField(default=0.0)
+    sessions = models.PositiveIntegerField(default=0)
 
     class Meta:
         unique_together = ("player", "week_start")
@@ -347,6 +363,9 @@ class CoachingSession(models.Model):
 
     class Meta:
         ordering = ["-session_date"]
+        indexes = [
+            models.Index(fields=["session_date"], name="session_date_idx"),
+        ]
 
     def __str__(self):
         return f"{getattr(self.coach.user, 'username', 'Coach')} session on {self.session_date.date()}"
@@ -360,6 +379,9 @@ class SessionAttendance(models.Model):
 
     class Meta:
         unique_together = ("session", "player")
+        indexes = [
+            models.Index(fields=["player", "attended"], name="sessatt_player_attended_idx"),
+        ]
 
     def __str__(self):
         return f"{self.player} - {self.session} ({'Present' if self.attended else 'Absent'})"
@@ -383,6 +405,11 @@ class PromotionRequest(models.Model):
     decided_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name="promotion_decisions")
     remarks = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "sport"], name="promotion_status_sport_idx"),
+        ]
+
     def __str__(self):
         return f"Promotion[{self.get_status_display()}] {getattr(self.user, 'username', 'user')} → coach"
 
@@ -391,15 +418,36 @@ class DailyPerformanceScore(models.Model):
     player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="daily_performance_scores")
     date = models.DateField(help_text="Calendar day")
     score = models.FloatField(default=0.0)
+    rating_sum = models.FloatField(default=0.0)
+    sessions = models.PositiveIntegerField(default=0)
 
     class Meta:
         unique_together = ("player", "date")
         ordering = ["-date"]
+        indexes = [
+            # Windowed leaderboards sum a date range across all players
+            models.Index(fields=["date", "player"], name="dailyperf_date_player_idx"),
+        ]
 
     def __str__(self):
         return f"{self.player.user.username} @ {self.date}: {self.score}"
 
 
+class MonthlyPerformanceScore(models.Model):
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="monthly_performance_scores")
+    month_start = models.DateField(help_text="First day of the month")
+    score = models.FloatField(default=0.0)
+    rating_sum = models.FloatField(default=0.0)
+    sessions = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("player", "month_start")
+        ordering = ["-month_start"]
+
+    def __str__(self):
+        return f"{self.player.user.username} @ {self.month_start:%Y-%m}: {self.score}"
+
+
 # -----------------------------
 # Coach ↔ Player link requests (per sport)
 # -----------------------------
@@ -423,6 +471,11 @@ class CoachPlayerLinkRequest(models.Model):
 
     class Meta:
         unique_together = ("coach", "player", "sport", "status")
+        indexes = [
+            models.Index(fields=["player", "status"], name="link_player_status_idx"),
+            # Coach inbox only ever lists pending requests
+            models.Index(fields=["coach", "direction"], condition=models.Q(status="pending"), name="link_coach_pending_idx"),
+        ]
 
     def __str__(self):
         return f"{self.get_direction_display()}: {getattr(self.coach.user, 'username', 'coach')} ↔ {getattr(self.player.user, 'username', 'player')} [{self.get_status_display()}]"
@@ -672,6 +725,7 @@ class MatchPlayerStats(models.Model):
     
     # Bowling stats
     overs_bowled = models.DecimalField(max_digits=4, decimal_places=1, default=0.0, help_text="Overs bowled (e.g., 5.3 = 5.3 overs)")
+    balls_bowled = models.PositiveIntegerField(default=0, help_text="Balls this player bowled; overs_bowled follows from it")
     runs_conceded = models.PositiveIntegerField(default=0)
     wickets_taken = models.PositiveIntegerField(default=0)
     maidens = models.PositiveIntegerField(default=0)
@@ -694,6 +748,64 @@ class MatchPlayerStats(models.Model):
         return f"{self.player.user.username} - {self.match} ({self.runs_scored} runs, {self.wickets_taken} wickets)"
 
 
+# -----------------------------
+# Ball-by-ball log of a cricket match
+# -----------------------------
+class Delivery(models.Model):
+    """One ball as scored through score/, wicket/ or deliveries/batch/."""
+    match = models.ForeignKey(TournamentMatch, on_delete=models.CASCADE, related_name="deliveries")
+    batting_team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="+")
+    bowling_team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="+")
+    striker = models.ForeignKey(Player, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    bowler = models.ForeignKey(Player, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    over = models.PositiveIntegerField(help_text="Over the ball belongs to (0-indexed)")
+    ball = models.PositiveIntegerField(help_text="Ball within the over (1-6)")
+    runs = models.PositiveIntegerField(default=0)
+    is_wicket = models.BooleanField(default=False)
+    next_batsman = models.ForeignKey(Player, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    sequence = models.PositiveIntegerField(null=True, blank=True, help_text="Client sequence number (batch submissions)")
+    idempotency_key = models.CharField(max_length=100, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+        constraints = [
+            # A retried batch cannot apply the same ball twice
+            models.UniqueConstraint(
+                fields=["match", "idempotency_key"],
+                condition=models.Q(idempotency_key__isnull=False),
+                name="delivery_match_key_uniq",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["match", "id"], name="delivery_match_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.match_id} {self.over}.{self.ball}: {'W' if self.is_wicket else self.runs}"
+
+
+class OverSummary(models.Model):
+    """Per-over totals of an innings, kept up to date as deliveries are scored (charts read these)."""
+    match = models.ForeignKey(TournamentMatch, on_delete=models.CASCADE, related_name="over_summaries")
+    batting_team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name="+")
+    over = models.PositiveIntegerField(help_text="Over number (0-indexed)")
+    bowler = models.ForeignKey(Player, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    runs = models.PositiveIntegerField(default=0)
+    wickets = models.PositiveIntegerField(default=0)
+    balls = models.PositiveIntegerField(default=0)
+    is_maiden = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ["id"]
+        constraints = [
+            models.UniqueConstraint(fields=["match", "batting_team", "over"], name="oversummary_innings_over_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.match_id} over {self.over + 1}: {self.runs}/{self.wickets}"
+
+
 # -----------------------------
 # Tournament Points Table
 # -----------------------------
@@ -744,6 +856,154 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "-created_at", "-id"], name="notification_user_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username}: {self.title}"
+
+# -----------------------------
+# Background jobs
+# -----------------------------
+class Job(models.Model):
+    """A unit of background work picked up by `manage.py run_worker`."""
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        SUCCEEDED = "succeeded", "Succeeded"
+        FAILED = "failed", "Failed"
+
+    queue = models.CharField(max_length=50, default="default")
+    name = models.CharField(max_length=100, help_text="Registered task name (see core/services/jobs.py)")
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.QUEUED)
+    idempotency_key = models.CharField(max_length=200, unique=True, null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True, default="")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    result = models.JSONField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["queue", "run_at", "id"],
+                name="job_ready_idx",
+                condition=models.Q(status="queued"),
+            ),
+            models.Index(fields=["queue", "status"], name="job_queue_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.name} [{self.queue}] {self.status}"
+
+
+# -----------------------------
+# Session CSV imports
+# -----------------------------
+class SessionImport(models.Model):
+    """
+    A coach's attendance CSV import, committed chunk by chunk. rows_processed is
+    the checkpoint: re-uploading the same file resumes after it.
+    """
+
+    class Status(models.TextChoices):
+        RUNNING = "running", "Running"
+        COMPLETED = "completed", "Completed"
+        FAILED = "failed", "Failed"
+
+    coach = models.ForeignKey(Coach, on_delete=models.CASCADE, related_name="session_imports")
+    session = models.ForeignKey(
+        CoachingSession, on_delete=models.SET_NULL, null=True, blank=True, related_name="imports",
+        help_text="Target session; empty for multi-session files with a session_id column",
+    )
+    fingerprint = models.CharField(max_length=64, help_text="SHA-256 of the uploaded file")
+    filename = models.CharField(max_length=255, blank=True, default="")
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.RUNNING)
+    end_sessions = models.BooleanField(default=False, help_text="End the imported sessions once the file is done")
+    session_ids = models.JSONField(default=list, blank=True, help_text="Sessions the file has touched so far")
+    rows_processed = models.PositiveIntegerField(default=0)
+    rows_updated = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["coach", "fingerprint"], name="sessimport_coach_fp_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.filename or 'import'} ({self.status}, {self.rows_processed} rows)"
+
+
+# -----------------------------
+# Elo ratings (core/services/ratings.py)
+# -----------------------------
+class Rating(models.Model):
+    """Current Elo rating of a team, or of a player in one sport."""
+
+    class Kind(models.TextChoices):
+        TEAM = "team", "Team"
+        PLAYER = "player", "Player"
+
+    kind = models.CharField(max_length=10, choices=Kind.choices)
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, null=True, blank=True, related_name="ratings")
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, null=True, blank=True, related_name="ratings")
+    sport = models.ForeignKey(Sport, on_delete=models.CASCADE, null=True, blank=True, related_name="ratings")
+    rating = models.FloatField(default=1500.0)
+    matches = models.PositiveIntegerField(default=0, help_text="Rated matches played")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["team"], condition=models.Q(kind="team"), name="rating_team_uniq"),
+            models.UniqueConstraint(
+                fields=["player", "sport"], condition=models.Q(kind="player"), name="rating_player_sport_uniq",
+            ),
+        ]
+        indexes = [
+            # Top-K and rank lookups per board
+            models.Index(fields=["kind", "sport", "-rating", "id"], name="rating_board_idx"),
+        ]
+
+    def __str__(self):
+        subject = self.team_id if self.kind == self.Kind.TEAM else self.player_id
+        return f"{self.kind} {subject}: {self.rating:.0f}"
+
+
+class RatingHistory(models.Model):
+    """A rating's value before and after one rated match (rating charts)."""
+
+    class Source(models.TextChoices):
+        MATCH = "match", "Match"
+        TOURNAMENT_MATCH = "tournament_match", "Tournament match"
+
+    rating = models.ForeignKey(Rating, on_delete=models.CASCADE, related_name="history")
+    source = models.CharField(max_length=20, choices=Source.choices)
+    match_id = models.PositiveIntegerField(help_text="Match or TournamentMatch id, per source")
+    played_at = models.DateTimeField()
+    before = models.FloatField()
+    after = models.FloatField()
+
+    class Meta:
+        ordering = ["played_at", "id"]
+        constraints = [
+            models.UniqueConstraint(fields=["rating", "source", "match_id"], name="ratinghistory_match_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["source", "match_id"], name="ratinghistory_source_idx"),
+            models.Index(fields=["rating", "played_at", "id"], name="ratinghistory_chart_idx"),
+        ]
 
     def __str__(self):
-        return f"{self.user.username}: {self.title}"
\ No newline at end of file
+        return f"{self.rating_id} {self.source} {self.match_id}: {self.before:.0f} -> {self.after:.0f}"
@@ -0,0 +1,247 @@
+# core/pagination.py
+import base64
+import datetime
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _is_true(value):
+    return (value or "").strip().lower() in {"1", "true", "yes"}
+
+
+def _is_false(value):
+    return (value or "").strip().lower() in {"0", "false", "no"}
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    """DjangoJSONEncoder trims datetimes to milliseconds; cursors need the exact value."""
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def _client_page_size(request, param, default, cap):
+    """Page size requested by the client via `param`, clamped to 1..cap."""
+    try:
+        size = int(request.query_params[param])
+    except (KeyError, ValueError):
+        return default
+    if size <= 0:
+        return default
+    return min(size, cap)
+
+
+class StandardPagination(PageNumberPagination):
+    """
+    Default page-number pagination.
+
+    Clients may pick `page_size` (up to MAX_PAGE_SIZE) and send `count=false`
+    to skip the COUNT(*) query; the response then has `count: null` and the
+    next link is decided by fetching one extra row.
+    """
+    page_size_query_param = "page_size"
+    max_page_size = settings.MAX_PAGE_SIZE
+    count_query_param = "count"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.skip_count = _is_false(request.query_params.get(self.count_query_param))
+        if not self.skip_count:
+            return super().paginate_queryset(queryset, request, view)
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        try:
+            page_number = int(request.query_params.get(self.page_query_param, 1))
+        except ValueError:
+            page_number = 0
+        if page_number < 1:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message="Invalid page."))
+
+        offset = (page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        self.request = request
+        self.page_number = page_number
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_paginated_response(self, data):
+        if not self.skip_count:
+            return super().get_paginated_response(data)
+        return Response({
+            "count": None,
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_next_link(self):
+        if not self.skip_count:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, self.page_number + 1)
+
+    def get_previous_link(self):
+        if not self.skip_count:
+            return super().get_previous_link()
+        if self.page_number <= 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, self.page_number - 1)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor (keyset) pagination over a composite ordering.
+
+    The cursor holds the ordering values of the last row served, and the next
+    page is fetched with `WHERE (a, b) > (x, y)` spelled out as OR-ed Q objects,
+    so deep pages cost the same as the first one and no COUNT(*) is run unless
+    the client asks for it with `count=true`. Subclasses set `ordering`; its
+    fields must be non-null and the last one must be unique (usually `id`).
+    `?ordering=<field>` (or `-<field>`) picks one of the view's
+    `ordering_fields` instead, with `id` as the tiebreaker.
+
+    With `page_number_class` set, requests without a `cursor` parameter are
+    paginated by that class instead, so existing clients keep `count`,
+    `previous` and `?page=`; sending `?cursor=` (empty for the first page)
+    opts into keyset pages.
+    """
+    ordering = ("-id",)
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.MAX_PAGE_SIZE
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    ordering_query_param = "ordering"
+    page_number_class = None
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_ordering(self, request, view):
+        requested = (request.query_params.get(self.ordering_query_param) or "").strip()
+        if requested and requested.lstrip("-") in getattr(view, "ordering_fields", ()):
+            return (requested, "-id" if requested.startswith("-") else "id")
+        return self.ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering = self.get_ordering(request, view)
+        queryset = queryset.order_by(*self.ordering)
+
+        self.pages = None
+        if self.page_number_class is not None and self.cursor_query_param not in request.query_params:
+            self.pages = self.page_number_class()
+            return self.pages.paginate_queryset(queryset, request, view)
+
+        self.page_size = _client_page_size(request, self.page_size_query_param, self.page_size, self.max_page_size)
+
+        self.count = None
+        if _is_true(request.query_params.get(self.count_query_param)):
+            self.count = queryset.count()
+
+        self.model = queryset.model
+        position = self.decode_cursor(request)
+        if position is not None:
+            queryset = queryset.filter(self._after(position))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.next_position = None
+        if len(rows) > self.page_size:
+            rows = rows[:self.page_size]
+            self.next_position = [self._value(rows[-1], field) for field in self.ordering]
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.pages is not None:
+            return self.pages.get_paginated_response(data)
+        payload = {"next": self.get_next_link(), "results": data}
+        if self.count is not None:
+            payload["count"] = self.count
+        return Response(payload)
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def encode_cursor(self, position):
+        raw = json.dumps(position, cls=_CursorEncoder, separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8"))
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return [self._coerce(field, value) for field, value in zip(self.ordering, position)]
+
+    def _coerce(self, field, value):
+        """A cursor value as its ordering field's Python type; a forged or stale cursor is a 404, not a 500."""
+        model_field = self.model._meta.get_field(field.lstrip("-"))
+        try:
+            value = model_field.to_python(value)
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None or isinstance(value, (list, dict)):
+            raise NotFound(self.invalid_cursor_message)
+        return value
+
+    def _value(self, instance, field):
+        return getattr(instance, field.lstrip("-"))
+
+    def _after(self, position):
+        """Lexicographic "row comes after position" predicate for self.ordering."""
+        condition = Q()
+        for i, field in enumerate(self.ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            clause = Q(**{f"{name}__{lookup}": position[i]})
+            for prev_field, prev_value in zip(self.ordering[:i], position[:i]):
+                clause &= Q(**{prev_field.lstrip("-"): prev_value})
+            condition |= clause
+        return condition
+
+
+class NotificationPagination(KeysetPagination):
+    ordering = ("-created_at", "-id")
+
+
+class LeaderboardPagination(KeysetPagination):
+    ordering = ("-score", "id")
+    page_number_class = StandardPagination
+
+
+class TournamentMatchPagination(KeysetPagination):
+    ordering = ("tournament_id", "match_number")
+    page_number_class = StandardPagination
+
+
+class PlayerSportProfilePagination(KeysetPagination):
+    ordering = ("id",)
+    page_number_class = StandardPagination
+
+
+class PlayerPagination(KeysetPagination):
+    ordering = ("id",)
+    page_number_class = StandardPagination
@@ -19,3 +19,23 @@ class IsAuthenticatedAndCoach(BasePermission):
         return bool(request.user and request.user.is_authenticated and getattr(request.user, "role", None) == "coach")
 
 
+class CanUpdatePlayerSportProfile(BasePermission):
+    """Managers of the profile's sport and the profile's own coach may change it."""
+    message = "Only managers and coaches can update profiles"
+
+    def has_permission(self, request, view):
+        if not (request.user and request.user.is_authenticated):
+            return False
+        return getattr(request.user, "role", None) in {"manager", "coach"}
+
+    def has_object_permission(self, request, view, obj):
+        from .services.access import get_access_context
+
+        access = get_access_context(request.user)
+        if access.role == "manager":
+            self.message = "You don't manage this sport"
+            return access.manages_sport(obj.sport_id)
+        if access.role == "coach":
+            self.message = "Not your player"
+            return access.coach_id is not None and obj.coach_id == access.coach_id
+        return False
@@ -21,6 +21,7 @@ from .models import (
     ManagerSport,
 )
 from .utils import generate_coach_id
+from .services.roster import assign_team, RosterConflictError
 
 
 class PromotionError(Exception):
@@ -30,11 +31,26 @@ class PromotionError(Exception):
 def _notify(user: User, title: str, message: str, ntype: str) -> None:
     try:
         from .models import Notification
-        Notification.objects.create(user=user, title=title, message=message, type=ntype)
+        from .services.notification_stream import notification_broker
+        n = Notification.objects.create(user=user, title=title, message=message, type=ntype)
+        # Wake long-poll clients only once the row is visible to them
+        transaction.on_commit(lambda: notification_broker.publish(n.user_id, n.id))
     except Exception:
         pass
 
 
+def _notify_many(user_ids, title: str, message: str, ntype: str) -> None:
+    """Queue one notification per user as a single "notifications.fan_out" job, once the caller commits."""
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return
+    from .services.jobs import enqueue
+    transaction.on_commit(lambda: enqueue(
+        "notifications.fan_out",
+        payload={"user_ids": user_ids, "title": title, "message": message, "ntype": ntype},
+    ))
+
+
 @transaction.atomic
 def request_promotion(user: User, sport: Sport, player: Optional[Player] = None, remarks: Optional[str] = None) -> PromotionRequest:
     if hasattr(user, "coach"):
@@ -48,9 +64,8 @@ def request_promotion(user: User, sport: Sport, player: Optional[Player] = None,
     _notify(user, "Promotion request submitted", f"Requested coach role for {sport.name}", ntype="promotion")
     
     # Notify managers assigned to this sport
-    manager_sports = ManagerSport.objects.filter(sport=sport).select_related("manager__user")
-    for ms in manager_sports:
-        _notify(ms.manager.user, "Promotion Request", f"Player {player.user.username if player else user.username} requested promotion to coach for {sport.name}", ntype="promotion")
+    manager_users = ManagerSport.objects.filter(sport=sport).values_list("manager__user_id", flat=True)
+    _notify_many(manager_users, "Promotion Request", f"Player {player.user.username if player else user.username} requested promotion to coach for {sport.name}", ntype="promotion")
     
     return pr
 
@@ -200,7 +215,9 @@ def reject_link_request(link: CoachPlayerLinkRequest, acting_user: User) -> Coac
 # Team Proposal Services
 # -----------------------------
 class TeamProposalError(Exception):
-    pass
+    def __init__(self, message, conflicts=None):
+        super().__init__(message)
+        self.conflicts = conflicts or []
 
 
 @transaction.atomic
@@ -252,28 +269,26 @@ def approve_team_proposal(proposal: TeamProposal, decided_by: User) -> Team:
         coach=proposal.coach,
     )
     
-    # Assign players to team via PlayerSportProfile
+    # Assign players to team via PlayerSportProfile as one set operation.
     # Re-validate that players are not already in a team (in case assigned between proposal and approval)
-    for player in proposal.proposed_players.all():
-        profile = PlayerSportProfile.objects.get(player=player, sport=proposal.sport, coach=proposal.coach)
-        
-        # Double-check: player should not be in another team for this sport
-        if profile.team_id is not None and profile.team_id != team.id:
-            raise TeamProposalError(f"Player {player.player_id} is already in team '{profile.team.name}' for {proposal.sport.name}")
-        
-        # Also check for any other active profile for this player-sport with a team
-        other_profile = PlayerSportProfile.objects.filter(
-            player=player,
-            sport=proposal.sport,
-            team__isnull=False,
-            is_active=True
-        ).exclude(id=profile.id).first()
-        
-        if other_profile:
-            raise TeamProposalError(f"Player {player.player_id} is already in team '{other_profile.team.name}' for {proposal.sport.name}")
-        
-        profile.team = team
-        profile.save(update_fields=["team"])
+    # and report every conflicting player at once.
+    proposed = list(proposal.proposed_players.values_list("id", "player_id"))
+    profile_rows = list(
+        PlayerSportProfile.objects.filter(
+            player_id__in=[pk for pk, _ in proposed], sport=proposal.sport, coach=proposal.coach,
+        ).values_list("id", "player_id")
+    )
+    with_profile = {player_pk for _, player_pk in profile_rows}
+    missing = [code for pk, code in proposed if pk not in with_profile]
+    if missing:
+        raise TeamProposalError(
+            f"Players no longer coached by {proposal.coach.user.username} for {proposal.sport.name}: {', '.join(missing)}",
+            conflicts=[{"player_id": code, "reason": "not_your_student"} for code in missing],
+        )
+    try:
+        assign_team([profile_id for profile_id, _ in profile_rows], team)
+    except RosterConflictError as e:
+        raise TeamProposalError(str(e), conflicts=e.conflicts)
     
     proposal.status = TeamProposal.Status.APPROVED
     proposal.decided_at = timezone.now()
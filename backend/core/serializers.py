@@ -10,6 +10,11 @@ from .models import (
 )
 import datetime
 
+from .services.sport_registry import sport_registry
+from .services.roster import find_team_conflicts
+from .services.access import get_access_context
+from .services.registration import register_user, RegistrationError
+
 User = get_user_model()
 
 
@@ -257,29 +262,16 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         sport_name = validated_data.pop('sport_name', None)
         role = validated_data.pop('role', 'player')
 
-        with transaction.atomic():
-            # Create user first, then set custom fields
-            user = User.objects.create_user(
+        try:
+            user = register_user(
                 username=validated_data['username'],
                 email=validated_data['email'],
-                password=validated_data['password']
+                password=validated_data['password'],
+                role=role,
+                sport_name=sport_name,
             )
-            user.role = role
-            user.save()  # This triggers the signal that creates Player/Coach
-
-            # After save, the signal has created the Player (if role is player)
-            if user.role == 'player' and sport_name:
-                # Get the player that was created by the signal
-                player = user.player
-
-                try:
-                    # Use filter with iexact for case-insensitive lookup
-                    sport = Sport.objects.get(name__iexact=sport_name)
-                    PlayerSportProfile.objects.create(player=player, sport=sport)
-                except Sport.DoesNotExist:
-                    raise serializers.ValidationError({
-                        "sport_name": f"Sport '{sport_name}' not found. Available sports: Cricket, Football, Basketball, Running"
-                    })
+        except RegistrationError as e:
+            raise serializers.ValidationError(e.errors or str(e))
 
         return user
 
@@ -303,15 +295,16 @@ class TeamCreateSerializer(serializers.ModelSerializer):
             if user.role == User.Roles.MANAGER:
                 # Get the Manager object for this user
                 try:
-                    manager_obj = user.manager
+                    user.manager  # raises if the manager profile is missing
                     sport_id = attrs.get("sport_id")
                     if sport_id:
                         # Verify manager is assigned to this sport
-                        if not ManagerSport.objects.filter(manager=manager_obj, sport_id=sport_id).exists():
+                        access = get_access_context(user)
+                        if not access.manages_sport(sport_id):
                             # Get available sports for this manager
-                            available_sports = ManagerSport.objects.filter(manager=manager_obj).values_list('sport_id', flat=True)
+                            available_sports = sorted(access.managed_sport_ids)
                             raise serializers.ValidationError({
-                                "sport_id": f"You are not assigned to this sport. You are assigned to sports: {list(available_sports) if available_sports else 'None'}"
+                                "sport_id": f"You are not assigned to this sport. You are assigned to sports: {available_sports if available_sports else 'None'}"
                             })
                 except AttributeError:
                     raise serializers.ValidationError({"detail": "Manager profile not found. Please contact admin to set up your manager profile."})
@@ -437,6 +430,24 @@ class ManagerSportSerializer(serializers.ModelSerializer):
         fields = ['id', 'manager', 'sport', 'assigned_by', 'assigned_at']
 
 
+def _proposal_manager(sport, manager_id):
+    """Reviewer of a team proposal: the given manager, else the sport's first one."""
+    if manager_id:
+        try:
+            manager = User.objects.get(id=manager_id, role=User.Roles.MANAGER)
+        except User.DoesNotExist:
+            raise serializers.ValidationError({"manager_id": "Manager not found"})
+        # Check manager is assigned to this sport
+        if not get_access_context(manager).manages_sport(sport.id):
+            raise serializers.ValidationError({"manager_id": "Manager is not assigned to this sport"})
+        return manager
+    # Find first manager assigned to this sport
+    manager_sport = ManagerSport.objects.filter(sport=sport).first()
+    if not manager_sport:
+        raise serializers.ValidationError({"sport_id": "No manager assigned to this sport"})
+    return manager_sport.manager.user
+
+
 class TeamProposalCreateSerializer(serializers.Serializer):
     manager_id = serializers.IntegerField(required=False, allow_null=True)
     sport_id = serializers.IntegerField()
@@ -457,23 +468,7 @@ class TeamProposalCreateSerializer(serializers.Serializer):
         if coach.primary_sport_id != sport.id:
             raise serializers.ValidationError({"sport_id": "Must match coach primary sport"})
         
-        # Auto-find manager if not provided
-        manager_id = attrs.get("manager_id")
-        if manager_id:
-            try:
-                manager = User.objects.get(id=manager_id, role=User.Roles.MANAGER)
-            except User.DoesNotExist:
-                raise serializers.ValidationError({"manager_id": "Manager not found"})
-            # Check manager is assigned to this sport
-            if not ManagerSport.objects.filter(manager__user=manager, sport=sport).exists():
-                raise serializers.ValidationError({"manager_id": "Manager is not assigned to this sport"})
-        else:
-            # Find first manager assigned to this sport
-            manager_sport = ManagerSport.objects.filter(sport=sport).first()
-            if not manager_sport:
-                raise serializers.ValidationError({"sport_id": "No manager assigned to this sport"})
-            manager = manager_sport.manager.user
-        
+        manager = _proposal_manager(sport, attrs.get("manager_id"))
         attrs["manager"] = manager
         
         # Validate players are coach's students and not in any team for this sport
@@ -496,6 +491,40 @@ class TeamProposalCreateSerializer(serializers.Serializer):
         return attrs
 
 
+class TeamBalanceSerializer(serializers.Serializer):
+    sport_id = serializers.IntegerField()
+    player_ids = serializers.ListField(child=serializers.IntegerField(), required=False, min_length=2)
+    team_count = serializers.IntegerField(min_value=2)
+    team_size = serializers.IntegerField(min_value=1, required=False, allow_null=True)
+    together = serializers.ListField(
+        child=serializers.ListField(child=serializers.IntegerField(), min_length=2, max_length=2), required=False, default=list,
+    )
+    apart = serializers.ListField(
+        child=serializers.ListField(child=serializers.IntegerField(), min_length=2, max_length=2), required=False, default=list,
+    )
+    min_roles = serializers.DictField(child=serializers.IntegerField(min_value=0), required=False, default=dict)
+    submit = serializers.BooleanField(required=False, default=False)
+    team_name_prefix = serializers.CharField(max_length=90, required=False, default="Team")
+    manager_id = serializers.IntegerField(required=False, allow_null=True)
+
+    def validate(self, attrs):
+        coach = getattr(self.context["request"].user, "coach", None)
+        if coach is None:
+            raise serializers.ValidationError("Only coaches can balance teams")
+        try:
+            sport = Sport.objects.get(id=attrs["sport_id"])
+        except Sport.DoesNotExist:
+            raise serializers.ValidationError({"sport_id": "Invalid sport"})
+        if coach.primary_sport_id != sport.id:
+            raise serializers.ValidationError({"sport_id": "Must match coach primary sport"})
+        attrs["coach"] = coach
+        attrs["sport"] = sport
+        # Proposals need a reviewer; plain previews do not
+        if attrs["submit"]:
+            attrs["manager"] = _proposal_manager(sport, attrs.get("manager_id"))
+        return attrs
+
+
 class TeamProposalSerializer(serializers.ModelSerializer):
     coach = CoachSerializer(read_only=True)
     manager = UserPublicSerializer(read_only=True)
@@ -582,14 +611,14 @@ class TournamentCreateSerializer(serializers.ModelSerializer):
             except User.DoesNotExist:
                 raise serializers.ValidationError({"manager_id": "Manager not found"})
             sport = attrs["sport"]
-            if not ManagerSport.objects.filter(manager__user=manager, sport=sport).exists():
+            if not get_access_context(manager).manages_sport(sport.id):
                 raise serializers.ValidationError({"manager_id": "Manager is not assigned to this sport"})
             attrs["manager"] = manager
         elif user.role == User.Roles.MANAGER:
             if not hasattr(user, "manager"):
                 raise serializers.ValidationError("Manager profile not found")
             sport = attrs["sport"]
-            if not ManagerSport.objects.filter(manager__user=user, sport=sport).exists():
+            if not get_access_context(user).manages_sport(sport.id):
                 raise serializers.ValidationError({"sport": "You are not assigned to this sport"})
             attrs["manager"] = user
         else:
@@ -756,40 +785,42 @@ class PlayerSportProfileUpdateSerializer(serializers.ModelSerializer):
         
         # If trying to assign to a team
         if new_team is not None:
-            # Get current team (from instance or attrs)
-            current_team = instance.team if hasattr(instance, 'team') else None
-            
-            # If already in a different team, prevent change (must remove first)
-            if current_team and current_team.id != new_team.id:
-                raise serializers.ValidationError({
-                    "team": f"Player {instance.player.player_id} is already in team '{current_team.name}' for {instance.sport.name}. Set team to null first to remove from current team."
-                })
-            
-            # Verify team sport matches profile sport
-            if new_team.sport_id != instance.sport_id:
-                raise serializers.ValidationError({
-                    "team": f"Team sport '{new_team.sport.name}' does not match profile sport '{instance.sport.name}'"
-                })
-            
-            # Double-check: ensure no other active profile for this player-sport has a team
-            # (This is a safety check, though there should only be one profile per player-sport)
-            other_profiles = PlayerSportProfile.objects.filter(
-                player=instance.player,
-                sport=instance.sport,
-                team__isnull=False,
-                is_active=True
-            ).exclude(id=instance.id)
-            
-            if other_profiles.exists():
-                other_team = other_profiles.first().team
-                if other_team.id != new_team.id:
+            # Same conflict rules as bulk roster moves (core/services/roster.py)
+            conflicts = find_team_conflicts([instance.id], new_team)
+            if conflicts:
+                # Report the profile's own team before a sibling profile's
+                conflict = min(conflicts, key=lambda c: c["profile_id"] != instance.id)
+                if conflict["reason"] == "sport_mismatch":
+                    raise serializers.ValidationError({
+                        "team": f"Team sport '{new_team.sport.name}' does not match profile sport '{instance.sport.name}'"
+                    })
+                if conflict["reason"] == "already_in_team":
                     raise serializers.ValidationError({
-                        "team": f"Player {instance.player.player_id} is already in team '{other_team.name}' for {instance.sport.name}."
+                        "team": f"Player {instance.player.player_id} is already in team '{conflict['team']}' for {instance.sport.name}. Set team to null first to remove from current team."
                     })
+                raise serializers.ValidationError({
+                    "team": f"Player {instance.player.player_id} is already in team '{conflict['team']}' for {instance.sport.name}."
+                })
         
         return attrs
 
 
+class PlayerSportProfileBulkTeamSerializer(serializers.Serializer):
+    """Move many profiles onto a team (or off their team with team_id=null) in one request."""
+    profile_ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=500,
+    )
+    team_id = serializers.IntegerField(allow_null=True)
+
+    def validate_team_id(self, value):
+        if value is None:
+            return None
+        try:
+            return Team.objects.select_related("sport").get(id=value)
+        except Team.DoesNotExist:
+            raise serializers.ValidationError("Team not found")
+
+
 # -----------------------------
 # Cricket Match Serializers
 # -----------------------------
@@ -0,0 +1,133 @@
+# backend/core/services/access.py
+from django.conf import settings
+from django.core.cache import cache
+
+from core.authentication import Principal
+from core.models import Manager, PlayerSportProfile
+
+
+class AccessContext:
+    """
+    What a user may see and change, computed once and reused. Identity comes
+    from the caller's Principal (role, own Player/Coach/Manager pk, managed
+    sports), which JWTs carry as claims; the context adds what is looked up
+    from it:
+
+    student_profile_ids  PlayerSportProfiles coached by this coach
+    student_player_ids   Players behind those profiles
+    profile_ids          the player's own PlayerSportProfiles
+    """
+
+    __slots__ = ("principal", "student_profile_ids", "student_player_ids", "profile_ids")
+
+    def __init__(self, principal, student_profile_ids=(), student_player_ids=(), profile_ids=()):
+        self.principal = principal
+        self.student_profile_ids = frozenset(student_profile_ids)
+        self.student_player_ids = frozenset(student_player_ids)
+        self.profile_ids = frozenset(profile_ids)
+
+    user_id = property(lambda self: self.principal.user_id)
+    role = property(lambda self: self.principal.role)
+    player_id = property(lambda self: self.principal.player_id)
+    coach_id = property(lambda self: self.principal.coach_id)
+    manager_id = property(lambda self: self.principal.manager_id)
+    managed_sport_ids = property(lambda self: self.principal.managed_sport_ids)
+
+    @property
+    def is_admin(self):
+        return self.role == "admin"
+
+    def manages_sport(self, sport_id):
+        return self.principal.manages_sport(sport_id)
+
+    def coaches_profile(self, profile_id):
+        return profile_id in self.student_profile_ids
+
+    def owns_profile(self, profile_id):
+        return profile_id in self.profile_ids
+
+    def to_dict(self):
+        return {
+            "principal": self.principal.to_dict(),
+            "student_profile_ids": sorted(self.student_profile_ids),
+            "student_player_ids": sorted(self.student_player_ids),
+            "profile_ids": sorted(self.profile_ids),
+        }
+
+    @classmethod
+    def from_dict(cls, data, principal=None):
+        data = dict(data)
+        stored = Principal.from_dict(data.pop("principal"))
+        return cls(principal or stored, **data)
+
+
+def _version_key(user_id):
+    return f"access:v:{user_id}"
+
+
+def _context_key(user_id, version):
+    return f"access:ctx:{user_id}:{version}"
+
+
+def access_version(user_id):
+    """Current version of a user's cached access data (0 until first bumped)."""
+    return cache.get(_version_key(user_id)) or 0
+
+
+def bump_access_version(*user_ids):
+    """Invalidate the cached context of these users (called from signals)."""
+    for user_id in set(user_ids):
+        if user_id is None:
+            continue
+        key = _version_key(user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Unknown key: start a fresh version line
+            cache.set(key, 1, None)
+
+
+def _build(user, principal=None):
+    principal = principal or Principal.for_user(user)
+    data = {}
+    if principal.coach_id is not None:
+        rows = list(PlayerSportProfile.objects.filter(coach_id=principal.coach_id).values_list("id", "player_id"))
+        data["student_profile_ids"] = [pid for pid, _ in rows]
+        data["student_player_ids"] = [player_id for _, player_id in rows]
+    elif principal.player_id is not None:
+        data["profile_ids"] = list(
+            PlayerSportProfile.objects.filter(player_id=principal.player_id).values_list("id", flat=True)
+        )
+    return AccessContext(principal, **data)
+
+
+def get_access_context(user):
+    """
+    AccessContext for `user`: memoised on the user object for the request and
+    cached across requests under a per-user version that the User, ManagerSport
+    and PlayerSportProfile signals bump. A claim-bearing JWT supplies the
+    principal; otherwise it is looked up with the rest and cached with it, and
+    get_principal reads it from here. The default cache (CACHE_BACKEND, LocMem
+    unless set) is per process, so another worker keeps its copy for up to
+    ACCESS_CONTEXT_TTL seconds; with Redis or Memcached configured the bump is
+    seen everywhere at once.
+    """
+    role = getattr(user, "role", None)
+    ctx = getattr(user, "_access_context", None)
+    if ctx is not None and ctx.role == role:
+        return ctx
+
+    principal = user.__dict__.get("principal")
+    key = _context_key(user.pk, access_version(user.pk))
+    data = cache.get(key)
+    if data is not None and data["principal"]["role"] == role:
+        ctx = AccessContext.from_dict(data, principal)
+    else:
+        ctx = _build(user, principal)
+        cache.set(key, ctx.to_dict(), settings.ACCESS_CONTEXT_TTL)
+    user._access_context = ctx
+    return ctx
+
+
+def manager_user_id(manager_pk):
+    return Manager.objects.filter(pk=manager_pk).values_list("user_id", flat=True).first()
@@ -0,0 +1,89 @@
+# backend/core/services/counters.py
+from django.db import connections, transaction
+from django.db.models import F
+from django.db.models.sql import UpdateQuery
+from django.utils import timezone
+
+
+def _supports_update_returning(connection):
+    # PostgreSQL, and SQLite >= 3.35 (which is when it gained RETURNING on inserts too)
+    return connection.vendor in ("postgresql", "sqlite") and connection.features.can_return_columns_from_insert
+
+
+def _assignments(model, deltas, values):
+    changes = {name: F(name) + delta for name, delta in (deltas or {}).items() if delta}
+    changes.update(values or {})
+    if changes:
+        # update() skips auto_now, so stamp those columns here as save() would
+        now = timezone.now()
+        for field in model._meta.concrete_fields:
+            if getattr(field, "auto_now", False) and field.name not in changes:
+                changes[field.name] = now
+    return changes
+
+
+def _from_db(connection, field, value):
+    # Same backend and field converters a SELECT applies (e.g. SQLite decimals and booleans)
+    col = field.get_col(field.model._meta.db_table)
+    for converter in connection.ops.get_db_converters(col) + col.get_db_converters(connection):
+        value = converter(value, col, connection)
+    return value
+
+
+def apply(queryset, deltas=None, values=None, returning=()):
+    """
+    Change the rows of `queryset` in one UPDATE statement: each field in
+    `deltas` becomes `col = col + delta` (F() expressions, so concurrent
+    increments are never lost) and each field in `values` is set to the value
+    or expression given. Expressions read the pre-update row, as in SQL.
+
+    Returns the `returning` fields of the first updated row as a dict (read
+    with RETURNING where the database supports it, otherwise re-read in the
+    same transaction), {} if nothing was asked for, or None when no row
+    matched.
+    """
+    model = queryset.model
+    changes = _assignments(model, deltas, values)
+    returning = list(returning)
+    if not changes:
+        if not returning:
+            return {}
+        return queryset.values(*returning).first()
+
+    connection = connections[queryset.db]
+    if returning and _supports_update_returning(connection):
+        query = queryset.query.chain(UpdateQuery)
+        query.add_update_values(changes)
+        compiler = query.get_compiler(queryset.db)
+        compiler.pre_sql_setup()
+        sql, params = compiler.as_sql()
+        fields = [model._meta.get_field(name) for name in returning]
+        qn = connection.ops.quote_name
+        sql = f"{sql} RETURNING {', '.join(qn(field.column) for field in fields)}"
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        return {name: _from_db(connection, field, value) for name, field, value in zip(returning, fields, row)}
+
+    with transaction.atomic(using=queryset.db):
+        updated = queryset.update(**changes)
+        if not updated:
+            return None
+        if not returning:
+            return {}
+        # The UPDATE holds the row lock until commit, so this read sees our change
+        return queryset.values(*returning).first()
+
+
+def increment(model, pk, returning=(), **deltas):
+    """apply() for one row by primary key with deltas only."""
+    return apply(model.objects.filter(pk=pk), deltas=deltas, returning=returning)
+
+
+def assign(instance, data):
+    """Copy values returned by apply() onto a loaded instance."""
+    for name, value in (data or {}).items():
+        setattr(instance, name, value)
+    return instance
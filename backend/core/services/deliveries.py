@@ -0,0 +1,327 @@
+# backend/core/services/deliveries.py
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, PositiveIntegerField, Q, Value, When
+
+from core.models import CricketMatchState, Delivery, MatchPlayerStats, PlayerSportProfile, TournamentMatch
+from core.services import counters, overs
+
+
+class DeliveryError(Exception):
+    pass
+
+
+# Deliveries accepted in one batch (a 50-over innings with extras fits easily)
+MAX_BATCH_SIZE = 600
+
+# CricketMatchState columns the scoring actions read back from their UPDATE
+STATE_COUNTERS = (
+    "current_over", "current_ball", "total_balls_bowled",
+    "team1_runs", "team1_wickets", "team2_runs", "team2_wickets", "updated_at",
+)
+
+
+def next_ball():
+    """current_ball/current_over assignments for one legal delivery; ball 6 completes the over."""
+    over_done = Q(current_ball__gte=5)
+    return {
+        "current_ball": Case(
+            When(over_done, then=Value(0)),
+            default=F("current_ball") + 1,
+            output_field=PositiveIntegerField(),
+        ),
+        "current_over": Case(
+            When(over_done, then=F("current_over") + 1),
+            default=F("current_over"),
+            output_field=PositiveIntegerField(),
+        ),
+    }
+
+
+def bowled_position(current_over, current_ball):
+    """(over, ball 1-6) of the delivery that left the state at current_over/current_ball."""
+    if current_ball == 0:
+        return current_over - 1, 6
+    return current_over, current_ball
+
+
+def log_delivery(match, state, new_state, runs=0, is_wicket=False, next_batsman_id=None):
+    """
+    Record a ball scored through score/ or wicket/ and add it to its over's
+    totals; `state` is the state as read before it.
+    """
+    over, ball = bowled_position(new_state["current_over"], new_state["current_ball"])
+    overs.add_to_over(
+        match.pk, state.current_batting_team_id, over, state.current_bowler_id,
+        runs=runs, wickets=int(is_wicket), balls=1,
+    )
+    return Delivery.objects.create(
+        match_id=match.pk,
+        batting_team_id=state.current_batting_team_id,
+        bowling_team_id=state.current_bowling_team_id,
+        striker_id=state.current_striker_id,
+        bowler_id=state.current_bowler_id,
+        over=over,
+        ball=ball,
+        runs=runs,
+        is_wicket=is_wicket,
+        next_batsman_id=next_batsman_id,
+    )
+
+
+def _int(value, name):
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be an integer")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer")
+
+
+def _parse(entry):
+    """Normalised delivery dict, or raises ValueError with the reason."""
+    if not isinstance(entry, dict):
+        raise ValueError("Each delivery must be an object")
+    seq = _int(entry.get("seq"), "seq")
+    key = entry.get("key")
+    if not isinstance(key, str) or not key.strip() or len(key) > 100:
+        raise ValueError("key must be a non-empty string of at most 100 characters")
+    kind = entry.get("type")
+    delivery = {"seq": seq, "key": key.strip(), "type": kind}
+    if entry.get("bowler_id") is not None:
+        delivery["bowler_id"] = _int(entry["bowler_id"], "bowler_id")
+    if kind == "runs":
+        runs = _int(entry.get("runs"), "runs")
+        if runs < 0 or runs > 6:
+            raise ValueError("runs must be between 0 and 6")
+        delivery["runs"] = runs
+    elif kind == "wicket":
+        if not entry.get("next_batsman_id"):
+            raise ValueError("next_batsman_id required")
+        delivery["next_batsman_id"] = _int(entry["next_batsman_id"], "next_batsman_id")
+    else:
+        raise ValueError('type must be "runs" or "wicket"')
+    return delivery
+
+
+class _Innings:
+    """The live state played forward in memory, with the per-player stat changes it implies."""
+
+    def __init__(self, match, state, rosters):
+        self.match = match
+        self.state = state
+        self.batting = state.current_batting_team_id
+        self.bowling = state.current_bowling_team_id
+        self.side = 1 if self.batting == match.team1_id else 2
+        self.rosters = rosters  # player pk -> team pk
+        self.batsman1 = state.batsman1_id
+        self.batsman2 = state.batsman2_id
+        self.striker = state.current_striker_id
+        self.bowler = state.current_bowler_id
+        self.over = state.current_over
+        self.ball = state.current_ball
+        self.runs = self.wickets = self.balls = 0
+        self.stats = defaultdict(lambda: {"deltas": defaultdict(int), "values": {}})
+        self.over_totals = {}  # over -> totals for add_to_over, in the order bowled
+        self.rows = []
+
+    def _advance(self, bowler, runs=0, wickets=0):
+        self.balls += 1
+        self.ball += 1
+        over, ball = self.over, self.ball
+        if self.ball >= 6:
+            self.ball = 0
+            self.over += 1
+        totals = self.over_totals.setdefault(over, {"runs": 0, "wickets": 0, "balls": 0, "bowler_id": None})
+        totals["runs"] += runs
+        totals["wickets"] += wickets
+        totals["balls"] += 1
+        totals["bowler_id"] = bowler or totals["bowler_id"]
+        if bowler:
+            self.stats[(bowler, self.bowling)]["deltas"]["balls_bowled"] += 1
+        return over, ball
+
+    def play(self, delivery):
+        """Apply one delivery, or raise ValueError with the same reasons score/ and wicket/ give."""
+        bowler = delivery.get("bowler_id", self.bowler)
+        if "bowler_id" in delivery and self.rosters.get(bowler) != self.bowling:
+            raise ValueError("Player must be in current bowling team")
+
+        if delivery["type"] == "runs":
+            if not self.striker or not bowler:
+                raise ValueError("Batsman and bowler must be set")
+            runs = delivery["runs"]
+            striker = self.striker
+            self.bowler = bowler
+            over, ball = self._advance(bowler, runs=runs)
+            self.runs += runs
+            batting = self.stats[(striker, self.batting)]["deltas"]
+            batting["runs_scored"] += runs
+            batting["balls_faced"] += 1
+            batting["fours"] += runs == 4
+            batting["sixes"] += runs == 6
+            self.stats[(bowler, self.bowling)]["deltas"]["runs_conceded"] += runs
+            # Switch striker on odd runs at the end of the over
+            if self.ball == 0 and runs % 2 == 1:
+                self.striker = self.batsman2 if self.striker == self.batsman1 else self.batsman1
+            self._row(delivery, striker, bowler, over, ball, runs=runs)
+            return
+
+        if not self.striker:
+            raise ValueError("No batsman on strike")
+        next_batsman = delivery["next_batsman_id"]
+        if self.rosters.get(next_batsman) != self.batting:
+            raise ValueError("Next batsman must be in batting team")
+        striker = self.striker
+        self.bowler = bowler
+        over, ball = self._advance(bowler, wickets=1)
+        self.wickets += 1
+        batting = self.stats[(striker, self.batting)]
+        batting["deltas"]["balls_faced"] += 1
+        batting["values"]["is_out"] = True
+        if bowler:
+            self.stats[(bowler, self.bowling)]["deltas"]["wickets_taken"] += 1
+        # Replace the out batsman
+        if striker == self.batsman1:
+            self.batsman1 = next_batsman
+        else:
+            self.batsman2 = next_batsman
+        self.striker = next_batsman
+        self._row(delivery, striker, bowler, over, ball, is_wicket=True, next_batsman=next_batsman)
+
+    def _row(self, delivery, striker, bowler, over, ball, runs=0, is_wicket=False, next_batsman=None):
+        self.rows.append(Delivery(
+            match_id=self.match.pk,
+            batting_team_id=self.batting,
+            bowling_team_id=self.bowling,
+            striker_id=striker,
+            bowler_id=bowler,
+            over=over,
+            ball=ball,
+            runs=runs,
+            is_wicket=is_wicket,
+            next_batsman_id=next_batsman,
+            sequence=delivery["seq"],
+            idempotency_key=delivery["key"],
+        ))
+
+    def save(self):
+        """Write the log, the player stats and the state; returns the state columns after the UPDATE."""
+        Delivery.objects.bulk_create(self.rows, batch_size=500)
+
+        existing = dict(
+            MatchPlayerStats.objects.filter(match=self.match, player_id__in={player for player, _ in self.stats})
+            .values_list("player_id", "id")
+        )
+        missing = [
+            MatchPlayerStats(match=self.match, player_id=player, team_id=team)
+            for player, team in self.stats if player not in existing
+        ]
+        if missing:
+            MatchPlayerStats.objects.bulk_create(missing, ignore_conflicts=True)
+            existing = dict(
+                MatchPlayerStats.objects.filter(match=self.match, player_id__in={player for player, _ in self.stats})
+                .values_list("player_id", "id")
+            )
+        for (player, _), change in self.stats.items():
+            deltas, values = change["deltas"], change["values"]
+            if deltas.get("balls_bowled"):
+                bowling = overs.bowled(deltas["balls_bowled"])
+                deltas, values = {**deltas, **bowling["deltas"]}, {**values, **bowling["values"]}
+            counters.apply(MatchPlayerStats.objects.filter(pk=existing[player]), deltas=deltas, values=values)
+        for over, totals in self.over_totals.items():
+            overs.add_to_over(self.match.pk, self.batting, over, **totals)
+
+        counters.increment(
+            TournamentMatch, self.match.pk,
+            **{f"score_team{self.side}": self.runs, f"wickets_team{self.side}": self.wickets},
+        )
+        # The state row is locked, so positions are written as they were played out
+        return counters.apply(
+            CricketMatchState.objects.filter(pk=self.state.pk),
+            deltas={
+                f"team{self.side}_runs": self.runs,
+                f"team{self.side}_wickets": self.wickets,
+                "total_balls_bowled": self.balls,
+            },
+            values={
+                "current_over": self.over,
+                "current_ball": self.ball,
+                "batsman1_id": self.batsman1,
+                "batsman2_id": self.batsman2,
+                "current_striker_id": self.striker,
+                "current_bowler_id": self.bowler,
+            },
+            returning=STATE_COUNTERS,
+        )
+
+
+def submit_batch(match, entries):
+    """
+    Apply an offline scorer's deliveries to `match` in one transaction.
+
+    Entries are {"seq", "key", "type": "runs"|"wicket", "runs" | "next_batsman_id",
+    optional "bowler_id"} and are played in seq order. A key already applied
+    to this match (by an earlier or retried batch, or earlier in this one) is
+    reported as a duplicate and skipped; an invalid entry is rejected with the
+    reason and the rest still apply. Returns (state, result) with the updated
+    CricketMatchState and the applied / duplicate / rejected entries.
+    """
+    if not isinstance(entries, list) or not entries:
+        raise DeliveryError("deliveries must be a non-empty list")
+    if len(entries) > MAX_BATCH_SIZE:
+        raise DeliveryError(f"At most {MAX_BATCH_SIZE} deliveries per batch")
+
+    parsed, rejected = [], []
+    for index, entry in enumerate(entries):
+        try:
+            parsed.append(_parse(entry))
+        except ValueError as e:
+            rejected.append({
+                "index": index,
+                "seq": entry.get("seq") if isinstance(entry, dict) else None,
+                "key": entry.get("key") if isinstance(entry, dict) else None,
+                "error": str(e),
+            })
+    parsed.sort(key=lambda delivery: delivery["seq"])
+
+    applied, duplicates = [], []
+    with transaction.atomic():
+        # Serialises batches for this match against each other and single-ball scoring
+        state = CricketMatchState.objects.select_for_update().filter(match_id=match.pk).first()
+        status = TournamentMatch.objects.filter(pk=match.pk).values_list("status", flat=True).first()
+        if state is None or status != TournamentMatch.Status.IN_PROGRESS:
+            raise DeliveryError("Match not in progress")
+
+        seen = set(
+            Delivery.objects.filter(match_id=match.pk, idempotency_key__in=[d["key"] for d in parsed])
+            .values_list("idempotency_key", flat=True)
+        )
+        rosters = dict(
+            PlayerSportProfile.objects.filter(
+                team_id__in=[state.current_batting_team_id, state.current_bowling_team_id],
+                sport_id=match.tournament.sport_id,
+                is_active=True,
+            ).values_list("player_id", "team_id")
+        )
+
+        innings = _Innings(match, state, rosters)
+        for delivery in parsed:
+            if delivery["key"] in seen:
+                duplicates.append({"seq": delivery["seq"], "key": delivery["key"]})
+                continue
+            try:
+                innings.play(delivery)
+            except ValueError as e:
+                rejected.append({"seq": delivery["seq"], "key": delivery["key"], "error": str(e)})
+                continue
+            seen.add(delivery["key"])
+            applied.append(delivery["seq"])
+
+        if innings.rows:
+            counters.assign(state, innings.save())
+            state.batsman1_id, state.batsman2_id = innings.batsman1, innings.batsman2
+            state.current_striker_id, state.current_bowler_id = innings.striker, innings.bowler
+
+    return state, {"applied": applied, "duplicates": duplicates, "rejected": rejected}
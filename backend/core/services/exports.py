@@ -0,0 +1,212 @@
+# backend/core/services/exports.py
+import csv
+import datetime
+import json
+import zlib
+
+from django.conf import settings
+
+from core.models import MatchPlayerStats, PlayerSportProfile, SessionAttendance, Tournament, TournamentPoints
+from core.utils import day_bounds
+
+
+class ExportError(Exception):
+    pass
+
+
+# Encoded rows are buffered up to this many bytes before a chunk is sent
+FLUSH_BYTES = 64 * 1024
+
+
+class _Line:
+    """File-like target for csv.writer that hands back each written line."""
+
+    def write(self, value):
+        return value
+
+
+def _parse_date(value, name):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise ExportError(f"{name} must be YYYY-MM-DD")
+
+
+# Every dataset maps its output columns to ORM paths and is read with
+# values_list(...).iterator(), so rows are never materialised as model instances.
+
+PLAYER_COLUMNS = [
+    ("player_id", "player__player_id"),
+    ("username", "player__user__username"),
+    ("email", "player__user__email"),
+    ("college", "player__college"),
+    ("player_active", "player__is_active"),
+    ("sport", "sport__name"),
+    ("team", "team__name"),
+    ("coach_id", "coach__coach_id"),
+    ("joined_date", "joined_date"),
+    ("profile_active", "is_active"),
+    ("career_score", "career_score"),
+    ("session_count", "session_count"),
+]
+
+ATTENDANCE_COLUMNS = [
+    ("session_id", "session_id"),
+    ("session_date", "session__session_date"),
+    ("sport", "session__sport__name"),
+    ("coach_id", "session__coach__coach_id"),
+    ("team", "session__team__name"),
+    ("player_id", "player__player_id"),
+    ("attended", "attended"),
+    ("rating", "rating"),
+]
+
+MATCH_STATS_COLUMNS = [
+    ("match_number", "match__match_number"),
+    ("match_date", "match__date"),
+    ("team", "team__name"),
+    ("player_id", "player__player_id"),
+    ("runs_scored", "runs_scored"),
+    ("balls_faced", "balls_faced"),
+    ("fours", "fours"),
+    ("sixes", "sixes"),
+    ("is_out", "is_out"),
+    ("dismissal_type", "dismissal_type"),
+    ("overs_bowled", "overs_bowled"),
+    ("runs_conceded", "runs_conceded"),
+    ("wickets_taken", "wickets_taken"),
+    ("maidens", "maidens"),
+    ("wides", "wides"),
+    ("no_balls", "no_balls"),
+    ("catches", "catches"),
+    ("stumpings", "stumpings"),
+    ("run_outs", "run_outs"),
+]
+
+POINTS_COLUMNS = [
+    ("team", "team__name"),
+    ("matches_played", "matches_played"),
+    ("matches_won", "matches_won"),
+    ("matches_lost", "matches_lost"),
+    ("matches_tied", "matches_tied"),
+    ("matches_no_result", "matches_no_result"),
+    ("points", "points"),
+    ("net_run_rate", "net_run_rate"),
+]
+
+
+def _players(params, sport_ids):
+    qs = PlayerSportProfile.objects.all()
+    if sport_ids is not None:
+        qs = qs.filter(sport_id__in=sport_ids)
+    if params.get("sport"):
+        qs = qs.filter(sport__name__iexact=params["sport"])
+    if params.get("active") in ("1", "true"):
+        qs = qs.filter(is_active=True, player__is_active=True)
+    return PLAYER_COLUMNS, qs.order_by("player__player_id", "sport__name")
+
+
+def _attendance(params, sport_ids):
+    qs = SessionAttendance.objects.all()
+    if sport_ids is not None:
+        qs = qs.filter(session__sport_id__in=sport_ids)
+    if params.get("sport"):
+        qs = qs.filter(session__sport__name__iexact=params["sport"])
+    if params.get("start"):
+        qs = qs.filter(session__session_date__gte=day_bounds(_parse_date(params["start"], "start"))[0])
+    if params.get("end"):
+        qs = qs.filter(session__session_date__lt=day_bounds(_parse_date(params["end"], "end"))[1])
+    if params.get("coach"):
+        qs = qs.filter(session__coach__coach_id=params["coach"])
+    return ATTENDANCE_COLUMNS, qs.order_by("session__session_date", "session_id", "player_id")
+
+
+def _tournament(params, sport_ids):
+    try:
+        tournament = Tournament.objects.only("id", "sport_id").get(pk=int(params.get("tournament", "")))
+    except (ValueError, Tournament.DoesNotExist):
+        raise ExportError("tournament must be the id of an existing tournament")
+    if sport_ids is not None and tournament.sport_id not in sport_ids:
+        raise ExportError("tournament is not in a sport you manage")
+    return tournament
+
+
+def _match_stats(params, sport_ids):
+    tournament = _tournament(params, sport_ids)
+    qs = MatchPlayerStats.objects.filter(match__tournament=tournament)
+    return MATCH_STATS_COLUMNS, qs.order_by("match__match_number", "team_id", "player_id")
+
+
+def _points(params, sport_ids):
+    tournament = _tournament(params, sport_ids)
+    qs = TournamentPoints.objects.filter(tournament=tournament)
+    return POINTS_COLUMNS, qs.order_by("-points", "-net_run_rate", "team__name")
+
+
+DATASETS = {
+    "players": _players,
+    "attendance": _attendance,
+    "match-stats": _match_stats,
+    "points": _points,
+}
+
+FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def build_export(dataset, params, sport_ids=None):
+    """
+    (column names, row iterator) for `dataset`. sport_ids limits the rows to
+    those sports (managers); None means no limit. Filters come from params.
+    """
+    if dataset not in DATASETS:
+        raise ExportError(f"Unknown export '{dataset}'. Available: {', '.join(DATASETS)}")
+    columns, qs = DATASETS[dataset](params, sport_ids)
+    rows = qs.values_list(*[path for _, path in columns]).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+    return [name for name, _ in columns], rows
+
+
+def encode_csv(columns, rows):
+    writer = csv.writer(_Line(), lineterminator="\n")
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _json_value(value):
+    # Dates/datetimes as ISO 8601, Decimals (overs, net run rate) as strings
+    return value.isoformat() if hasattr(value, "isoformat") else str(value)
+
+
+def encode_ndjson(columns, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row)), default=_json_value) + "\n"
+
+
+ENCODERS = {"csv": encode_csv, "ndjson": encode_ndjson}
+
+
+def stream(lines, compress=False):
+    """
+    Join encoded lines into ~FLUSH_BYTES chunks of bytes, gzip-compressed when
+    `compress` is set. Only one chunk is held in memory at a time.
+    """
+    gz = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+    buffer, size = [], 0
+    for line in lines:
+        data = line.encode("utf-8")
+        buffer.append(data)
+        size += len(data)
+        if size >= FLUSH_BYTES:
+            chunk = b"".join(buffer)
+            buffer, size = [], 0
+            chunk = gz.compress(chunk) if gz else chunk
+            if chunk:
+                yield chunk
+    chunk = b"".join(buffer)
+    if gz:
+        chunk = gz.compress(chunk) + gz.flush()
+    if chunk:
+        yield chunk
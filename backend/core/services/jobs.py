@@ -0,0 +1,193 @@
+# backend/core/services/jobs.py
+import contextlib
+import datetime
+import random
+import traceback
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.models import Job
+
+
+class JobError(Exception):
+    pass
+
+
+# name -> {"func", "queue", "max_attempts"}
+_TASKS = {}
+
+
+def task(name, queue="default", max_attempts=None):
+    """
+    Register a function as a background task:
+
+        @task("ratings.recompute", queue="leaderboard")
+        def recompute():
+            ...
+
+    The function is called with the job payload as keyword arguments; its
+    return value (if JSON serialisable) is stored on the job.
+    """
+    def decorator(func):
+        _TASKS[name] = {"func": func, "queue": queue, "max_attempts": max_attempts}
+        return func
+    return decorator
+
+
+def registered_tasks():
+    _load_tasks()
+    return dict(_TASKS)
+
+
+def _load_tasks():
+    # Task modules register themselves on import
+    import core.tasks  # noqa: F401
+
+
+def queue_limits():
+    """
+    Per-queue concurrency caps from JOB_QUEUE_CONCURRENCY ("name=n,name=n").
+    Queues not listed are only bounded by the worker's own pool size.
+    """
+    limits = {}
+    for item in (getattr(settings, "JOB_QUEUE_CONCURRENCY", "") or "").split(","):
+        name, _, value = item.partition("=")
+        name = name.strip()
+        if name and value.strip().isdigit():
+            limits[name] = int(value)
+    return limits
+
+
+def enqueue(name, payload=None, queue=None, idempotency_key=None, run_at=None, max_attempts=None):
+    """
+    Add a job to the queue and return it. With an idempotency_key, enqueueing the
+    same key again returns the existing job instead of creating a second one.
+    """
+    _load_tasks()
+    spec = _TASKS.get(name)
+    if spec is None:
+        raise JobError(f"Unknown task '{name}'")
+
+    fields = {
+        "name": name,
+        "queue": queue or spec["queue"],
+        "payload": payload or {},
+        "run_at": run_at or timezone.now(),
+        "max_attempts": max_attempts or spec["max_attempts"] or settings.JOB_MAX_ATTEMPTS,
+    }
+    if idempotency_key is None:
+        return Job.objects.create(**fields)
+
+    existing = Job.objects.filter(idempotency_key=idempotency_key).first()
+    if existing:
+        return existing
+    try:
+        with transaction.atomic():
+            return Job.objects.create(idempotency_key=idempotency_key, **fields)
+    except IntegrityError:
+        # Lost a race with another enqueue of the same key
+        return Job.objects.get(idempotency_key=idempotency_key)
+
+
+def backoff_delay(attempts):
+    """Exponential backoff with jitter, capped at JOB_RETRY_MAX_DELAY seconds."""
+    base = settings.JOB_RETRY_BASE_DELAY * (2 ** max(0, attempts - 1))
+    delay = min(base, settings.JOB_RETRY_MAX_DELAY)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def requeue_stale():
+    """Put back jobs whose worker died mid-run (locked longer than JOB_LOCK_TIMEOUT)."""
+    cutoff = timezone.now() - datetime.timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    return Job.objects.filter(status=Job.Status.RUNNING, locked_at__lt=cutoff).update(
+        status=Job.Status.QUEUED, locked_by="", locked_at=None,
+    )
+
+
+def claim(queue, worker_id, limit):
+    """
+    Atomically take up to `limit` ready jobs from `queue` for worker_id.
+
+    PostgreSQL: rows are picked with FOR UPDATE SKIP LOCKED, and a per-queue
+    advisory lock makes the concurrency-cap check and the claim one step.
+    SQLite: no row locks, so each candidate is claimed with its own conditional
+    UPDATE ... WHERE status='queued' in autocommit mode; SQLite serialises
+    writers, so only one worker can win a given row. The concurrency cap is
+    best-effort there when several worker processes share a queue.
+    """
+    cap = queue_limits().get(queue)
+    now = timezone.now()
+    ready = Job.objects.filter(queue=queue, status=Job.Status.QUEUED, run_at__lte=now).order_by("run_at", "id")
+    postgres = connection.vendor == "postgresql"
+
+    # A deferred SQLite transaction that reads and then writes can fail with
+    # "database is locked" instead of waiting, so only PostgreSQL gets one.
+    with transaction.atomic() if postgres else contextlib.nullcontext():
+        if postgres:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", [f"core_job:{queue}"])
+        if cap is not None:
+            running = Job.objects.filter(queue=queue, status=Job.Status.RUNNING).count()
+            limit = min(limit, cap - running)
+        if limit <= 0:
+            return []
+
+        claim_fields = {
+            "status": Job.Status.RUNNING,
+            "locked_by": worker_id,
+            "locked_at": now,
+            "attempts": F("attempts") + 1,
+        }
+        if postgres:
+            claimed = list(ready.select_for_update(skip_locked=True).values_list("id", flat=True)[:limit])
+            if claimed:
+                Job.objects.filter(id__in=claimed).update(**claim_fields)
+        else:
+            claimed = [
+                job_id for job_id in ready.values_list("id", flat=True)[:limit]
+                if Job.objects.filter(id=job_id, status=Job.Status.QUEUED).update(**claim_fields)
+            ]
+
+    if not claimed:
+        return []
+    return list(Job.objects.filter(id__in=claimed).order_by("run_at", "id"))
+
+
+def execute(job):
+    """Run a claimed job and record the outcome (success, retry or failure)."""
+    _load_tasks()
+    spec = _TASKS.get(job.name)
+    try:
+        if spec is None:
+            raise JobError(f"Unknown task '{job.name}'")
+        result = spec["func"](**(job.payload or {}))
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            Job.objects.filter(id=job.id).update(
+                status=Job.Status.QUEUED,
+                run_at=timezone.now() + datetime.timedelta(seconds=backoff_delay(job.attempts)),
+                locked_by="", locked_at=None, last_error=error,
+            )
+        else:
+            Job.objects.filter(id=job.id).update(
+                status=Job.Status.FAILED, finished_at=timezone.now(),
+                locked_by="", locked_at=None, last_error=error,
+            )
+        return False
+
+    try:
+        Job.objects.filter(id=job.id).update(
+            status=Job.Status.SUCCEEDED, finished_at=timezone.now(), result=result,
+            locked_by="", locked_at=None, last_error="",
+        )
+    except (TypeError, ValueError):
+        # Return value is not JSON serialisable; keep the success, drop the result
+        Job.objects.filter(id=job.id).update(
+            status=Job.Status.SUCCEEDED, finished_at=timezone.now(),
+            locked_by="", locked_at=None, last_error="",
+        )
+    return True
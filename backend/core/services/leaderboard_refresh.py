@@ -0,0 +1,91 @@
+# backend/core/services/leaderboard_refresh.py
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Job
+
+REFRESH_TASK = "leaderboard.refresh_players"
+
+
+class LeaderboardRefresher:
+    """
+    Coalescing front for the leaderboard refresh job.
+
+    `enqueue` merges the affected players into the refresh job that has not
+    started yet, or queues a new one LEADERBOARD_REFRESH_DELAY seconds out, so
+    the finalizations within that window share one "leaderboard.refresh_players"
+    job. The pending players live on the Job row, so they survive restarts and
+    every process adds to the same job; `run_worker` runs it with the job
+    queue's retries, and `status()` is read from the job rows.
+    """
+
+    @property
+    def delay(self):
+        return max(0.0, float(getattr(settings, "LEADERBOARD_REFRESH_DELAY", 5)))
+
+    def enqueue(self, player_ids):
+        """Add player_ids to the pending refresh; returns its Job (None if there is nothing to do)."""
+        from core.services.jobs import enqueue
+
+        player_ids = set(player_ids)
+        if not player_ids:
+            return None
+        with transaction.atomic():
+            # Only a job that has never run; one waiting out a retry backoff keeps its own players
+            job = (
+                Job.objects.select_for_update()
+                .filter(name=REFRESH_TASK, status=Job.Status.QUEUED, attempts=0)
+                .order_by("id")
+                .first()
+            )
+            if job is None:
+                run_at = timezone.now() + datetime.timedelta(seconds=self.delay)
+                return enqueue(REFRESH_TASK, payload={"player_ids": sorted(player_ids)}, run_at=run_at)
+            pending = set(job.payload.get("player_ids", []))
+            if not player_ids <= pending:
+                job.payload = {"player_ids": sorted(pending | player_ids)}
+                job.save(update_fields=["payload"])
+            return job
+
+    def status(self):
+        """Pending, running and last finished refresh, from the job table."""
+        jobs = Job.objects.filter(name=REFRESH_TASK)
+        pending = list(jobs.filter(status=Job.Status.QUEUED).order_by("run_at", "id"))
+        running = jobs.filter(status=Job.Status.RUNNING).order_by("-id").first()
+        last = (
+            jobs.filter(status__in=[Job.Status.SUCCEEDED, Job.Status.FAILED])
+            .order_by("-finished_at", "-id")
+            .first()
+        )
+
+        if running is not None:
+            state = "running"
+        elif pending:
+            state = "retrying" if pending[0].attempts else "scheduled"
+        elif last is not None and last.status == Job.Status.FAILED:
+            state = "failed"
+        else:
+            state = "idle"
+        pending_players = set()
+        for job in pending:
+            pending_players.update(job.payload.get("player_ids", []))
+
+        return {
+            "state": state,
+            "pending_jobs": len(pending),
+            "pending_players": len(pending_players),
+            "next_run_at": pending[0].run_at if pending else None,
+            "running_job_id": running.id if running else None,
+            "last_job_id": last.id if last else None,
+            "last_status": last.status if last else None,
+            "last_finished_at": last.finished_at if last else None,
+            "last_players": len(last.payload.get("player_ids", [])) if last else None,
+            "last_attempts": last.attempts if last else None,
+            "last_error": (last.last_error or None) if last else None,
+        }
+
+
+leaderboard_refresher = LeaderboardRefresher()
@@ -0,0 +1,125 @@
+# backend/core/services/leaderboards.py
+import datetime
+
+from django.conf import settings
+from django.db.models import F, Q, Sum, Window
+from django.db.models.functions import Rank, RowNumber
+from django.utils import timezone
+
+from core.models import DailyPerformanceScore, Leaderboard, Player, PlayerSportProfile
+
+
+class LeaderboardError(Exception):
+    pass
+
+
+# ?window= values besides "season"
+WINDOW_DAYS = {"7": 7, "30": 30}
+
+
+def season_start(today=None):
+    """The latest LEADERBOARD_SEASON_START (MM-DD) on or before today."""
+    today = today or timezone.localdate()
+    month, day = (int(part) for part in settings.LEADERBOARD_SEASON_START.split("-"))
+    start = datetime.date(today.year, month, day)
+    return start if start <= today else start.replace(year=today.year - 1)
+
+
+def window_start(window, today=None):
+    today = today or timezone.localdate()
+    if window == "season":
+        return season_start(today)
+    if window not in WINDOW_DAYS:
+        raise LeaderboardError(f"window must be one of: {', '.join([*WINDOW_DAYS, 'season'])}")
+    return today - datetime.timedelta(days=WINDOW_DAYS[window] - 1)
+
+
+def board(sport_id=None, college=None, team_id=None, window=None):
+    """
+    Rows of one leaderboard as a queryset of {player_id, points}:
+
+    - all-time, all sports: Leaderboard.score (sum of career scores)
+    - all-time, one sport: that sport's PlayerSportProfile.career_score
+    - window (7, 30 or season): DailyPerformanceScore summed since its start
+
+    narrowed to a college (Player.college) and/or a team's roster. Inactive
+    players are left out.
+    """
+    if window:
+        if sport_id:
+            raise LeaderboardError("Windowed leaderboards cover all sports; drop sport or window")
+        rows = (
+            DailyPerformanceScore.objects.filter(date__gte=window_start(window))
+            .values("player_id").annotate(points=Sum("score"))
+        )
+    elif sport_id:
+        rows = PlayerSportProfile.objects.filter(sport_id=sport_id, is_active=True).annotate(points=F("career_score"))
+    else:
+        rows = Leaderboard.objects.annotate(points=F("score"))
+
+    rows = rows.filter(player__is_active=True)
+    if college:
+        rows = rows.filter(player__college__iexact=college)
+    if team_id:
+        if sport_id and not window:
+            rows = rows.filter(team_id=team_id)
+        else:
+            rows = rows.filter(player__sport_profiles__team_id=team_id, player__sport_profiles__is_active=True)
+    return rows.values("player_id", "points")
+
+
+def _with_players(rows):
+    players = {
+        pk: (code, username)
+        for pk, code, username in Player.objects.filter(pk__in=[row["player_id"] for row in rows]).values_list(
+            "pk", "player_id", "user__username",
+        )
+    }
+    return [
+        {
+            "rank": row["rank"],
+            "player_id": players[row["player_id"]][0],
+            "username": players[row["player_id"]][1],
+            "score": round(float(row["points"] or 0), 2),
+        }
+        for row in rows
+    ]
+
+
+def top(rows, offset=0, limit=50):
+    """A page of the board with ranks, from RANK() OVER the whole board."""
+    page = list(
+        rows.annotate(rank=Window(Rank(), order_by=F("points").desc()))
+        .order_by("-points", "player_id")[offset:offset + limit]
+    )
+    return _with_players(page)
+
+
+def _find(rows, player_pk):
+    # No default ordering: ordering by pk would split the windowed board's GROUP BY
+    return next(iter(rows.filter(player_id=player_pk).order_by()[:1]), None)
+
+
+def around(rows, player_pk, radius=5):
+    """
+    The player's row and up to `radius` rows either side, ranked: the
+    player's score, then one pass counting the rows ahead of them and one
+    pass taking RANK()/ROW_NUMBER() OVER the board, kept to their
+    neighbourhood. Windowed boards are aggregated once per pass.
+    """
+    found = _find(rows, player_pk)
+    if found is None:
+        return None
+    points = found["points"]
+    position = rows.filter(Q(points__gt=points) | Q(points=points, player_id__lt=player_pk)).count() + 1
+    entries = list(
+        rows.annotate(
+            rank=Window(Rank(), order_by=F("points").desc()),
+            position=Window(RowNumber(), order_by=[F("points").desc(), F("player_id").asc()]),
+        )
+        .filter(position__gte=position - radius, position__lte=position + radius)
+        .order_by("position")
+    )
+    # The board can move between the two queries; the rank is the one in the window
+    rank = next((row["rank"] for row in entries if row["player_id"] == player_pk), None)
+    return {"rank": rank, "entries": _with_players(entries)}
@@ -0,0 +1,127 @@
+# backend/core/services/live_scores.py
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+
+from core.models import Delivery, TournamentMatch
+
+# Balls shown in each match's recent-deliveries strip
+RECENT_BALLS = 6
+
+# Response key -> ORM path; read with one values_list() across the live state joins
+_FIELDS = {
+    "id": "id",
+    "match_number": "match_number",
+    "team1_id": "team1_id",
+    "team1_name": "team1__name",
+    "team2_id": "team2_id",
+    "team2_name": "team2__name",
+    "score_team1": "score_team1",
+    "score_team2": "score_team2",
+    "wickets_team1": "wickets_team1",
+    "wickets_team2": "wickets_team2",
+    "state_id": "cricket_state__id",
+    "batting_team_id": "cricket_state__current_batting_team_id",
+    "current_over": "cricket_state__current_over",
+    "current_ball": "cricket_state__current_ball",
+    "team1_runs": "cricket_state__team1_runs",
+    "team1_wickets": "cricket_state__team1_wickets",
+    "team2_runs": "cricket_state__team2_runs",
+    "team2_wickets": "cricket_state__team2_wickets",
+    "striker_id": "cricket_state__current_striker_id",
+    "striker_player_id": "cricket_state__current_striker__player_id",
+    "striker_username": "cricket_state__current_striker__user__username",
+    "bowler_id": "cricket_state__current_bowler_id",
+    "bowler_player_id": "cricket_state__current_bowler__player_id",
+    "bowler_username": "cricket_state__current_bowler__user__username",
+    "updated_at": "cricket_state__updated_at",
+}
+
+
+def _player(row, prefix):
+    if row[f"{prefix}_id"] is None:
+        return None
+    return {
+        "id": row[f"{prefix}_id"],
+        "player_id": row[f"{prefix}_player_id"],
+        "username": row[f"{prefix}_username"],
+    }
+
+
+def _recent_balls(rows):
+    """{match id: ["1", "4", "W", ...]} for the current innings of each match, oldest first."""
+    innings = Q()
+    for row in rows:
+        if row["batting_team_id"] is not None:
+            innings |= Q(match_id=row["id"], batting_team_id=row["batting_team_id"])
+    if not innings:
+        return {}
+    recent = (
+        Delivery.objects.filter(innings)
+        .annotate(rank=Window(RowNumber(), partition_by=[F("match_id")], order_by=F("id").desc()))
+        .filter(rank__lte=RECENT_BALLS)
+        .order_by("match_id", "id")
+        .values_list("match_id", "runs", "is_wicket")
+    )
+    balls = {}
+    for match_id, runs, is_wicket in recent:
+        balls.setdefault(match_id, []).append("W" if is_wicket else str(runs))
+    return balls
+
+
+def _compact(row, balls):
+    has_state = row["state_id"] is not None
+    return {
+        "id": row["id"],
+        "match_number": row["match_number"],
+        "team1": {
+            "id": row["team1_id"],
+            "name": row["team1_name"],
+            "runs": row["team1_runs"] if has_state else row["score_team1"],
+            "wickets": row["team1_wickets"] if has_state else row["wickets_team1"],
+        },
+        "team2": {
+            "id": row["team2_id"],
+            "name": row["team2_name"],
+            "runs": row["team2_runs"] if has_state else row["score_team2"],
+            "wickets": row["team2_wickets"] if has_state else row["wickets_team2"],
+        },
+        "batting_team_id": row["batting_team_id"],
+        "overs": f"{row['current_over']}.{row['current_ball']}" if has_state else None,
+        "striker": _player(row, "striker"),
+        "bowler": _player(row, "bowler"),
+        "last_balls": balls.get(row["id"], []),
+        "updated_at": row["updated_at"],
+    }
+
+
+def live_matches(tournament_id, since=None):
+    """
+    Compact live state of every in-progress match of a tournament, in two
+    queries. With `since`, only matches whose state changed after it are
+    included; match_ids always lists every live match so clients can drop
+    finished ones.
+    """
+    matches = (
+        TournamentMatch.objects.filter(tournament_id=tournament_id, status=TournamentMatch.Status.IN_PROGRESS)
+        .order_by("match_number")
+        .values_list(*_FIELDS.values())
+    )
+    rows = [dict(zip(_FIELDS, values)) for values in matches]
+    as_of = max((row["updated_at"] for row in rows if row["updated_at"]), default=None)
+    changed = [row for row in rows if since is None or (row["updated_at"] and row["updated_at"] > since)]
+    balls = _recent_balls(changed)
+    return {
+        "tournament": tournament_id,
+        "as_of": as_of,
+        "match_ids": [row["id"] for row in rows],
+        "matches": [_compact(row, balls) for row in changed],
+    }
+
+
+def etag(payload):
+    digest = hashlib.sha1(json.dumps(payload, cls=DjangoJSONEncoder, sort_keys=True).encode()).hexdigest()
+    return f'"{digest}"'
@@ -0,0 +1,130 @@
+# backend/core/services/login.py
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.cache import cache
+
+from core.models import Coach, Manager, ManagerSport, Player, PlayerSportProfile, User
+from core.services.access import access_version
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def hash_pool():
+    """
+    Process-wide pool that runs every password hash/verify done at login.
+
+    LOGIN_HASH_WORKERS caps how many hashes run at once; extra logins queue
+    here instead of competing for CPU with the rest of the request traffic.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=max(1, settings.LOGIN_HASH_WORKERS), thread_name_prefix="pwhash"
+                )
+    return _pool
+
+
+def _verify(raw_password, encoded):
+    """(is_correct, needs_rehash) for a stored hash; pure CPU, no DB access."""
+    needs_rehash = []
+    ok = check_password(raw_password, encoded, setter=needs_rehash.append)
+    return ok, bool(needs_rehash)
+
+
+def verify_password(user, raw_password):
+    """
+    Check `raw_password` for `user` on the hash pool. If the stored hash uses an
+    older hasher or cost, it is replaced with a hash from the preferred one.
+    """
+    ok, needs_rehash = hash_pool().submit(_verify, raw_password, user.password).result()
+    if ok and needs_rehash:
+        _upgrade(user, hash_pool().submit(make_password, raw_password).result())
+    return ok
+
+
+async def averify_password(user, raw_password):
+    """verify_password for async views: the event loop is free while hashing runs."""
+    from asgiref.sync import sync_to_async
+
+    loop = asyncio.get_running_loop()
+    ok, needs_rehash = await loop.run_in_executor(hash_pool(), _verify, raw_password, user.password)
+    if ok and needs_rehash:
+        encoded = await loop.run_in_executor(hash_pool(), make_password, raw_password)
+        await sync_to_async(_upgrade)(user, encoded)
+    return ok
+
+
+def burn_hash(raw_password):
+    """Hash once for an unknown username so its response time matches a real user's."""
+    hash_pool().submit(make_password, raw_password).result()
+
+
+async def aburn_hash(raw_password):
+    await asyncio.get_running_loop().run_in_executor(hash_pool(), make_password, raw_password)
+
+
+def _upgrade(user, encoded):
+    # update() instead of save(): no signals, and only the password column is written
+    User.objects.filter(pk=user.pk).update(password=encoded)
+    user.password = encoded
+
+
+def _payload_key(user_id):
+    return f"login:payload:{user_id}:{access_version(user_id)}"
+
+
+def _build_payload(user):
+    payload = {
+        "user_id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "is_staff": user.is_staff,
+        "is_superuser": user.is_superuser,
+        "role": user.role,
+        "profile": {},
+    }
+    if user.role == User.Roles.PLAYER:
+        player = Player.objects.filter(user_id=user.pk).values("id", "player_id").first()
+        if player:
+            payload["profile"] = {
+                "player_id": player["player_id"],
+                "sport_ids": list(
+                    PlayerSportProfile.objects.filter(player_id=player["id"], is_active=True)
+                    .values_list("sport_id", flat=True)
+                ),
+            }
+    elif user.role == User.Roles.COACH:
+        coach_id = Coach.objects.filter(user_id=user.pk).values_list("coach_id", flat=True).first()
+        if coach_id:
+            payload["profile"] = {"coach_id": coach_id}
+    elif user.role == User.Roles.MANAGER:
+        manager_id = Manager.objects.filter(user_id=user.pk).values_list("manager_id", flat=True).first()
+        if manager_id:
+            payload["profile"] = {
+                "manager_id": manager_id,
+                "sport_ids": list(
+                    ManagerSport.objects.filter(manager__user_id=user.pk).values_list("sport_id", flat=True)
+                ),
+            }
+    return payload
+
+
+def login_payload(user):
+    """
+    The user/role/profile part of the login response, cached per user under the
+    access-context version so role, profile and managed-sport changes show up
+    at the next login.
+    """
+    key = _payload_key(user.pk)
+    payload = cache.get(key)
+    if payload is None:
+        payload = _build_payload(user)
+        cache.set(key, payload, settings.LOGIN_PAYLOAD_TTL)
+    return payload
@@ -0,0 +1,137 @@
+# backend/core/services/notification_stream.py
+import asyncio
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Max
+
+
+class NotificationBroker:
+    """
+    In-process pub/sub used to wake long-poll clients when a Notification is written.
+
+    Idle clients never touch the DB: the broker keeps the latest notification id
+    per user in memory, and waiters are only woken when `publish` is called for
+    their user. `_notify` publishes directly, so same-process notifications wake
+    clients at once. Rows written by other processes (another web worker, or the
+    job worker's bulk fan-out) are found by one watcher per process, which runs
+    while anyone is waiting and every NOTIFICATION_STREAM_POLL_INTERVAL seconds
+    asks for the users with notifications past the highest id it has seen: one
+    query per process per interval, whatever the number of idle clients.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latest = {}    # user_id -> highest published notification id
+        self._waiters = {}   # user_id -> set of wake callbacks
+        self._high_water = None   # highest notification id the watcher has seen
+        self._watcher = None
+        self._watcher_loop = None
+
+    def prime(self):
+        """
+        Start the watcher's high-water mark at the current last notification; called
+        before a client's first read, so anything written after that read is seen.
+        """
+        if self._high_water is None:
+            from core.models import Notification
+            latest = Notification.objects.aggregate(latest=Max("id"))["latest"] or 0
+            with self._lock:
+                if self._high_water is None:
+                    self._high_water = latest
+
+    def _poll(self):
+        """(user_id, newest id) for notifications past the high-water mark, advancing it."""
+        from core.models import Notification
+        try:
+            self.prime()
+            rows = list(
+                Notification.objects.filter(id__gt=self._high_water)
+                .values("user_id")
+                .annotate(latest=Max("id"))
+                .values_list("user_id", "latest")
+                .order_by()
+            )
+        finally:
+            close_old_connections()
+        if rows:
+            with self._lock:
+                self._high_water = max(self._high_water, max(latest for _, latest in rows))
+        return rows
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(settings.NOTIFICATION_STREAM_POLL_INTERVAL)
+            with self._lock:
+                if not self._waiters:
+                    self._watcher = None
+                    return
+            try:
+                rows = await sync_to_async(self._poll, thread_sensitive=False)()
+            except Exception:
+                continue  # e.g. the DB is briefly unavailable; clients still time out normally
+            for user_id, notification_id in rows:
+                self.publish(user_id, notification_id)
+
+    def _ensure_watcher(self, loop):
+        with self._lock:
+            running = self._watcher is not None and not self._watcher.done() and self._watcher_loop.is_running()
+            if not running:
+                self._watcher = loop.create_task(self._watch())
+                self._watcher_loop = loop
+
+    def latest(self, user_id):
+        with self._lock:
+            return self._latest.get(user_id, 0)
+
+    def publish(self, user_id, notification_id):
+        """Record a new notification for user_id and wake everyone waiting on it."""
+        with self._lock:
+            if notification_id > self._latest.get(user_id, 0):
+                self._latest[user_id] = notification_id
+            waiters = self._waiters.pop(user_id, set())
+        for wake in waiters:
+            wake()
+
+    def _subscribe(self, user_id, wake):
+        with self._lock:
+            self._waiters.setdefault(user_id, set()).add(wake)
+
+    def _unsubscribe(self, user_id, wake):
+        with self._lock:
+            waiters = self._waiters.get(user_id)
+            if waiters is not None:
+                waiters.discard(wake)
+                if not waiters:
+                    del self._waiters[user_id]
+
+    async def wait(self, user_id, since, timeout):
+        """
+        Wait (without blocking the event loop) until a notification newer than
+        `since` is published for user_id. Returns True if woken, False on timeout.
+        """
+        if self.latest(user_id) > since:
+            return True
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+
+        def wake():
+            loop.call_soon_threadsafe(event.set)
+
+        self._subscribe(user_id, wake)
+        self._ensure_watcher(loop)
+        try:
+            # Re-check after subscribing so a publish between the two is not lost
+            if self.latest(user_id) > since:
+                return True
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._unsubscribe(user_id, wake)
+
+
+notification_broker = NotificationBroker()
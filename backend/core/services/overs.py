@@ -0,0 +1,153 @@
+# backend/core/services/overs.py
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast, Mod
+
+from core.models import Delivery, MatchPlayerStats, OverSummary
+from core.services import counters
+
+BALLS_PER_OVER = 6
+
+
+def bowled(balls):
+    """
+    MatchPlayerStats assignments for a bowler's `balls` more deliveries:
+    balls_bowled grows and overs_bowled follows in cricket notation
+    (14 balls -> 2.2), both from the pre-update row.
+    """
+    total = F("balls_bowled") + balls
+    return {
+        "deltas": {"balls_bowled": balls},
+        "values": {
+            "overs_bowled": Cast(total / BALLS_PER_OVER, FloatField())
+            + Cast(Mod(total, BALLS_PER_OVER), FloatField()) / 10.0,
+        },
+    }
+
+
+def _is_maiden(item):
+    return item["balls"] >= BALLS_PER_OVER and item["runs"] == 0 and item["bowler_id"] is not None
+
+
+def add_to_over(match_id, batting_team_id, over, bowler_id=None, runs=0, wickets=0, balls=0):
+    """
+    Add a delivery (or a batch's worth) to an over's totals, creating the row
+    for the over's first ball. An over completed without a run is marked a
+    maiden once and credited to its bowler.
+    """
+    row = counters.apply(
+        OverSummary.objects.filter(match_id=match_id, batting_team_id=batting_team_id, over=over),
+        deltas={"runs": runs, "wickets": wickets, "balls": balls},
+        values={"bowler_id": bowler_id} if bowler_id else None,
+        returning=("id", "runs", "balls", "is_maiden", "bowler_id"),
+    )
+    if row is None:
+        try:
+            with transaction.atomic():
+                created = OverSummary.objects.create(
+                    match_id=match_id, batting_team_id=batting_team_id, over=over,
+                    bowler_id=bowler_id, runs=runs, wickets=wickets, balls=balls,
+                )
+        except IntegrityError:
+            # Created concurrently; add to that row instead
+            return add_to_over(match_id, batting_team_id, over, bowler_id, runs, wickets, balls)
+        row = {"id": created.pk, "runs": runs, "balls": balls, "is_maiden": False, "bowler_id": bowler_id}
+
+    if _is_maiden(row) and not row["is_maiden"]:
+        # Conditional, so two requests finishing the same over credit it once
+        if OverSummary.objects.filter(pk=row["id"], is_maiden=False).update(is_maiden=True):
+            counters.apply(
+                MatchPlayerStats.objects.filter(match_id=match_id, player_id=row["bowler_id"]),
+                deltas={"maidens": 1},
+            )
+
+
+def _rate(runs, balls):
+    return round(runs * BALLS_PER_OVER / balls, 2) if balls else None
+
+
+def match_overs(match):
+    """
+    Per-innings over table of a match from OverSummary (one query): each over
+    with runs, wickets, bowler and maiden flag, plus the worm (cumulative
+    runs/wickets), the run rate after the over and, chasing, the required rate.
+    """
+    rows = (
+        OverSummary.objects.filter(match=match)
+        .order_by("id")
+        .values_list(
+            "batting_team_id", "batting_team__name", "over", "runs", "wickets", "balls",
+            "is_maiden", "bowler_id", "bowler__user__username",
+        )
+    )
+    innings = {}
+    for team_id, team_name, over, runs, wickets, balls, is_maiden, bowler_id, bowler_name in rows:
+        entry = innings.setdefault(team_id, {"batting_team": {"id": team_id, "name": team_name}, "overs": []})
+        entry["overs"].append({
+            "over": over + 1,
+            "runs": runs,
+            "wickets": wickets,
+            "balls": balls,
+            "maiden": is_maiden,
+            "bowler": {"id": bowler_id, "username": bowler_name} if bowler_id else None,
+        })
+
+    max_balls = match.tournament.overs_per_match * BALLS_PER_OVER
+    target = None
+    result = []
+    # Innings in the order they were batted
+    for entry in innings.values():
+        entry["overs"].sort(key=lambda item: item["over"])
+        total_runs = total_wickets = total_balls = 0
+        for item in entry["overs"]:
+            total_runs += item["runs"]
+            total_wickets += item["wickets"]
+            total_balls += item["balls"]
+            item["cumulative_runs"] = total_runs
+            item["cumulative_wickets"] = total_wickets
+            item["run_rate"] = _rate(total_runs, total_balls)
+            if target is not None:
+                remaining = max_balls - total_balls
+                needed = target - total_runs
+                item["required_run_rate"] = _rate(needed, remaining) if needed > 0 and remaining > 0 else None
+        entry.update(runs=total_runs, wickets=total_wickets, balls=total_balls, target=target)
+        result.append(entry)
+        if target is None:
+            target = total_runs + 1
+    return result
+
+
+def rebuild(match):
+    """Recompute a match's over table and bowlers' balls/overs/maidens from its Delivery log."""
+    totals, balls = {}, Counter()
+    for team_id, over, bowler_id, runs, is_wicket in (
+        Delivery.objects.filter(match=match).order_by("id")
+        .values_list("batting_team_id", "over", "bowler_id", "runs", "is_wicket")
+    ):
+        item = totals.setdefault((team_id, over), {"runs": 0, "wickets": 0, "balls": 0, "bowler_id": None})
+        item["runs"] += runs
+        item["wickets"] += is_wicket
+        item["balls"] += 1
+        item["bowler_id"] = bowler_id or item["bowler_id"]
+        if bowler_id:
+            balls[bowler_id] += 1
+    maidens = Counter(item["bowler_id"] for item in totals.values() if _is_maiden(item))
+
+    with transaction.atomic():
+        OverSummary.objects.filter(match=match).delete()
+        OverSummary.objects.bulk_create([
+            OverSummary(
+                match=match, batting_team_id=team_id, over=over, bowler_id=item["bowler_id"],
+                runs=item["runs"], wickets=item["wickets"], balls=item["balls"], is_maiden=_is_maiden(item),
+            )
+            for (team_id, over), item in totals.items()
+        ])
+        for stats in MatchPlayerStats.objects.filter(match=match):
+            count = balls[stats.player_id]
+            stats.balls_bowled = count
+            stats.overs_bowled = count // BALLS_PER_OVER + (count % BALLS_PER_OVER) / 10
+            stats.maidens = maidens[stats.player_id]
+            stats.save(update_fields=["balls_bowled", "overs_bowled", "maidens"])
+    return len(totals)
@@ -0,0 +1,269 @@
+# backend/core/services/performance_rollups.py
+import datetime
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, FloatField, Sum, Value
+from django.db.models.functions import Coalesce, NullIf, TruncDate
+
+from core.models import DailyPerformanceScore, MonthlyPerformanceScore, PerformanceScore, SessionAttendance
+from core.utils import day_bounds
+
+
+class RollupError(Exception):
+    pass
+
+
+def week_start(day):
+    return day - datetime.timedelta(days=day.weekday())
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def session_day(session_date):
+    # Same calendar day the daily scores have always used
+    return session_date.date()
+
+
+# granularity -> (model, period field, bucket function)
+LEVELS = {
+    "day": (DailyPerformanceScore, "date", lambda day: day),
+    "week": (PerformanceScore, "week_start", week_start),
+    "month": (MonthlyPerformanceScore, "month_start", month_start),
+}
+
+# Coarser granularities served by regrouping monthly rows
+DERIVED = {
+    "quarter": lambda day: day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1),
+    "year": lambda day: day.replace(month=1, day=1),
+}
+
+GRANULARITIES = tuple(LEVELS) + tuple(DERIVED)
+
+
+def contribution(attended, rating):
+    """(rating_sum, sessions) one attendance row adds: ratings of attended sessions are averaged."""
+    return (float(rating or 0), 1) if attended else (0.0, 0)
+
+
+def _score_expr(d_sum, d_count):
+    # SET clauses read the old column values, so the new score is computed from them
+    return Coalesce(
+        (F("rating_sum") + Value(d_sum)) / NullIf(F("sessions") + Value(d_count), Value(0)),
+        Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def _period_totals(level, player_id, period):
+    """(rating_sum, sessions) of the player's attended sessions in one period, from raw attendance."""
+    start, end = day_bounds(period)[0], day_bounds(NEXT_PERIOD[level](period))[0]
+    row = SessionAttendance.objects.filter(
+        player_id=player_id, attended=True, session__session_date__gte=start, session__session_date__lt=end,
+    ).aggregate(rating_sum=Coalesce(Sum("rating"), 0), sessions=Count("id"))
+    return float(row["rating_sum"]), row["sessions"]
+
+
+def _recount_level(level, player_id, period):
+    """Write one rollup row recomputed from raw attendance (removed if the period has no sessions)."""
+    model, field, _ = LEVELS[level]
+    rows = model.objects.filter(player_id=player_id, **{field: period})
+    rating_sum, sessions = _period_totals(level, player_id, period)
+    if not sessions:
+        rows.delete()
+        return
+    values = {"score": rating_sum / sessions, "rating_sum": rating_sum, "sessions": sessions}
+    if rows.update(**values):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(player_id=player_id, **{field: period}, **values)
+    except IntegrityError:
+        # Created concurrently; that writer's attendance is committed now, so count again
+        _recount_level(level, player_id, period)
+
+
+def _apply_level(level, player_id, period, d_sum, d_count):
+    model, field, _ = LEVELS[level]
+    rows = model.objects.filter(player_id=player_id, **{field: period})
+    updated = rows.update(
+        score=_score_expr(d_sum, d_count),
+        rating_sum=F("rating_sum") + d_sum,
+        sessions=F("sessions") + d_count,
+    )
+    if updated:
+        if d_count < 0:
+            # Drop periods left without sessions, as a backfill would
+            rows.filter(sessions=0).delete()
+        return
+    # No row: the player's first session in the period, or a period `compact`
+    # removed. A delta alone is wrong for the latter, so count the period from
+    # the attendance (already written when the delta is applied).
+    _recount_level(level, player_id, period)
+
+
+def apply_deltas(deltas):
+    """
+    Apply {(player_id, day): (d_sum, d_count)} to the day, ISO week and month
+    rollups. Deltas are summed per period first, so a period whose row has to
+    be recounted from attendance is recounted once and gets no delta on top.
+    """
+    for level, (_, _, bucket) in LEVELS.items():
+        totals = defaultdict(lambda: [0.0, 0])
+        for (player_id, day), (d_sum, d_count) in deltas.items():
+            acc = totals[(player_id, bucket(day))]
+            acc[0] += d_sum
+            acc[1] += d_count
+        for (player_id, period), (d_sum, d_count) in totals.items():
+            if d_sum or d_count:
+                _apply_level(level, player_id, period, d_sum, d_count)
+
+
+def apply_delta(player_id, day, d_sum, d_count):
+    """Add (d_sum, d_count) to the player's day, ISO week and month rollups."""
+    apply_deltas({(player_id, day): (d_sum, d_count)})
+
+
+def add_months(day, months):
+    month = day.month - 1 + months
+    return day.replace(year=day.year + month // 12, month=month % 12 + 1, day=1)
+
+
+# granularity -> start of the following period
+NEXT_PERIOD = {
+    "day": lambda day: day + datetime.timedelta(days=1),
+    "week": lambda day: day + datetime.timedelta(days=7),
+    "month": lambda day: add_months(day, 1),
+    "quarter": lambda day: add_months(day, 3),
+    "year": lambda day: add_months(day, 12),
+}
+
+# Longest series (in periods) one request may ask for with fill=True
+MAX_SERIES_POINTS = 1000
+
+
+def backfill(start=None, end=None, player_ids=None):
+    """
+    Rebuild the rollups from SessionAttendance for days in [start, end] (all
+    time by default). Weeks and months touching the range are rebuilt whole.
+    Returns the number of rows written per granularity.
+    """
+    attendance = SessionAttendance.objects.filter(attended=True)
+    # Read enough raw days to recompute every week and month the range touches
+    # (datetime bounds rather than __date so the session_date index is used)
+    if start:
+        first = min(week_start(start), month_start(start))
+        attendance = attendance.filter(session__session_date__gte=day_bounds(first)[0])
+    if end:
+        last = max(week_start(end) + datetime.timedelta(days=6), add_months(end, 1) - datetime.timedelta(days=1))
+        attendance = attendance.filter(session__session_date__lt=day_bounds(last)[1])
+    if player_ids is not None:
+        attendance = attendance.filter(player_id__in=player_ids)
+
+    daily = (
+        attendance.annotate(day=TruncDate("session__session_date"))
+        .values("player_id", "day")
+        .annotate(rating_sum=Coalesce(Sum("rating"), 0), sessions=Count("id"))
+    )
+    totals = {level: defaultdict(lambda: [0.0, 0]) for level in LEVELS}
+    for row in daily.iterator():
+        for level, (_, _, bucket) in LEVELS.items():
+            period = bucket(row["day"])
+            if (start and period < bucket(start)) or (end and period > bucket(end)):
+                continue
+            acc = totals[level][(row["player_id"], period)]
+            acc[0] += float(row["rating_sum"])
+            acc[1] += row["sessions"]
+
+    written = {}
+    with transaction.atomic():
+        for level, (model, field, bucket) in LEVELS.items():
+            existing = model.objects.all()
+            if start:
+                existing = existing.filter(**{f"{field}__gte": bucket(start)})
+            if end:
+                existing = existing.filter(**{f"{field}__lte": bucket(end)})
+            if player_ids is not None:
+                existing = existing.filter(player_id__in=player_ids)
+            existing.delete()
+            model.objects.bulk_create(
+                [
+                    model(player_id=player_id, score=round(s / n, 4), rating_sum=s, sessions=n, **{field: period})
+                    for (player_id, period), (s, n) in totals[level].items()
+                ],
+                batch_size=1000,
+            )
+            written[level] = len(totals[level])
+    return written
+
+
+def compact(keep_daily_days, keep_weekly_days=None, today=None):
+    """
+    Drop daily rows older than keep_daily_days (and weekly rows older than
+    keep_weekly_days) whose period is already covered by the coarser rollups.
+    Raw attendance is untouched, so `backfill` can always rebuild them.
+    """
+    today = today or datetime.date.today()
+    removed = {}
+    # Only whole months are dropped, so month-level series stay exact
+    daily_cutoff = month_start(today - datetime.timedelta(days=keep_daily_days))
+    removed["day"] = DailyPerformanceScore.objects.filter(date__lt=daily_cutoff).delete()[0]
+    if keep_weekly_days is not None:
+        weekly_cutoff = week_start(month_start(today - datetime.timedelta(days=keep_weekly_days)))
+        removed["week"] = PerformanceScore.objects.filter(week_start__lt=weekly_cutoff).delete()[0]
+    return removed
+
+
+def series(player_ids, granularity, start, end, fill=False):
+    """
+    {player_id: [{"period", "score", "sessions"}]} for periods overlapping
+    [start, end], read from the rollup tables only. quarter/year regroup
+    monthly rows. With fill=True periods without sessions are included with
+    score None.
+    """
+    if granularity not in GRANULARITIES:
+        raise RollupError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+    if start > end:
+        raise RollupError("start must not be after end")
+
+    if granularity in LEVELS:
+        model, field, bucket = LEVELS[granularity]
+    else:
+        (model, field, _), bucket = LEVELS["month"], DERIVED[granularity]
+
+    rows = (
+        model.objects.filter(
+            player_id__in=player_ids,
+            **{f"{field}__gte": bucket(start), f"{field}__lte": end},
+        )
+        .values_list("player_id", field, "rating_sum", "sessions")
+        .order_by(field)
+    )
+    grouped = {player_id: {} for player_id in player_ids}
+    for player_id, period, rating_sum, sessions in rows:
+        acc = grouped[player_id].setdefault(bucket(period), [0.0, 0])
+        acc[0] += rating_sum
+        acc[1] += sessions
+
+    periods = None
+    if fill:
+        periods, period = [], bucket(start)
+        while period <= end:
+            periods.append(period)
+            if len(periods) > MAX_SERIES_POINTS:
+                raise RollupError(f"Range too long for {granularity} points (max {MAX_SERIES_POINTS})")
+            period = NEXT_PERIOD[granularity](period)
+
+    result = {}
+    for player_id, buckets in grouped.items():
+        result[player_id] = []
+        for period in periods if fill else sorted(buckets):
+            rating_sum, sessions = buckets.get(period, (0.0, 0))
+            result[player_id].append({
+                "period": period,
+                "score": round(rating_sum / sessions, 2) if sessions else None,
+                "sessions": sessions,
+            })
+    return result
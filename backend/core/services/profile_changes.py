@@ -0,0 +1,59 @@
+# backend/core/services/profile_changes.py
+from django.core.cache import caches
+from django.utils.connection import ConnectionProxy
+
+# Its own alias, shared by every process (see CACHES in settings)
+cache = ConnectionProxy(caches, "profile_changes")
+
+# Log entries are kept this many seconds; a reader further behind than
+# MAX_LOG entries rebuilds instead of applying them one by one
+LOG_TTL = 86400
+MAX_LOG = 500
+
+_SEQ_KEY = "profile_changes:seq"
+
+
+def _log_key(seq):
+    return f"profile_changes:log:{seq}"
+
+
+def changed(player_ids=None, sport_id=None):
+    """
+    Log that these players' profiles (in one sport, or all of theirs)
+    changed; None means everyone. Per-process tables built from profiles
+    (similarity index, scouting tables) apply the log on their next read,
+    so call this once the write is committed.
+    """
+    entry = (sport_id, None if player_ids is None else sorted(set(player_ids)))
+    cache.add(_SEQ_KEY, 0, None)
+    # incr is a read and a write on the database backend, so two writers can
+    # draw the same number; add() never overwrites, the loser draws again
+    while not cache.add(_log_key(cache.incr(_SEQ_KEY)), entry, LOG_TTL):
+        pass
+
+
+def current():
+    return cache.get(_SEQ_KEY) or 0
+
+
+def players_since(seq, until, sport_id):
+    """
+    Players whose `sport_id` profiles changed in the entries after `seq` up
+    to `until`, or None when the reader has to rebuild: everyone changed,
+    it is too far behind to replay the log, or the counter went back (the
+    cache was cleared).
+    """
+    if until < seq or until - seq > MAX_LOG:
+        return None
+    keys = [_log_key(s) for s in range(seq + 1, until + 1)]
+    entries = cache.get_many(keys)
+    if len(entries) < len(keys):
+        return None
+    players = set()
+    for entry_sport, player_ids in entries.values():
+        if entry_sport not in (None, sport_id):
+            continue
+        if player_ids is None:
+            return None
+        players.update(player_ids)
+    return players
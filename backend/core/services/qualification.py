@@ -0,0 +1,189 @@
+# backend/core/services/qualification.py
+import math
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Avg
+
+from core.models import PlayerSportProfile, TournamentMatch, TournamentPoints, TournamentTeam
+
+
+class SimulationError(Exception):
+    pass
+
+
+# Points for a win, as awarded by complete_match (ties and no-results score nothing yet)
+WIN_POINTS = 2
+
+# Simulations run per block, bounding the random draws held in memory
+BLOCK_SIZE = 25000
+
+MAX_RUNS = 1000000
+
+# Career-score gap (0-10 scale) that moves a fixture's log-odds by 1 (~73% / 27%)
+STRENGTH_SCALE = 1.0
+
+# Pseudo-wins and losses added to a team's tournament record when rating its form
+FORM_PRIOR = 3
+
+# Fixtures not yet decided; a match in progress is simulated from scratch
+REMAINING = (TournamentMatch.Status.SCHEDULED, TournamentMatch.Status.IN_PROGRESS)
+
+
+def _version_key(tournament_id):
+    return f"qualification:v:{tournament_id}"
+
+
+def invalidate(tournament_id):
+    """Drop cached simulations of a tournament (results or fixtures changed)."""
+    key = _version_key(tournament_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def _table(tournament):
+    """Teams in table order: [(id, name, points, won, lost, net run rate)]."""
+    standing = {
+        row[0]: row[1:]
+        for row in TournamentPoints.objects.filter(tournament=tournament).values_list(
+            "team_id", "team__name", "points", "matches_won", "matches_lost", "net_run_rate",
+        )
+    }
+    teams = []
+    for team_id, name in TournamentTeam.objects.filter(tournament=tournament).values_list("team_id", "team__name"):
+        _, points, won, lost, nrr = standing.pop(team_id, (name, 0, 0, 0, 0))
+        teams.append((team_id, name, points, won, lost, float(nrr)))
+    # Teams with points but no longer registered still hold their table place
+    for team_id, (name, points, won, lost, nrr) in standing.items():
+        teams.append((team_id, name, points, won, lost, float(nrr)))
+    teams.sort(key=lambda team: (-team[2], -team[5], team[0]))
+    return teams
+
+
+def team_strengths(tournament, team_ids):
+    """
+    Strength per team from the mean career_score of its active rostered
+    profiles for the tournament sport, relative to the league and over
+    STRENGTH_SCALE. Teams without scored players get the league average.
+    """
+    career = dict(
+        PlayerSportProfile.objects.filter(
+            team_id__in=team_ids, sport_id=tournament.sport_id, is_active=True, career_score__gt=0,
+        ).values("team_id").annotate(score=Avg("career_score")).values_list("team_id", "score")
+    )
+    league = sum(career.values()) / len(career) if career else 0.0
+    return {
+        team_id: (career.get(team_id, league) - league) / STRENGTH_SCALE
+        for team_id in team_ids
+    }
+
+
+def _win_form(won, lost):
+    # Smoothed with FORM_PRIOR wins and losses, so early results move it gently
+    return math.log((won + FORM_PRIOR) / (lost + FORM_PRIOR))
+
+
+def simulate(points, fixtures, p_home, nrr, runs, seed=None):
+    """
+    Play the remaining fixtures `runs` times. points/nrr are per team index,
+    fixtures a (k, 2) array of team indexes and p_home the chance the first
+    team wins each one. Teams are ranked by points, then current net run
+    rate, then at random. Returns (position counts (teams x teams), total
+    final points per team).
+    """
+    rng = np.random.default_rng(seed)
+    n_teams = len(points)
+    base = np.asarray(points, dtype=np.float64)
+    # Current NRR order breaks points ties; equal NRR shares a rank and is drawn
+    nrr = np.asarray(nrr, dtype=np.float64)
+    nrr_rank = np.searchsorted(np.unique(nrr), nrr).astype(np.float64)
+
+    # Start from every second team winning; a first-team win moves the points
+    # across, so one product per block scores all fixtures
+    swing = np.zeros((len(fixtures), n_teams), dtype=np.float32)
+    if len(fixtures):
+        rows = np.arange(len(fixtures))
+        swing[rows, fixtures[:, 0]] = WIN_POINTS
+        swing[rows, fixtures[:, 1]] = -WIN_POINTS
+        base += np.bincount(fixtures[:, 1], minlength=n_teams) * WIN_POINTS
+    p_home = np.asarray(p_home, dtype=np.float32)
+
+    counts = np.zeros(n_teams * n_teams, dtype=np.int64)
+    total_points = np.zeros(n_teams)
+    positions = np.arange(n_teams)
+    done = 0
+    while done < runs:
+        size = min(BLOCK_SIZE, runs - done)
+        home_wins = (rng.random((size, len(fixtures)), dtype=np.float32) < p_home).astype(np.float32)
+        final = base + home_wins @ swing
+        total_points += final.sum(axis=0)
+        key = final + (nrr_rank + rng.random((size, n_teams))) / (n_teams + 1)
+        order = np.argsort(-key, axis=1)
+        counts += np.bincount((order * n_teams + positions).ravel(), minlength=n_teams * n_teams)
+        done += size
+    return counts.reshape(n_teams, n_teams), total_points
+
+
+def qualification(tournament, top=4, runs=None):
+    """
+    Chance of each team finishing in the top `top` places (and in each place)
+    from the current points table and the fixtures still to play, by Monte
+    Carlo over `runs` simulated seasons. Cached until the tournament's
+    results or fixtures change (see invalidate()).
+    """
+    if runs is None:
+        runs = settings.QUALIFICATION_SIMULATIONS
+    if not 0 < runs <= MAX_RUNS:
+        raise SimulationError(f"runs must be between 1 and {MAX_RUNS}")
+    if top < 1:
+        raise SimulationError("top must be at least 1")
+
+    key = f"qualification:{tournament.pk}:{cache.get(_version_key(tournament.pk)) or 0}:{top}:{runs}"
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    teams = _table(tournament)
+    if not teams:
+        raise SimulationError("Tournament has no teams")
+    index = {team[0]: i for i, team in enumerate(teams)}
+    fixtures = [
+        (index[team1], index[team2])
+        for team1, team2 in TournamentMatch.objects.filter(tournament=tournament, status__in=REMAINING)
+        .order_by("match_number").values_list("team1_id", "team2_id")
+        if team1 in index and team2 in index
+    ]
+    fixtures = np.array(fixtures, dtype=np.int64).reshape(-1, 2)
+
+    strength = team_strengths(tournament, list(index))
+    # Log-odds rating: roster strength plus form in this tournament
+    rating = np.array([strength[team[0]] + _win_form(team[3], team[4]) for team in teams])
+    p_home = 1.0 / (1.0 + np.exp(rating[fixtures[:, 1]] - rating[fixtures[:, 0]]))
+
+    counts, total_points = simulate(
+        [team[2] for team in teams], fixtures, p_home, [team[5] for team in teams], runs,
+    )
+    probabilities = counts / runs
+    data = {
+        "tournament": tournament.pk,
+        "top": top,
+        "runs": runs,
+        "remaining_matches": len(fixtures),
+        "teams": [
+            {
+                "team": {"id": team_id, "name": name},
+                "points": points,
+                "rating": round(float(rating[i]), 3),
+                "expected_points": round(float(total_points[i] / runs), 2),
+                "qualify": round(float(probabilities[i, :top].sum()), 4),
+                "positions": [round(float(p), 4) for p in probabilities[i]],
+            }
+            for i, (team_id, name, points, *_) in enumerate(teams)
+        ],
+    }
+    data["teams"].sort(key=lambda item: (-item["qualify"], -item["expected_points"]))
+    cache.set(key, data, settings.QUALIFICATION_CACHE_TTL)
+    return data
@@ -0,0 +1,425 @@
+# backend/core/services/ratings.py
+from collections import namedtuple
+
+import numpy as np
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import (
+    Attendance, Match, MatchPlayerStats, PlayerSportProfile, Rating, RatingHistory, TournamentMatch,
+)
+from core.services import profile_changes
+
+
+class RatingError(Exception):
+    pass
+
+
+INITIAL_RATING = 1500.0
+
+# Rating gap at which the stronger side is expected to score 10:1
+ELO_SCALE = 400.0
+
+K_FACTOR = 24.0
+
+# Teams and players move faster until they have PROVISIONAL_MATCHES rated matches
+PROVISIONAL_K = 40.0
+PROVISIONAL_MATCHES = 10
+
+BATCH_SIZE = 2000
+
+# A completed match to rate. score1 is team1's result (1 win, 0.5 tie, 0 loss);
+# players1/players2 are Player pks, rated in sport_id.
+Game = namedtuple("Game", "source match_id played_at sport_id team1_id team2_id score1 players1 players2")
+
+
+def _score(runs1, runs2):
+    return 1.0 if runs1 > runs2 else 0.0 if runs1 < runs2 else 0.5
+
+
+def tournament_games(matches):
+    """Games for the TournamentMatch queryset `matches` that have a cricket state (winner by runs)."""
+    rows = list(
+        matches.filter(cricket_state__isnull=False).values_list(
+            "id", "date", "tournament__sport_id", "team1_id", "team2_id",
+            "cricket_state__team1_runs", "cricket_state__team2_runs",
+        )
+    )
+    sides = {row[0]: ([], []) for row in rows}
+    for match_id, player_id, team_id, team1_id, team2_id in (
+        MatchPlayerStats.objects.filter(match_id__in=list(sides)).order_by("id")
+        .values_list("match_id", "player_id", "team_id", "match__team1_id", "match__team2_id")
+    ):
+        if team_id in (team1_id, team2_id):
+            sides[match_id][team_id != team1_id].append(player_id)
+    return [
+        Game(RatingHistory.Source.TOURNAMENT_MATCH, match_id, date, sport_id, team1_id, team2_id,
+             _score(runs1, runs2), *sides[match_id])
+        for match_id, date, sport_id, team1_id, team2_id, runs1, runs2 in rows
+    ]
+
+
+def friendly_games(matches):
+    """
+    Games for the Match queryset `matches`. Each side is the team's active
+    roster in team1's sport, narrowed to the players marked present when the
+    match has attendance.
+    """
+    rows = list(matches.values_list("id", "date", "team1__sport_id", "team1_id", "team2_id", "score_team1", "score_team2"))
+    rosters = {}
+    for team_id, sport_id, player_id in (
+        PlayerSportProfile.objects.filter(team_id__in={team for row in rows for team in row[3:5]}, is_active=True)
+        .order_by("id").values_list("team_id", "sport_id", "player_id")
+    ):
+        rosters.setdefault((team_id, sport_id), []).append(player_id)
+    present = {}
+    for match_id, player_id in Attendance.objects.filter(
+        match_id__in=[row[0] for row in rows], attended=True,
+    ).values_list("match_id", "player_id"):
+        present.setdefault(match_id, set()).add(player_id)
+
+    games = []
+    for match_id, date, sport_id, team1_id, team2_id, score1, score2 in rows:
+        sides = []
+        for team_id in (team1_id, team2_id):
+            roster = rosters.get((team_id, sport_id), [])
+            if match_id in present:
+                roster = [player_id for player_id in roster if player_id in present[match_id]]
+            sides.append(roster)
+        games.append(Game(RatingHistory.Source.MATCH, match_id, date, sport_id, team1_id, team2_id,
+                          _score(score1, score2), *sides))
+    return games
+
+
+def _sides(game):
+    """The game's players without repeats; a player listed on both sides plays for team1."""
+    players1 = list(dict.fromkeys(game.players1))
+    players2 = [pk for pk in dict.fromkeys(game.players2) if pk not in set(players1)]
+    return players1, players2
+
+
+def _expected(rating, opponent):
+    return 1.0 / (1.0 + 10.0 ** ((opponent - rating) / ELO_SCALE))
+
+
+def _k(matches):
+    return np.where(matches < PROVISIONAL_MATCHES, PROVISIONAL_K, K_FACTOR)
+
+
+def _play(teams, players, t1, t2, score1, slot_player, slot_game, slot_side):
+    """
+    Rate games that share no team or player, all at once. teams/players are
+    (ratings, matches) arrays updated in place; t1/t2/score1 are per game and
+    the slot_* arrays have one entry per player appearance: player index,
+    game position and side (0 team1, 1 team2). Players are rated against the
+    mean of the other side; a side without players counts as its team.
+    Returns the team1, team2 and player ratings before the games.
+    """
+    team_rating, team_matches = teams
+    player_rating, player_matches = players
+    before1, before2 = team_rating[t1], team_rating[t2]
+    surprise = score1 - _expected(before1, before2)
+    team_rating[t1] = before1 + _k(team_matches[t1]) * surprise
+    team_rating[t2] = before2 - _k(team_matches[t2]) * surprise
+    team_matches[t1] += 1
+    team_matches[t2] += 1
+
+    player_before = player_rating[slot_player]
+    bucket = slot_game * 2 + slot_side
+    count = np.bincount(bucket, minlength=2 * len(t1))
+    total = np.bincount(bucket, weights=player_before, minlength=2 * len(t1))
+    mean = np.where(count > 0, total / np.maximum(count, 1), np.column_stack([before1, before2]).ravel())
+    surprise = score1 - _expected(mean[0::2], mean[1::2])
+    sign = 1 - 2 * slot_side
+    player_rating[slot_player] = player_before + sign * _k(player_matches[slot_player]) * surprise[slot_game]
+    player_matches[slot_player] += 1
+    return before1, before2, player_before
+
+
+def _rating_rows(kind, ids, sport_id):
+    """Rating rows for these teams/players, created at INITIAL_RATING if missing and locked."""
+    field = "team_id" if kind == Rating.Kind.TEAM else "player_id"
+    Rating.objects.bulk_create(
+        [Rating(kind=kind, sport_id=sport_id, rating=INITIAL_RATING, **{field: pk}) for pk in ids],
+        ignore_conflicts=True,
+    )
+    rows = Rating.objects.select_for_update().filter(kind=kind, **{f"{field}__in": ids})
+    if kind == Rating.Kind.PLAYER:
+        rows = rows.filter(sport_id=sport_id)
+    by_id = {getattr(row, field): row for row in rows}
+    return [by_id[pk] for pk in ids]
+
+
+def record(game):
+    """
+    Apply one completed match to the team and player ratings, with history.
+    Returns False, changing nothing, if the match was already rated.
+    """
+    if game.team1_id == game.team2_id:
+        return True
+    players1, players2 = _sides(game)
+    players = players1 + players2
+    with transaction.atomic():
+        if RatingHistory.objects.filter(source=game.source, match_id=game.match_id).exists():
+            return False
+        team_rows = _rating_rows(Rating.Kind.TEAM, [game.team1_id, game.team2_id], game.sport_id)
+        player_rows = _rating_rows(Rating.Kind.PLAYER, players, game.sport_id)
+        rows = team_rows + player_rows
+
+        teams = (np.array([row.rating for row in team_rows]), np.array([row.matches for row in team_rows]))
+        ratings = (np.array([row.rating for row in player_rows]), np.array([row.matches for row in player_rows]))
+        sides = np.array([0] * len(players1) + [1] * len(players2), dtype=np.int64)
+        before1, before2, player_before = _play(
+            teams, ratings, np.array([0]), np.array([1]), np.array([game.score1]),
+            np.arange(len(players)), np.zeros(len(players), dtype=np.int64), sides,
+        )
+
+        before = [before1[0], before2[0], *player_before]
+        after = [*teams[0], *ratings[0]]
+        matches = [*teams[1], *ratings[1]]
+        now = timezone.now()
+        for row, value, count in zip(rows, after, matches):
+            row.rating, row.matches, row.updated_at = float(value), int(count), now
+        Rating.objects.bulk_update(rows, ["rating", "matches", "updated_at"])
+        RatingHistory.objects.bulk_create([
+            RatingHistory(
+                rating=row, source=game.source, match_id=game.match_id, played_at=game.played_at,
+                before=float(old), after=row.rating,
+            )
+            for row, old in zip(rows, before)
+        ])
+        # Ratings feed the similarity and scouting tables
+        transaction.on_commit(lambda: profile_changes.changed(players, game.sport_id))
+    return True
+
+
+def record_tournament_match(match):
+    for game in tournament_games(TournamentMatch.objects.filter(pk=match.pk)):
+        record(game)
+
+
+def record_friendly_match(match):
+    """Rate a finalized Match; a rated match finalized again is re-rated by replaying all history."""
+    from core.services.jobs import enqueue
+
+    for game in friendly_games(Match.objects.filter(pk=match.pk)):
+        if not record(game):
+            transaction.on_commit(lambda: enqueue("ratings.recompute"))
+
+
+def _schedule(games, team_index, player_index):
+    """
+    Round of each game: one after the latest round any of its teams or
+    players appears in. Games in a round are disjoint and can be rated
+    together; each entity still sees its games in order.
+    """
+    team_last = [-1] * len(team_index)
+    player_last = [-1] * len(player_index)
+    rounds = []
+    for game in games:
+        t1, t2 = team_index[game.team1_id], team_index[game.team2_id]
+        members = [player_index[(pk, game.sport_id)] for side in _sides(game) for pk in side]
+        current = 1 + max([team_last[t1], team_last[t2]] + [player_last[p] for p in members])
+        team_last[t1] = team_last[t2] = current
+        for p in members:
+            player_last[p] = current
+        rounds.append(current)
+    return np.array(rounds, dtype=np.int64)
+
+
+def _insert_history(rows):
+    """
+    Insert (rating_id, source, match_id, played_at, before, after) tuples with
+    executemany; a full recompute writes one row per team and player per match,
+    which is where building model instances would spend its time.
+    """
+    connection = connections[RatingHistory.objects.db]
+    meta = RatingHistory._meta
+    columns = [meta.get_field(name).column for name in ("rating", "source", "match_id", "played_at", "before", "after")]
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        connection.ops.quote_name(meta.db_table),
+        ", ".join(connection.ops.quote_name(column) for column in columns),
+        ", ".join(["%s"] * len(columns)),
+    )
+    adapt = connection.ops.adapt_datetimefield_value
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), BATCH_SIZE):
+            cursor.executemany(sql, [
+                (rating_id, source, match_id, adapt(played_at), before, after)
+                for rating_id, source, match_id, played_at, before, after in rows[start:start + BATCH_SIZE]
+            ])
+
+
+def recompute():
+    """
+    Rebuild every rating and its history from all completed matches and
+    tournament matches, in date order. Games are grouped into rounds of
+    disjoint teams and players (see _schedule) and each round is rated with
+    one vectorized _play() call, giving the same ratings as recording the
+    games one by one.
+    """
+    games = sorted(
+        (
+            game
+            for game in friendly_games(Match.objects.filter(is_completed=True))
+            + tournament_games(TournamentMatch.objects.filter(status=TournamentMatch.Status.COMPLETED))
+            if game.team1_id != game.team2_id
+        ),
+        key=lambda game: (game.played_at, game.source, game.match_id),
+    )
+    team_index, team_sport, player_index = {}, {}, {}
+    slot_player, slot_game, slot_side = [], [], []
+    for position, game in enumerate(games):
+        for team_id in (game.team1_id, game.team2_id):
+            team_index.setdefault(team_id, len(team_index))
+            team_sport.setdefault(team_id, game.sport_id)
+        for side, members in enumerate(_sides(game)):
+            for pk in members:
+                slot_player.append(player_index.setdefault((pk, game.sport_id), len(player_index)))
+                slot_game.append(position)
+                slot_side.append(side)
+
+    t1 = np.array([team_index[game.team1_id] for game in games], dtype=np.int64)
+    t2 = np.array([team_index[game.team2_id] for game in games], dtype=np.int64)
+    score1 = np.array([game.score1 for game in games], dtype=np.float64)
+    slot_player = np.array(slot_player, dtype=np.int64)
+    slot_game = np.array(slot_game, dtype=np.int64)
+    slot_side = np.array(slot_side, dtype=np.int64)
+
+    teams = (np.full(len(team_index), INITIAL_RATING), np.zeros(len(team_index), dtype=np.int64))
+    players = (np.full(len(player_index), INITIAL_RATING), np.zeros(len(player_index), dtype=np.int64))
+    team_before = np.zeros((len(games), 2))
+    team_after = np.zeros((len(games), 2))
+    player_before = np.zeros(len(slot_player))
+    player_after = np.zeros(len(slot_player))
+
+    rounds = _schedule(games, team_index, player_index)
+    game_order = np.argsort(rounds, kind="stable")
+    slot_order = np.argsort(rounds[slot_game], kind="stable")
+    n_rounds = int(rounds.max()) + 1 if len(games) else 0
+    game_bounds = np.searchsorted(rounds[game_order], np.arange(n_rounds + 1))
+    slot_bounds = np.searchsorted(rounds[slot_game][slot_order], np.arange(n_rounds + 1))
+    # Position of each game within its round
+    position = np.empty(len(games), dtype=np.int64)
+    position[game_order] = np.arange(len(games)) - game_bounds[rounds[game_order]]
+
+    for current in range(n_rounds):
+        batch = game_order[game_bounds[current]:game_bounds[current + 1]]
+        slots = slot_order[slot_bounds[current]:slot_bounds[current + 1]]
+        before1, before2, player_before[slots] = _play(
+            teams, players, t1[batch], t2[batch], score1[batch],
+            slot_player[slots], position[slot_game[slots]], slot_side[slots],
+        )
+        team_before[batch, 0], team_before[batch, 1] = before1, before2
+        team_after[batch, 0], team_after[batch, 1] = teams[0][t1[batch]], teams[0][t2[batch]]
+        player_after[slots] = players[0][slot_player[slots]]
+
+    with transaction.atomic():
+        Rating.objects.all().delete()
+        team_rows = Rating.objects.bulk_create([
+            Rating(kind=Rating.Kind.TEAM, team_id=team_id, sport_id=team_sport[team_id],
+                   rating=float(teams[0][i]), matches=int(teams[1][i]))
+            for team_id, i in team_index.items()
+        ], batch_size=BATCH_SIZE)
+        player_rows = Rating.objects.bulk_create([
+            Rating(kind=Rating.Kind.PLAYER, player_id=player_id, sport_id=sport_id,
+                   rating=float(players[0][i]), matches=int(players[1][i]))
+            for (player_id, sport_id), i in player_index.items()
+        ], batch_size=BATCH_SIZE)
+        team_pks = [row.pk for row in team_rows]
+        player_pks = [row.pk for row in player_rows]
+        history = []
+        for i, game in enumerate(games):
+            for column, index in ((0, t1[i]), (1, t2[i])):
+                history.append((
+                    team_pks[index], game.source, game.match_id, game.played_at,
+                    float(team_before[i, column]), float(team_after[i, column]),
+                ))
+        for slot, index, before, after in zip(
+            slot_game.tolist(), slot_player.tolist(), player_before.tolist(), player_after.tolist(),
+        ):
+            game = games[slot]
+            history.append((player_pks[index], game.source, game.match_id, game.played_at, before, after))
+        _insert_history(history)
+        transaction.on_commit(profile_changes.changed)
+    return {"matches": len(games), "teams": len(team_index), "players": len(player_index), "rounds": n_rounds}
+
+
+def board(kind, sport_id=None):
+    """Ratings of one kind (optionally one sport) in rank order; inactive players are left out."""
+    rows = Rating.objects.filter(kind=kind).select_related("team", "player__user")
+    if sport_id:
+        rows = rows.filter(sport_id=sport_id)
+    if kind == Rating.Kind.PLAYER:
+        rows = rows.filter(player__is_active=True)
+    return rows.order_by("-rating", "id")
+
+
+def entry(row, rank=None):
+    data = {"rank": rank, "rating": round(row.rating, 1), "matches": row.matches, "sport": row.sport_id}
+    if row.kind == Rating.Kind.TEAM:
+        data["team"] = {"id": row.team_id, "name": row.team.name}
+    else:
+        data["player"] = {"id": row.player_id, "player_id": row.player.player_id, "username": row.player.user.username}
+    return data
+
+
+def top(kind, sport_id=None, limit=10):
+    return [entry(row, rank) for rank, row in enumerate(board(kind, sport_id)[:limit], start=1)]
+
+
+def _ahead(row):
+    # Rows ranked before `row` in board() order
+    return Q(rating__gt=row.rating) | Q(rating=row.rating, id__lt=row.id)
+
+
+def around(row, radius=5):
+    """`row` with its rank and the `radius` ratings either side of it on its board."""
+    rows = board(row.kind, row.sport_id)
+    rank = rows.filter(_ahead(row)).count() + 1
+    above = list(rows.filter(_ahead(row)).order_by("rating", "-id")[:radius])[::-1]
+    below = rows.filter(Q(rating__lt=row.rating) | Q(rating=row.rating, id__gt=row.id))[:radius]
+    return {
+        "rank": rank,
+        "entries": [entry(other, rank - len(above) + i) for i, other in enumerate(above)]
+        + [entry(row, rank)]
+        + [entry(other, rank + 1 + i) for i, other in enumerate(below)],
+    }
+
+
+def find(kind, team_id=None, player_id=None, sport_id=None):
+    """
+    The rating of a team (by pk) or a player (by player_id code), or None.
+    A player rated in several sports needs sport_id.
+    """
+    rows = Rating.objects.filter(kind=kind).select_related("team", "player__user")
+    if kind == Rating.Kind.TEAM:
+        if not team_id:
+            raise RatingError("team_id is required")
+        return rows.filter(team_id=team_id).first()
+    if not player_id:
+        raise RatingError("player_id is required")
+    rows = rows.filter(player__player_id=player_id)
+    if sport_id:
+        rows = rows.filter(sport_id=sport_id)
+    found = list(rows[:2])
+    if len(found) > 1:
+        raise RatingError("Player is rated in several sports; pass sport")
+    return found[0] if found else None
+
+
+def history(row):
+    """A rating's value after each rated match, oldest first."""
+    return [
+        {
+            "played_at": played_at,
+            "rating": round(after, 1),
+            "change": round(after - before, 1),
+            "source": source,
+            "match_id": match_id,
+        }
+        for played_at, before, after, source, match_id in row.history.order_by("played_at", "id").values_list(
+            "played_at", "before", "after", "source", "match_id",
+        )
+    ]
@@ -0,0 +1,210 @@
+# backend/core/services/registration.py
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
+
+from core.models import User, Player, Coach, Manager, Admin, PlayerSportProfile
+from core.services.sport_registry import sport_registry
+from core.utils import generate_coach_id, generate_player_id
+
+
+class RegistrationError(Exception):
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.errors = errors or {}
+
+
+class RegistrationForbidden(RegistrationError):
+    """Rows the caller may not create (e.g. a manager onboarding another sport)."""
+
+
+# Unique-ID races are retried this many times before giving up
+ID_ALLOCATION_ATTEMPTS = 5
+
+
+def _id_sequence(first_id, count):
+    """first_id and the count-1 IDs after it (same prefix, 5-digit counter)."""
+    prefix, start = first_id[:-5], int(first_id[-5:])
+    if start + count - 1 > 99999:
+        raise RegistrationError("ID sequence exhausted for the year")
+    return [f"{prefix}{start + i:05d}" for i in range(count)]
+
+
+def _resolve_sport(role, sport_name):
+    if role != User.Roles.PLAYER:
+        return None
+    if not sport_name:
+        raise RegistrationError("Sport is required for players", {"sport_name": "This field is required for players."})
+    sport = sport_registry.get(sport_name)
+    if sport is None:
+        available = ", ".join(entry.name for entry in sport_registry.all())
+        raise RegistrationError(
+            f"Sport '{sport_name}' not found",
+            {"sport_name": f"Sport '{sport_name}' not found. Available sports: {available}"},
+        )
+    return sport
+
+
+def _create_domain_profile(user, college=None):
+    """Create the role's profile row with its external ID, retrying on ID collisions."""
+    if user.role == User.Roles.MANAGER:
+        return Manager.objects.create(user=user)
+    if user.role == User.Roles.ADMIN:
+        return Admin.objects.create(user=user)
+
+    for attempt in range(ID_ALLOCATION_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                if user.role == User.Roles.PLAYER:
+                    return Player.objects.create(user=user, player_id=generate_player_id(), college=college)
+                return Coach.objects.create(user=user, coach_id=generate_coach_id())
+        except IntegrityError:
+            # A concurrent registration took the same ID; allocate again
+            if attempt == ID_ALLOCATION_ATTEMPTS - 1:
+                raise
+
+
+@transaction.atomic
+def register_user(username, email, password, role=User.Roles.PLAYER, sport_name=None, college=None):
+    """
+    Create a user with its role, its Player/Coach/Manager/Admin profile and, for
+    players, the PlayerSportProfile, in one transaction.
+
+    The user row is inserted once with the role already set, so the role
+    signals and the second save that `create_user` + `role = ...` needed are
+    skipped; the sport comes from the in-process registry.
+    """
+    sport = _resolve_sport(role, sport_name)
+
+    user = User(username=username, email=User.objects.normalize_email(email), role=role)
+    user.set_password(password)
+    user._profile_created_by_service = True
+    user.save()
+
+    profile = _create_domain_profile(user, college=college)
+    if sport is not None:
+        PlayerSportProfile.objects.create(player=profile, sport_id=sport.id)
+    return user
+
+
+def _bulk_create_with_ids(model, field, generate, rows):
+    """
+    bulk_create `rows` (user_id, extra fields) numbered from the next free ID,
+    renumbering if a concurrent registration takes part of the range.
+    """
+    for attempt in range(ID_ALLOCATION_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                ids = _id_sequence(generate(), len(rows))
+                model.objects.bulk_create([
+                    model(user_id=user_id, **{field: external_id}, **extra)
+                    for (user_id, extra), external_id in zip(rows, ids)
+                ])
+                return
+        except IntegrityError:
+            if attempt == ID_ALLOCATION_ATTEMPTS - 1:
+                raise
+
+
+def register_users_bulk(rows, default_password=None, allowed_sport_ids=None):
+    """
+    Onboard many users (e.g. a college roster from CSV) with a handful of bulk
+    statements instead of several queries per user.
+
+    `rows` are dicts with username, email, role (default player), sport (for
+    players), college and password (falls back to default_password; without
+    either the account gets an unusable password and must be reset). Every
+    row is validated first; if any row is invalid nothing is written and
+    RegistrationError.errors maps row number -> problems.
+
+    With `allowed_sport_ids` (a manager's sports) only players of those sports
+    may be created; other rows raise RegistrationForbidden.
+    """
+    errors = {}
+    forbidden = {}
+    cleaned = []
+    seen = set()
+    usernames = [(row.get("username") or "").strip() for row in rows]
+    taken = set(User.objects.filter(username__in=[u for u in usernames if u]).values_list("username", flat=True))
+    valid_roles = {choice for choice, _ in User.Roles.choices}
+
+    for number, (row, username) in enumerate(zip(rows, usernames), start=1):
+        problems = {}
+        role = (row.get("role") or User.Roles.PLAYER).strip().lower()
+        if not username:
+            problems["username"] = "Required"
+        elif username in taken:
+            problems["username"] = "Already registered"
+        elif username in seen:
+            problems["username"] = "Duplicate in file"
+        seen.add(username)
+        if role not in valid_roles:
+            problems["role"] = f"Unknown role '{role}'"
+        sport = None
+        if role == User.Roles.PLAYER:
+            try:
+                sport = _resolve_sport(role, (row.get("sport") or row.get("sport_name") or "").strip())
+            except RegistrationError as e:
+                problems.update(e.errors)
+        if allowed_sport_ids is not None:
+            if role != User.Roles.PLAYER:
+                forbidden[number] = {"role": "Managers can only onboard players"}
+            elif sport is not None and sport.id not in allowed_sport_ids:
+                forbidden[number] = {"sport": "You are not assigned to this sport"}
+        if problems:
+            errors[number] = problems
+            continue
+        cleaned.append({
+            "username": username,
+            "email": User.objects.normalize_email((row.get("email") or "").strip()),
+            "role": role,
+            "sport": sport,
+            "college": (row.get("college") or "").strip() or None,
+            "password": row.get("password") or default_password,
+        })
+
+    if forbidden:
+        raise RegistrationForbidden(f"{len(forbidden)} invalid row(s)", forbidden)
+    if errors:
+        raise RegistrationError(f"{len(errors)} invalid row(s)", errors)
+    if not cleaned:
+        return []
+
+    # Password hashing dominates a bulk import; the hashers release the GIL
+    with ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as pool:
+        hashes = list(pool.map(make_password, [d["password"] for d in cleaned]))
+
+    with transaction.atomic():
+        User.objects.bulk_create([
+            User(username=d["username"], email=d["email"], role=d["role"], password=hashed)
+            for d, hashed in zip(cleaned, hashes)
+        ])
+        # Re-read ids: not every backend returns them from bulk_create
+        ids = dict(User.objects.filter(username__in=[d["username"] for d in cleaned]).values_list("username", "id"))
+
+        players = [d for d in cleaned if d["role"] == User.Roles.PLAYER]
+        coaches = [d for d in cleaned if d["role"] == User.Roles.COACH]
+        others = [d for d in cleaned if d["role"] in (User.Roles.MANAGER, User.Roles.ADMIN)]
+
+        if players:
+            _bulk_create_with_ids(
+                Player, "player_id", generate_player_id,
+                [(ids[d["username"]], {"college": d["college"]}) for d in players],
+            )
+            player_pks = dict(
+                Player.objects.filter(user_id__in=[ids[d["username"]] for d in players]).values_list("user_id", "id")
+            )
+            PlayerSportProfile.objects.bulk_create([
+                PlayerSportProfile(player_id=player_pks[ids[d["username"]]], sport_id=d["sport"].id)
+                for d in players
+            ])
+        if coaches:
+            _bulk_create_with_ids(Coach, "coach_id", generate_coach_id, [(ids[d["username"]], {}) for d in coaches])
+        for d in others:
+            # Manager/Admin IDs and the manager sport auto-assignment live in save()/signals
+            user = User(pk=ids[d["username"]], username=d["username"], role=d["role"])
+            _create_domain_profile(user)
+
+    return [ids[d["username"]] for d in cleaned]
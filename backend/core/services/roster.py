@@ -0,0 +1,100 @@
+# backend/core/services/roster.py
+from django.db import transaction
+from django.db.models import Q
+
+from core.models import PlayerSportProfile
+
+
+class RosterConflictError(Exception):
+    """Raised with every blocking profile at once instead of stopping at the first."""
+
+    def __init__(self, message, conflicts):
+        super().__init__(message)
+        self.conflicts = conflicts
+
+
+def find_team_conflicts(profile_ids, team):
+    """
+    All reasons the given profiles cannot join `team`, found in one query.
+
+    A profile conflicts if it is already on a different team, if its sport is
+    not the team's sport, or if another active profile of the same player for
+    the team's sport is on a different team.
+    """
+    targets = PlayerSportProfile.objects.filter(id__in=profile_ids)
+    rows = (
+        PlayerSportProfile.objects.filter(
+            Q(id__in=profile_ids) & (Q(team__isnull=False) | ~Q(sport_id=team.sport_id))
+            | Q(
+                player_id__in=targets.values("player_id"),
+                sport_id=team.sport_id,
+                is_active=True,
+                team__isnull=False,
+            ) & ~Q(id__in=profile_ids)
+        )
+        .exclude(Q(team_id=team.id) & Q(sport_id=team.sport_id))
+        .values("id", "player__player_id", "sport_id", "team_id", "team__name")
+        .order_by("player__player_id", "id")
+    )
+
+    target_ids = set(profile_ids)
+    conflicts = []
+    for row in rows:
+        if row["id"] in target_ids and row["sport_id"] != team.sport_id:
+            reason = "sport_mismatch"
+        elif row["id"] in target_ids:
+            reason = "already_in_team"
+        else:
+            reason = "other_profile_in_team"
+        conflicts.append({
+            "profile_id": row["id"],
+            "player_id": row["player__player_id"],
+            "team_id": row["team_id"],
+            "team": row["team__name"],
+            "reason": reason,
+        })
+    return conflicts
+
+
+def describe_conflicts(conflicts, sport_name):
+    parts = []
+    for c in conflicts:
+        if c["reason"] == "sport_mismatch":
+            parts.append(f"{c['player_id']} (profile is not for {sport_name})")
+        else:
+            parts.append(f"{c['player_id']} (in team '{c['team']}')")
+    return f"Players already in a team for {sport_name}: " + ", ".join(parts)
+
+
+@transaction.atomic
+def assign_team(profile_ids, team):
+    """
+    Put every profile in profile_ids on `team` as one set operation.
+
+    Three queries whatever the size of the batch: lock the targets, collect all
+    conflicts, then a single UPDATE ... WHERE id IN (...). Nothing is written
+    if any profile conflicts. Returns the number of profiles updated.
+    """
+    profile_ids = list(dict.fromkeys(profile_ids))
+    if not profile_ids:
+        return 0
+    locked = list(
+        PlayerSportProfile.objects.select_for_update().filter(id__in=profile_ids).values_list("id", flat=True)
+    )
+    missing = set(profile_ids) - set(locked)
+    if missing:
+        raise RosterConflictError(
+            f"Profiles not found: {', '.join(str(pid) for pid in sorted(missing))}",
+            [{"profile_id": pid, "reason": "not_found"} for pid in sorted(missing)],
+        )
+
+    conflicts = find_team_conflicts(profile_ids, team)
+    if conflicts:
+        raise RosterConflictError(describe_conflicts(conflicts, team.sport.name if team.sport else "this sport"), conflicts)
+
+    return PlayerSportProfile.objects.filter(id__in=profile_ids).update(team=team)
+
+
+def remove_from_team(profile_ids):
+    """Clear the team of every profile in profile_ids with a single UPDATE."""
+    return PlayerSportProfile.objects.filter(id__in=list(profile_ids)).update(team=None)
@@ -0,0 +1,318 @@
+# backend/core/services/scouting.py
+import datetime
+import operator
+import re
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from core.models import PlayerSportProfile, Rating, SessionAttendance
+from core.services import profile_changes
+from core.services.sport_registry import sport_registry
+from core.services.sport_stats import first_rows
+
+
+class ScoutingError(Exception):
+    pass
+
+
+# Attendance-rate windows (days) kept besides the all-time rate
+ATTENDANCE_WINDOWS = (30, 60, 90)
+
+# Metrics of every sport, after its stats columns
+BASE_METRICS = [
+    "career_score", "session_count", "rating", "attendance_rate",
+    *(f"attendance_rate_{days}d" for days in ATTENDANCE_WINDOWS),
+]
+
+# Comparisons per query, bounding the work one request can ask for
+MAX_CLAUSES = 20
+
+OPERATORS = {
+    ">=": operator.ge, "<=": operator.le, ">": operator.gt, "<": operator.lt,
+    "=": operator.eq, "==": operator.eq, "!=": operator.ne,
+}
+
+_TOKEN = re.compile(r"\s*(?:(?P<number>-?\d+(?:\.\d+)?)|(?P<op>>=|<=|!=|==|=|>|<)|(?P<paren>[()])|(?P<word>[A-Za-z_]\w*))")
+
+
+def _rows(sport_id, player_ids=None):
+    """
+    Metric values of the sport's active profiles (optionally of some players):
+    (profile ids, player pks, public flags, matrix with NaN where unknown, metric names).
+    """
+    profiles = PlayerSportProfile.objects.filter(sport_id=sport_id, is_active=True, player__is_active=True)
+    attendance = SessionAttendance.objects.filter(session__sport_id=sport_id)
+    ratings = Rating.objects.filter(kind=Rating.Kind.PLAYER, sport_id=sport_id)
+    if player_ids is not None:
+        profiles = profiles.filter(player_id__in=player_ids)
+        attendance = attendance.filter(player_id__in=player_ids)
+        ratings = ratings.filter(player_id__in=player_ids)
+
+    rows = list(profiles.order_by("id").values_list(
+        "id", "player_id", "player__is_public", "career_score", "session_count",
+    ))
+    spec = sport_registry.stats_spec(sport_id)
+    columns = spec.columns if spec else []
+    stats = first_rows(spec, spec.model.objects.filter(profile__in=profiles.values("id"))) if spec else {}
+    rating = dict(ratings.values_list("player_id", "rating"))
+
+    # One pass for the all-time and every windowed rate
+    today = timezone.now()
+    counts = {"total": Count("id"), "present": Count("id", filter=Q(attended=True))}
+    for days in ATTENDANCE_WINDOWS:
+        recent = Q(session__session_date__gte=today - datetime.timedelta(days=days))
+        counts[f"total_{days}"] = Count("id", filter=recent)
+        counts[f"present_{days}"] = Count("id", filter=recent & Q(attended=True))
+    attended = {row["player_id"]: row for row in attendance.values("player_id").annotate(**counts)}
+
+    def rate(row, suffix=""):
+        total = row[f"total{suffix}"] if row else 0
+        return row[f"present{suffix}"] / total if total else np.nan
+
+    values = np.full((len(rows), len(columns) + len(BASE_METRICS)), np.nan)
+    for i, (profile_id, player_pk, _, career_score, session_count) in enumerate(rows):
+        row = stats.get(profile_id)
+        if row is not None:
+            values[i, :len(columns)] = [np.nan if row[c] is None else float(row[c]) for c in columns]
+        att = attended.get(player_pk)
+        values[i, len(columns):] = [
+            career_score or 0.0, session_count, rating.get(player_pk, np.nan), rate(att),
+            *(rate(att, f"_{days}") for days in ATTENDANCE_WINDOWS),
+        ]
+    return (
+        np.array([row[0] for row in rows], dtype=np.int64),
+        np.array([row[1] for row in rows], dtype=np.int64),
+        np.array([row[2] for row in rows], dtype=bool),
+        values,
+        columns + BASE_METRICS,
+    )
+
+
+class ScoutingTable:
+    """
+    Metric values of one sport's active profiles as columns, with each
+    metric's sorted values cached for percentiles (share of the sport's
+    players with a value at or below, in percent). Changed players are
+    re-read from the profile change log and patched in place; sorted
+    columns are re-sorted on their next use.
+    """
+
+    def __init__(self, sport_id, seq):
+        self.sport_id = sport_id
+        self.seq = seq
+        self.built_at = time.monotonic()
+        self.ids, self.players, self.public, self.values, self.metrics = _rows(sport_id)
+        self.alive = np.ones(len(self.ids), dtype=bool)
+        self.pos = {pk: i for i, pk in enumerate(self.ids.tolist())}
+        self.column = {name: c for c, name in enumerate(self.metrics)}
+        self._sorted = {}
+
+    def update(self, player_ids):
+        ids, players, public, values, _ = _rows(self.sport_id, player_ids)
+        gone = np.isin(self.players, np.array(sorted(player_ids), dtype=np.int64)) & ~np.isin(self.ids, ids)
+        self.alive[gone] = False
+        fresh = []
+        for i, pk in enumerate(ids.tolist()):
+            row = self.pos.get(pk)
+            if row is None:
+                fresh.append(i)
+            else:
+                self.values[row], self.public[row], self.alive[row] = values[i], public[i], True
+        if fresh:
+            start = len(self.ids)
+            self.ids = np.concatenate([self.ids, ids[fresh]])
+            self.players = np.concatenate([self.players, players[fresh]])
+            self.public = np.concatenate([self.public, public[fresh]])
+            self.alive = np.concatenate([self.alive, np.ones(len(fresh), dtype=bool)])
+            self.values = np.vstack([self.values, values[fresh]])
+            for offset, pk in enumerate(ids[fresh].tolist()):
+                self.pos[pk] = start + offset
+        self._sorted.clear()
+
+    def percentile(self, column, rows=None):
+        known = self._sorted.get(column)
+        if known is None:
+            values = self.values[self.alive, column]
+            known = self._sorted[column] = np.sort(values[~np.isnan(values)])
+        values = self.values[:, column] if rows is None else self.values[rows, column]
+        if not len(known):
+            return np.full(len(values), np.nan)
+        result = np.searchsorted(known, values, side="right") * (100.0 / len(known))
+        result[np.isnan(values)] = np.nan
+        return result
+
+
+def _tokens(text):
+    position, tokens = 0, []
+    text = text.strip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if not match or match.end() == position:
+            raise ScoutingError(f"Cannot read the query at: {text[position:position + 20]!r}")
+        kind = match.lastgroup
+        value = match.group(kind)
+        tokens.append((kind, value.lower() if kind == "word" else value))
+        position = match.end()
+    return tokens
+
+
+def parse(text, metrics):
+    """
+    Parse a query such as `runs percentile >= 90 and strike_rate >= 130 and
+    attendance_rate_60d >= 0.8` into a tree: ("and"|"or", left, right),
+    ("not", node) or ("cmp", metric, percentile?, op, number). NOT binds
+    tightest, then AND, then OR; parentheses group.
+    """
+    tokens = _tokens(text)
+    position = 0
+    clauses = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else (None, None)
+
+    def take(kind=None, value=None, what=None):
+        nonlocal position
+        token = peek()
+        if token[0] is None or (kind and token[0] != kind) or (value and token[1] != value):
+            raise ScoutingError(f"Expected {what or value or kind} in the query")
+        position += 1
+        return token[1]
+
+    def either():
+        node = both()
+        while peek() == ("word", "or"):
+            take()
+            node = ("or", node, both())
+        return node
+
+    def both():
+        node = single()
+        while peek() == ("word", "and"):
+            take()
+            node = ("and", node, single())
+        return node
+
+    def single():
+        nonlocal clauses
+        if peek() == ("word", "not"):
+            take()
+            return ("not", single())
+        if peek() == ("paren", "("):
+            take()
+            node = either()
+            take("paren", ")")
+            return node
+        metric = take("word", what="a metric")
+        if metric not in metrics:
+            raise ScoutingError(f"Unknown metric {metric!r}; this sport has: {', '.join(metrics)}")
+        percentile = peek()[0] == "word" and peek()[1] in ("percentile", "pct")
+        if percentile:
+            take()
+        op = take("op", what="a comparison (>=, <=, >, <, =, !=)")
+        number = float(take("number", what="a number"))
+        clauses += 1
+        if clauses > MAX_CLAUSES:
+            raise ScoutingError(f"At most {MAX_CLAUSES} comparisons per query")
+        return ("cmp", metric, percentile, op, number)
+
+    node = either()
+    if position != len(tokens):
+        raise ScoutingError(f"Unexpected {tokens[position][1]!r} in the query")
+    return node
+
+
+def _evaluate(node, table):
+    """
+    (true, false) row masks for a query tree. A comparison on an unknown
+    (NaN) value is neither, and NOT keeps it so: as in SQL, a player without
+    a value is never matched through it, negated or not.
+    """
+    kind = node[0]
+    if kind == "not":
+        true, false = _evaluate(node[1], table)
+        return false, true
+    if kind in ("and", "or"):
+        true1, false1 = _evaluate(node[1], table)
+        true2, false2 = _evaluate(node[2], table)
+        if kind == "and":
+            return true1 & true2, false1 | false2
+        return true1 | true2, false1 & false2
+    _, metric, percentile, op, number = node
+    column = table.column[metric]
+    values = table.percentile(column) if percentile else table.values[:, column]
+    known = ~np.isnan(values)
+    with np.errstate(invalid="ignore"):
+        result = OPERATORS[op](values, number)
+    return result & known, ~result & known
+
+
+_tables = {}
+_lock = threading.Lock()
+
+
+def _get_table(sport_id):
+    """This process's table for a sport, rebuilt when stale and caught up on the change log. Hold _lock."""
+    seq = profile_changes.current()
+    table = _tables.get(sport_id)
+    if table is not None and time.monotonic() - table.built_at > settings.SCOUTING_MAX_AGE:
+        table = None
+    if table is not None and seq != table.seq:
+        players = profile_changes.players_since(table.seq, seq, sport_id)
+        if players is None:
+            table = None
+        else:
+            if players:
+                table.update(players)
+            table.seq = seq
+    if table is None:
+        table = _tables[sport_id] = ScoutingTable(sport_id, seq)
+    return table
+
+
+def search(sport_id, query="", sort="-career_score", offset=0, limit=50):
+    """
+    Public players' active profiles in a sport matching `query` (see
+    parse(); empty matches everyone), ordered by `sort` (a metric, "-" for
+    descending; unknown values last, then profile id). Returns (total
+    matches, metric names, page of (profile id, {metric: value},
+    {metric: percentile})).
+    """
+    # Patched in place by updates, so reads take the lock too
+    with _lock:
+        table = _get_table(sport_id)
+        tree = parse(query, table.column) if query and query.strip() else None
+        descending = sort.startswith("-")
+        name = sort.lstrip("-")
+        if name not in table.column:
+            raise ScoutingError(f"Cannot sort by {name!r}; this sport has: {', '.join(table.metrics)}")
+
+        matched = table.alive & table.public
+        if tree is not None:
+            matched &= _evaluate(tree, table)[0]
+        rows = np.flatnonzero(matched)
+        key = table.values[rows, table.column[name]]
+        key = -key if descending else key
+        order = np.lexsort((table.ids[rows], np.nan_to_num(key, nan=0.0), np.isnan(key)))
+        page = rows[order[offset:offset + limit]]
+
+        values = table.values[page]
+        percentiles = np.column_stack([table.percentile(c, page) for c in range(len(table.metrics))]) \
+            if len(page) else np.zeros((0, len(table.metrics)))
+        results = [
+            (
+                int(table.ids[row]),
+                {m: _number(values[i, c]) for c, m in enumerate(table.metrics)},
+                {m: _number(percentiles[i, c], 1) for c, m in enumerate(table.metrics)},
+            )
+            for i, row in enumerate(page.tolist())
+        ]
+        return len(rows), table.metrics, results
+
+
+def _number(value, digits=3):
+    return None if np.isnan(value) else round(float(value), digits)
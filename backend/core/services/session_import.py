@@ -0,0 +1,339 @@
+# backend/core/services/session_import.py
+import csv
+import datetime
+import hashlib
+import io
+from collections import defaultdict
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, Q
+from django.utils import timezone
+
+from core.models import CoachingSession, PlayerSportProfile, SessionAttendance, SessionImport
+from core.services import profile_changes
+from core.services.performance_rollups import apply_deltas, contribution, session_day
+
+
+class SessionImportError(Exception):
+    pass
+
+
+class ImportInProgress(SessionImportError):
+    pass
+
+
+REQUIRED_COLUMNS = {"player_id", "attended", "score"}
+SESSION_COLUMN = "session_id"
+
+# Row errors kept on the import for the status endpoint; error_count has the total
+MAX_STORED_ERRORS = 500
+
+# A running import not checkpointed for this long is assumed dead and may be resumed
+STALE_AFTER = datetime.timedelta(minutes=5)
+
+
+def fingerprint(file):
+    """SHA-256 of the upload, read in chunks; the file is rewound afterwards."""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def read_csv(file):
+    """
+    (fieldnames, rows) for an uploaded CSV, decoded and parsed incrementally
+    from the file handle. rows yields dicts; if undecodable bytes are reached
+    it yields None once and stops (decoding works in blocks, so a few rows
+    before the bad bytes may be lost with it).
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text)
+        fieldnames = reader.fieldnames or []
+    except UnicodeDecodeError:
+        raise SessionImportError("Invalid file encoding")
+
+    def rows():
+        try:
+            yield from reader
+        except UnicodeDecodeError:
+            yield None
+
+    return fieldnames, rows()
+
+
+def _check_columns(fieldnames, session):
+    columns = set(fieldnames)
+    if session is None and SESSION_COLUMN not in columns:
+        raise SessionImportError(f"CSV must have a {SESSION_COLUMN} column when no session is given")
+    if columns - {SESSION_COLUMN} != REQUIRED_COLUMNS:
+        raise SessionImportError(
+            f"CSV must have columns: {', '.join(sorted(REQUIRED_COLUMNS))} (optionally {SESSION_COLUMN})"
+        )
+
+
+def _claim(coach_id, session, digest, filename, end_sessions):
+    """The unfinished import of this file to resume, or a new one."""
+    with transaction.atomic():
+        job = (
+            SessionImport.objects.select_for_update()
+            .filter(coach_id=coach_id, session=session, fingerprint=digest, end_sessions=end_sessions)
+            .exclude(status=SessionImport.Status.COMPLETED)
+            .order_by("-id")
+            .first()
+        )
+        if job is None:
+            return SessionImport.objects.create(
+                coach_id=coach_id, session=session, fingerprint=digest, filename=filename, end_sessions=end_sessions,
+            )
+        if job.status == SessionImport.Status.RUNNING and job.updated_at > timezone.now() - STALE_AFTER:
+            raise ImportInProgress(f"This file is already being imported (import {job.id})")
+        job.status = SessionImport.Status.RUNNING
+        job.last_error = ""
+        job.save(update_fields=["status", "last_error", "updated_at"])
+        return job
+
+
+class _Chunk:
+    """Validates and writes one chunk of rows; lookups are batched per chunk."""
+
+    def __init__(self, job, sessions, rosters):
+        self.job = job
+        self.sessions = sessions  # session pk -> CoachingSession (or None), kept across chunks
+        self.rosters = rosters  # sport id -> {player_id: Player pk}, kept across chunks
+        self.updated = 0
+        self.errors = []
+
+    def _error(self, line, pid, message):
+        self.errors.append({"row": line, "player_id": pid, "error": message})
+
+    def _load_sessions(self, rows):
+        wanted = set()
+        for _, row in rows:
+            value = (row.get(SESSION_COLUMN) or "").strip()
+            if value.isdigit() and int(value) not in self.sessions:
+                wanted.add(int(value))
+        if wanted:
+            found = CoachingSession.objects.filter(pk__in=wanted, coach_id=self.job.coach_id).only(
+                "id", "sport_id", "session_date", "is_active"
+            )
+            self.sessions.update({session.pk: session for session in found})
+            self.sessions.update({pk: None for pk in wanted - set(self.sessions)})
+
+    def _roster(self, sport_id):
+        # Players under this coach for this sport and active
+        if sport_id not in self.rosters:
+            self.rosters[sport_id] = dict(
+                PlayerSportProfile.objects.filter(
+                    coach_id=self.job.coach_id,
+                    sport_id=sport_id,
+                    is_active=True,
+                    player__is_active=True,
+                ).values_list("player__player_id", "player_id")
+            )
+        return self.rosters[sport_id]
+
+    def _resolve_session(self, row):
+        value = (row.get(SESSION_COLUMN) or "").strip()
+        if self.job.session_id is not None:
+            if value and value != str(self.job.session_id):
+                return None, "session_id does not match the session being imported"
+            return self.job.session, None
+        if not value.isdigit():
+            return None, "session_id is required"
+        session = self.sessions.get(int(value))
+        if session is None:
+            return None, "Session not found or not yours"
+        return session, None
+
+    def validate(self, rows):
+        """[(session, player pk, attended, score)] for the valid rows; errors are collected."""
+        if self.job.session_id is None:
+            self._load_sessions(rows)
+        valid = []
+        for line, row in rows:
+            pid = (row.get("player_id") or "").strip()
+            session, problem = self._resolve_session(row)
+            if problem:
+                self._error(line, pid, problem)
+                continue
+            player_pk = self._roster(session.sport_id).get(pid)
+            if player_pk is None:
+                self._error(line, pid, "Player not under this coach/sport or inactive")
+                continue
+            try:
+                attended = int((row.get("attended") or "").strip())
+                score = int((row.get("score") or "").strip())
+            except ValueError:
+                self._error(line, pid, "attended and score must be integers")
+                continue
+            # Normalize: attendance to 0/1, score to 0-10
+            attended = min(max(attended, 0), 1)
+            score = min(max(score, 0), 10)
+            valid.append((session, player_pk, bool(attended), score if attended else 0))
+        return valid
+
+    def write(self, valid):
+        """
+        Upsert the chunk with one bulk insert and one bulk update. Bulk writes
+        send no signals, so the rollup deltas are summed per (player, day) and
+        applied once, and the profile change log gets one entry for the chunk.
+        """
+        existing = {
+            (sa.session_id, sa.player_id): sa
+            for sa in SessionAttendance.objects.filter(
+                session_id__in={session.pk for session, *_ in valid},
+                player_id__in={player_pk for _, player_pk, *_ in valid},
+            )
+        }
+        created, changed = {}, {}
+        deltas = defaultdict(lambda: [0.0, 0])
+        for session, player_pk, attended, rating in valid:
+            key = (session.pk, player_pk)
+            sa = created.get(key) or existing.get(key)
+            if sa is None:
+                old = (0.0, 0)
+                sa = created[key] = SessionAttendance(session=session, player_id=player_pk)
+            elif (sa.attended, sa.rating) == (attended, rating):
+                self.updated += 1
+                continue
+            else:
+                old = contribution(sa.attended, sa.rating)
+                if sa.pk is not None:
+                    changed[sa.pk] = sa
+            sa.attended, sa.rating = attended, rating
+            new = contribution(attended, rating)
+            acc = deltas[(player_pk, session_day(session.session_date))]
+            acc[0] += new[0] - old[0]
+            acc[1] += new[1] - old[1]
+            self.updated += 1
+
+        SessionAttendance.objects.bulk_create(created.values(), batch_size=500)
+        SessionAttendance.objects.bulk_update(changed.values(), ["attended", "rating"], batch_size=500)
+        apply_deltas(deltas)
+        player_ids = {player_pk for _, player_pk in created} | {sa.player_id for sa in changed.values()}
+        if player_ids:
+            transaction.on_commit(lambda: profile_changes.changed(player_ids))
+
+    def commit(self, rows):
+        """Write the chunk and move the checkpoint past it in one transaction."""
+        valid = self.validate(rows)
+        job = self.job
+        with transaction.atomic():
+            self.write(valid)
+            job.rows_processed += len(rows)
+            job.rows_updated += self.updated
+            job.error_count += len(self.errors)
+            job.errors = (job.errors + self.errors)[:MAX_STORED_ERRORS]
+            job.session_ids = sorted(set(job.session_ids) | {session.pk for session, *_ in valid})
+            job.save(update_fields=[
+                "rows_processed", "rows_updated", "error_count", "errors", "session_ids", "updated_at",
+            ])
+
+
+def _end_sessions(job):
+    """Mark the imported sessions ended and refresh the players' session_count/career_score."""
+    sessions = CoachingSession.objects.filter(pk__in=job.session_ids, coach_id=job.coach_id)
+    sessions.filter(is_active=True).update(is_active=False)
+
+    attendance = SessionAttendance.objects.filter(session__in=sessions)
+    pairs = set(attendance.values_list("player_id", "session__sport_id").distinct())
+    if not pairs:
+        return
+    player_ids = {player_id for player_id, _ in pairs}
+    sport_ids = {sport_id for _, sport_id in pairs}
+    # Recomputed from all attendance rather than incremented, so a resumed import
+    # cannot count a session twice
+    totals = {
+        (row["player_id"], row["session__sport_id"]): row
+        for row in SessionAttendance.objects.filter(
+            player_id__in=player_ids, session__sport_id__in=sport_ids, attended=True,
+        ).values("player_id", "session__sport_id").annotate(
+            ended=Count("id", filter=Q(session__is_active=False)),
+            average=Avg("rating", filter=Q(rating__gt=0)),
+        )
+    }
+    profiles = [
+        profile
+        for profile in PlayerSportProfile.objects.filter(player_id__in=player_ids, sport_id__in=sport_ids)
+        if (profile.player_id, profile.sport_id) in pairs
+    ]
+    for profile in profiles:
+        row = totals.get((profile.player_id, profile.sport_id), {})
+        profile.session_count = row.get("ended", 0)
+        profile.career_score = round(float(row.get("average") or 0.0), 2)
+    PlayerSportProfile.objects.bulk_update(profiles, ["session_count", "career_score"], batch_size=500)
+    # bulk_update sends no signals; tell the profile-derived tables directly
+    transaction.on_commit(lambda: profile_changes.changed(player_ids))
+
+
+def import_sessions(coach_id, file, session=None, end_sessions=False):
+    """
+    Import an attendance CSV (player_id, attended, score and, without `session`,
+    session_id) for a coach. Rows are read straight from the upload and written
+    SESSION_IMPORT_CHUNK_SIZE at a time, each chunk committed together with the
+    import's checkpoint; uploading the same file again after a failure resumes
+    where it stopped. With end_sessions, the sessions are ended once every row
+    is in. Returns the SessionImport, completed or failed.
+    """
+    digest = fingerprint(file)
+    fieldnames, rows = read_csv(file)
+    _check_columns(fieldnames, session)
+    job = _claim(coach_id, session, digest, getattr(file, "name", "") or "", end_sessions)
+
+    chunk_size = settings.SESSION_IMPORT_CHUNK_SIZE
+    # Data rows start on line 2; rows before the checkpoint are already committed
+    numbered = islice(enumerate(rows, start=2), job.rows_processed, None)
+    sessions, rosters = {}, {}
+    try:
+        while True:
+            chunk = list(islice(numbered, chunk_size))
+            undecodable = next((line for line, row in chunk if row is None), None)
+            if undecodable is not None:
+                chunk = chunk[: undecodable - chunk[0][0]]
+            if chunk:
+                _Chunk(job, sessions, rosters).commit(chunk)
+            if undecodable is not None:
+                raise SessionImportError(f"Invalid file encoding (rows up to {undecodable - 1} were imported)")
+            if len(chunk) < chunk_size:
+                break
+        if end_sessions:
+            with transaction.atomic():
+                _end_sessions(job)
+    except Exception as exc:
+        job.status = SessionImport.Status.FAILED
+        job.last_error = str(exc)[:1000]
+        job.save(update_fields=["status", "last_error", "updated_at"])
+        if not isinstance(exc, SessionImportError):
+            raise
+        return job
+
+    job.status = SessionImport.Status.COMPLETED
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "finished_at", "updated_at"])
+    return job
+
+
+def import_status(job, errors=True):
+    data = {
+        "id": job.id,
+        "status": job.status,
+        "session": job.session_id,
+        "sessions": job.session_ids,
+        "filename": job.filename,
+        "end_sessions": job.end_sessions,
+        "rows_processed": job.rows_processed,
+        "rows_updated": job.rows_updated,
+        "error_count": job.error_count,
+        "last_error": job.last_error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+        "finished_at": job.finished_at,
+    }
+    if errors:
+        data["errors"] = job.errors
+    return data
@@ -0,0 +1,252 @@
+# backend/core/services/similarity.py
+import datetime
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from core.models import PlayerSportProfile, Rating, RatingHistory, SessionAttendance
+from core.services import profile_changes
+from core.services.sport_registry import sport_registry
+from core.services.sport_stats import first_rows
+
+
+class SimilarityError(Exception):
+    pass
+
+
+# Features besides the sport's stats columns
+EXTRA_FEATURES = ["career_score", "attendance_rate", "rating_trend"]
+
+# Rating change summed over this many days is a player's rating trend
+RATING_TREND_DAYS = 90
+
+# Standardized features are clipped so one outlier stat cannot dominate a distance
+CLIP = 4.0
+
+KMEANS_ITERATIONS = 8
+KMEANS_SAMPLE = 20000
+# Rows assigned to cells per matrix product, bounding its memory
+ASSIGN_BLOCK = 10000
+
+
+def _feature_rows(sport_id, player_ids=None):
+    """
+    Raw features of the sport's active profiles (optionally of some players):
+    (profile ids, player pks, public flags, matrix with NaN where unknown).
+    """
+    profiles = PlayerSportProfile.objects.filter(sport_id=sport_id, is_active=True, player__is_active=True)
+    attendance = SessionAttendance.objects.filter(session__sport_id=sport_id)
+    trend = RatingHistory.objects.filter(
+        rating__kind=Rating.Kind.PLAYER, rating__sport_id=sport_id,
+        played_at__gte=timezone.now() - datetime.timedelta(days=RATING_TREND_DAYS),
+    )
+    if player_ids is not None:
+        profiles = profiles.filter(player_id__in=player_ids)
+        attendance = attendance.filter(player_id__in=player_ids)
+        trend = trend.filter(rating__player_id__in=player_ids)
+
+    rows = list(profiles.order_by("id").values_list("id", "player_id", "player__is_public", "career_score"))
+    spec = sport_registry.stats_spec(sport_id)
+    columns = spec.columns if spec else []
+    stats = first_rows(spec, spec.model.objects.filter(profile__in=profiles.values("id"))) if spec else {}
+    rates = {
+        row["player_id"]: row["present"] / row["total"]
+        for row in attendance.values("player_id").annotate(
+            total=Count("id"), present=Count("id", filter=Q(attended=True)),
+        )
+    }
+    trends = dict(
+        trend.values("rating__player_id").annotate(change=Sum(F("after") - F("before")))
+        .values_list("rating__player_id", "change")
+    )
+
+    raw = np.full((len(rows), len(columns) + len(EXTRA_FEATURES)), np.nan)
+    for i, (profile_id, player_pk, _, career_score) in enumerate(rows):
+        row = stats.get(profile_id)
+        if row is not None:
+            raw[i, :len(columns)] = [np.nan if row[c] is None else float(row[c]) for c in columns]
+        raw[i, len(columns):] = [career_score or 0.0, rates.get(player_pk, np.nan), trends.get(player_pk, 0.0)]
+    return (
+        np.array([row[0] for row in rows], dtype=np.int64),
+        np.array([row[1] for row in rows], dtype=np.int64),
+        np.array([row[2] for row in rows], dtype=bool),
+        raw,
+        columns + EXTRA_FEATURES,
+    )
+
+
+class SimilarityIndex:
+    """
+    Standardized feature vectors of one sport's active profiles, searched
+    exactly with NumPy up to SIMILARITY_EXACT_LIMIT profiles and through
+    k-means cells above it (the query's SIMILARITY_PROBES nearest cells,
+    widened until k visible profiles are found). Scaling is fixed at build
+    time; changed profiles are re-read and patched in place.
+    """
+
+    def __init__(self, sport_id, seq):
+        self.sport_id = sport_id
+        self.seq = seq
+        self.built_at = time.monotonic()
+        ids, players, public, raw, self.features = _feature_rows(sport_id)
+        with np.errstate(invalid="ignore"):
+            known = ~np.isnan(raw)
+            count = known.sum(axis=0)
+            self.mean = np.where(count > 0, np.nansum(raw, axis=0) / np.maximum(count, 1), 0.0)
+            spread = np.sqrt(np.nansum((raw - self.mean) ** 2, axis=0) / np.maximum(count, 1))
+        self.std = np.where(spread > 0, spread, 1.0)
+        self.ids, self.players, self.visible = ids, players, public
+        self.vectors = self._scale(raw)
+        self.pos = {pk: i for i, pk in enumerate(ids.tolist())}
+        self.centroids = None
+        if len(ids) > settings.SIMILARITY_EXACT_LIMIT:
+            self._partition()
+
+    def _scale(self, raw):
+        scaled = (raw - self.mean) / self.std
+        # Unknown values sit at the mean
+        return np.clip(np.nan_to_num(scaled, nan=0.0), -CLIP, CLIP).astype(np.float32)
+
+    def _partition(self):
+        rng = np.random.default_rng(0)
+        n = len(self.vectors)
+        cells = int(np.sqrt(n))
+        sample = self.vectors[rng.choice(n, min(n, KMEANS_SAMPLE), replace=False)]
+        centroids = sample[rng.choice(len(sample), cells, replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):
+            nearest = self._nearest_cells(sample, centroids, 1)[:, 0]
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, nearest, sample)
+            sizes = np.bincount(nearest, minlength=cells)
+            filled = sizes > 0
+            centroids[filled] = sums[filled] / sizes[filled, None]
+        self.centroids = centroids
+        self.cell = self._nearest_cells(self.vectors, centroids, 1)[:, 0]
+        order = np.argsort(self.cell, kind="stable")
+        bounds = np.searchsorted(self.cell[order], np.arange(cells + 1))
+        self.members = [order[bounds[c]:bounds[c + 1]] for c in range(cells)]
+
+    @staticmethod
+    def _nearest_cells(vectors, centroids, count):
+        """The `count` nearest centroids of each vector, nearest first, in blocks of ASSIGN_BLOCK rows."""
+        norms = (centroids ** 2).sum(axis=1)[None, :]
+        count = min(count, len(centroids))
+        blocks = []
+        for start in range(0, len(vectors), ASSIGN_BLOCK):
+            d = norms - 2 * vectors[start:start + ASSIGN_BLOCK] @ centroids.T
+            nearest = np.argpartition(d, count - 1, axis=1)[:, :count]
+            order = np.argsort(np.take_along_axis(d, nearest, axis=1), axis=1)
+            blocks.append(np.take_along_axis(nearest, order, axis=1))
+        return np.concatenate(blocks) if blocks else np.zeros((0, count), dtype=np.int64)
+
+    def update(self, player_ids):
+        """Re-read these players' profiles: changed rows in place, new ones appended, gone ones hidden."""
+        ids, players, public, raw, _ = _feature_rows(self.sport_id, player_ids)
+        gone = np.isin(self.players, np.array(sorted(player_ids), dtype=np.int64)) & ~np.isin(self.ids, ids)
+        self.visible[gone] = False
+        vectors = self._scale(raw)
+        fresh = []
+        for i, pk in enumerate(ids.tolist()):
+            row = self.pos.get(pk)
+            if row is None:
+                fresh.append(i)
+                continue
+            self.vectors[row], self.visible[row] = vectors[i], public[i]
+            if self.centroids is not None:
+                self._move(row, self._nearest_cells(vectors[i:i + 1], self.centroids, 1)[0, 0])
+        if fresh:
+            start = len(self.ids)
+            self.ids = np.concatenate([self.ids, ids[fresh]])
+            self.players = np.concatenate([self.players, players[fresh]])
+            self.visible = np.concatenate([self.visible, public[fresh]])
+            self.vectors = np.vstack([self.vectors, vectors[fresh]])
+            for offset, pk in enumerate(ids[fresh].tolist()):
+                self.pos[pk] = start + offset
+            if self.centroids is not None:
+                cells = self._nearest_cells(vectors[fresh], self.centroids, 1)[:, 0]
+                self.cell = np.concatenate([self.cell, np.full(len(fresh), -1)])
+                for offset, cell in enumerate(cells.tolist()):
+                    self._move(start + offset, cell)
+
+    def _move(self, row, cell):
+        old = self.cell[row]
+        if old == cell:
+            return
+        if old >= 0:
+            self.members[old] = self.members[old][self.members[old] != row]
+        self.members[cell] = np.append(self.members[cell], row)
+        self.cell[row] = cell
+
+    def search(self, vector, k, exclude=None):
+        """Rows of the k nearest visible profiles (squared distance order) and their distances."""
+        if self.centroids is None:
+            candidates = None
+        else:
+            probes = settings.SIMILARITY_PROBES
+            while True:
+                cells = self._nearest_cells(vector[None, :], self.centroids, probes)[0]
+                candidates = np.concatenate([self.members[c] for c in cells])
+                enough = np.count_nonzero(self.visible[candidates]) > k
+                if enough or probes >= len(self.centroids):
+                    break
+                probes *= 2
+        vectors = self.vectors if candidates is None else self.vectors[candidates]
+        distance = ((vectors - vector) ** 2).sum(axis=1)
+        rows = np.arange(len(self.vectors)) if candidates is None else candidates
+        allowed = self.visible[rows] & (rows != (-1 if exclude is None else exclude))
+        rows, distance = rows[allowed], distance[allowed]
+        if len(rows) > k:
+            top = np.argpartition(distance, k - 1)[:k]
+            rows, distance = rows[top], distance[top]
+        order = np.argsort(distance, kind="stable")
+        return rows[order], np.sqrt(distance[order])
+
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def _get_index(sport_id):
+    """This process's index for a sport, rebuilt when stale and caught up on the change log. Hold _lock."""
+    seq = profile_changes.current()
+    index = _indexes.get(sport_id)
+    if index is not None and time.monotonic() - index.built_at > settings.SIMILARITY_MAX_AGE:
+        index = None
+    if index is not None and seq != index.seq:
+        players = profile_changes.players_since(index.seq, seq, sport_id)
+        if players is None:
+            index = None
+        else:
+            if players:
+                index.update(players)
+            index.seq = seq
+    if index is None:
+        index = _indexes[sport_id] = SimilarityIndex(sport_id, seq)
+    return index
+
+
+def similar(profile, k=10):
+    """
+    The k profiles in the profile's sport nearest to it by feature vector,
+    public players only. Returns ([(profile id, distance)], feature names).
+    """
+    if profile.sport_id is None:
+        raise SimilarityError("Profile has no sport")
+    # Updates patch the index in place, so searches take the lock too
+    with _lock:
+        index = _get_index(profile.sport_id)
+        row = index.pos.get(profile.pk)
+        if row is not None:
+            vector = index.vectors[row]
+        else:
+            # Not indexed (inactive, or newer than the index): score it on the fly
+            ids, _, _, raw, _ = _feature_rows(profile.sport_id, [profile.player_id])
+            if profile.pk not in ids.tolist():
+                raise SimilarityError("Inactive profiles have no similar players")
+            vector = index._scale(raw[ids.tolist().index(profile.pk)][None, :])[0]
+        rows, distances = index.search(vector, k, exclude=row)
+        return [(int(index.ids[r]), float(d)) for r, d in zip(rows, distances)], index.features
@@ -0,0 +1,117 @@
+# backend/core/services/sport_registry.py
+import threading
+import time
+from collections import namedtuple
+
+from django.core.cache import cache
+
+from core.models import Sport
+from core.services.sport_stats import SPORT_STATS
+
+
+SportEntry = namedtuple("SportEntry", ["id", "name", "key", "sport_type"])
+
+
+# Sports with tournament / live match management
+MATCH_MANAGED_SPORTS = {"cricket"}
+
+
+VERSION_KEY = "sports:version"
+
+
+class SportRegistry:
+    """
+    In-process map of Sport rows by id and by case-insensitive name.
+
+    The sports table is tiny and almost never written, so it is loaded once per
+    process under a version kept in the cache, which the Sport post_save/
+    post_delete signals bump. Each process compares its version with the cached
+    one at most every `check_interval` seconds, so with a shared CACHE_BACKEND
+    (Redis/Memcached) a rename or deletion made through another process is seen
+    within that time. A lookup that misses reloads once, so a sport created
+    elsewhere is found even with the per-process default cache.
+    """
+
+    check_interval = 1.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_id = None
+        self._by_key = None
+        self._version = None
+        self._checked_at = 0.0
+
+    def _load(self):
+        version = cache.get(VERSION_KEY) or 0
+        by_id, by_key = {}, {}
+        for sport_id, name, sport_type in Sport.objects.values_list("id", "name", "sport_type"):
+            entry = SportEntry(sport_id, name, name.strip().lower(), sport_type)
+            by_id[sport_id] = entry
+            by_key[entry.key] = entry
+        with self._lock:
+            self._by_id, self._by_key = by_id, by_key
+            self._version, self._checked_at = version, time.monotonic()
+        return by_id, by_key
+
+    def _maps(self):
+        now = time.monotonic()
+        with self._lock:
+            by_id, by_key = self._by_id, self._by_key
+            check = by_id is not None and now - self._checked_at >= self.check_interval
+            if check:
+                self._checked_at = now
+        if check and (cache.get(VERSION_KEY) or 0) != self._version:
+            by_id = None
+        if by_id is None:
+            by_id, by_key = self._load()
+        return by_id, by_key
+
+    def invalidate(self):
+        """Drop this process's maps and bump the shared version so the other processes reload too."""
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.set(VERSION_KEY, 1, None)
+        with self._lock:
+            self._by_id = None
+            self._by_key = None
+
+    def all(self):
+        by_id, _ = self._maps()
+        return sorted(by_id.values(), key=lambda e: e.id)
+
+    def get(self, name):
+        """Entry for a sport name (case-insensitive), or None."""
+        if not name:
+            return None
+        key = name.strip().lower()
+        _, by_key = self._maps()
+        if key not in by_key:
+            _, by_key = self._load()
+        return by_key.get(key)
+
+    def by_id(self, sport_id):
+        if sport_id is None:
+            return None
+        by_id, _ = self._maps()
+        if sport_id not in by_id:
+            by_id, _ = self._load()
+        return by_id.get(sport_id)
+
+    def id_for(self, name):
+        entry = self.get(name)
+        return entry.id if entry else None
+
+    def key_for(self, sport_id):
+        """Lowercase sport name used to index SPORT_STATS, or None."""
+        entry = self.by_id(sport_id)
+        return entry.key if entry else None
+
+    def stats_spec(self, sport_id):
+        return SPORT_STATS.get(self.key_for(sport_id))
+
+    def is_match_managed(self, sport_id):
+        return self.key_for(sport_id) in MATCH_MANAGED_SPORTS
+
+
+sport_registry = SportRegistry()
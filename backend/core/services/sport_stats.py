@@ -0,0 +1,121 @@
+# backend/core/services/sport_stats.py
+from collections import defaultdict
+
+from core.models import (
+    CricketStats,
+    FootballStats,
+    BasketballStats,
+    RunningStats,
+)
+
+
+class SportStatsSpec:
+    """
+    How one sport's stats table is read, ranked and shown.
+
+    model         per-profile stats table (FK `profile` to PlayerSportProfile)
+    fields        stats exposed on dashboards, in display order
+    rank_metrics  (metric, higher_is_better) pairs used for ranks
+    formatter     optional callable(dict) -> dict applied before serializing
+    """
+
+    def __init__(self, model, fields, rank_metrics, formatter=None):
+        self.model = model
+        self.fields = list(fields)
+        self.rank_metrics = list(rank_metrics)
+        self.formatter = formatter
+
+    @property
+    def columns(self):
+        metric_names = [metric for metric, _ in self.rank_metrics]
+        return list(dict.fromkeys(self.fields + metric_names))
+
+    def serialize(self, row):
+        data = {field: row[field] for field in self.fields}
+        return self.formatter(data) if self.formatter else data
+
+
+# One entry per sport, keyed by lowercase sport name (see sport_registry).
+# Adding a sport means adding its stats model and a row here.
+SPORT_STATS = {
+    "cricket": SportStatsSpec(
+        CricketStats,
+        fields=["runs", "wickets", "average", "strike_rate", "matches_played"],
+        rank_metrics=[("runs", True), ("wickets", True), ("average", True), ("strike_rate", True)],
+    ),
+    "football": SportStatsSpec(
+        FootballStats,
+        fields=["goals", "assists", "tackles", "matches_played"],
+        rank_metrics=[("goals", True), ("assists", True), ("tackles", True)],
+    ),
+    "basketball": SportStatsSpec(
+        BasketballStats,
+        fields=["points", "rebounds", "assists", "matches_played"],
+        rank_metrics=[("points", True), ("rebounds", True), ("assists", True)],
+    ),
+    "running": SportStatsSpec(
+        RunningStats,
+        fields=["total_distance_km", "best_time_seconds", "events_participated", "matches_played"],
+        rank_metrics=[("total_distance_km", True), ("best_time_seconds", False)],
+    ),
+}
+
+
+def first_rows(spec, queryset):
+    """
+    One stats row per profile. A profile can in theory own several rows; like
+    the old `related_manager.first()` calls, the lowest id wins.
+    """
+    rows = {}
+    for row in queryset.order_by("profile_id", "id").values("profile_id", *spec.columns):
+        rows.setdefault(row["profile_id"], row)
+    return rows
+
+
+def _rank_positions(rows, metric, higher_is_better):
+    """profile_id -> 1-based position; ties keep profile order (stable sort)."""
+    ordered = sorted(rows, key=lambda r: r[metric] or 0, reverse=higher_is_better)
+    return {r["profile_id"]: i + 1 for i, r in enumerate(ordered)}
+
+
+def build_stats(profiles, with_ranks=False):
+    """
+    Stats (and optionally ranks within the sport) for a set of PlayerSportProfiles.
+
+    Returns {profile_id: {"stats": {...}, "ranks": {...}}} for profiles that have
+    a stats row. Runs one query per sport for the stats and, with ranks, one more
+    per sport for the ranking pool, however many profiles are passed.
+    """
+    from core.services.sport_registry import sport_registry
+
+    by_sport = defaultdict(list)
+    for profile in profiles:
+        if sport_registry.stats_spec(profile.sport_id):
+            by_sport[profile.sport_id].append(profile.id)
+
+    result = {}
+    for sport_id, profile_ids in by_sport.items():
+        spec = sport_registry.stats_spec(sport_id)
+        if with_ranks:
+            pool = first_rows(spec, spec.model.objects.filter(profile__sport_id=sport_id))
+            own = {pid: pool[pid] for pid in profile_ids if pid in pool}
+        else:
+            pool = None
+            own = first_rows(spec, spec.model.objects.filter(profile_id__in=profile_ids))
+
+        positions = {}
+        if own and with_ranks:
+            pool_rows = list(pool.values())
+            positions = {
+                metric: _rank_positions(pool_rows, metric, higher)
+                for metric, higher in spec.rank_metrics
+            }
+
+        for profile_id, row in own.items():
+            block = {"stats": spec.serialize(row)}
+            if with_ranks:
+                ranks = {metric: positions[metric].get(profile_id) for metric, _ in spec.rank_metrics}
+                ranks["total_players"] = len(pool)
+                block["ranks"] = ranks
+            result[profile_id] = block
+    return result
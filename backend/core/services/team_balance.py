@@ -0,0 +1,304 @@
+# backend/core/services/team_balance.py
+import numpy as np
+
+from core.models import PlayerSportProfile
+from core.services.sport_registry import sport_registry
+from core.services.sport_stats import first_rows
+
+
+class BalanceError(Exception):
+    pass
+
+
+# Cricket roles, read from CricketStats; other sports balance on strength only
+ROLES = ("batsman", "bowler", "all_rounder")
+
+# Runs per match (CricketStats.average) and wickets per match that make a
+# batsman or a bowler; both make an all-rounder
+BATTING_AVERAGE = 15.0
+BOWLING_RATE = 1.0
+
+# Added to career_score (0-10) for a player's stats, from their mean
+# percentile within the pool; players without stats sit at the median
+STATS_WEIGHT = 2.0
+
+# A team one player off the even share of a role costs as much as a team
+# total 2 points off the mean
+ROLE_WEIGHT = 4.0
+
+MAX_SWAPS = 1000
+# Placement dead ends undone before a split is declared impossible
+MAX_BACKTRACKS = 20000
+
+
+def _role(row):
+    matches = row["matches_played"] or 0
+    if not matches:
+        return None
+    batting = (row["average"] or 0) >= BATTING_AVERAGE
+    bowling = (row["wickets"] or 0) / matches >= BOWLING_RATE
+    if batting and bowling:
+        return "all_rounder"
+    return "batsman" if batting else "bowler" if bowling else None
+
+
+def load_pool(coach, sport_id, player_ids=None):
+    """
+    The coach's active students for the sport not yet in a team (the ones a
+    TeamProposal accepts), optionally only the given Player pks, each with a
+    strength and, for cricket, a role.
+    """
+    rows = list(
+        PlayerSportProfile.objects.filter(coach=coach, sport_id=sport_id, is_active=True, team__isnull=True)
+        .order_by("player_id")
+        .values("id", "player_id", "player__player_id", "player__user__username", "career_score")
+    )
+    if player_ids is not None:
+        wanted = set(player_ids)
+        rows = [row for row in rows if row["player_id"] in wanted]
+        missing = wanted - {row["player_id"] for row in rows}
+        if missing:
+            raise BalanceError(f"Not your unassigned students for this sport: {sorted(missing)}")
+
+    spec = sport_registry.stats_spec(sport_id)
+    stats = first_rows(spec, spec.model.objects.filter(profile_id__in=[row["id"] for row in rows])) if spec else {}
+    bonus = np.full(len(rows), 0.5)
+    if stats and len(rows) > 1:
+        has = np.array([row["id"] in stats for row in rows])
+        percentiles = []
+        for metric, higher in spec.rank_metrics:
+            values = np.array([
+                float(stats[row["id"]][metric] or 0) if row["id"] in stats else 0.0 for row in rows
+            ])[has]
+            order = np.argsort(values if higher else -values, kind="stable")
+            ranks = np.empty(len(values))
+            ranks[order] = np.arange(len(values))
+            percentiles.append(ranks / max(len(values) - 1, 1))
+        bonus[has] = np.mean(percentiles, axis=0)
+
+    cricket = sport_registry.key_for(sport_id) == "cricket"
+    return [
+        {
+            "player": row["player_id"],
+            "player_id": row["player__player_id"],
+            "username": row["player__user__username"],
+            "strength": float(row["career_score"] or 0) + STATS_WEIGHT * float(bonus[i]),
+            "role": _role(stats[row["id"]]) if cricket and row["id"] in stats else None,
+        }
+        for i, row in enumerate(rows)
+    ]
+
+
+def _groups(n, index, together, apart):
+    """Union must-together pairs into units; must-apart pairs become unit conflicts."""
+    parent = list(range(n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def lookup(pair):
+        unknown = [pk for pk in pair if pk not in index]
+        if unknown:
+            raise BalanceError(f"Constraint names players outside the pool: {unknown}")
+        return index[pair[0]], index[pair[1]]
+
+    for pair in together:
+        a, b = lookup(pair)
+        parent[find(a)] = find(b)
+    roots = sorted({find(i) for i in range(n)})
+    unit_of = {root: u for u, root in enumerate(roots)}
+    unit = np.array([unit_of[find(i)] for i in range(n)])
+
+    conflicts = np.zeros((len(roots), len(roots)), dtype=bool)
+    for pair in apart:
+        a, b = lookup(pair)
+        if unit[a] == unit[b]:
+            raise BalanceError(f"Players {pair[0]} and {pair[1]} must be both together and apart")
+        conflicts[unit[a], unit[b]] = conflicts[unit[b], unit[a]] = True
+    return unit, conflicts
+
+
+def _bench(pool, team_count, team_size, constrained):
+    """Leave the weakest unconstrained players out when the pool exceeds the teams."""
+    extra = len(pool) - team_count * team_size
+    if extra < 0:
+        raise BalanceError(f"{team_count} teams of {team_size} need {team_count * team_size} players; the pool has {len(pool)}")
+    if not extra:
+        return pool, []
+    free = sorted((p for p in pool if p["player"] not in constrained), key=lambda p: (p["strength"], p["player"]))
+    if len(free) < extra:
+        raise BalanceError("Too many constrained players to leave anyone out; lower the pool or raise the team size")
+    benched = {p["player"] for p in free[:extra]}
+    return [p for p in pool if p["player"] not in benched], free[:extra]
+
+
+def _place(size, strength, roles, conflicts, capacity):
+    """
+    Start split: most constrained units first (most must-apart conflicts,
+    then biggest, then strongest), each to the cheapest team with room. On a
+    dead end, backtrack to the latest unit with an untried team, for at most
+    MAX_BACKTRACKS steps; empty teams of one capacity are interchangeable, so
+    only one of them is tried.
+    """
+    team_count = len(capacity)
+    capacity = np.array(capacity)
+    team = np.full(len(size), -1)
+    totals = np.zeros(team_count)
+    counts = np.zeros((team_count, roles.shape[1]))
+    room = capacity.copy()
+    degree = conflicts.sum(axis=1)
+    order = sorted(range(len(size)), key=lambda u: (-degree[u], -size[u], -strength[u], u))
+
+    def options(u):
+        blocked = np.zeros(team_count, dtype=bool)
+        blocked[team[conflicts[u] & (team >= 0)]] = True
+        open_teams = np.flatnonzero((room >= size[u]) & ~blocked)
+        empty = open_teams[room[open_teams] == capacity[open_teams]]
+        _, first = np.unique(capacity[empty], return_index=True)
+        open_teams = np.union1d(open_teams[room[open_teams] < capacity[open_teams]], empty[first])
+        # Added squared deviation of the team's total and role counts
+        cost = strength[u] * totals[open_teams] + ROLE_WEIGHT * counts[open_teams] @ roles[u]
+        return list(open_teams[np.argsort(cost, kind="stable")])
+
+    def move(u, t, sign):
+        totals[t] += sign * strength[u]
+        counts[t] += sign * roles[u]
+        room[t] -= sign * size[u]
+
+    stack = []          # per placed unit (in order), the teams it has left to try
+    backtracks = 0
+    while len(stack) < len(order):
+        u = order[len(stack)]
+        left = options(u)
+        while not left:
+            if not stack or backtracks >= MAX_BACKTRACKS:
+                raise BalanceError("No split satisfies the team sizes and together/apart constraints")
+            # Dead end: take the last placed unit out and move it to its next team
+            backtracks += 1
+            left = stack.pop()
+            u = order[len(stack)]
+            move(u, team[u], -1)
+            team[u] = -1
+        t = left.pop(0)
+        team[u] = t
+        move(u, t, 1)
+        stack.append(left)
+    return team, totals, counts
+
+
+def _improve(team, totals, counts, size, strength, roles, conflicts):
+    """
+    Local search: apply the best swap of two equal-sized units in different
+    teams until none lowers the sum of squared team totals and role counts
+    (sizes stay fixed, so this is the spread around the mean). All swaps are
+    scored at once per step; cross terms come from r_i . C_t products.
+    """
+    team_count = len(totals)
+    n = len(team)
+    d = strength[:, None] - strength[None, :]
+    role_d = roles @ roles.T
+    role_sq = np.diag(role_d)[:, None] + np.diag(role_d)[None, :] - 2 * role_d
+    same_size = size[:, None] == size[None, :]
+    apart = conflicts.astype(np.int64)
+    # apart partners of each unit per team
+    clash = apart @ np.eye(team_count, dtype=np.int64)[team]
+    swaps = 0
+    while swaps < MAX_SWAPS:
+        own = totals[team]
+        delta = 2 * d * (d + own[None, :] - own[:, None])
+        q = (roles @ counts.T)[:, team]
+        cross = q + q.T - np.diag(q)[:, None] - np.diag(q)[None, :]
+        delta += ROLE_WEIGHT * 2 * (role_sq + cross)
+        moved = clash[:, team] - apart
+        valid = same_size & (team[:, None] != team[None, :]) & (moved == 0) & (moved.T == 0)
+        delta[~valid] = np.inf
+        best = np.argmin(delta)
+        i, j = divmod(best, n)
+        if not delta[i, j] < -1e-9:
+            break
+        a, b = team[i], team[j]
+        team[i], team[j] = b, a
+        totals[a] += strength[j] - strength[i]
+        totals[b] += strength[i] - strength[j]
+        counts[a] += roles[j] - roles[i]
+        counts[b] += roles[i] - roles[j]
+        clash[:, a] += apart[:, j] - apart[:, i]
+        clash[:, b] += apart[:, i] - apart[:, j]
+        swaps += 1
+    return team
+
+
+def balance(pool, team_count, team_size=None, together=(), apart=(), min_roles=None):
+    """
+    Split a pool (see load_pool) into `team_count` teams of `team_size`
+    (default: everyone, as evenly as possible) with the closest strength
+    totals and an even share of each role, keeping must-together pairs in
+    one team and must-apart pairs in different ones. Placement (backtracking
+    on dead ends), then pairwise swaps. `min_roles` ({role: n}) checks the
+    pool can give every team n of that role; teams still short of it are
+    reported.
+    """
+    min_roles = min_roles or {}
+    unknown = set(min_roles) - set(ROLES)
+    if unknown:
+        raise BalanceError(f"Unknown roles: {sorted(unknown)}; use {', '.join(ROLES)}")
+    if team_count < 2:
+        raise BalanceError("team_count must be at least 2")
+
+    constrained = {pk for pair in [*together, *apart] for pk in pair}
+    benched = []
+    if team_size is not None:
+        if team_size < 1:
+            raise BalanceError("team_size must be at least 1")
+        pool, benched = _bench(pool, team_count, team_size, constrained)
+        capacity = [team_size] * team_count
+    else:
+        if len(pool) < team_count:
+            raise BalanceError(f"{team_count} teams need at least {team_count} players; the pool has {len(pool)}")
+        base, extra = divmod(len(pool), team_count)
+        capacity = [base + (t < extra) for t in range(team_count)]
+
+    for role, wanted in min_roles.items():
+        have = sum(p["role"] == role for p in pool)
+        if have < wanted * team_count:
+            raise BalanceError(f"{team_count} teams with {wanted} {role} each need {wanted * team_count}; the pool has {have}")
+
+    index = {p["player"]: i for i, p in enumerate(pool)}
+    unit, conflicts = _groups(len(pool), index, together, apart)
+    units = len(conflicts)
+    size = np.bincount(unit, minlength=units)
+    if size.max() > max(capacity):
+        raise BalanceError(f"A must-together group of {size.max()} players does not fit a team of {max(capacity)}")
+    player_strength = np.array([p["strength"] for p in pool])
+    player_roles = np.array([[p["role"] == role for role in ROLES] for p in pool], dtype=np.float64).reshape(-1, len(ROLES))
+    strength = np.bincount(unit, weights=player_strength, minlength=units)
+    roles = np.zeros((units, len(ROLES)))
+    np.add.at(roles, unit, player_roles)
+
+    team, totals, counts = _place(size, strength, roles, conflicts, capacity)
+    team = _improve(team, totals, counts, size, strength, roles, conflicts)
+
+    teams = [{"players": [], "strength": 0.0, "roles": dict.fromkeys(ROLES, 0)} for _ in range(team_count)]
+    for i, player in enumerate(pool):
+        entry = teams[team[unit[i]]]
+        entry["players"].append({**player, "strength": round(player["strength"], 3)})
+        entry["strength"] += player["strength"]
+        if player["role"]:
+            entry["roles"][player["role"]] += 1
+    for t, entry in enumerate(teams):
+        entry["index"] = t + 1
+        entry["strength"] = round(entry["strength"], 3)
+        entry["players"].sort(key=lambda p: -p["strength"])
+    totals = [entry["strength"] for entry in teams]
+    return {
+        "teams": teams,
+        "spread": round(max(totals) - min(totals), 3),
+        "bench": [{**p, "strength": round(p["strength"], 3)} for p in benched],
+        "short_of_roles": [
+            {"team": entry["index"], "role": role, "have": entry["roles"][role], "want": wanted}
+            for entry in teams for role, wanted in min_roles.items() if entry["roles"][role] < wanted
+        ],
+    }
@@ -1,37 +1,29 @@
 # core/signals.py
-from django.db.models.signals import post_save, pre_save   # ✅ include pre_save here
+from django.db.models.signals import post_save, pre_save, post_delete, post_init   # ✅ include pre_save here
 from django.dispatch import receiver
 from django.db import transaction
-from django.db.models import Max
-import datetime
 
-from .models import User, Player, Coach, Manager, Admin, PlayerSportProfile, CricketStats, Sport, ManagerSport
-from .utils import generate_coach_id
+from .models import (
+    User, Player, Coach, Manager, Admin, PlayerSportProfile, CricketStats, Sport, ManagerSport,
+    CoachingSession, SessionAttendance, FootballStats, BasketballStats, RunningStats,
+)
+from .utils import generate_coach_id, generate_player_id
+from .services.sport_registry import sport_registry
+from .services.access import bump_access_version, manager_user_id
+from .authentication import bump_claims_version
+from .services.performance_rollups import apply_delta, apply_deltas, contribution, session_day
+from .services import profile_changes
 
 
 def _next_player_id():
     """Generate next player id like P25xxxxx."""
-    yy = str(datetime.date.today().year)[-2:]
-    prefix = f"P{yy}"
-    result = Player.objects.filter(player_id__startswith=prefix).aggregate(max_id=Max("player_id"))
-    max_id = result.get("max_id")
-
-    if max_id:
-        try:
-            last_num = int(max_id[-5:])
-        except Exception:
-            last_num = Player.objects.filter(player_id__startswith=prefix).count()
-    else:
-        last_num = 0
-
-    next_num = last_num + 1
-    return f"{prefix}{next_num:05d}"
+    return generate_player_id()
 
 
 
 @receiver(post_save, sender=User)
 def create_or_update_player(sender, instance, created, **kwargs):
-    if instance.role != User.Roles.PLAYER:
+    if instance.role != User.Roles.PLAYER or getattr(instance, "_profile_created_by_service", False):
         return
 
     # If newly created or role changed to player
@@ -52,7 +44,7 @@ def create_or_update_player(sender, instance, created, **kwargs):
 
 @receiver(post_save, sender=User)
 def create_or_update_coach(sender, instance, created, **kwargs):
-    if instance.role != User.Roles.COACH:
+    if instance.role != User.Roles.COACH or getattr(instance, "_profile_created_by_service", False):
         return
 
     # If newly created or role changed to coach
@@ -94,7 +86,7 @@ def auto_assign_manager_to_all_sports(sender, instance, created, **kwargs):
 
 @receiver(post_save, sender=User)
 def create_or_update_manager(sender, instance, created, **kwargs):
-    if instance.role != User.Roles.MANAGER:
+    if instance.role != User.Roles.MANAGER or getattr(instance, "_profile_created_by_service", False):
         return
 
     # If newly created or role changed to manager
@@ -111,7 +103,7 @@ def create_or_update_manager(sender, instance, created, **kwargs):
 
 @receiver(post_save, sender=User)
 def create_or_update_admin(sender, instance, created, **kwargs):
-    if instance.role != User.Roles.ADMIN:
+    if instance.role != User.Roles.ADMIN or getattr(instance, "_profile_created_by_service", False):
         return
 
     # If newly created or role changed to admin
@@ -127,13 +119,11 @@ def create_or_update_admin(sender, instance, created, **kwargs):
 
 @receiver(pre_save, sender=User)
 def store_old_role(sender, instance, **kwargs):
-    if not instance.pk:
-        instance._old_role = None
-    else:
-        try:
-            instance._old_role = User.objects.get(pk=instance.pk).role
-        except User.DoesNotExist:
-            instance._old_role = None
+    instance._old_role = instance._old_is_active = None
+    if instance.pk:
+        row = User.objects.filter(pk=instance.pk).values_list("role", "is_active").first()
+        if row:
+            instance._old_role, instance._old_is_active = row
 
 
 #-----------------------------
@@ -143,3 +133,198 @@ def store_old_role(sender, instance, **kwargs):
 # REMOVED: Auto-creation of Cricket profile
 # The serializer now handles sport profile creation based on user selection
 # This signal was causing all players to get Cricket regardless of their choice
+
+
+#-----------------------------
+# Sport Registry Signals
+#-----------------------------
+
+@receiver(post_save, sender=Sport)
+@receiver(post_delete, sender=Sport)
+def invalidate_sport_registry(sender, instance, **kwargs):
+    """Drop the cached name/id map in every process, now and again once the write is committed."""
+    sport_registry.invalidate()
+    transaction.on_commit(sport_registry.invalidate)
+
+
+#-----------------------------
+# Access Context Signals
+#-----------------------------
+
+@receiver(post_save, sender=User)
+def invalidate_user_access(sender, instance, created, **kwargs):
+    # Role or account changes; also drops the cached login payload
+    if created:
+        return
+    bump_access_version(instance.pk)
+    if (instance._old_role, instance._old_is_active) != (instance.role, instance.is_active):
+        # Access tokens carry the role; make the client refresh them
+        bump_claims_version(instance.pk)
+
+
+@receiver(post_save, sender=ManagerSport)
+@receiver(post_delete, sender=ManagerSport)
+def invalidate_manager_access(sender, instance, **kwargs):
+    user_id = manager_user_id(instance.manager_id)
+    bump_access_version(user_id)
+    bump_claims_version(user_id)
+
+
+@receiver(post_init, sender=PlayerSportProfile)
+def remember_profile_coach(sender, instance, **kwargs):
+    # Snapshot without a query so a coach change can invalidate the old coach too
+    instance._old_coach_id = instance.__dict__.get("coach_id")
+
+
+def _bump_profile_access(profile, coach_ids, include_player):
+    coach_ids = set(coach_ids) - {None}
+    user_ids = list(Coach.objects.filter(id__in=coach_ids).values_list("user_id", flat=True)) if coach_ids else []
+    if include_player:
+        user_ids += list(Player.objects.filter(id=profile.player_id).values_list("user_id", flat=True))
+    bump_access_version(*user_ids)
+
+
+@receiver(post_save, sender=PlayerSportProfile)
+def invalidate_profile_access(sender, instance, created, **kwargs):
+    # Only membership changes matter; score/session updates leave contexts valid
+    old_coach_id = getattr(instance, "_old_coach_id", None)
+    if created:
+        _bump_profile_access(instance, [instance.coach_id], include_player=True)
+    elif old_coach_id != instance.coach_id:
+        _bump_profile_access(instance, [old_coach_id, instance.coach_id], include_player=False)
+    instance._old_coach_id = instance.coach_id
+
+
+@receiver(post_delete, sender=PlayerSportProfile)
+def invalidate_deleted_profile_access(sender, instance, **kwargs):
+    _bump_profile_access(instance, [instance.coach_id, getattr(instance, "_old_coach_id", None)], include_player=True)
+
+
+#-----------------------------
+# Performance Rollup Signals
+#-----------------------------
+
+def _attendance_snapshot(instance):
+    data = instance.__dict__
+    if "attended" not in data or "rating" not in data or "session_id" not in data:
+        return None  # deferred fields; read the stored row when it matters
+    return data["session_id"], data["attended"], data["rating"]
+
+
+def _session_day(session_id, instance=None):
+    if instance is not None and instance.session_id == session_id and "session" in instance._state.fields_cache:
+        return session_day(instance.session.session_date)
+    session_date = CoachingSession.objects.filter(pk=session_id).values_list("session_date", flat=True).first()
+    return session_day(session_date) if session_date else None
+
+
+@receiver(post_init, sender=SessionAttendance)
+def remember_attendance_state(sender, instance, **kwargs):
+    instance._rollup_state = _attendance_snapshot(instance) if instance.pk else None
+
+
+@receiver(pre_save, sender=SessionAttendance)
+def load_attendance_state(sender, instance, **kwargs):
+    # Only instances loaded with deferred fields lack the snapshot
+    if instance.pk and not instance._state.adding and getattr(instance, "_rollup_state", None) is None:
+        instance._rollup_state = (
+            SessionAttendance.objects.filter(pk=instance.pk).values_list("session_id", "attended", "rating").first()
+        )
+
+
+@receiver(post_save, sender=SessionAttendance)
+def update_performance_rollups(sender, instance, created, **kwargs):
+    old = None if created else getattr(instance, "_rollup_state", None)
+    new = (instance.session_id, instance.attended, instance.rating)
+    instance._rollup_state = new
+    if old == new:
+        return
+
+    # Net change per session, so an edit within one session is a single delta
+    deltas = {}
+    if old is not None:
+        old_sum, old_count = contribution(old[1], old[2])
+        deltas[old[0]] = (-old_sum, -old_count)
+    new_sum, new_count = contribution(new[1], new[2])
+    prev_sum, prev_count = deltas.get(new[0], (0.0, 0))
+    deltas[new[0]] = (prev_sum + new_sum, prev_count + new_count)
+
+    by_day = {}
+    for session_id, (d_sum, d_count) in deltas.items():
+        if d_sum or d_count:
+            day = _session_day(session_id, instance)
+            if day:
+                prev_sum, prev_count = by_day.get((instance.player_id, day), (0.0, 0))
+                by_day[(instance.player_id, day)] = (prev_sum + d_sum, prev_count + d_count)
+    apply_deltas(by_day)
+
+
+@receiver(post_delete, sender=SessionAttendance)
+def remove_from_performance_rollups(sender, instance, **kwargs):
+    d_sum, d_count = contribution(instance.attended, instance.rating)
+    if d_count:
+        day = _session_day(instance.session_id, instance)
+        if day:
+            apply_delta(instance.player_id, day, -d_sum, -d_count)
+
+
+@receiver(post_init, sender=CoachingSession)
+def remember_session_date(sender, instance, **kwargs):
+    instance._old_session_date = instance.__dict__.get("session_date") if instance.pk else None
+
+
+@receiver(post_save, sender=CoachingSession)
+def move_session_rollups(sender, instance, created, **kwargs):
+    # A session moved to another day carries its attended ratings with it
+    old_date = getattr(instance, "_old_session_date", None)
+    instance._old_session_date = instance.session_date
+    if created or old_date is None or session_day(old_date) == session_day(instance.session_date):
+        return
+    rows = SessionAttendance.objects.filter(session=instance, attended=True).values_list("player_id", "rating")
+    for player_id, rating in rows:
+        apply_deltas({
+            (player_id, session_day(old_date)): (-float(rating), -1),
+            (player_id, session_day(instance.session_date)): (float(rating), 1),
+        })
+
+
+#-----------------------------
+# Profile Change Log Signals
+#-----------------------------
+
+def _features_changed(player_id, sport_id=None):
+    # Similarity indexes and scouting tables in every process read the log, so only log committed writes
+    transaction.on_commit(lambda: profile_changes.changed([player_id], sport_id))
+
+
+@receiver(post_save, sender=PlayerSportProfile)
+@receiver(post_delete, sender=PlayerSportProfile)
+def profile_features_changed(sender, instance, **kwargs):
+    _features_changed(instance.player_id, instance.sport_id)
+
+
+@receiver(post_save, sender=CricketStats)
+@receiver(post_save, sender=FootballStats)
+@receiver(post_save, sender=BasketballStats)
+@receiver(post_save, sender=RunningStats)
+@receiver(post_delete, sender=CricketStats)
+@receiver(post_delete, sender=FootballStats)
+@receiver(post_delete, sender=BasketballStats)
+@receiver(post_delete, sender=RunningStats)
+def stats_features_changed(sender, instance, **kwargs):
+    profile = PlayerSportProfile.objects.filter(pk=instance.profile_id).values_list("player_id", "sport_id").first()
+    if profile:
+        _features_changed(*profile)
+
+
+@receiver(post_save, sender=SessionAttendance)
+@receiver(post_delete, sender=SessionAttendance)
+def attendance_features_changed(sender, instance, **kwargs):
+    _features_changed(instance.player_id)
+
+
+@receiver(post_save, sender=Player)
+def player_features_changed(sender, instance, created, **kwargs):
+    # is_public / is_active decide who appears in results
+    if not created:
+        _features_changed(instance.pk)
@@ -0,0 +1,36 @@
+# core/tasks.py
+"""Background tasks run by `manage.py run_worker` (enqueue with core.services.jobs.enqueue)."""
+from .services.jobs import task
+
+
+@task("leaderboard.refresh_players", queue="leaderboard")
+def refresh_leaderboard(player_ids):
+    from .utils import refresh_leaderboard_players
+    return {"rows": refresh_leaderboard_players(player_ids)}
+
+
+@task("ratings.recompute", queue="leaderboard")
+def recompute_ratings():
+    from .services.ratings import recompute
+    return recompute()
+
+
+@task("notifications.fan_out", queue="notifications")
+def fan_out_notifications(user_ids, title, message="", ntype="tournament"):
+    """
+    Create the same notification for many users in one bulk insert. This runs in
+    the worker, so the web processes' broker watchers wake long-poll clients.
+    """
+    from .models import Notification
+    rows = Notification.objects.bulk_create([
+        Notification(user_id=uid, title=title, message=message, type=ntype)
+        for uid in user_ids
+    ])
+    return {"created": len(rows)}
+
+
+@task("ai.player_insight", queue="ai", max_attempts=3)
+def player_insight(prompt, requested_by=None):
+    """Gemini insight for POST /api/player-insight/; requested_by may read it at /api/jobs/<id>/."""
+    from ai_an.services.gemini_client import gemini_summarize_player
+    return {"answer": gemini_summarize_player(prompt)}
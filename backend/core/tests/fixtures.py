@@ -0,0 +1,84 @@
+from django import test
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from core.models import CricketMatchState, MatchPlayerStats, PlayerSportProfile, Sport, Team, Tournament, TournamentMatch
+from core.services.registration import register_user
+
+PASSWORD = "Passw0rd!x"
+
+
+def make_user(username, role="player", sport_name="Cricket", **kwargs):
+    """A user with its role profile through the registration service; players get a sport profile."""
+    return register_user(
+        username, f"{username}@example.com", PASSWORD, role=role,
+        sport_name=sport_name if role == "player" else None, **kwargs,
+    )
+
+
+class CacheResetMixin:
+    """
+    The default cache and the in-process similarity/scouting tables survive a
+    test's rollback, and ids are reused; start every test without them.
+    """
+
+    def setUp(self):
+        super().setUp()
+        from core.services import scouting, similarity
+
+        cache.clear()
+        similarity._indexes.clear()
+        scouting._tables.clear()
+
+
+class TestCase(CacheResetMixin, test.TestCase):
+    pass
+
+
+class TransactionTestCase(CacheResetMixin, test.TransactionTestCase):
+    pass
+
+
+def api_client(user=None):
+    client = APIClient(SERVER_NAME="localhost")
+    if user is not None:
+        client.force_authenticate(user)
+    return client
+
+
+class CricketFixture:
+    """A cricket match in progress: three batsmen for team 1, one bowler for team 2."""
+
+    def setUp(self):
+        super().setUp()
+        self.sport, _ = Sport.objects.get_or_create(name="Cricket")
+        self.manager = make_user("manager", role="manager")
+        self.team1 = Team.objects.create(name="Team 1", sport=self.sport, manager=self.manager)
+        self.team2 = Team.objects.create(name="Team 2", sport=self.sport, manager=self.manager)
+        self.batsmen = [self._player(f"bat{i}", self.team1) for i in range(3)]
+        self.bowler = self._player("bowl", self.team2)
+        self.tournament = Tournament.objects.create(name="Cup", sport=self.sport, manager=self.manager)
+
+    def _player(self, username, team):
+        user = make_user(username)
+        PlayerSportProfile.objects.filter(player__user=user).update(team=team)
+        return user.player
+
+    def _match(self, number=1):
+        match = TournamentMatch.objects.create(
+            tournament=self.tournament, team1=self.team1, team2=self.team2,
+            match_number=number, status=TournamentMatch.Status.IN_PROGRESS,
+        )
+        CricketMatchState.objects.create(
+            match=match, toss_won_by=self.team1, batting_first=self.team1,
+            current_batting_team=self.team1, current_bowling_team=self.team2,
+            batsman1=self.batsmen[0], batsman2=self.batsmen[1], current_striker=self.batsmen[0],
+            current_bowler=self.bowler,
+        )
+        return match
+
+    def _client(self):
+        return api_client(self.manager)
+
+    def _stats(self, match, player):
+        return MatchPlayerStats.objects.get(match=match, player=player)
@@ -0,0 +1,71 @@
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+
+from core.models import Coach, ManagerSport, PlayerSportProfile, Sport, Team, User
+from core.services.access import get_access_context
+from core.tests.fixtures import TestCase, api_client, make_user
+
+
+class AccessContextTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.cricket, _ = Sport.objects.get_or_create(name="Cricket")
+        self.football, _ = Sport.objects.get_or_create(name="Football")
+        self.manager = make_user("manager", role="manager")
+        self.coach = make_user("coach", role="coach")
+        self.player = make_user("player")
+
+    def _fresh(self, user):
+        # A new object per request, as the authentication classes give
+        return User.objects.get(pk=user.pk)
+
+    def test_context_is_reused_across_requests(self):
+        get_access_context(self._fresh(self.manager))
+        user = self._fresh(self.manager)
+        with CaptureQueriesContext(connection) as queries:
+            ctx = get_access_context(user)
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(ctx.managed_sport_ids, {self.cricket.id, self.football.id})
+
+    def test_sport_assignment_change_invalidates_it(self):
+        self.assertTrue(get_access_context(self._fresh(self.manager)).manages_sport(self.football.id))
+        ManagerSport.objects.filter(manager__user=self.manager, sport=self.football).delete()
+        ctx = get_access_context(self._fresh(self.manager))
+        self.assertFalse(ctx.manages_sport(self.football.id))
+        self.assertTrue(ctx.manages_sport(self.cricket.id))
+
+    def test_new_student_shows_up_for_the_coach(self):
+        coach = Coach.objects.get(user=self.coach)
+        self.assertEqual(get_access_context(self._fresh(self.coach)).student_player_ids, frozenset())
+        profile = PlayerSportProfile.objects.get(player__user=self.player)
+        profile.coach = coach
+        profile.save()
+        ctx = get_access_context(self._fresh(self.coach))
+        self.assertEqual(ctx.student_player_ids, {self.player.player.pk})
+        self.assertTrue(ctx.coaches_profile(profile.pk))
+
+    def test_profiles_are_scoped_by_role(self):
+        other = make_user("other")
+        coach = Coach.objects.get(user=self.coach)
+        PlayerSportProfile.objects.filter(player__user=self.player).update(coach=coach)
+        mine = PlayerSportProfile.objects.get(player__user=self.player).pk
+        theirs = PlayerSportProfile.objects.get(player__user=other).pk
+        ManagerSport.objects.filter(manager__user=self.manager, sport=self.cricket).delete()
+
+        def visible(user):
+            response = api_client(user).get("/api/player-sport-profiles/")
+            self.assertEqual(response.status_code, 200, response.data)
+            return {row["id"] for row in response.data["results"]}
+
+        self.assertEqual(visible(self.coach), {mine})
+        self.assertEqual(visible(self.player), {mine})
+        # The manager now only manages football; both players play cricket
+        self.assertEqual(visible(self.manager), set())
+        self.assertNotIn(theirs, visible(self.coach))
+
+    def test_coach_without_a_coach_row_sees_no_teams(self):
+        Team.objects.create(name="Coachless", sport=self.cricket, manager=self.manager)
+        Coach.objects.filter(user=self.coach).delete()
+        response = api_client(User.objects.get(pk=self.coach.pk)).get("/api/teams/")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["results"], [])
@@ -0,0 +1,61 @@
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from core.authentication import ClaimsJWTAuthentication, get_principal
+from core.models import ManagerSport, Sport, User
+from core.services.access import get_access_context
+from core.tests.fixtures import PASSWORD, TestCase, make_user
+
+
+class ClaimsTokenTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.cricket, _ = Sport.objects.get_or_create(name="Cricket")
+        self.football, _ = Sport.objects.get_or_create(name="Football")
+        self.manager = make_user("manager", role="manager")
+        self.client = APIClient(SERVER_NAME="localhost")
+        tokens = self.client.post("/api/token/", {"username": "manager", "password": PASSWORD}, format="json").data
+        self.access, self.refresh = tokens["access"], tokens["refresh"]
+
+    def _get(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        return self.client.get("/api/notifications/")
+
+    def test_token_carries_the_principal(self):
+        token = AccessToken(self.access)
+        self.assertEqual(token["role"], "manager")
+        self.assertEqual(token["sports"], sorted([self.cricket.id, self.football.id]))
+
+        user = ClaimsJWTAuthentication().get_user(token)
+        with self.assertNumQueries(0):
+            principal = get_principal(user)
+            self.assertEqual(principal.managed_sport_ids, {self.cricket.id, self.football.id})
+        # The access context is built on that same principal
+        self.assertIs(get_access_context(user).principal, principal)
+
+    def test_sport_change_revokes_issued_tokens(self):
+        self.assertEqual(self._get(self.access).status_code, 200)
+        ManagerSport.objects.filter(manager__user=self.manager, sport=self.football).delete()
+        response = self._get(self.access)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data["detail"].code, "claims_outdated")
+
+        self.client.credentials()
+        refreshed = self.client.post("/api/token/refresh/", {"refresh": self.refresh}, format="json")
+        self.assertEqual(refreshed.status_code, 200, refreshed.data)
+        self.assertEqual(AccessToken(refreshed.data["access"])["sports"], [self.cricket.id])
+        self.assertEqual(self._get(refreshed.data["access"]).status_code, 200)
+
+    def test_deactivation_revokes_issued_tokens(self):
+        self.manager.is_active = False
+        self.manager.save()
+        response = self._get(self.access)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data["detail"].code, "user_inactive")
+
+    def test_session_user_principal_comes_from_the_cached_context(self):
+        get_access_context(User.objects.get(pk=self.manager.pk))
+        user = User.objects.get(pk=self.manager.pk)
+        with self.assertNumQueries(0):
+            principal = get_principal(user)
+        self.assertEqual((principal.role, principal.manager_id), ("manager", self.manager.manager.pk))
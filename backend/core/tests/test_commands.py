@@ -0,0 +1,29 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+
+from core.management.commands import benchmark_login
+from core.models import Manager, ManagerSport, Sport, User
+from core.tests.fixtures import TransactionTestCase
+
+
+class BenchmarkLoginTests(TransactionTestCase):
+    def test_runs_in_a_rolled_back_transaction(self):
+        Sport.objects.get_or_create(name="Cricket")
+        seen = []
+
+        def payload(user):
+            # The throwaway manager is never committed
+            seen.append((connection.in_atomic_block, ManagerSport.objects.filter(manager__user=user).count()))
+            return {}
+
+        out = StringIO()
+        with mock.patch.object(benchmark_login, "login_payload", payload):
+            call_command("benchmark_login", "--logins", "2", "--hasher", "pbkdf2_sha256", stdout=out)
+        self.assertIn("full login (sequential)", out.getvalue())
+        self.assertEqual(seen, [(True, 1), (True, 1)])
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(Manager.objects.exists())
+        self.assertFalse(ManagerSport.objects.exists())
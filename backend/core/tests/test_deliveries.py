@@ -0,0 +1,74 @@
+from core.models import CricketMatchState, Delivery, MatchPlayerStats
+from core.tests.fixtures import CricketFixture, TestCase
+
+
+class DeliveryBatchTests(CricketFixture, TestCase):
+    # An over with an odd last ball (striker swap), a wicket, then two more balls
+    SEQUENCE = [1, 4, 0, 6, 2, 3, "W", 1, 2]
+
+    def _batch(self, prefix="ball"):
+        return [
+            {"seq": seq, "key": f"{prefix}-{seq}", "type": "wicket", "next_batsman_id": self.batsmen[2].pk}
+            if ball == "W" else {"seq": seq, "key": f"{prefix}-{seq}", "type": "runs", "runs": ball}
+            for seq, ball in enumerate(self.SEQUENCE, start=1)
+        ]
+
+    def _snapshot(self, match):
+        state = CricketMatchState.objects.get(match=match)
+        stats = {
+            row.pop("player_id"): row
+            for row in MatchPlayerStats.objects.filter(match=match).values(
+                "player_id", "runs_scored", "balls_faced", "fours", "sixes", "is_out",
+                "balls_bowled", "overs_bowled", "runs_conceded", "wickets_taken",
+            )
+        }
+        log = list(Delivery.objects.filter(match=match).values_list(
+            "over", "ball", "runs", "is_wicket", "striker_id", "bowler_id",
+        ))
+        return {
+            "state": (
+                state.team1_runs, state.team1_wickets, state.total_balls_bowled, state.current_over,
+                state.current_ball, state.batsman1_id, state.batsman2_id, state.current_striker_id,
+            ),
+            "stats": stats,
+            "log": log,
+        }
+
+    def test_batch_matches_ball_by_ball_scoring(self):
+        client = self._client()
+        single, batched = self._match(1), self._match(2)
+        for ball in self.SEQUENCE:
+            if ball == "W":
+                response = client.post(
+                    f"/api/tournament-matches/{single.pk}/wicket/",
+                    {"next_batsman_id": self.batsmen[2].pk}, format="json",
+                )
+            else:
+                response = client.post(f"/api/tournament-matches/{single.pk}/score/", {"runs": ball}, format="json")
+            self.assertEqual(response.status_code, 200, response.data)
+
+        response = client.post(
+            f"/api/tournament-matches/{batched.pk}/deliveries/batch/", {"deliveries": self._batch()}, format="json",
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["applied"], list(range(1, len(self.SEQUENCE) + 1)))
+        self.assertEqual(self._snapshot(batched), self._snapshot(single))
+
+    def test_retried_batch_applies_nothing_twice(self):
+        client = self._client()
+        match = self._match()
+        url = f"/api/tournament-matches/{match.pk}/deliveries/batch/"
+        first = client.post(url, {"deliveries": self._batch()[:5]}, format="json")
+        self.assertEqual(first.status_code, 200, first.data)
+        before = self._snapshot(match)
+
+        retry = client.post(url, {"deliveries": self._batch()[:5]}, format="json")
+        self.assertEqual(retry.status_code, 200, retry.data)
+        self.assertEqual(retry.data["applied"], [])
+        self.assertEqual([d["seq"] for d in retry.data["duplicates"]], [1, 2, 3, 4, 5])
+        self.assertEqual(self._snapshot(match), before)
+
+        # A retry that carries new balls applies only those
+        rest = client.post(url, {"deliveries": self._batch()}, format="json")
+        self.assertEqual(rest.data["applied"], list(range(6, len(self.SEQUENCE) + 1)))
+        self.assertEqual(Delivery.objects.filter(match=match).count(), len(self.SEQUENCE))
@@ -0,0 +1,96 @@
+import csv
+import datetime
+import gzip
+import io
+import json
+from unittest import mock
+
+from django.utils import timezone
+
+from core.models import CoachingSession, ManagerSport, PlayerSportProfile, SessionAttendance, Sport
+from core.services import exports
+from core.tests.fixtures import TestCase, api_client, make_user
+
+
+def body(response):
+    return b"".join(response.streaming_content)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.cricket, _ = Sport.objects.get_or_create(name="Cricket")
+        self.football, _ = Sport.objects.get_or_create(name="Football")
+        self.manager = make_user("manager", role="manager")
+        ManagerSport.objects.filter(manager__user=self.manager, sport=self.football).delete()
+        self.coach = make_user("coach", role="coach").coach
+        self.batter = make_user("batter").player
+        self.striker = make_user("striker", sport_name="Football").player
+
+        for day, player, sport in [(1, self.batter, self.cricket), (20, self.batter, self.cricket), (5, self.striker, self.football)]:
+            when = timezone.make_aware(datetime.datetime(2026, 3, day, 12))
+            session = CoachingSession.objects.create(coach=self.coach, sport=sport, session_date=when)
+            SessionAttendance.objects.create(session=session, player=player, attended=True, rating=day % 10)
+
+    def test_players_csv_is_limited_to_managed_sports(self):
+        response = api_client(self.manager).get("/api/exports/players.csv")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        rows = list(csv.DictReader(io.StringIO(body(response).decode())))
+        self.assertEqual([(r["player_id"], r["sport"]) for r in rows], [(self.batter.player_id, "Cricket")])
+
+    def test_admin_gets_every_sport(self):
+        response = api_client(make_user("admin", role="admin")).get("/api/exports/players.csv?sport=football")
+        rows = list(csv.DictReader(io.StringIO(body(response).decode())))
+        self.assertEqual([r["player_id"] for r in rows], [self.striker.player_id])
+
+    def test_attendance_ndjson_with_a_date_range(self):
+        response = api_client(self.manager).get("/api/exports/attendance.ndjson?start=2026-03-01&end=2026-03-10")
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        records = [json.loads(line) for line in body(response).decode().splitlines()]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["player_id"], self.batter.player_id)
+        self.assertEqual(records[0]["rating"], 1)
+        self.assertTrue(records[0]["session_date"].startswith("2026-03-01"))
+
+    def test_gzip_round_trip(self):
+        plain = body(api_client(self.manager).get("/api/exports/attendance.csv"))
+        response = api_client(self.manager).get("/api/exports/attendance.csv.gz")
+        self.assertEqual(response["Content-Type"], "application/gzip")
+        self.assertIn('.csv.gz"', response["Content-Disposition"])
+        self.assertEqual(gzip.decompress(body(response)), plain)
+
+    def test_bad_requests(self):
+        client = api_client(self.manager)
+        self.assertEqual(client.get("/api/exports/points.csv?tournament=999").status_code, 400)
+        self.assertEqual(client.get("/api/exports/attendance.csv?start=March").status_code, 400)
+        self.assertEqual(client.get("/api/exports/nothing.csv").status_code, 400)
+        self.assertEqual(api_client(self.batter.user).get("/api/exports/players.csv").status_code, 403)
+
+    def test_session_csv_template_is_a_csv_body(self):
+        PlayerSportProfile.objects.filter(player=self.batter).update(coach=self.coach)
+        session = CoachingSession.objects.filter(sport=self.cricket).first()
+        response = api_client(self.coach.user).get(f"/api/sessions/{session.id}/csv-template/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body(response).decode(), f"player_id,attended,score\n{self.batter.player_id},0,0\n")
+
+
+class StreamTests(TestCase):
+    def test_chunks_are_bounded(self):
+        lines = (f"{i:09d}\n" for i in range(20000))
+        with mock.patch.object(exports, "FLUSH_BYTES", 1000):
+            chunks = list(exports.stream(lines))
+        self.assertGreater(len(chunks), 100)
+        self.assertTrue(all(len(chunk) < 1010 for chunk in chunks))
+        self.assertEqual(b"".join(chunks).count(b"\n"), 20000)
+
+    def test_compressed_stream_is_one_gzip_member(self):
+        lines = [f"{i},row\n" for i in range(5000)]
+        with mock.patch.object(exports, "FLUSH_BYTES", 1000):
+            data = b"".join(exports.stream(iter(lines), compress=True))
+        self.assertEqual(gzip.decompress(data).decode(), "".join(lines))
+
+    def test_csv_quotes_fields(self):
+        lines = list(exports.encode_csv(["a", "b"], iter([("x,y", 'say "hi"')])))
+        self.assertEqual(lines, ["a,b\n", '"x,y","say ""hi"""\n'])
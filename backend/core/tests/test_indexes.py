@@ -0,0 +1,70 @@
+import datetime
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+
+from core.management.commands.audit_indexes import SCAN_PATTERNS, SORT_PATTERNS, build_catalog
+from core.models import CoachingSession, Sport
+from core.tests.fixtures import TestCase, make_user
+from core.utils import day_bounds
+
+# The tournament top-scorer aggregate sorts on a SUM, which no index can serve
+UNINDEXABLE = {"tournament leaderboard: top scorer"}
+# PostgreSQL prefers a sequential scan on tables this small whatever the indexes
+sqlite_only = skipUnless(connection.vendor == "sqlite", "plan checks need SQLite's rule-based planner")
+
+
+class AuditIndexesTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        Sport.objects.get_or_create(name="Cricket")
+        make_user("coach", role="coach")
+        make_user("player")
+
+    @sqlite_only
+    def test_hot_querysets_use_an_index(self):
+        for name, make_qs in build_catalog():
+            if name in UNINDEXABLE:
+                continue
+            with self.subTest(name):
+                plan = make_qs().explain()
+                self.assertFalse([p.pattern for p in SCAN_PATTERNS if p.search(plan)], plan)
+                self.assertFalse([p.pattern for p in SORT_PATTERNS if p.search(plan)], plan)
+
+    @sqlite_only
+    def test_command_reports_every_catalogued_queryset(self):
+        out = StringIO()
+        call_command("audit_indexes", "--repeat", "1", stdout=out)
+        lines = out.getvalue().splitlines()
+        for name, _ in build_catalog():
+            self.assertTrue(any(line.startswith(name) for line in lines), name)
+        self.assertIn("1 queryset(s)", lines[-1])
+
+    def test_scan_patterns(self):
+        self.assertTrue(SCAN_PATTERNS[0].search("SCAN core_notification"))
+        self.assertFalse(SCAN_PATTERNS[0].search("SCAN core_notification USING INDEX notification_user_created_idx"))
+        self.assertTrue(SCAN_PATTERNS[1].search("Seq Scan on core_notification  (cost=0.00..1.01 rows=1)"))
+
+
+class DayBoundsTests(TestCase):
+    @override_settings(TIME_ZONE="Asia/Kolkata")
+    def test_range_matches_the_local_day(self):
+        coach = make_user("coach", role="coach").coach
+        day = datetime.date(2026, 3, 10)
+        start, end = day_bounds(day)
+        inside = [start, end - datetime.timedelta(microseconds=1)]
+        outside = [start - datetime.timedelta(microseconds=1), end]
+        for when in inside + outside:
+            CoachingSession.objects.create(coach=coach, session_date=when)
+
+        in_range = CoachingSession.objects.filter(session_date__gte=start, session_date__lt=end)
+        by_date = CoachingSession.objects.filter(session_date__date=day)
+        self.assertEqual(in_range.count(), 2)
+        self.assertEqual(set(in_range), set(by_date))
+        self.assertEqual(timezone.localtime(start).time(), datetime.time.min)
+        if connection.vendor == "sqlite":
+            self.assertIn("session_date_idx", in_range.explain())
@@ -0,0 +1,143 @@
+import datetime
+import threading
+from unittest import mock
+
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+
+from core.models import Job, Notification, Player, Sport
+from core.services.jobs import JobError, claim, enqueue, execute, requeue_stale, task
+from core.tests.fixtures import TestCase, TransactionTestCase, api_client, make_user
+
+calls = []
+
+
+@task("tests.flaky", queue="tests", max_attempts=3)
+def flaky(fail_times=0, key="flaky"):
+    calls.append(key)
+    if calls.count(key) <= fail_times:
+        raise RuntimeError(f"attempt {calls.count(key)} failed")
+    return {"calls": calls.count(key)}
+
+
+@override_settings(JOB_QUEUE_CONCURRENCY="", JOB_RETRY_BASE_DELAY=10, JOB_RETRY_MAX_DELAY=600)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        calls.clear()
+
+    def _run_ready(self, queue="tests"):
+        return [execute(job) for job in claim(queue, "test-worker", 10)]
+
+    def test_unknown_task_is_rejected(self):
+        with self.assertRaises(JobError):
+            enqueue("tests.missing")
+
+    def test_idempotency_key_returns_the_existing_job(self):
+        first = enqueue("tests.flaky", idempotency_key="once")
+        self.assertEqual(enqueue("tests.flaky", idempotency_key="once").pk, first.pk)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_successful_job_stores_its_result(self):
+        job = enqueue("tests.flaky")
+        self.assertEqual(self._run_ready(), [True])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.result), (Job.Status.SUCCEEDED, 1, {"calls": 1}))
+        self.assertEqual(job.locked_by, "")
+
+    def test_failures_back_off_then_give_up(self):
+        job = enqueue("tests.flaky", {"fail_times": 5})
+        before = timezone.now()
+        self.assertEqual(self._run_ready(), [False])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.QUEUED, 1))
+        self.assertGreaterEqual(job.run_at, before + datetime.timedelta(seconds=8))
+        self.assertIn("attempt 1 failed", job.last_error)
+        # Not ready again until the backoff has passed
+        self.assertEqual(self._run_ready(), [])
+
+        for _ in range(2):
+            Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+            self.assertEqual(self._run_ready(), [False])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.Status.FAILED, 3))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_retry_succeeds_after_a_failure(self):
+        job = enqueue("tests.flaky", {"fail_times": 1})
+        self._run_ready()
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self.assertEqual(self._run_ready(), [True])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.result), (Job.Status.SUCCEEDED, 2, {"calls": 2}))
+
+    @override_settings(JOB_QUEUE_CONCURRENCY="tests=1")
+    def test_queue_concurrency_cap(self):
+        for i in range(3):
+            enqueue("tests.flaky", {"key": str(i)})
+        first = claim("tests", "a", 5)
+        self.assertEqual(len(first), 1)
+        self.assertEqual(claim("tests", "b", 5), [])
+        execute(first[0])
+        self.assertEqual(len(claim("tests", "b", 5)), 1)
+
+    def test_stale_running_jobs_are_requeued(self):
+        job = enqueue("tests.flaky")
+        claim("tests", "dead-worker", 1)
+        Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - datetime.timedelta(hours=1))
+        self.assertEqual(requeue_stale(), 1)
+        self.assertEqual([j.pk for j in claim("tests", "live-worker", 1)], [job.pk])
+
+    def test_notification_fan_out_job(self):
+        users = [make_user(f"u{i}", role="coach") for i in range(3)]
+        enqueue("notifications.fan_out", {"user_ids": [u.pk for u in users], "title": "Hello"})
+        self.assertEqual(self._run_ready("notifications"), [True])
+        self.assertEqual(Notification.objects.filter(title="Hello").count(), 3)
+
+
+@override_settings(JOB_QUEUE_CONCURRENCY="")
+class ConcurrentClaimTests(TransactionTestCase):
+    def test_workers_never_claim_the_same_job(self):
+        for i in range(12):
+            enqueue("tests.flaky", {"key": str(i)})
+        barrier = threading.Barrier(4)
+        claimed = []
+
+        def work(worker_id):
+            try:
+                barrier.wait()
+                for _ in range(3):
+                    claimed.extend(job.pk for job in claim("tests", worker_id, 2))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=work, args=(f"w{i}",)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # A worker that loses a race simply gets fewer rows; whatever is left is still claimable
+        claimed += [job.pk for job in claim("tests", "sweeper", 12)]
+        self.assertEqual(sorted(claimed), sorted(Job.objects.values_list("pk", flat=True)))
+
+
+class PlayerInsightJobTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        Sport.objects.get_or_create(name="Cricket")
+
+    def test_insight_is_queued_and_readable_by_its_requester(self):
+        user = make_user("player")
+        player = Player.objects.get(user=user)
+        response = api_client(user).post("/api/player-insight/", {"player_id": player.pk}, format="json")
+        self.assertEqual(response.status_code, 202, response.data)
+        job_id = response.data["job_id"]
+
+        self.assertEqual(api_client(make_user("other")).get(f"/api/jobs/{job_id}/").status_code, 404)
+        self.assertEqual(api_client(user).get(f"/api/jobs/{job_id}/").data["status"], Job.Status.QUEUED)
+
+        with mock.patch("ai_an.services.gemini_client.gemini_summarize_player", return_value="Keep it up"):
+            self.assertEqual([execute(job) for job in claim("ai", "test-worker", 1)], [True])
+        data = api_client(user).get(f"/api/jobs/{job_id}/").data
+        self.assertEqual((data["status"], data["result"]), (Job.Status.SUCCEEDED, {"answer": "Keep it up"}))
@@ -0,0 +1,127 @@
+import datetime
+from unittest import mock
+
+from django.test import override_settings
+from django.utils import timezone
+
+from core.models import DailyPerformanceScore, Job, Leaderboard, Match, PlayerSportProfile, Sport, Team
+from core.services.jobs import claim, execute
+from core.services.leaderboard_refresh import leaderboard_refresher
+from core.services.leaderboards import around, board, top
+from core.tests.fixtures import TestCase, api_client, make_user
+
+
+class LeaderboardRankTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.sport, _ = Sport.objects.get_or_create(name="Cricket")
+        self.players = []
+        for i, score in enumerate([50, 40, 40, 30, 40, 10]):
+            user = make_user(f"p{i}")
+            PlayerSportProfile.objects.filter(player__user=user).update(career_score=score)
+            self.players.append(user.player)
+
+    def test_ties_share_a_rank_and_the_next_rank_skips(self):
+        rows = top(board(sport_id=self.sport.id))
+        self.assertEqual([row["rank"] for row in rows], [1, 2, 2, 2, 5, 6])
+        self.assertEqual([row["score"] for row in rows], [50, 40, 40, 40, 30, 10])
+        # Ties are listed in player order
+        tied = [self.players[i].player_id for i in (1, 2, 4)]
+        self.assertEqual([row["player_id"] for row in rows[1:4]], tied)
+
+    def test_around_a_tied_player(self):
+        result = around(board(sport_id=self.sport.id), self.players[4].pk, radius=1)
+        self.assertEqual(result["rank"], 2)
+        self.assertEqual(
+            [(row["player_id"], row["rank"]) for row in result["entries"]],
+            [(self.players[2].player_id, 2), (self.players[4].player_id, 2), (self.players[3].player_id, 5)],
+        )
+
+    def test_window_sums_daily_scores_since_its_start(self):
+        today = timezone.localdate()
+        for player, days_ago, score in [(0, 0, 5), (0, 10, 50), (1, 3, 7), (2, 6, 2), (2, 1, 4)]:
+            DailyPerformanceScore.objects.create(
+                player=self.players[player], date=today - datetime.timedelta(days=days_ago), score=score,
+            )
+        rows = top(board(window="7"))
+        self.assertEqual(
+            [(row["player_id"], row["score"]) for row in rows],
+            # The 10-day-old score falls outside the window; 6 days ago is its first day
+            [(self.players[1].player_id, 7), (self.players[2].player_id, 6), (self.players[0].player_id, 5)],
+        )
+
+    def test_me_endpoint(self):
+        response = api_client(self.players[3].user).get("/api/leaderboard/me/", {"sport": self.sport.id, "radius": 0})
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["rank"], 5)
+        self.assertEqual([row["player_id"] for row in response.data["entries"]], [self.players[3].player_id])
+
+
+@override_settings(JOB_QUEUE_CONCURRENCY="")
+class LeaderboardRefreshTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.sport, _ = Sport.objects.get_or_create(name="Cricket")
+        self.manager = make_user("manager", role="manager")
+        self.teams = [Team.objects.create(name=f"T{i}", sport=self.sport, manager=self.manager) for i in range(3)]
+        self.players = []
+        for i, team in enumerate(self.teams):
+            user = make_user(f"p{i}")
+            PlayerSportProfile.objects.filter(player__user=user).update(team=team, career_score=10 * (i + 1))
+            self.players.append(user.player)
+
+    def _finalize(self, team1, team2):
+        match = Match.objects.create(team1=self.teams[team1], team2=self.teams[team2])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = api_client(self.manager).post(
+                f"/api/matches/{match.pk}/finalize/", {"score_team1": 1, "score_team2": 0}, format="json",
+            )
+        self.assertEqual(response.status_code, 200, response.data)
+
+    def _run_due(self):
+        Job.objects.filter(name="leaderboard.refresh_players", status=Job.Status.QUEUED).update(run_at=timezone.now())
+        return [execute(job) for job in claim("leaderboard", "test-worker", 5)]
+
+    def _status(self):
+        response = api_client(self.manager).get("/api/leaderboard/refresh-status/")
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_finalizations_share_one_delayed_job(self):
+        self._finalize(0, 1)
+        self._finalize(1, 2)
+        job = Job.objects.get(name="leaderboard.refresh_players")
+        self.assertEqual(job.payload["player_ids"], sorted(p.pk for p in self.players))
+        self.assertGreater(job.run_at, timezone.now())
+        status = self._status()
+        self.assertEqual((status["state"], status["pending_jobs"], status["pending_players"]), ("scheduled", 1, 3))
+
+        self.assertEqual(self._run_due(), [True])
+        self.assertEqual(
+            dict(Leaderboard.objects.values_list("player_id", "score")),
+            {p.pk: 10 * (i + 1) for i, p in enumerate(self.players)},
+        )
+        status = self._status()
+        self.assertEqual((status["state"], status["last_job_id"], status["last_players"]), ("idle", job.pk, 3))
+
+    def test_refresh_after_the_job_started_gets_a_new_job(self):
+        self._finalize(0, 1)
+        Job.objects.update(run_at=timezone.now())
+        claimed = claim("leaderboard", "test-worker", 5)
+        self.assertEqual(self._status()["state"], "running")
+        self._finalize(2, 2)
+        pending = Job.objects.get(name="leaderboard.refresh_players", status=Job.Status.QUEUED)
+        self.assertEqual(pending.payload["player_ids"], [self.players[2].pk])
+        self.assertEqual([execute(job) for job in claimed], [True])
+
+    def test_failed_refresh_is_retried_and_reported(self):
+        leaderboard_refresher.enqueue([self.players[0].pk])
+        with mock.patch("core.utils.refresh_leaderboard_players", side_effect=RuntimeError("db down")):
+            self.assertEqual(self._run_due(), [False])
+        status = self._status()
+        self.assertEqual((status["state"], status["pending_players"]), ("retrying", 1))
+        # New work does not wait behind the backoff of the failed job
+        fresh = leaderboard_refresher.enqueue([self.players[1].pk])
+        self.assertEqual((fresh.attempts, fresh.payload["player_ids"]), (0, [self.players[1].pk]))
+        self.assertEqual(self._run_due(), [True, True])
+        self.assertEqual(self._status()["state"], "idle")
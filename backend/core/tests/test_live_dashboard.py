@@ -0,0 +1,84 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import CricketMatchState
+from core.tests.fixtures import CricketFixture, TestCase
+
+
+class LiveDashboardTests(CricketFixture, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = self._client()
+        self.url = f"/api/tournaments/{self.tournament.pk}/live/"
+
+    def _score(self, match, *balls):
+        for runs in balls:
+            path = "wicket" if runs == "W" else "score"
+            data = {"next_batsman_id": self.batsmen[2].pk} if runs == "W" else {"runs": runs}
+            response = self.client.post(f"/api/tournament-matches/{match.pk}/{path}/", data, format="json")
+            self.assertEqual(response.status_code, 200, response.data)
+
+    def test_compact_state_of_every_live_match(self):
+        first, second = self._match(1), self._match(2)
+        self._score(first, 1, 4, 2, 0, 6, "W", 2)
+        self._score(second, 2)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["match_ids"], [first.pk, second.pk])
+        live = response.data["matches"][0]
+        self.assertEqual((live["team1"]["runs"], live["team1"]["wickets"]), (15, 1))
+        self.assertEqual(live["overs"], "1.1")
+        self.assertEqual(live["last_balls"], ["4", "2", "0", "6", "W", "2"])
+        self.assertEqual(live["bowler"]["id"], self.bowler.pk)
+        self.assertEqual(response.data["matches"][1]["last_balls"], ["2"])
+
+    def test_query_count_does_not_grow_with_the_matches(self):
+        self._score(self._match(1), 1)
+        with CaptureQueriesContext(connection) as one:
+            self.client.get(self.url)
+        for number in (2, 3, 4):
+            self._score(self._match(number), 1)
+        with CaptureQueriesContext(connection) as four:
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data["matches"]), 4)
+        self.assertEqual(len(one), len(four))
+        self.assertLessEqual(len(four), 3)
+
+    def test_if_none_match(self):
+        match = self._match()
+        response = self.client.get(self.url)
+        tag = response["ETag"]
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=tag).status_code, 304)
+        self._score(match, 4)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=tag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], tag)
+
+    def test_since_returns_only_changed_matches(self):
+        first, second = self._match(1), self._match(2)
+        self._score(first, 1)
+        self._score(second, 1)
+        as_of = self.client.get(self.url).data["as_of"]
+
+        self._score(second, 4)
+        response = self.client.get(self.url, {"since": as_of.isoformat()})
+        self.assertEqual(response.data["match_ids"], [first.pk, second.pk])
+        self.assertEqual([m["id"] for m in response.data["matches"]], [second.pk])
+        self.assertEqual(self.client.get(self.url, {"since": "yesterday"}).status_code, 400)
+
+    def test_finished_matches_drop_out(self):
+        match = self._match()
+        match.status = match.Status.COMPLETED
+        match.save(update_fields=["status"])
+        self.assertEqual(self.client.get(self.url).data["match_ids"], [])
+        self.assertEqual(self.client.get("/api/tournaments/999/live/").status_code, 404)
+
+    def test_state_changes_without_a_ball_show_up_in_since(self):
+        match = self._match()
+        as_of = self.client.get(self.url).data["as_of"]
+        response = self.client.post(
+            f"/api/tournament-matches/{match.pk}/set-bowler/", {"bowler_id": self.bowler.pk}, format="json",
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertGreater(CricketMatchState.objects.get(match=match).updated_at, as_of)
@@ -0,0 +1,71 @@
+import threading
+from decimal import Decimal
+
+from django.db import connection
+
+from core.models import CricketMatchState, Delivery, MatchPlayerStats
+from core.tests.fixtures import CricketFixture, TransactionTestCase
+
+
+class ConcurrentScoringTests(CricketFixture, TransactionTestCase):
+    def test_deliveries_from_several_threads_all_count(self):
+        match = self._match()
+        # Even runs only, so no delivery swaps the striker under another
+        plan = [[4, 2], [6, 0], [2, 2], [4, 6], [0, 2], [6, 4]]
+        barrier = threading.Barrier(len(plan) + 1)
+        failures = []
+
+        def score(runs_list):
+            client = self._client()
+            try:
+                barrier.wait()
+                for runs in runs_list:
+                    response = client.post(f"/api/tournament-matches/{match.pk}/score/", {"runs": runs}, format="json")
+                    if response.status_code != 200:
+                        failures.append(response.data)
+            finally:
+                connection.close()
+
+        def wicket():
+            client = self._client()
+            try:
+                barrier.wait()
+                response = client.post(
+                    f"/api/tournament-matches/{match.pk}/wicket/",
+                    {"next_batsman_id": self.batsmen[2].pk}, format="json",
+                )
+                if response.status_code != 200:
+                    failures.append(response.data)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=score, args=(runs,)) for runs in plan]
+        threads.append(threading.Thread(target=wicket))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(failures, [])
+
+        total = sum(map(sum, plan))
+        balls = sum(map(len, plan)) + 1
+        state = CricketMatchState.objects.get(match=match)
+        self.assertEqual((state.team1_runs, state.team1_wickets), (total, 1))
+        self.assertEqual(state.total_balls_bowled, balls)
+        self.assertEqual((state.current_over, state.current_ball), divmod(balls, 6))
+        self.assertEqual(state.current_striker_id, self.batsmen[2].pk)
+        match.refresh_from_db()
+        self.assertEqual((match.score_team1, match.wickets_team1), (total, 1))
+
+        # Every ball has its own position in the log
+        positions = list(Delivery.objects.filter(match=match).values_list("over", "ball"))
+        self.assertEqual(len(positions), balls)
+        self.assertEqual(len(set(positions)), balls)
+
+        batting = MatchPlayerStats.objects.filter(match=match, team=self.team1)
+        self.assertEqual(sum(s.runs_scored for s in batting), total)
+        self.assertEqual(sum(s.balls_faced for s in batting), balls)
+        self.assertEqual(sum(s.is_out for s in batting), 1)
+        bowler = self._stats(match, self.bowler)
+        self.assertEqual((bowler.balls_bowled, bowler.runs_conceded, bowler.wickets_taken), (balls, total, 1))
+        self.assertEqual(bowler.overs_bowled, Decimal(f"{balls // 6}.{balls % 6}"))
@@ -0,0 +1,63 @@
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, override_settings
+
+from core.models import Notification
+from core.promotion_services import _notify
+from core.services.notification_stream import notification_broker
+from core.tests.fixtures import TransactionTestCase, make_user
+
+
+@override_settings(NOTIFICATION_STREAM_POLL_INTERVAL=0.2)
+class NotificationStreamTests(TransactionTestCase):
+    def setUp(self):
+        super().setUp()
+        # The broker is per process and outlives each test's data
+        notification_broker.__init__()
+        self.user = make_user("coach", role="coach")
+        self.client = AsyncClient(SERVER_NAME="localhost")
+
+    async def _stream(self, **params):
+        await self.client.aforce_login(self.user)
+        response = await self.client.get("/api/notifications/stream/", params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    async def _later(self, func, delay=0.3):
+        await asyncio.sleep(delay)
+        return await sync_to_async(func)()
+
+    async def test_returns_existing_notifications_at_once(self):
+        first = await sync_to_async(Notification.objects.create)(user=self.user, type="tournament", title="a")
+        data = await self._stream(since=0, timeout=5)
+        self.assertEqual([row["id"] for row in data["results"]], [first.id])
+        self.assertEqual(data["cursor"], first.id)
+
+    async def test_same_process_notify_wakes_the_client(self):
+        started = time.monotonic()
+        data, _ = await asyncio.gather(
+            self._stream(since=0, timeout=10),
+            self._later(lambda: _notify(self.user, "Promoted", "", ntype="promotion")),
+        )
+        self.assertEqual([row["title"] for row in data["results"]], ["Promoted"])
+        self.assertLess(time.monotonic() - started, 5)
+
+    async def test_bulk_insert_from_another_process_wakes_the_client(self):
+        # What the worker's notifications.fan_out job does: rows only, no publish
+        def fan_out():
+            Notification.objects.bulk_create([Notification(user=self.user, type="tournament", title="Fixtures out")])
+
+        started = time.monotonic()
+        data, _ = await asyncio.gather(self._stream(since=0, timeout=10), self._later(fan_out))
+        self.assertEqual([row["title"] for row in data["results"]], ["Fixtures out"])
+        self.assertLess(time.monotonic() - started, 5)
+
+    async def test_times_out_with_the_same_cursor(self):
+        data = await self._stream(since=7, timeout=0.3)
+        self.assertEqual(data, {"results": [], "cursor": 7})
+
+    async def test_requires_authentication(self):
+        response = await AsyncClient(SERVER_NAME="localhost").get("/api/notifications/stream/")
+        self.assertEqual(response.status_code, 401)
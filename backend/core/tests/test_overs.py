@@ -0,0 +1,74 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+
+from core.models import OverSummary
+from core.services.overs import match_overs
+from core.tests.fixtures import CricketFixture, TestCase
+
+
+class OverSummaryTests(CricketFixture, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = self._client()
+        self.match = self._match()
+
+    def _score(self, *balls):
+        for runs in balls:
+            response = self.client.post(f"/api/tournament-matches/{self.match.pk}/score/", {"runs": runs}, format="json")
+            self.assertEqual(response.status_code, 200, response.data)
+
+    def _table(self):
+        return list(
+            OverSummary.objects.filter(match=self.match).order_by("batting_team_id", "over")
+            .values_list("batting_team_id", "over", "bowler_id", "runs", "wickets", "balls", "is_maiden")
+        )
+
+    def test_maiden_over_is_credited_once(self):
+        self._score(0, 0, 0, 0, 0, 0)
+        self._score(1, 2)
+        [first, second] = self._table()
+        self.assertEqual(first[3:], (0, 0, 6, True))
+        self.assertEqual(second[3:], (3, 0, 2, False))
+        stats = self._stats(self.match, self.bowler)
+        self.assertEqual((stats.balls_bowled, stats.maidens), (8, 1))
+        self.assertEqual(Decimal(str(stats.overs_bowled)), Decimal("1.2"))
+
+    def test_chart_data(self):
+        self._score(1, 4, 0, 6, 2, 1)
+        self._score(4, 4)
+        response = self.client.get(f"/api/tournament-matches/{self.match.pk}/overs/")
+        self.assertEqual(response.status_code, 200)
+        [innings] = response.data["innings"]
+        self.assertEqual((innings["runs"], innings["balls"], innings["target"]), (22, 8, None))
+        overs = innings["overs"]
+        self.assertEqual([o["runs"] for o in overs], [14, 8])
+        self.assertEqual([o["cumulative_runs"] for o in overs], [14, 22])
+        self.assertEqual([o["run_rate"] for o in overs], [14.0, 16.5])
+        self.assertEqual(overs[0]["bowler"]["id"], self.bowler.pk)
+        self.assertNotIn("required_run_rate", overs[0])
+
+    def test_required_run_rate_for_the_chase(self):
+        self._score(6, 6)
+        OverSummary.objects.create(match=self.match, batting_team=self.team2, over=0, runs=4, balls=6)
+        self.match.tournament.overs_per_match = 2
+        [_, chase] = match_overs(self.match)
+        self.assertEqual(chase["target"], 13)
+        # 9 more needed from the last 6 balls
+        self.assertEqual(chase["overs"][0]["required_run_rate"], 9.0)
+
+    def test_rebuild_matches_the_live_table(self):
+        self._score(0, 0, 0, 0, 0, 0)
+        self._score(3, 1, 2)
+        live = self._table()
+        stats = self._stats(self.match, self.bowler)
+        OverSummary.objects.all().delete()
+        type(stats).objects.filter(pk=stats.pk).update(maidens=0, balls_bowled=0, overs_bowled=0)
+
+        out = StringIO()
+        call_command("rebuild_overs", "--match", str(self.match.pk), stdout=out)
+        self.assertIn("Rebuilt 2 overs across 1 matches", out.getvalue())
+        self.assertEqual(self._table(), live)
+        rebuilt = self._stats(self.match, self.bowler)
+        self.assertEqual((rebuilt.balls_bowled, rebuilt.maidens, rebuilt.overs_bowled), (9, 1, stats.overs_bowled))
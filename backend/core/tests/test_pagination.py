@@ -0,0 +1,84 @@
+import datetime
+from urllib.parse import parse_qs, urlparse
+
+from django.utils import timezone
+
+from core.models import Leaderboard, Player, User
+from core.tests.fixtures import TestCase, api_client
+
+
+def query(url):
+    return {name: values[0] for name, values in parse_qs(urlparse(url).query).items()}
+
+
+class PaginationTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(5):
+            User.objects.create(username=f"u{i}", role=User.Roles.PLAYER)
+        self.players = list(Player.objects.order_by("id"))
+        self.client = api_client()
+
+    def _walk(self, url):
+        ids, seen_urls = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.data)
+            self.assertNotIn("previous", response.data)
+            ids += [row["id"] for row in response.data["results"]]
+            url = response.data["next"]
+            seen_urls += 1
+            self.assertLess(seen_urls, 10)
+        return ids
+
+    def test_page_numbers_without_a_cursor(self):
+        response = self.client.get("/api/players/?page_size=2&page=2")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["count"], 5)
+        self.assertEqual([row["id"] for row in response.data["results"]], [p.pk for p in self.players[2:4]])
+        self.assertEqual(query(response.data["next"])["page"], "3")
+        self.assertNotIn("page", query(response.data["previous"]))
+
+    def test_cursor_walks_every_row_once(self):
+        first = self.client.get("/api/players/?page_size=2&cursor=")
+        self.assertNotIn("count", first.data)
+        self.assertIn("cursor", query(first.data["next"]))
+        # Rows added mid-walk do not shift the pages still to come
+        User.objects.create(username="late", role=User.Roles.PLAYER)
+        ids = [row["id"] for row in first.data["results"]] + self._walk(first.data["next"])
+        self.assertEqual(ids, [p.pk for p in Player.objects.order_by("id")])
+
+    def test_cursor_follows_joined_at_ordering_with_ties(self):
+        now = timezone.now()
+        joined = [now, now, now - datetime.timedelta(days=1), now + datetime.timedelta(days=1), now]
+        for player, when in zip(self.players, joined):
+            Player.objects.filter(pk=player.pk).update(joined_at=when)
+        expected = [p.pk for p in Player.objects.order_by("-joined_at", "-id")]
+
+        self.assertEqual(self._walk("/api/players/?page_size=2&cursor=&ordering=-joined_at"), expected)
+        self.assertEqual(self._walk("/api/players/?page_size=2&cursor=&ordering=joined_at"), expected[::-1])
+        numbered = self.client.get("/api/players/?ordering=-joined_at")
+        self.assertEqual([row["id"] for row in numbered.data["results"]], expected)
+        # Anything not in ordering_fields keeps the default order
+        self.assertEqual(self._walk("/api/players/?page_size=2&cursor=&ordering=user"), [p.pk for p in self.players])
+
+    def test_leaderboard_cursor_breaks_score_ties_by_id(self):
+        for player, score in zip(self.players, [5, 9, 5, 5, 1]):
+            Leaderboard.objects.create(player=player, score=score)
+        expected = list(Leaderboard.objects.order_by("-score", "id").values_list("id", flat=True))
+
+        walked, url = [], "/api/leaderboard/?page_size=2&cursor="
+        while url:
+            response = self.client.get(url)
+            walked += [row["id"] for row in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(walked, expected)
+
+        numbered = self.client.get("/api/leaderboard/")
+        self.assertEqual(numbered.data["count"], 5)
+        self.assertIsNone(numbered.data["previous"])
+
+    def test_malformed_cursor_is_not_found(self):
+        for cursor in ("not-base64!", "WzEsMl0=", "WyJ4Il0="):
+            response = self.client.get(f"/api/players/?cursor={cursor}")
+            self.assertEqual(response.status_code, 404, cursor)
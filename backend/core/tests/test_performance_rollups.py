@@ -0,0 +1,103 @@
+import datetime
+
+from django.utils import timezone
+
+from core.models import (
+    Coach, CoachingSession, DailyPerformanceScore, PerformanceScore,
+    SessionAttendance, Sport,
+)
+from core.services import performance_rollups
+from core.tests.fixtures import TestCase, make_user
+
+
+def rollups():
+    return {
+        level: {
+            (player_id, period): (rating_sum, sessions)
+            for player_id, period, rating_sum, sessions in model.objects.values_list(
+                "player_id", field, "rating_sum", "sessions"
+            )
+        }
+        for level, (model, field, _) in performance_rollups.LEVELS.items()
+    }
+
+
+class PerformanceRollupSignalTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        sport, _ = Sport.objects.get_or_create(name="Cricket")
+        self.coach = Coach.objects.get(user=make_user("coach", role="coach"))
+        self.player = make_user("player").player
+        self.today = timezone.now()
+        # Two sessions on one day long ago, one today
+        old = self.today - datetime.timedelta(days=200)
+        self.sessions = [
+            CoachingSession.objects.create(coach=self.coach, sport=sport, session_date=date)
+            for date in (old, old + datetime.timedelta(hours=2), self.today)
+        ]
+        self.rows = [
+            SessionAttendance.objects.create(session=session, player=self.player, attended=True, rating=rating)
+            for session, rating in zip(self.sessions, (6, 8, 5))
+        ]
+
+    def assertMatchesBackfill(self, complete=("day", "week", "month")):
+        """Every rollup row equals a backfill's; `complete` levels must also have all of its rows."""
+        current = rollups()
+        performance_rollups.backfill()
+        rebuilt = rollups()
+        for level, rows in current.items():
+            if level in complete:
+                self.assertEqual(rows, rebuilt[level], level)
+            else:
+                self.assertEqual(rows, {key: rebuilt[level][key] for key in rows}, level)
+
+    def test_writes_match_a_backfill(self):
+        self.rows[0].rating = 9
+        self.rows[0].save()
+        self.rows[2].attended = False
+        self.rows[2].save()
+        self.rows[1].delete()
+        self.assertMatchesBackfill()
+
+    def test_edit_on_a_compacted_day_recounts_it(self):
+        performance_rollups.compact(keep_daily_days=30)
+        old_day = self.sessions[0].session_date.date()
+        self.assertFalse(DailyPerformanceScore.objects.filter(date=old_day).exists())
+
+        self.rows[0].rating = 10
+        self.rows[0].save()
+        day = DailyPerformanceScore.objects.get(player=self.player, date=old_day)
+        self.assertEqual((day.rating_sum, day.sessions, day.score), (18.0, 2, 9.0))
+        self.assertMatchesBackfill()
+
+    def test_changes_on_a_compacted_week_recount_it(self):
+        performance_rollups.compact(keep_daily_days=30, keep_weekly_days=30)
+        old_week = performance_rollups.week_start(self.sessions[0].session_date.date())
+        self.assertFalse(PerformanceScore.objects.filter(week_start=old_week).exists())
+
+        other = make_user("other").player
+        SessionAttendance.objects.create(session=self.sessions[0], player=other, attended=True, rating=4)
+        self.rows[1].delete()
+        rows = dict(
+            PerformanceScore.objects.filter(week_start=old_week).values_list("player_id", "rating_sum")
+        )
+        self.assertEqual(rows, {self.player.pk: 6.0, other.pk: 4.0})
+        self.assertMatchesBackfill(complete=("month",))
+
+    def test_session_moved_out_of_a_compacted_week(self):
+        performance_rollups.compact(keep_daily_days=30, keep_weekly_days=30)
+        session = self.sessions[0]
+        session.session_date += datetime.timedelta(days=7)
+        session.save()
+        self.assertMatchesBackfill(complete=("month",))
+        weeks = sorted(PerformanceScore.objects.values_list("week_start", "sessions"))
+        self.assertEqual(weeks[0], (performance_rollups.week_start(session.session_date.date()) - datetime.timedelta(days=7), 1))
+
+    def test_session_moved_within_a_compacted_week_leaves_it_compacted(self):
+        performance_rollups.compact(keep_daily_days=30, keep_weekly_days=30)
+        session = self.sessions[0]
+        session.session_date += datetime.timedelta(days=1 if session.session_date.weekday() < 6 else -1)
+        session.save()
+        week = performance_rollups.week_start(session.session_date.date())
+        self.assertFalse(PerformanceScore.objects.filter(week_start=week).exists())
+        self.assertMatchesBackfill(complete=("month",))
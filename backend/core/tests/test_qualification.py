@@ -0,0 +1,91 @@
+import time
+
+import numpy as np
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from core.models import CricketMatchState, TournamentMatch, TournamentPoints, TournamentTeam
+from core.services.qualification import simulate
+from core.tests.fixtures import CricketFixture, TestCase
+
+
+class SimulateTests(SimpleTestCase):
+    def _fixtures(self, pairs):
+        return np.array(pairs, dtype=np.int64).reshape(-1, 2)
+
+    def test_no_fixtures_keeps_the_table(self):
+        counts, _ = simulate([6, 4, 4, 0], self._fixtures([]), [], [0.0, -0.5, 0.5, 0.0], runs=100, seed=1)
+        # Points first, then net run rate
+        self.assertEqual(counts.argmax(axis=1).tolist(), [0, 2, 1, 3])
+        self.assertTrue((counts.max(axis=1) == 100).all())
+
+    def test_certain_results(self):
+        fixtures = self._fixtures([(1, 0), (1, 2)])
+        counts, total_points = simulate([4, 0, 2], fixtures, [1.0, 1.0], [0, 0, 0], runs=50, seed=1)
+        self.assertEqual(total_points.tolist(), [200.0, 200.0, 100.0])
+        self.assertEqual(counts[2, 2], 50)
+
+    def test_counts_cover_every_run_and_place(self):
+        fixtures = self._fixtures([(0, 1), (2, 3), (0, 2), (1, 3)])
+        counts, _ = simulate([2, 2, 0, 0], fixtures, [0.5, 0.6, 0.3, 0.5], [0, 0, 0, 0], runs=30001, seed=7)
+        self.assertTrue((counts.sum(axis=0) == 30001).all())
+        self.assertTrue((counts.sum(axis=1) == 30001).all())
+        again, _ = simulate([2, 2, 0, 0], fixtures, [0.5, 0.6, 0.3, 0.5], [0, 0, 0, 0], runs=30001, seed=7)
+        self.assertTrue((counts == again).all())
+
+    def test_probabilities_follow_the_fixture_odds(self):
+        counts, _ = simulate([0, 0], self._fixtures([(0, 1)]), [0.8], [0, 0], runs=100000, seed=3)
+        self.assertAlmostEqual(counts[0, 0] / 100000, 0.8, delta=0.01)
+
+    def test_sixteen_team_league_in_under_a_second(self):
+        pairs = [(a, b) for a in range(16) for b in range(16) if a != b]
+        p_home = np.random.default_rng(0).uniform(0.2, 0.8, len(pairs))
+        started = time.perf_counter()
+        counts, _ = simulate([0] * 16, self._fixtures(pairs), p_home, [0] * 16, runs=100000, seed=0)
+        self.assertLess(time.perf_counter() - started, 1.0)
+        self.assertEqual(int(counts.sum()), 16 * 100000)
+
+
+@override_settings(QUALIFICATION_SIMULATIONS=2000)
+class QualificationTests(CricketFixture, TestCase):
+    def setUp(self):
+        super().setUp()
+        for team in (self.team1, self.team2):
+            TournamentTeam.objects.create(tournament=self.tournament, team=team)
+        TournamentPoints.objects.create(tournament=self.tournament, team=self.team1, points=2, matches_won=1, matches_played=1)
+        self.url = f"/api/tournaments/{self.tournament.pk}/qualification/"
+
+    def test_odds_for_the_remaining_fixtures(self):
+        TournamentMatch.objects.create(tournament=self.tournament, team1=self.team1, team2=self.team2, match_number=2)
+        response = self._client().get(self.url, {"top": 1})
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual((response.data["remaining_matches"], response.data["runs"]), (1, 2000))
+        leader, other = response.data["teams"]
+        self.assertEqual(leader["team"]["id"], self.team1.pk)
+        # Team 2 can only draw level on points and then needs the tiebreak
+        self.assertGreater(leader["qualify"], 0.6)
+        self.assertAlmostEqual(leader["qualify"] + other["qualify"], 1.0, places=6)
+        self.assertAlmostEqual(sum(leader["positions"]), 1.0, places=6)
+
+    def test_cached_until_a_match_is_completed(self):
+        match = self._match(number=2)
+        client = self._client()
+        self.assertEqual(client.get(self.url).data["remaining_matches"], 1)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(client.get(self.url).data["remaining_matches"], 1)
+        self.assertFalse([q for q in queries if "core_tournamentmatch" in q["sql"]])
+
+        CricketMatchState.objects.filter(match=match).update(team1_runs=10)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post(f"/api/tournament-matches/{match.pk}/complete/", {}, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+        data = client.get(self.url).data
+        self.assertEqual(data["remaining_matches"], 0)
+        self.assertEqual(data["teams"][0]["points"], 4)
+
+    def test_bad_parameters(self):
+        client = self._client()
+        self.assertEqual(client.get(self.url, {"runs": 0}).status_code, 400)
+        self.assertEqual(client.get(self.url, {"top": "four"}).status_code, 400)
+        self.assertEqual(client.get("/api/tournaments/999/qualification/").status_code, 404)
@@ -0,0 +1,115 @@
+import datetime
+
+from django.utils import timezone
+
+from core.models import CricketMatchState, Job, Match, MatchPlayerStats, Rating, RatingHistory
+from core.services import ratings
+from core.tests.fixtures import CricketFixture, TestCase, api_client, make_user
+
+
+class RatingTests(CricketFixture, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = self._client()
+        self.start = timezone.now() - datetime.timedelta(days=30)
+
+    def _complete(self, number, team1_runs, team2_runs, batsman=0):
+        """A finished match between the fixture teams; batsmen[batsman] and the bowler took part."""
+        match = self._match(number)
+        match.date = self.start + datetime.timedelta(days=number)
+        match.save(update_fields=["date"])
+        CricketMatchState.objects.filter(match=match).update(team1_runs=team1_runs, team2_runs=team2_runs)
+        MatchPlayerStats.objects.get_or_create(match=match, player=self.batsmen[batsman], team=self.team1)
+        MatchPlayerStats.objects.get_or_create(match=match, player=self.bowler, team=self.team2)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f"/api/tournament-matches/{match.pk}/complete/", {}, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+        return match
+
+    def _snapshot(self):
+        current = {
+            (row.kind, row.team_id, row.player_id): (round(row.rating, 6), row.matches)
+            for row in Rating.objects.all()
+        }
+        history = sorted(
+            (kind, team_id, player_id, match_id, round(before, 6), round(after, 6))
+            for kind, team_id, player_id, match_id, before, after in RatingHistory.objects.values_list(
+                "rating__kind", "rating__team_id", "rating__player_id", "match_id", "before", "after",
+            )
+        )
+        return current, history
+
+    def _rating(self, **lookup):
+        return Rating.objects.get(**lookup).rating
+
+    def test_completed_match_moves_team_and_player_ratings(self):
+        match = self._complete(1, 150, 120)
+        # Even sides, provisional K: the winner gains K / 2
+        self.assertAlmostEqual(self._rating(kind="team", team=self.team1), 1520.0)
+        self.assertAlmostEqual(self._rating(kind="team", team=self.team2), 1480.0)
+        self.assertAlmostEqual(self._rating(kind="player", player=self.batsmen[0]), 1520.0)
+        self.assertAlmostEqual(self._rating(kind="player", player=self.bowler), 1480.0)
+        self.assertEqual(RatingHistory.objects.filter(match_id=match.pk).count(), 4)
+
+    def test_a_match_is_rated_once(self):
+        match = self._complete(1, 150, 120)
+        [game] = ratings.tournament_games(type(match).objects.filter(pk=match.pk))
+        self.assertFalse(ratings.record(game))
+        self.assertEqual(Rating.objects.get(kind="team", team=self.team1).matches, 1)
+
+    def test_recompute_matches_incremental_updates(self):
+        for number, (runs1, runs2, batsman) in enumerate(
+            [(150, 120, 0), (90, 140, 1), (100, 100, 0), (160, 110, 2), (80, 81, 1)], start=1,
+        ):
+            self._complete(number, runs1, runs2, batsman)
+        incremental = self._snapshot()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            summary = ratings.recompute()
+        self.assertEqual((summary["matches"], summary["teams"], summary["players"]), (5, 2, 4))
+        self.assertEqual(self._snapshot(), incremental)
+
+    def test_finalized_friendly_is_rated_and_refinalizing_queues_a_recompute(self):
+        match = Match.objects.create(team1=self.team1, team2=self.team2)
+        url = f"/api/matches/{match.pk}/finalize/"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.post(url, {"score_team1": 1, "score_team2": 3}, format="json").status_code, 200)
+        self.assertAlmostEqual(self._rating(kind="team", team=self.team2), 1520.0)
+        # The whole roster of each side is rated
+        self.assertAlmostEqual(self._rating(kind="player", player=self.bowler), 1520.0)
+        self.assertEqual(Rating.objects.filter(kind="player", rating=1480.0).count(), 3)
+        self.assertFalse(Job.objects.filter(name="ratings.recompute").exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(url, {"score_team1": 3, "score_team2": 1}, format="json")
+        self.assertEqual(RatingHistory.objects.filter(source="match", match_id=match.pk).count(), 6)
+        self.assertTrue(Job.objects.filter(name="ratings.recompute").exists())
+
+    def test_endpoints(self):
+        self._complete(1, 150, 120)
+        self._complete(2, 150, 120, batsman=1)
+        player = api_client(self.batsmen[1].user)
+
+        top = player.get("/api/ratings/", {"kind": "player", "limit": 2}).data["results"]
+        self.assertEqual([e["player"]["id"] for e in top], [self.batsmen[0].pk, self.batsmen[1].pk])
+        self.assertEqual([e["rank"] for e in top], [1, 2])
+
+        around = player.get("/api/ratings/around/", {"kind": "team", "team_id": self.team2.pk, "radius": 1}).data
+        self.assertEqual(around["rank"], 2)
+        self.assertEqual([e["team"]["id"] for e in around["entries"]], [self.team1.pk, self.team2.pk])
+
+        [mine] = player.get("/api/ratings/me/").data
+        self.assertEqual((mine["rank"], mine["sport"]), (2, self.sport.pk))
+
+        chart = player.get("/api/ratings/history/", {"kind": "team", "team_id": self.team1.pk}).data
+        self.assertEqual([point["change"] for point in chart["history"]], [20.0, 17.7])
+
+        self.assertEqual(player.get("/api/ratings/", {"kind": "coach"}).status_code, 400)
+        self.assertEqual(player.get("/api/ratings/around/", {"kind": "team", "team_id": 999}).status_code, 404)
+        self.assertEqual(self.client.get("/api/ratings/me/").status_code, 403)
+
+    def test_recompute_is_queued_for_admins_only(self):
+        self.assertEqual(self._client().post("/api/ratings/recompute/").status_code, 403)
+        response = api_client(make_user("admin", role="admin")).post("/api/ratings/recompute/")
+        self.assertEqual(response.status_code, 202, response.data)
+        self.assertTrue(Job.objects.filter(name="ratings.recompute").exists())
@@ -0,0 +1,60 @@
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+
+from core.models import ManagerSport, Player, PlayerSportProfile, Sport, User
+from core.services import registration
+from core.services.registration import register_users_bulk
+from core.tests.fixtures import TestCase, api_client, make_user
+from core.utils import generate_player_id
+
+
+def csv_file(*lines):
+    return SimpleUploadedFile("roster.csv", ("\n".join(lines) + "\n").encode(), content_type="text/csv")
+
+
+class BulkRegistrationTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.cricket, _ = Sport.objects.get_or_create(name="Cricket")
+        self.football, _ = Sport.objects.get_or_create(name="Football")
+        self.manager = make_user("manager", role="manager")
+        # A cricket-only manager
+        ManagerSport.objects.filter(manager__user=self.manager, sport=self.football).delete()
+        self.manager = User.objects.get(pk=self.manager.pk)
+
+    def _upload(self, file):
+        return api_client(self.manager).post("/api/auth/bulk-register/", {"file": file}, format="multipart")
+
+    def test_manager_onboards_players_of_their_sport(self):
+        response = self._upload(csv_file("username,sport", "a1,Cricket", "a2,Cricket"))
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(PlayerSportProfile.objects.filter(player__user__username__in=["a1", "a2"], sport=self.cricket).count(), 2)
+
+    def test_manager_cannot_onboard_another_sport_under_either_column(self):
+        for header in ("sport", "sport_name"):
+            response = self._upload(csv_file(f"username,{header}", "a1,Cricket", "f1,Football"))
+            self.assertEqual(response.status_code, 403, response.data)
+            self.assertEqual(set(response.data["errors"]), {2})
+        self.assertFalse(User.objects.filter(username__in=["a1", "f1"]).exists())
+
+    def test_manager_cannot_onboard_other_roles(self):
+        response = self._upload(csv_file("username,role", "c1,coach"))
+        self.assertEqual(response.status_code, 403, response.data)
+        self.assertFalse(User.objects.filter(username="c1").exists())
+
+    @override_settings(BULK_REGISTRATION_MAX_ROWS=2)
+    def test_upload_over_the_cap_is_rejected(self):
+        response = self._upload(csv_file("username,sport", "a1,Cricket", "a2,Cricket", "a3,Cricket"))
+        self.assertEqual(response.status_code, 400, response.data)
+        self.assertFalse(User.objects.filter(username__startswith="a").exists())
+
+    def test_player_id_race_is_retried(self):
+        taken = make_user("earlier").player.player_id
+        # The first allocation returns an ID another registration already holds
+        ids = mock.Mock(side_effect=[taken, generate_player_id()])
+        with mock.patch.object(registration, "generate_player_id", ids):
+            user_ids = register_users_bulk([{"username": "b1", "sport": "Cricket"}], default_password="x")
+        self.assertEqual(ids.call_count, 2)
+        self.assertNotEqual(Player.objects.get(user_id=user_ids[0]).player_id, taken)
@@ -0,0 +1,126 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Coach, PlayerSportProfile, Sport, Team, TeamProposal
+from core.promotion_services import TeamProposalError, approve_team_proposal
+from core.services.roster import RosterConflictError, assign_team
+from core.tests.fixtures import TestCase, api_client, make_user
+
+
+class RosterFixture:
+    """Six cricket players of one coach and two cricket teams."""
+
+    def setUp(self):
+        super().setUp()
+        self.sport, _ = Sport.objects.get_or_create(name="Cricket")
+        self.football, _ = Sport.objects.get_or_create(name="Football")
+        self.manager = make_user("manager", role="manager")
+        self.coach = make_user("coach", role="coach").coach
+        Coach.objects.filter(pk=self.coach.pk).update(primary_sport=self.sport)
+        self.coach.refresh_from_db()
+        self.team = Team.objects.create(name="Blues", sport=self.sport, manager=self.manager)
+        self.other_team = Team.objects.create(name="Reds", sport=self.sport, manager=self.manager)
+        self.profiles = [self._profile(f"p{i}") for i in range(6)]
+
+    def _profile(self, username, sport_name="Cricket"):
+        profile = PlayerSportProfile.objects.get(player__user=make_user(username, sport_name=sport_name))
+        profile.coach = self.coach
+        profile.save(update_fields=["coach"])
+        return profile
+
+    def _ids(self, profiles):
+        return [p.id for p in profiles]
+
+
+class RosterTests(RosterFixture, TestCase):
+    def test_assigns_the_whole_batch(self):
+        self.assertEqual(assign_team(self._ids(self.profiles), self.team), 6)
+        self.assertEqual(PlayerSportProfile.objects.filter(team=self.team).count(), 6)
+
+    def test_reports_every_conflict_and_writes_nothing(self):
+        PlayerSportProfile.objects.filter(id__in=self._ids(self.profiles[1:3])).update(team=self.other_team)
+        footballer = self._profile("f0", sport_name="Football")
+        with self.assertRaises(RosterConflictError) as raised:
+            assign_team(self._ids(self.profiles) + [footballer.id], self.team)
+        reasons = {c["profile_id"]: c["reason"] for c in raised.exception.conflicts}
+        self.assertEqual(reasons, {
+            self.profiles[1].id: "already_in_team",
+            self.profiles[2].id: "already_in_team",
+            footballer.id: "sport_mismatch",
+        })
+        self.assertFalse(PlayerSportProfile.objects.filter(team=self.team).exists())
+
+    def test_query_count_does_not_grow_with_the_batch(self):
+        with CaptureQueriesContext(connection) as one:
+            assign_team(self._ids(self.profiles[:1]), self.team)
+        with CaptureQueriesContext(connection) as many:
+            assign_team(self._ids(self.profiles[1:]), self.team)
+        self.assertEqual(len(one), len(many))
+
+    def test_approval_lists_all_conflicting_players(self):
+        proposal = TeamProposal.objects.create(coach=self.coach, manager=self.manager, sport=self.sport, team_name="New")
+        proposal.proposed_players.set([p.player for p in self.profiles])
+        PlayerSportProfile.objects.filter(id__in=self._ids(self.profiles[2:4])).update(team=self.other_team)
+
+        with self.assertRaises(TeamProposalError) as raised:
+            approve_team_proposal(proposal, self.manager)
+        self.assertEqual(
+            sorted(c["player_id"] for c in raised.exception.conflicts),
+            sorted(p.player.player_id for p in self.profiles[2:4]),
+        )
+
+        PlayerSportProfile.objects.update(team=None)
+        Team.objects.filter(name="New").delete()
+        team = approve_team_proposal(proposal, self.manager)
+        self.assertEqual(PlayerSportProfile.objects.filter(team=team).count(), 6)
+        proposal.refresh_from_db()
+        self.assertEqual(proposal.status, TeamProposal.Status.APPROVED)
+
+
+class BulkAssignTeamViewTests(RosterFixture, TestCase):
+    url = "/api/player-sport-profiles/bulk-assign-team/"
+
+    def test_coach_moves_their_players_and_clears_them(self):
+        client = api_client(self.coach.user)
+        ids = self._ids(self.profiles)
+        response = client.post(self.url, {"profile_ids": ids, "team_id": self.team.id}, format="json")
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["updated"], 6)
+
+        response = client.post(self.url, {"profile_ids": ids, "team_id": None}, format="json")
+        self.assertEqual(response.data["updated"], 6)
+        self.assertFalse(PlayerSportProfile.objects.filter(team__isnull=False).exists())
+
+    def test_conflicts_come_back_together(self):
+        PlayerSportProfile.objects.filter(id__in=self._ids(self.profiles[:2])).update(team=self.other_team)
+        response = api_client(self.coach.user).post(
+            self.url, {"profile_ids": self._ids(self.profiles), "team_id": self.team.id}, format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(response.data["conflicts"]), 2)
+
+    def test_other_coaches_profiles_are_forbidden(self):
+        stranger = make_user("stranger", role="coach")
+        response = api_client(stranger).post(
+            self.url, {"profile_ids": self._ids(self.profiles[:1]), "team_id": self.team.id}, format="json",
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data["profile_ids"], self._ids(self.profiles[:1]))
+
+    def test_players_and_admins_are_refused(self):
+        for user in (self.profiles[0].player.user, make_user("admin", role="admin")):
+            with self.subTest(role=user.role):
+                response = api_client(user).post(
+                    self.url, {"profile_ids": self._ids(self.profiles[:1]), "team_id": None}, format="json",
+                )
+                self.assertEqual(response.status_code, 403)
+
+    def test_single_update_uses_the_same_conflict_rules(self):
+        profile = self.profiles[0]
+        client = api_client(self.coach.user)
+        url = f"/api/player-sport-profiles/{profile.id}/"
+        self.assertEqual(client.patch(url, {"team_id": self.team.id}, format="json").status_code, 200)
+
+        response = client.patch(url, {"team_id": self.other_team.id}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("already in team 'Blues'", str(response.data["team"]))
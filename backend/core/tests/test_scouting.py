@@ -0,0 +1,130 @@
+import datetime
+
+from django.utils import timezone
+
+from core.models import (
+    CoachingSession, CricketStats, ManagerSport, Player, PlayerSportProfile, SessionAttendance, Sport,
+)
+from core.services import scouting
+from core.services.scouting import ScoutingError, parse, search
+from core.tests.fixtures import TestCase, api_client, make_user
+
+METRICS = {"runs": 0, "wickets": 1, "strike_rate": 2}
+
+
+class ParseTests(TestCase):
+    def test_precedence_and_grouping(self):
+        runs, wickets, rate = ("cmp", "runs", False, ">=", 1.0), ("cmp", "wickets", True, ">", 2.0), ("cmp", "strike_rate", False, "<", 3.0)
+        self.assertEqual(
+            parse("runs >= 1 or wickets pct > 2 and not strike_rate < 3", METRICS),
+            ("or", runs, ("and", wickets, ("not", rate))),
+        )
+        self.assertEqual(
+            parse("(RUNS >= 1 or wickets percentile > 2) and strike_rate < 3", METRICS),
+            ("and", ("or", runs, wickets), rate),
+        )
+
+    def test_errors(self):
+        for query in (
+            "goals >= 1",
+            "runs >= 1 wickets",
+            "runs >=",
+            "(runs >= 1",
+            "runs ~ 1",
+            " and ".join(["runs >= 1"] * (scouting.MAX_CLAUSES + 1)),
+        ):
+            with self.subTest(query), self.assertRaises(ScoutingError):
+                parse(query, METRICS)
+
+
+class ScoutingTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.sport, _ = Sport.objects.get_or_create(name="Cricket")
+        self.profiles = []
+        for i in range(10):
+            profile = PlayerSportProfile.objects.get(player__user=make_user(f"p{i}"))
+            CricketStats.objects.create(profile=profile, runs=i * 10, strike_rate=100 + i * 10)
+            self.profiles.append(profile)
+        self.unscored = PlayerSportProfile.objects.get(player__user=make_user("fresh"))
+        Player.objects.update(is_public=True)
+
+    def _ids(self, query, sort="-runs", **kwargs):
+        _, _, page = search(self.sport.pk, query, sort, **kwargs)
+        return [pid for pid, _, _ in page]
+
+    def test_compound_percentile_query(self):
+        top = [self.profiles[9].pk, self.profiles[8].pk]
+        self.assertEqual(self._ids("runs percentile >= 90"), top)
+        self.assertEqual(self._ids("runs pct >= 90 and strike_rate >= 190"), top[:1])
+        self.assertEqual(self._ids("runs < 20 or not strike_rate < 180"), top + [self.profiles[1].pk, self.profiles[0].pk])
+
+    def test_unknown_values_never_match_and_sort_last(self):
+        self.assertNotIn(self.unscored.pk, self._ids("runs >= 0"))
+        self.assertNotIn(self.unscored.pk, self._ids("not runs >= 0"))
+        self.assertEqual(self._ids("", sort="runs")[-1], self.unscored.pk)
+
+    def test_sort_and_pagination(self):
+        total, metrics, page = search(self.sport.pk, "runs >= 30", "strike_rate", offset=2, limit=3)
+        self.assertEqual(total, 7)
+        self.assertEqual([pid for pid, _, _ in page], [p.pk for p in self.profiles[5:8]])
+        _, values, percentiles = page[0]
+        self.assertEqual((values["runs"], percentiles["runs"]), (50.0, 60.0))
+        self.assertIn("attendance_rate_60d", metrics)
+        with self.assertRaises(ScoutingError):
+            search(self.sport.pk, "", "goals")
+
+    def test_private_and_inactive_players_are_left_out(self):
+        Player.objects.filter(pk=self.profiles[9].player_id).update(is_public=False)
+        PlayerSportProfile.objects.filter(pk=self.profiles[8].pk).update(is_active=False)
+        scouting._tables.clear()
+        self.assertEqual(self._ids("runs >= 70"), [self.profiles[7].pk])
+
+    def test_changes_are_patched_into_a_built_table(self):
+        self._ids("")
+        table = scouting._tables[self.sport.pk]
+        with self.captureOnCommitCallbacks(execute=True):
+            stats = CricketStats.objects.get(profile=self.profiles[0])
+            stats.runs = 500
+            stats.save()
+        self.assertEqual(self._ids("runs percentile >= 100"), [self.profiles[0].pk])
+        self.assertIs(scouting._tables[self.sport.pk], table)
+
+    def test_windowed_attendance_rate(self):
+        coach = make_user("coach", role="coach").coach
+        player = self.profiles[0].player
+        now = timezone.now()
+        for days, attended in ((5, True), (20, True), (50, False), (80, False)):
+            session = CoachingSession.objects.create(coach=coach, sport=self.sport, session_date=now - datetime.timedelta(days=days))
+            SessionAttendance.objects.create(session=session, player=player, attended=attended)
+        scouting._tables.clear()
+        _, _, [(_, values, _)] = search(self.sport.pk, "attendance_rate_30d >= 1", "runs")
+        self.assertEqual(values["attendance_rate"], 0.5)
+        self.assertAlmostEqual(values["attendance_rate_60d"], 2 / 3, places=3)
+        self.assertEqual(self._ids("attendance_rate_60d >= 0.8"), [])
+
+
+class ScoutingViewTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.cricket, _ = Sport.objects.get_or_create(name="Cricket")
+        self.football, _ = Sport.objects.get_or_create(name="Football")
+        self.profile = PlayerSportProfile.objects.get(player__user=make_user("batter"))
+        CricketStats.objects.create(profile=self.profile, runs=40)
+        self.manager = make_user("manager", role="manager")
+        ManagerSport.objects.filter(manager__user=self.manager, sport=self.football).delete()
+
+    def test_manager_searches_their_sport(self):
+        response = api_client(self.manager).get("/api/scouting/", {"sport": self.cricket.pk, "q": "runs >= 40"})
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["count"], 1)
+        [row] = response.data["results"]
+        self.assertEqual((row["profile_id"], row["username"], row["metrics"]["runs"]), (self.profile.pk, "batter", 40.0))
+
+    def test_rejections(self):
+        client = api_client(self.manager)
+        self.assertEqual(client.get("/api/scouting/", {"sport": self.football.pk}).status_code, 403)
+        self.assertEqual(client.get("/api/scouting/", {"sport": 999}).status_code, 404)
+        self.assertEqual(client.get("/api/scouting/", {"sport": self.cricket.pk, "q": "runs >>= 1"}).status_code, 400)
+        self.assertEqual(client.get("/api/scouting/").status_code, 400)
+        self.assertEqual(api_client(self.profile.player.user).get("/api/scouting/", {"sport": self.cricket.pk}).status_code, 403)
@@ -0,0 +1,112 @@
+import datetime
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.utils import timezone
+
+from core.models import (
+    Coach, CoachingSession, DailyPerformanceScore, MonthlyPerformanceScore,
+    PlayerSportProfile, SessionAttendance, SessionImport, Sport,
+)
+from core.services import performance_rollups, session_import
+from core.services.session_import import import_sessions
+from core.tests.fixtures import TestCase, make_user
+
+
+def rollups():
+    return {
+        model.__name__: sorted(model.objects.values_list("player_id", field, "rating_sum", "sessions"))
+        for model, field, _ in performance_rollups.LEVELS.values()
+    }
+
+
+@override_settings(SESSION_IMPORT_CHUNK_SIZE=2)
+class SessionImportTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.sport, _ = Sport.objects.get_or_create(name="Cricket")
+        self.coach = Coach.objects.get(user=make_user("coach", role="coach"))
+        self.players = [make_user(f"p{i}").player for i in range(5)]
+        PlayerSportProfile.objects.filter(player__in=self.players).update(coach=self.coach)
+        now = timezone.now()
+        self.sessions = [
+            CoachingSession.objects.create(coach=self.coach, sport=self.sport, session_date=now - datetime.timedelta(days=days))
+            for days in (1, 40)
+        ]
+
+    def _file(self, rows, name="attendance.csv"):
+        lines = ["session_id,player_id,attended,score"] + [
+            f"{session.pk},{player.player_id},{attended},{score}" for session, player, attended, score in rows
+        ]
+        return SimpleUploadedFile(name, ("\n".join(lines) + "\n").encode(), content_type="text/csv")
+
+    def _rows(self, score):
+        return [(session, player, 1, score) for session in self.sessions for player in self.players[:3]]
+
+    def test_chunks_update_rollups_and_change_log_once_each(self):
+        with mock.patch.object(session_import.profile_changes, "changed") as changed:
+            with self.captureOnCommitCallbacks(execute=True):
+                job = import_sessions(self.coach.pk, self._file(self._rows(7)))
+        self.assertEqual(job.status, SessionImport.Status.COMPLETED)
+        self.assertEqual((job.rows_processed, job.rows_updated, job.error_count), (6, 6, 0))
+        self.assertEqual(SessionAttendance.objects.filter(rating=7).count(), 6)
+        # Three chunks of two rows, one change-log entry each
+        self.assertEqual(changed.call_count, 3)
+
+        imported = rollups()
+        self.assertTrue(imported["DailyPerformanceScore"])
+        performance_rollups.backfill()
+        self.assertEqual(imported, rollups())
+
+    def test_reimport_with_new_scores_applies_only_the_difference(self):
+        import_sessions(self.coach.pk, self._file(self._rows(7)))
+        rows = self._rows(4)
+        rows[0] = (self.sessions[0], self.players[0], 0, 0)
+        rows.append((self.sessions[0], self.players[3], 1, 9))
+        import_sessions(self.coach.pk, self._file(rows, name="second.csv"))
+
+        imported = rollups()
+        performance_rollups.backfill()
+        self.assertEqual(imported, rollups())
+        self.assertEqual(DailyPerformanceScore.objects.get(player=self.players[3]).rating_sum, 9)
+        self.assertFalse(
+            DailyPerformanceScore.objects.filter(
+                player=self.players[0], date=self.sessions[0].session_date.date()
+            ).exists()
+        )
+
+    def test_failed_import_resumes_from_its_checkpoint(self):
+        commit = session_import._Chunk.commit
+        calls = []
+
+        def fail_second_chunk(chunk, rows):
+            calls.append(len(rows))
+            if len(calls) == 2:
+                raise RuntimeError("connection lost")
+            return commit(chunk, rows)
+
+        with mock.patch.object(session_import._Chunk, "commit", fail_second_chunk):
+            with self.assertRaises(RuntimeError):
+                import_sessions(self.coach.pk, self._file(self._rows(7)))
+        job = SessionImport.objects.get()
+        self.assertEqual((job.status, job.rows_processed), (SessionImport.Status.FAILED, 2))
+        self.assertEqual(SessionAttendance.objects.count(), 2)
+
+        # Uploading the same file again picks up after the committed chunk
+        resumed = import_sessions(self.coach.pk, self._file(self._rows(7)))
+        self.assertEqual(resumed.pk, job.pk)
+        self.assertEqual((resumed.status, resumed.rows_processed, resumed.rows_updated), (SessionImport.Status.COMPLETED, 6, 6))
+        self.assertEqual(SessionAttendance.objects.count(), 6)
+        self.assertEqual(sum(MonthlyPerformanceScore.objects.values_list("sessions", flat=True)), 6)
+        imported = rollups()
+        performance_rollups.backfill()
+        self.assertEqual(imported, rollups())
+
+    def test_rows_outside_the_coachs_roster_are_reported(self):
+        stranger = make_user("stranger").player
+        rows = self._rows(5)[:2] + [(self.sessions[0], stranger, 1, 5)]
+        job = import_sessions(self.coach.pk, self._file(rows))
+        self.assertEqual((job.rows_updated, job.error_count), (2, 1))
+        self.assertEqual(job.errors[0]["player_id"], stranger.player_id)
+        self.assertFalse(SessionAttendance.objects.filter(player=stranger).exists())
@@ -0,0 +1,56 @@
+from core.models import Player, PlayerSportProfile, Sport
+from core.services import profile_changes, similarity
+from core.tests.fixtures import TestCase, api_client, make_user
+
+
+class SimilarityTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.sport, _ = Sport.objects.get_or_create(name="Cricket")
+        self.profiles = []
+        for i, score in enumerate([1.0, 2.0, 3.5, 8.0, 9.0]):
+            user = make_user(f"p{i}")
+            PlayerSportProfile.objects.filter(player__user=user).update(career_score=score)
+            self.profiles.append(PlayerSportProfile.objects.get(player__user=user))
+        Player.objects.update(is_public=True)
+
+    def _similar(self, profile, k):
+        hits, _ = similarity.similar(profile, k)
+        return [pid for pid, _ in hits]
+
+    def test_nearest_profiles_first_without_the_profile_itself(self):
+        self.assertEqual(self._similar(self.profiles[1], 2), [self.profiles[0].pk, self.profiles[2].pk])
+        self.assertEqual(self._similar(self.profiles[4], 1), [self.profiles[3].pk])
+
+    def test_only_public_players_are_returned(self):
+        Player.objects.filter(pk=self.profiles[0].player_id).update(is_public=False)
+        self.assertEqual(self._similar(self.profiles[1], 1), [self.profiles[2].pk])
+
+    def test_logged_changes_are_applied_to_a_built_index(self):
+        self._similar(self.profiles[1], 1)
+        profile = self.profiles[3]
+        with self.captureOnCommitCallbacks(execute=True):
+            profile.career_score = 2.2
+            profile.save()
+        self.assertEqual(self._similar(self.profiles[1], 1), [profile.pk])
+        self.assertEqual(similarity._indexes[self.sport.id].seq, profile_changes.current())
+
+    def test_change_log_reports_players_by_sport(self):
+        start = profile_changes.current()
+        profile_changes.changed([1, 2], self.sport.id)
+        profile_changes.changed([3], self.sport.id + 1)
+        until = profile_changes.current()
+        self.assertEqual(until, start + 2)
+        self.assertEqual(profile_changes.players_since(start, until, self.sport.id), {1, 2})
+        profile_changes.changed(None, None)
+        self.assertIsNone(profile_changes.players_since(start, profile_changes.current(), self.sport.id))
+        # A counter that went back (cache cleared) makes readers rebuild
+        self.assertIsNone(profile_changes.players_since(until + 5, until, self.sport.id))
+
+    def test_endpoint(self):
+        response = api_client(self.profiles[0].player.user).get(
+            f"/api/player-sport-profiles/{self.profiles[1].pk}/similar/", {"k": 2},
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual([row["profile_id"] for row in response.data["results"]], [self.profiles[0].pk, self.profiles[2].pk])
+        self.assertIn("career_score", response.data["features"])
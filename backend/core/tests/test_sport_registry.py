@@ -0,0 +1,34 @@
+from core.models import Sport
+from core.services.sport_registry import SportRegistry, sport_registry
+from core.tests.fixtures import TestCase
+
+
+class SportRegistryTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        self.sport = Sport.objects.create(name="Kabaddi")
+        # Another process's registry: its own maps, the same cache
+        self.other = SportRegistry()
+        self.other.check_interval = 0
+
+    def test_rename_elsewhere_reaches_every_registry(self):
+        self.assertEqual(self.other.by_id(self.sport.pk).name, "Kabaddi")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sport.name = "Kho Kho"
+            self.sport.save()
+        self.assertEqual(self.other.by_id(self.sport.pk).name, "Kho Kho")
+        self.assertIsNone(self.other.get("kabaddi"))
+
+    def test_deleted_sport_disappears(self):
+        self.assertIsNotNone(self.other.get("kabaddi"))
+        self.sport.delete()
+        self.assertIsNone(self.other.by_id(self.sport.pk))
+
+    def test_unchanged_version_serves_from_memory(self):
+        self.other.all()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.other.id_for("KABADDI"), self.sport.pk)
+
+    def test_lookups_are_case_insensitive(self):
+        self.assertEqual(sport_registry.id_for("  kabaddi "), self.sport.pk)
+        self.assertIsNone(sport_registry.get(""))
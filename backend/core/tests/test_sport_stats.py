@@ -0,0 +1,63 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.models import CricketStats, PlayerSportProfile, RunningStats, Sport
+from core.services.sport_registry import sport_registry
+from core.services.sport_stats import build_stats
+from core.tests.fixtures import TestCase, api_client, make_user
+
+
+class SportStatsTests(TestCase):
+    def setUp(self):
+        super().setUp()
+        Sport.objects.get_or_create(name="Cricket")
+        Sport.objects.get_or_create(name="Running")
+        self.cricket = [self._profile(f"bat{i}", "Cricket") for i in range(3)]
+        self.running = [self._profile(f"run{i}", "Running") for i in range(2)]
+        for profile, runs in zip(self.cricket, [10, 50, 30]):
+            CricketStats.objects.create(profile=profile, runs=runs, wickets=runs // 10)
+        for profile, (distance, best) in zip(self.running, [(5.0, 1500), (12.0, 1400)]):
+            RunningStats.objects.create(profile=profile, total_distance_km=distance, best_time_seconds=best)
+        sport_registry.all()
+
+    def _profile(self, username, sport_name):
+        return PlayerSportProfile.objects.get(player__user=make_user(username, sport_name=sport_name))
+
+    def test_stats_for_each_sport(self):
+        blocks = build_stats(self.cricket[:1] + self.running[:1])
+        self.assertEqual(set(blocks), {self.cricket[0].id, self.running[0].id})
+        self.assertEqual(blocks[self.cricket[0].id]["stats"]["runs"], 10)
+        self.assertEqual(blocks[self.running[0].id]["stats"]["total_distance_km"], 5.0)
+        self.assertNotIn("balls_faced", blocks[self.cricket[0].id]["stats"])
+        self.assertNotIn("ranks", blocks[self.cricket[0].id])
+
+    def test_ranks_follow_each_metric_direction(self):
+        blocks = build_stats([self.cricket[0], self.running[0]], with_ranks=True)
+        self.assertEqual(blocks[self.cricket[0].id]["ranks"]["runs"], 3)
+        self.assertEqual(blocks[self.cricket[0].id]["ranks"]["total_players"], 3)
+        ranks = blocks[self.running[0].id]["ranks"]
+        self.assertEqual(ranks["total_distance_km"], 2)
+        # Lower time is better
+        self.assertEqual(ranks["best_time_seconds"], 2)
+
+    def test_first_stats_row_per_profile_wins(self):
+        CricketStats.objects.create(profile=self.cricket[0], runs=999)
+        self.assertEqual(build_stats(self.cricket[:1])[self.cricket[0].id]["stats"]["runs"], 10)
+
+    def test_one_query_per_sport_whatever_the_profile_count(self):
+        profiles = self.cricket + self.running
+        for with_ranks in (False, True):
+            with self.subTest(with_ranks=with_ranks), CaptureQueriesContext(connection) as few:
+                build_stats(profiles[:1] + profiles[-1:], with_ranks=with_ranks)
+            with CaptureQueriesContext(connection) as many:
+                build_stats(profiles, with_ranks=with_ranks)
+            self.assertEqual(len(few), 2)
+            self.assertEqual(len(many), 2)
+
+    def test_player_dashboard_serves_stats_and_ranks(self):
+        response = api_client(self.cricket[1].player.user).get("/api/dashboard/player/")
+        self.assertEqual(response.status_code, 200, response.data)
+        [profile] = response.data["profiles"]
+        self.assertEqual(profile["stats"]["runs"], 50)
+        self.assertEqual(profile["ranks"]["runs"], 1)
+        self.assertEqual(profile["ranks"]["total_players"], 3)
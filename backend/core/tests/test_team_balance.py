@@ -0,0 +1,29 @@
+from django.test import SimpleTestCase
+
+from core.services.team_balance import BalanceError, balance
+
+
+def _pool(n):
+    return [
+        {"player": pk, "player_id": f"P{pk}", "username": f"player{pk}", "strength": float(pk % 7), "role": None}
+        for pk in range(1, n + 1)
+    ]
+
+
+class TeamBalanceTests(SimpleTestCase):
+    def _team_of(self, result):
+        return {p["player"]: entry["index"] for entry in result["teams"] for p in entry["players"]}
+
+    def test_together_group_with_apart_chain(self):
+        # Placing the group of three first used to leave no team for player 4
+        result = balance(_pool(20), 2, together=[(1, 2), (1, 3)], apart=[(1, 4), (4, 5)])
+        team_of = self._team_of(result)
+        self.assertEqual(team_of[1], team_of[2])
+        self.assertEqual(team_of[1], team_of[3])
+        self.assertNotEqual(team_of[1], team_of[4])
+        self.assertNotEqual(team_of[4], team_of[5])
+        self.assertEqual([len(entry["players"]) for entry in result["teams"]], [10, 10])
+
+    def test_apart_cycle_that_cannot_split(self):
+        with self.assertRaises(BalanceError):
+            balance(_pool(10), 2, apart=[(1, 2), (2, 3), (3, 1)])
@@ -1,17 +1,17 @@
-from django.urls import path, include
+from django.urls import path, re_path, include
 from rest_framework import routers
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from .views import (
     TeamViewSet, PlayerViewSet, MatchViewSet,
     AttendanceViewSet, LeaderboardViewSet,
-    predict_player_start, player_insight, register_user,
-    player_dashboard, coach_dashboard,
+    predict_player_start, player_insight, job_status, register_user, bulk_register_users,
+    player_dashboard, coach_dashboard, performance_series, export_data,
     CustomObtainAuthToken, RoleAwareProfileView, player_profile, coach_profile,
     PromotionRequestViewSet, CoachingSessionViewSet, CoachPlayerLinkViewSet, NotificationViewSet,
     SportViewSet, TeamProposalViewSet, TeamAssignmentRequestViewSet, TournamentViewSet,
     TournamentMatchViewSet, ManagerSportAssignmentViewSet, PlayerSportProfileViewSet,
-    CoachViewSet,
+    CoachViewSet, RatingViewSet, ScoutingViewSet, notification_stream, login_async,
 )
 
 
@@ -33,19 +33,27 @@ router.register(r"tournament-matches", TournamentMatchViewSet, basename="tournam
 router.register(r"manager-sport-assignments", ManagerSportAssignmentViewSet, basename="manager-sport-assignments")
 router.register(r"player-sport-profiles", PlayerSportProfileViewSet, basename="player-sport-profiles")
 router.register(r"coaches", CoachViewSet, basename="coaches")
+router.register(r"ratings", RatingViewSet, basename="ratings")
+router.register(r"scouting", ScoutingViewSet, basename="scouting")
 
 urlpatterns = [
     
+    path('notifications/stream/', notification_stream, name='notification-stream'),
     path('', include(router.urls)),
     path('predict-player/', predict_player_start, name='predict_player_start'),
     path('player-insight/', player_insight, name='player_insight'),
+    path('jobs/<int:job_id>/', job_status, name='job-status'),
     path('auth/signup/', register_user, name='register_user'),
+    path('auth/bulk-register/', bulk_register_users, name='bulk-register-users'),
     path('auth/login/', CustomObtainAuthToken.as_view(), name='api-login'),
+    path('auth/login/async/', login_async, name='api-login-async'),
     path('profile/', RoleAwareProfileView.as_view(), name='api-profile'),
     path('player/profile/', player_profile, name='player-profile'),   # optional
     path('coach/profile/', coach_profile, name='coach-profile'),
     path('dashboard/player/', player_dashboard, name='player-dashboard'),
     path('dashboard/coach/', coach_dashboard, name='coach-dashboard'),
+    path('performance/series/', performance_series, name='performance-series'),
+    re_path(r'^exports/(?P<dataset>[a-z-]+)\.(?P<fmt>csv|ndjson)(?P<gz>\.gz)?$', export_data, name='export-data'),
     
     # ✅ Add JWT authentication endpoints
     path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -33,6 +33,41 @@ def generate_coach_id(latest_existing_id: Optional[str] = None) -> str:
 # core/utils.py
 from .models import Player, Leaderboard, PlayerSportProfile
 
+
+def day_bounds(day):
+    """
+    Aware [start, end) datetimes covering a calendar day in the current timezone.
+    Filtering on this range instead of `__date=day` lets the DB use the session_date index.
+    """
+    from django.utils import timezone
+    start = timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+    return start, start + datetime.timedelta(days=1)
+
+def generate_player_id(latest_existing_id: Optional[str] = None) -> str:
+    """Generate unique player ID like P25xxxxx, following generate_coach_id.
+
+    Walks the unique player_id index from the top instead of aggregating MAX over
+    every player. The caller must ensure uniqueness via DB constraints/transactions.
+    """
+    current_year_two_digits = str(datetime.date.today().year % 100).zfill(2)
+    prefix = f"P{current_year_two_digits}"
+
+    if latest_existing_id and latest_existing_id.startswith(prefix):
+        next_seq = int(latest_existing_id[-5:]) + 1
+    else:
+        last = (
+            Player.objects.filter(player_id__startswith=prefix)
+            .order_by("-player_id")
+            .values_list("player_id", flat=True)
+            .first()
+        )
+        next_seq = int(last[-5:]) + 1 if last else 1
+
+    if next_seq > 99999:
+        raise ValueError("Player ID sequence exhausted for the year")
+
+    return f"{prefix}{next_seq:05d}"
+
 def recalc_leaderboard():
     """
     Recalculate leaderboard by aggregating PlayerSportProfile.career_score
@@ -48,3 +83,39 @@ def recalc_leaderboard():
     Leaderboard.objects.all().delete()
     for pid, score in totals_by_player.items():
         Leaderboard.objects.create(player_id=pid, score=int(score))
+
+
+def refresh_leaderboard_players(player_ids):
+    """
+    Recalculate Leaderboard rows for the given players only, using the same
+    career_score total as recalc_leaderboard. Returns the number of rows written.
+    """
+    from django.db import transaction
+    from django.db.models import Sum
+
+    player_ids = set(player_ids)
+    if not player_ids:
+        return 0
+
+    totals = (
+        PlayerSportProfile.objects.filter(player_id__in=player_ids)
+        .values("player_id")
+        .annotate(total=Sum("career_score"))
+        .values_list("player_id", "total")
+    )
+    rows = [Leaderboard(player_id=pid, score=int(total or 0)) for pid, total in totals]
+    with transaction.atomic():
+        Leaderboard.objects.filter(player_id__in=player_ids).delete()
+        Leaderboard.objects.bulk_create(rows)
+    return len(rows)
+
+
+def match_player_ids(match):
+    """Players whose leaderboard entry can change when `match` is finalized."""
+    from .models import Attendance
+
+    team_ids = [match.team1_id, match.team2_id]
+    ids = set(PlayerSportProfile.objects.filter(team_id__in=team_ids).values_list("player_id", flat=True))
+    ids.update(Player.objects.filter(team_id__in=team_ids).values_list("id", flat=True))
+    ids.update(Attendance.objects.filter(match=match).values_list("player_id", flat=True))
+    return ids
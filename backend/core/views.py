@@ -3,7 +3,8 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 import csv
-from io import StringIO
+from io import TextIOWrapper
+from itertools import islice
 from django.db import models
 from django.db import transaction
 
@@ -18,21 +19,34 @@ from .serializers import (
     PromotionRequestCreateSerializer, PromotionRequestSerializer,
     CoachingSessionCreateSerializer, CoachInviteSerializer, PlayerRequestCoachSerializer,
     CoachPlayerLinkRequestSerializer, LeaderboardSerializer, NotificationSerializer,
-    SportSerializer, TeamProposalCreateSerializer, TeamProposalSerializer,
+    SportSerializer, TeamProposalCreateSerializer, TeamProposalSerializer, TeamBalanceSerializer,
     TeamAssignmentRequestCreateSerializer, TeamAssignmentRequestSerializer,
     TournamentCreateSerializer, TournamentSerializer, TournamentTeamSerializer, 
     TournamentMatchCreateSerializer, TournamentMatchSerializer,
     ManagerSportSerializer, PlayerSportProfileSerializer, PlayerSportProfileUpdateSerializer,
+    PlayerSportProfileBulkTeamSerializer,
     CricketMatchStateSerializer, MatchPlayerStatsSerializer, TournamentPointsSerializer,
     CoachSerializer,
 )
-from .permissions import IsAuthenticatedAndPlayer, IsAuthenticatedAndManagerOrAdmin, IsAuthenticatedAndCoach
+from .permissions import (
+    IsAuthenticatedAndPlayer, IsAuthenticatedAndManagerOrAdmin, IsAuthenticatedAndCoach,
+    CanUpdatePlayerSportProfile,
+)
+from .pagination import (
+    NotificationPagination, LeaderboardPagination, TournamentMatchPagination,
+    PlayerSportProfilePagination, PlayerPagination,
+)
 from .promotion_services import (
     request_promotion, approve_promotion, reject_promotion, PromotionError,
     coach_invite_player, player_request_coach, accept_link_request, reject_link_request, LinkError,
     create_team_proposal, approve_team_proposal, reject_team_proposal, TeamProposalError,
     create_team_assignment, accept_team_assignment, reject_team_assignment, TeamAssignmentError,
 )
+from .services.sport_registry import sport_registry
+from .services.sport_stats import build_stats
+from .services.leaderboard_refresh import leaderboard_refresher
+from .services.access import get_access_context
+from .authentication import get_principal
 
 
 class PromotionRequestViewSet(viewsets.GenericViewSet):
@@ -92,7 +106,7 @@ class CoachingSessionViewSet(viewsets.GenericViewSet):
 
     def list(self, request):
         """List sessions for the current coach."""
-        qs = self.get_queryset().filter(coach=request.user.coach).order_by("-session_date")
+        qs = self.get_queryset().filter(coach_id=get_principal(request.user).coach_id).order_by("-session_date")
         serializer = self.get_serializer(qs, many=True)
         return Response(serializer.data)
 
@@ -112,28 +126,27 @@ class CoachingSessionViewSet(viewsets.GenericViewSet):
             session = self.get_queryset().get(pk=pk)
         except CoachingSession.DoesNotExist:
             return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
-        if session.coach_id != request.user.coach.id:
+        if session.coach_id != get_principal(request.user).coach_id:
             return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
 
+        from django.http import StreamingHttpResponse
+        from .services.exports import encode_csv, stream
+
         # Players under this coach for this sport and currently active
-        profiles = PlayerSportProfile.objects.select_related("player").filter(
-            coach=request.user.coach,
+        player_ids = PlayerSportProfile.objects.filter(
+            coach_id=session.coach_id,
             sport=session.sport,
             is_active=True,
             player__is_active=True,
-        )
+        ).values_list("player__player_id", flat=True)
 
-        output = StringIO()
-        writer = csv.writer(output, lineterminator='\n')  # Use Unix line endings for consistency
-        writer.writerow(["player_id", "attended", "score"])  # attended: 0/1, score: 1-10
-        for p in profiles:
-            writer.writerow([p.player.player_id, 0, 0])
-        data = output.getvalue()
-        # Ensure proper CSV format with UTF-8 BOM for Excel compatibility
-        response = Response(data, headers={
-            "Content-Type": "text/csv; charset=utf-8",
-            "Content-Disposition": f'attachment; filename="session_{pk}_template.csv"'
-        })
+        # attended: 0/1, score: 1-10; Unix line endings for consistency
+        rows = ((player_id, 0, 0) for player_id in player_ids.iterator())
+        response = StreamingHttpResponse(
+            stream(encode_csv(["player_id", "attended", "score"], rows)),
+            content_type="text/csv; charset=utf-8",
+        )
+        response["Content-Disposition"] = f'attachment; filename="session_{pk}_template.csv"'
         return response
 
     @action(detail=True, methods=["post"], url_path="upload-csv")
@@ -142,96 +155,70 @@ class CoachingSessionViewSet(viewsets.GenericViewSet):
             session = self.get_queryset().get(pk=pk)
         except CoachingSession.DoesNotExist:
             return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
-        if session.coach_id != request.user.coach.id:
+        if session.coach_id != get_principal(request.user).coach_id:
             return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
 
         file = request.FILES.get("file")
         if not file:
             return Response({"detail": "CSV file required (field name: file)"}, status=status.HTTP_400_BAD_REQUEST)
 
+        from .services.session_import import ImportInProgress, SessionImportError, import_sessions
+
+        # Streamed and committed in chunks; re-uploading after a failure resumes.
+        # Daily/weekly/monthly performance rollups follow from the saves (core/signals.py)
         try:
-            content = file.read().decode("utf-8")
-        except Exception:
-            return Response({"detail": "Invalid file encoding"}, status=status.HTTP_400_BAD_REQUEST)
+            job = import_sessions(session.coach_id, file, session=session)
+        except ImportInProgress as e:
+            return Response({"detail": str(e)}, status=status.HTTP_409_CONFLICT)
+        except SessionImportError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        reader = csv.DictReader(StringIO(content))
-        required_cols = {"player_id", "attended", "score"}
-        if set(reader.fieldnames or []) != required_cols:
-            return Response({"detail": f"CSV must have columns: {', '.join(sorted(required_cols))}"}, status=status.HTTP_400_BAD_REQUEST)
+        data = {"import_id": job.id, "updated": job.rows_updated, "error_count": job.error_count, "errors": job.errors}
+        if job.status == job.Status.FAILED:
+            data["detail"] = job.last_error
+            return Response(data, status=status.HTTP_400_BAD_REQUEST)
+        status_code = status.HTTP_200_OK if not job.error_count else status.HTTP_207_MULTI_STATUS
+        return Response(data, status=status_code)
 
-        # Allowed players: under this coach for this sport and active
-        allowed_player_ids = set(
-            PlayerSportProfile.objects.select_related("player").filter(
-                coach=request.user.coach,
-                sport=session.sport,
-                is_active=True,
-                player__is_active=True,
-            ).values_list("player__player_id", flat=True)
-        )
+    @action(detail=False, methods=["post"], url_path="import")
+    def import_csv(self, request):
+        """
+        Import attendance for several of the coach's sessions from one CSV with
+        a session_id column (e.g. backfilling weeks). end=1 also ends them.
+        """
+        coach_id = get_principal(request.user).coach_id
+        if coach_id is None:
+            return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
 
-        updated = 0
-        errors = []
-        for idx, row in enumerate(reader, start=2):  # header is line 1
-            pid = (row.get("player_id") or "").strip()
-            attended_val = (row.get("attended") or "").strip()
-            score_val = (row.get("score") or "").strip()
+        file = request.FILES.get("file")
+        if not file:
+            return Response({"detail": "CSV file required (field name: file)"}, status=status.HTTP_400_BAD_REQUEST)
 
-            if pid not in allowed_player_ids:
-                errors.append({"row": idx, "player_id": pid, "error": "Player not under this coach/sport or inactive"})
-                continue
-            try:
-                attended = int(attended_val)
-                score = int(score_val)
-            except ValueError:
-                errors.append({"row": idx, "player_id": pid, "error": "attended and score must be integers"})
-                continue
-            # Normalize attendance: anything > 1 is treated as 1
-            if attended > 1:
-                attended = 1
-            elif attended < 0:
-                attended = 0
-            # Normalize score: anything > 10 is treated as 10, allow 0-10
-            if score > 10:
-                score = 10
-            elif score < 0:
-                score = 0
-            if attended not in (0, 1):
-                errors.append({"row": idx, "player_id": pid, "error": "attended must be 0/1"})
-                continue
-            if not (0 <= score <= 10):
-                errors.append({"row": idx, "player_id": pid, "error": "score must be 0-10"})
-                continue
+        from .services.session_import import ImportInProgress, SessionImportError, import_sessions, import_status
 
-            try:
-                player = Player.objects.get(player_id=pid)
-            except Player.DoesNotExist:
-                errors.append({"row": idx, "player_id": pid, "error": "Player not found"})
-                continue
+        end_sessions = str(request.data.get("end", "")).lower() in ("1", "true")
+        try:
+            job = import_sessions(coach_id, file, end_sessions=end_sessions)
+        except ImportInProgress as e:
+            return Response({"detail": str(e)}, status=status.HTTP_409_CONFLICT)
+        except SessionImportError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-            sa, _ = SessionAttendance.objects.get_or_create(session=session, player=player)
-            sa.attended = bool(attended)
-            sa.rating = score if sa.attended else 0
-            sa.save()
-            updated += 1
+        if job.status == job.Status.FAILED:
+            return Response(import_status(job), status=status.HTTP_400_BAD_REQUEST)
+        status_code = status.HTTP_200_OK if not job.error_count else status.HTTP_207_MULTI_STATUS
+        return Response(import_status(job), status=status_code)
 
-            # Update DailyPerformanceScore for the calendar day
-            from .models import DailyPerformanceScore
-            day = session.session_date.date()
-            dps, _ = DailyPerformanceScore.objects.get_or_create(player=player, date=day)
-            # recompute as average of all ratings for this player on this day (across sessions)
-            from django.db.models import Avg
-            avg_score = (
-                SessionAttendance.objects.filter(
-                    player=player,
-                    session__session_date__date=day,
-                    attended=True,
-                ).aggregate(Avg("rating"))["rating__avg"] or 0.0
-            )
-            dps.score = float(avg_score)
-            dps.save(update_fields=["score"])
+    @action(detail=False, methods=["get"], url_path=r"imports/(?P<import_id>\d+)")
+    def import_progress(self, request, import_id=None):
+        """Progress of a CSV import: rows committed so far, errors, status."""
+        from .models import SessionImport
+        from .services.session_import import import_status
 
-        status_code = status.HTTP_200_OK if not errors else status.HTTP_207_MULTI_STATUS
-        return Response({"updated": updated, "errors": errors}, status=status_code)
+        job = SessionImport.objects.filter(pk=import_id, coach_id=get_principal(request.user).coach_id).first()
+        if job is None:
+            return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(import_status(job))
 
     @action(detail=True, methods=["post"], url_path="end-session")
     def end_session(self, request, pk=None):
@@ -241,7 +228,7 @@ class CoachingSessionViewSet(viewsets.GenericViewSet):
         except CoachingSession.DoesNotExist:
             return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
         
-        if session.coach_id != request.user.coach.id:
+        if session.coach_id != get_principal(request.user).coach_id:
             return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
         
         if not session.is_active:
@@ -252,14 +239,15 @@ class CoachingSessionViewSet(viewsets.GenericViewSet):
         if not file:
             return Response({"detail": "CSV file required to end session"}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            content = file.read().decode("utf-8")
-        except Exception:
-            return Response({"detail": "Invalid file encoding"}, status=status.HTTP_400_BAD_REQUEST)
+        from .services.session_import import SessionImportError, read_csv
 
-        reader = csv.DictReader(StringIO(content))
+        # Decoded and parsed as the rows are read, not loaded whole
+        try:
+            fieldnames, rows = read_csv(file)
+        except SessionImportError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         required_cols = {"player_id", "attended", "score"}
-        if set(reader.fieldnames or []) != required_cols:
+        if set(fieldnames) != required_cols:
             return Response({"detail": f"CSV must have columns: {', '.join(sorted(required_cols))}"}, status=status.HTTP_400_BAD_REQUEST)
 
         # Allowed players: under this coach for this sport and active
@@ -277,7 +265,10 @@ class CoachingSessionViewSet(viewsets.GenericViewSet):
         processed_players = []
         
         # Process CSV row by row
-        for idx, row in enumerate(reader, start=2):  # header is line 1
+        for idx, row in enumerate(rows, start=2):  # header is line 1
+            if row is None:
+                errors.append({"row": idx, "player_id": "", "error": "Invalid file encoding"})
+                break
             pid = (row.get("player_id") or "").strip()
             attended_val = (row.get("attended") or "").strip()
             score_val = (row.get("score") or "").strip()
@@ -320,14 +311,14 @@ class CoachingSessionViewSet(viewsets.GenericViewSet):
                 profile = PlayerSportProfile.objects.get(
                     player=player,
                     sport=session.sport,
-                    coach=request.user.coach,
+                    coach_id=get_principal(request.user).coach_id,
                     is_active=True
                 )
             except PlayerSportProfile.DoesNotExist:
                 errors.append({"row": idx, "player_id": pid, "error": "Player profile not found for this sport"})
                 continue
 
-            # Create or update SessionAttendance
+            # Create or update SessionAttendance; performance rollups follow from the save
             sa, created = SessionAttendance.objects.get_or_create(
                 session=session,
                 player=player,
@@ -355,21 +346,6 @@ class CoachingSessionViewSet(viewsets.GenericViewSet):
                 "score": score if attended else 0
             })
             updated += 1
-
-            # Update DailyPerformanceScore for the calendar day
-            from .models import DailyPerformanceScore
-            day = session.session_date.date()
-            dps, _ = DailyPerformanceScore.objects.get_or_create(player=player, date=day)
-            from django.db.models import Avg
-            avg_score = (
-                SessionAttendance.objects.filter(
-                    player=player,
-                    session__session_date__date=day,
-                    attended=True,
-                ).aggregate(Avg("rating"))["rating__avg"] or 0.0
-            )
-            dps.score = float(avg_score)
-            dps.save(update_fields=["score"])
         
         if errors:
             return Response({
@@ -460,10 +436,10 @@ class CoachPlayerLinkViewSet(viewsets.GenericViewSet):
             # Allow admin or the appropriate party
             if request.user.role != User.Roles.ADMIN:
                 if link.direction == CoachPlayerLinkRequest.Direction.COACH_TO_PLAYER:
-                    if not hasattr(request.user, "player") or request.user.player.id != link.player.id:
+                    if get_principal(request.user).player_id != link.player_id:
                         return Response({"detail": "Only the invited player or admin can accept"}, status=status.HTTP_403_FORBIDDEN)
                 else:
-                    if not hasattr(request.user, "coach") or request.user.coach.id != link.coach.id:
+                    if get_principal(request.user).coach_id != link.coach_id:
                         return Response({"detail": "Only the invited coach or admin can accept"}, status=status.HTTP_403_FORBIDDEN)
             psp = accept_link_request(link, acting_user=request.user)
         except CoachPlayerLinkRequest.DoesNotExist:
@@ -495,10 +471,22 @@ class LeaderboardViewSet(viewsets.GenericViewSet):
 
 class NotificationViewSet(viewsets.GenericViewSet):
     permission_classes = [IsAuthenticated]
+    pagination_class = NotificationPagination
+
+    # Any of these opts a client into keyset pages ({next, results})
+    PAGINATION_PARAMS = ("cursor", "page_size", "count")
 
     def list(self, request):
-        qs = Notification.objects.filter(user=request.user).order_by("-created_at")
-        return Response(NotificationSerializer(qs, many=True).data)
+        """
+        The user's notifications, newest first. Dashboards still call this
+        without parameters and get the bare list; with ?cursor=, ?page_size=
+        or ?count= it returns keyset pages.
+        """
+        qs = Notification.objects.filter(user=request.user).order_by("-created_at", "-id")
+        if not any(name in request.query_params for name in self.PAGINATION_PARAMS):
+            return Response(NotificationSerializer(qs, many=True).data)
+        page = self.paginate_queryset(qs)
+        return self.get_paginated_response(NotificationSerializer(page, many=True).data)
 
     @action(detail=True, methods=["post"], url_path="mark-read")
     def mark_read(self, request, pk=None):
@@ -512,6 +500,66 @@ class NotificationViewSet(viewsets.GenericViewSet):
             n.save(update_fields=["read_at"])
         return Response({"detail": "OK"})
 
+
+# ------------------ NOTIFICATION STREAM ------------------
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from .services.notification_stream import notification_broker
+
+
+def _authenticate_stream_request(request):
+    """Run the configured DRF authenticators against a plain Django request."""
+    drf_request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+    try:
+        user = drf_request.user
+    except exceptions.APIException:
+        # Expired or malformed credentials are treated like none at all
+        return None
+    return user if user and user.is_authenticated else None
+
+
+def _notifications_since(user_id, since, limit):
+    notification_broker.prime()
+    qs = Notification.objects.filter(user_id=user_id, id__gt=since).order_by("id")[:limit]
+    return NotificationSerializer(qs, many=True).data
+
+
+async def notification_stream(request):
+    """
+    Long-poll for new notifications: GET /api/notifications/stream/?since=<last id seen>.
+    Holds the connection until a notification newer than `since` is written for the
+    user (or the timeout passes) and returns only the delta plus the next cursor.
+    Waiting is done on the in-process broker, so idle clients cost no DB queries;
+    notifications written by other processes arrive within the broker's poll interval.
+    """
+    if request.method != "GET":
+        return JsonResponse({"detail": "Method not allowed"}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    user = await sync_to_async(_authenticate_stream_request)(request)
+    if user is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=status.HTTP_401_UNAUTHORIZED)
+
+    max_timeout = settings.NOTIFICATION_STREAM_TIMEOUT
+    try:
+        since = int(request.GET.get("since", 0))
+        timeout = min(float(request.GET.get("timeout", max_timeout)), max_timeout)
+    except ValueError:
+        return JsonResponse({"detail": "since and timeout must be numbers"}, status=status.HTTP_400_BAD_REQUEST)
+
+    limit = settings.NOTIFICATION_STREAM_BATCH_SIZE
+    results = await sync_to_async(_notifications_since)(user.id, since, limit)
+    if not results and timeout > 0:
+        if await notification_broker.wait(user.id, since, timeout):
+            results = await sync_to_async(_notifications_since)(user.id, since, limit)
+
+    cursor = results[-1]["id"] if results else since
+    return JsonResponse({"results": results, "cursor": cursor})
+
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.permissions import (
@@ -553,25 +601,60 @@ from .models import  Coach
 
 
 from .services.model_service import predict_player_start_from_features
-from ai_an.services.gemini_client import gemini_summarize_player
 
 
 #------------------Authentication View------------------
 class CustomObtainAuthToken(ObtainAuthToken):
     def post(self, request, *args, **kwargs):
-        response = super().post(request, *args, **kwargs)
-        token = Token.objects.get(key=response.data['token'])
-        user = token.user
-        return Response({
-            'token': token.key,
-            'user_id': user.id,
-            'username': user.username,
-            'email': user.email,
-            'is_staff': user.is_staff,
-            'is_superuser': user.is_superuser,
-            'role': user.role,   # from our new column
-        })
-        
+        from .services.login import login_payload
+
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        user = serializer.validated_data['user']
+        token, _ = Token.objects.get_or_create(user=user)
+        return Response({'token': token.key, **login_payload(user)})
+
+
+@csrf_exempt
+async def login_async(request):
+    """
+    Token login for ASGI deployments: POST auth/login/async/ with username and
+    password (JSON or form). Same response as auth/login/, but the password
+    check is awaited on the hash pool so the event loop keeps serving other
+    requests while a burst of logins is hashed.
+    """
+    import json
+    from django.contrib.auth import aauthenticate
+    from .services.login import login_payload
+
+    if request.method != "POST":
+        return JsonResponse({"detail": "Method not allowed"}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
+    if request.content_type == "application/json":
+        try:
+            data = json.loads(request.body or b"{}")
+        except ValueError:
+            return JsonResponse({"detail": "Invalid JSON"}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        data = request.POST
+    username, password = data.get("username"), data.get("password")
+    if not username or not password:
+        return JsonResponse(
+            {"non_field_errors": ['Must include "username" and "password".']}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    user = await aauthenticate(request, username=username, password=password)
+    if user is None:
+        return JsonResponse(
+            {"non_field_errors": ["Unable to log in with provided credentials."]}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    def _issue():
+        token, _ = Token.objects.get_or_create(user=user)
+        return {"token": token.key, **login_payload(user)}
+
+    return JsonResponse(await sync_to_async(_issue)())
+
+
 #-------------------Role Based Access Control Decorator------------------
 class RoleAwareProfileView(APIView):
     permission_classes = [IsAuthenticated]
@@ -656,7 +739,9 @@ class TeamViewSet(viewsets.ModelViewSet):
         if user.role == User.Roles.MANAGER:
             qs = qs.filter(manager=user)
         elif user.role == User.Roles.COACH:
-            qs = qs.filter(coach__user=user)
+            coach_id = get_access_context(user).coach_id
+            # filter(coach_id=None) would match every coachless team
+            qs = qs.filter(coach_id=coach_id) if coach_id is not None else qs.none()
         return qs
 
 # ------------------ PLAYER ------------------
@@ -667,6 +752,7 @@ class PlayerViewSet(viewsets.ModelViewSet):
     queryset = Player.objects.all()
     permission_classes = [IsAuthenticatedOrReadOnly]
     serializer_class = PlayerSerializer
+    pagination_class = PlayerPagination
     # Enable filtering and ordering
     filterset_fields = ["team__id", "coach__id"]
     ordering_fields = ["joined_at"]
@@ -689,8 +775,9 @@ class MatchViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated])
     def finalize(self, request, pk=None):
         """
-        Finalize match (set is_completed=True and update scores).
-        Also updates the leaderboard.
+        Finalize match (set is_completed=True and update scores) and rate it.
+        The leaderboard refresh for the match's players is queued and
+        coalesced with other finalizations (see leaderboard/refresh-status/).
         """
         match = self.get_object()
         score1 = request.data.get("score_team1")
@@ -705,9 +792,13 @@ class MatchViewSet(viewsets.ModelViewSet):
         match.is_completed = True
         match.save()
 
-        # Update leaderboard
-        from .utils import recalc_leaderboard
-        recalc_leaderboard()
+        from .services.ratings import record_friendly_match
+        record_friendly_match(match)
+
+        # Queue a leaderboard refresh for the affected players only
+        from .utils import match_player_ids
+        player_ids = match_player_ids(match)
+        transaction.on_commit(lambda: leaderboard_refresher.enqueue(player_ids))
 
         return Response(MatchSerializer(match).data)
 
@@ -725,9 +816,82 @@ class AttendanceViewSet(viewsets.ModelViewSet):
 
 # ------------------ LEADERBOARD ------------------
 class LeaderboardViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = Leaderboard.objects.all().order_by("-score")
+    queryset = Leaderboard.objects.select_related("player__user").order_by("-score")
     serializer_class = LeaderboardSerializer
     permission_classes = [AllowAny]
+    pagination_class = LeaderboardPagination
+
+    SCOPE_PARAMS = ("sport", "college", "team", "window", "around")
+    MAX_RADIUS = 50
+
+    def _board(self, request):
+        from .services.leaderboards import board
+
+        params = request.query_params
+        for name in ("sport", "team"):
+            if params.get(name) and not params[name].isdigit():
+                raise ValueError(f"{name} must be an integer")
+        return board(
+            sport_id=params.get("sport") or None,
+            college=params.get("college") or None,
+            team_id=params.get("team") or None,
+            window=params.get("window") or None,
+        )
+
+    def _int(self, request, name, default, minimum, maximum):
+        value = request.query_params.get(name, default)
+        if not str(value).isdigit() or int(value) < minimum:
+            raise ValueError(f"{name} must be an integer of at least {minimum}")
+        return min(int(value), maximum)
+
+    def list(self, request, *args, **kwargs):
+        """
+        Global board by default, in numbered pages (keyset pages with ?cursor=). Scoped by ?sport=, ?college=,
+        ?team= and ?window=7|30|season, it returns ranked ?offset=/?limit= pages;
+        ?around=<player_id>&radius=k returns that player's rank and neighbours.
+        """
+        from .services.leaderboards import LeaderboardError, around, top
+
+        params = request.query_params
+        if not any(params.get(name) for name in self.SCOPE_PARAMS):
+            return super().list(request, *args, **kwargs)
+        try:
+            rows = self._board(request)
+            if params.get("around"):
+                radius = self._int(request, "radius", 5, 0, self.MAX_RADIUS)
+                player = Player.objects.filter(player_id=params["around"]).values_list("pk", flat=True).first()
+                result = around(rows, player, radius) if player else None
+                if result is None:
+                    return Response({"detail": "Player not on this leaderboard"}, status=status.HTTP_404_NOT_FOUND)
+                return Response(result)
+            offset = self._int(request, "offset", 0, 0, 10 ** 9)
+            limit = self._int(request, "limit", 50, 1, settings.MAX_PAGE_SIZE)
+        except (ValueError, LeaderboardError) as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"offset": offset, "results": top(rows, offset, limit)})
+
+    @action(detail=False, methods=["get"], url_path="me", permission_classes=[IsAuthenticated])
+    def me(self, request):
+        """The requesting player's rank and ?radius= neighbours on the board the scope params select."""
+        from .services.leaderboards import LeaderboardError, around
+
+        player_id = get_principal(request.user).player_id
+        if player_id is None:
+            return Response({"detail": "Only players are on leaderboards"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            rows = self._board(request)
+            radius = self._int(request, "radius", 5, 0, self.MAX_RADIUS)
+        except (ValueError, LeaderboardError) as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        result = around(rows, player_id, radius)
+        if result is None:
+            return Response({"detail": "You are not on this leaderboard"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(result)
+
+    @action(detail=False, methods=["get"], url_path="refresh-status", permission_classes=[IsAuthenticated])
+    def refresh_status(self, request):
+        """Pending, running and last leaderboard refresh jobs (run_worker runs them)."""
+        return Response(leaderboard_refresher.status())
 
 
 # ------------------ AI ENDPOINTS ------------------
@@ -753,8 +917,11 @@ def predict_player_start(request):
 @permission_classes([IsAuthenticatedOrReadOnly])
 def player_insight(request):
     """
-    Generate AI-based player performance insights using Gemini API.
+    Queue an AI-based player performance insight (Gemini). Returns 202 with a
+    job_id; the answer appears at /api/jobs/<job_id>/ once run_worker has run it.
     """
+    from .services.jobs import enqueue
+
     player_id = request.data.get("player_id")
     context = request.data.get("context", "")
 
@@ -783,8 +950,33 @@ def player_insight(request):
     Additional Context: {context}
     """
 
-    answer = gemini_summarize_player(prompt)
-    return Response({"insight": answer})
+    job = enqueue("ai.player_insight", {"prompt": prompt, "requested_by": request.user.id})
+    return Response({"job_id": job.id, "status": job.status}, status=status.HTTP_202_ACCEPTED)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def job_status(request, job_id):
+    """
+    Status of a background job: admins see any job, other users only the jobs
+    they queued. `result` is set once the job has succeeded.
+    """
+    from .models import Job
+
+    job = Job.objects.filter(pk=job_id).first()
+    if job is None or (
+        request.user.role != User.Roles.ADMIN and (job.payload or {}).get("requested_by") != request.user.id
+    ):
+        return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+    return Response({
+        "id": job.id,
+        "name": job.name,
+        "status": job.status,
+        "attempts": job.attempts,
+        "result": job.result,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    })
 
 
 # ------------------ USER MANAGEMENT ------------------
@@ -818,6 +1010,49 @@ def register_user(request):
         }, status=status.HTTP_201_CREATED)
 
 
+@api_view(["POST"])
+@permission_classes([IsAuthenticatedAndManagerOrAdmin])
+def bulk_register_users(request):
+    """
+    Onboard a roster from CSV (field name: file). Columns: username, email,
+    role, sport, college, password; only username is required (role defaults
+    to player). Managers may only add players for sports they manage. Nothing
+    is created unless every row is valid.
+    """
+    from .services.registration import register_users_bulk, RegistrationError, RegistrationForbidden
+
+    file = request.FILES.get("file")
+    if not file:
+        return Response({"detail": "CSV file required (field name: file)"}, status=status.HTTP_400_BAD_REQUEST)
+    limit = settings.BULK_REGISTRATION_MAX_ROWS
+    try:
+        # Parse while streaming and stop one row past the cap
+        rows = list(islice(csv.DictReader(TextIOWrapper(file, encoding="utf-8-sig")), limit + 1))
+    except (UnicodeDecodeError, csv.Error):
+        return Response({"detail": "Invalid file encoding"}, status=status.HTTP_400_BAD_REQUEST)
+
+    if not rows or "username" not in rows[0]:
+        return Response({"detail": "CSV must have a header row with at least a username column"}, status=status.HTTP_400_BAD_REQUEST)
+    if len(rows) > limit:
+        return Response({"detail": f"At most {limit} rows per upload"}, status=status.HTTP_400_BAD_REQUEST)
+
+    allowed_sport_ids = None
+    if request.user.role == User.Roles.MANAGER:
+        allowed_sport_ids = get_access_context(request.user).managed_sport_ids
+
+    try:
+        user_ids = register_users_bulk(
+            rows,
+            default_password=request.data.get("default_password") or None,
+            allowed_sport_ids=allowed_sport_ids,
+        )
+    except RegistrationForbidden as e:
+        return Response({"detail": str(e), "errors": e.errors}, status=status.HTTP_403_FORBIDDEN)
+    except RegistrationError as e:
+        return Response({"detail": str(e), "errors": e.errors}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({"created": len(user_ids), "user_ids": user_ids}, status=status.HTTP_201_CREATED)
+
+
 # ------------------ PROFILE VIEWS ------------------
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
@@ -876,8 +1111,9 @@ def player_dashboard(request):
     achievements = Achievement.objects.filter(player=player).order_by("-date_awarded")[:10]
 
     # Build per-sport stats and ranks
+    stats_blocks = build_stats(profiles, with_ranks=True)
+
     def get_stats_and_rank(profile):
-        sport_name = (profile.sport.name if profile.sport else "").lower()
         payload = {
             "sport": profile.sport.name if profile.sport else None,
             "sport_type": getattr(profile.sport, "sport_type", None) if profile.sport else None,
@@ -892,113 +1128,11 @@ def player_dashboard(request):
             "performance": {"series": []},
             "attendance": {"total_sessions": 0, "attended": 0},
         }
-        # Collect stats and compute ranks
-        if sport_name == "cricket":
-            st = getattr(profile, "cricket_stats", None)
-            st = st.first() if hasattr(st, "first") else None
-            if st:
-                payload["stats"] = {
-                    "runs": st.runs,
-                    "wickets": st.wickets,
-                    "average": st.average,
-                    "strike_rate": st.strike_rate,
-                    "matches_played": st.matches_played,
-                }
-                # Ranks (higher better)
-                all_stats = []
-                for p in PlayerSportProfile.objects.filter(sport__name__iexact="Cricket"):
-                    s = getattr(p, "cricket_stats", None)
-                    s = s.first() if hasattr(s, "first") else None
-                    if s:
-                        all_stats.append({"profile_id": p.id, "runs": s.runs, "wickets": s.wickets, "average": s.average, "strike_rate": s.strike_rate})
-                def rank(metric, reverse=True):
-                    arr = sorted(all_stats, key=lambda x: x.get(metric) or 0, reverse=reverse)
-                    positions = {x["profile_id"]: i+1 for i, x in enumerate(arr)}
-                    return positions.get(profile.id)
-                payload["ranks"] = {
-                    "runs": rank("runs", True),
-                    "wickets": rank("wickets", True),
-                    "average": rank("average", True),
-                    "strike_rate": rank("strike_rate", True),
-                    "total_players": len(all_stats),
-                }
-        elif sport_name == "football":
-            st = getattr(profile, "football_stats", None)
-            st = st.first() if hasattr(st, "first") else None
-            if st:
-                payload["stats"] = {
-                    "goals": st.goals,
-                    "assists": st.assists,
-                    "tackles": st.tackles,
-                    "matches_played": st.matches_played,
-                }
-                all_stats = []
-                for p in PlayerSportProfile.objects.filter(sport__name__iexact="Football"):
-                    s = getattr(p, "football_stats", None)
-                    s = s.first() if hasattr(s, "first") else None
-                    if s:
-                        all_stats.append({"profile_id": p.id, "goals": s.goals, "assists": s.assists, "tackles": s.tackles})
-                def rank(metric, reverse=True):
-                    arr = sorted(all_stats, key=lambda x: x.get(metric) or 0, reverse=reverse)
-                    positions = {x["profile_id"]: i+1 for i, x in enumerate(arr)}
-                    return positions.get(profile.id)
-                payload["ranks"] = {
-                    "goals": rank("goals", True),
-                    "assists": rank("assists", True),
-                    "tackles": rank("tackles", True),
-                    "total_players": len(all_stats),
-                }
-        elif sport_name == "basketball":
-            st = getattr(profile, "basketball_stats", None)
-            st = st.first() if hasattr(st, "first") else None
-            if st:
-                payload["stats"] = {
-                    "points": st.points,
-                    "rebounds": st.rebounds,
-                    "assists": st.assists,
-                    "matches_played": st.matches_played,
-                }
-                all_stats = []
-                for p in PlayerSportProfile.objects.filter(sport__name__iexact="Basketball"):
-                    s = getattr(p, "basketball_stats", None)
-                    s = s.first() if hasattr(s, "first") else None
-                    if s:
-                        all_stats.append({"profile_id": p.id, "points": s.points, "rebounds": s.rebounds, "assists": s.assists})
-                def rank(metric, reverse=True):
-                    arr = sorted(all_stats, key=lambda x: x.get(metric) or 0, reverse=reverse)
-                    positions = {x["profile_id"]: i+1 for i, x in enumerate(arr)}
-                    return positions.get(profile.id)
-                payload["ranks"] = {
-                    "points": rank("points", True),
-                    "rebounds": rank("rebounds", True),
-                    "assists": rank("assists", True),
-                    "total_players": len(all_stats),
-                }
-        elif sport_name == "running":
-            st = getattr(profile, "running_stats", None)
-            st = st.first() if hasattr(st, "first") else None
-            if st:
-                payload["stats"] = {
-                    "total_distance_km": st.total_distance_km,
-                    "best_time_seconds": st.best_time_seconds,
-                    "events_participated": st.events_participated,
-                    "matches_played": st.matches_played,
-                }
-                all_stats = []
-                for p in PlayerSportProfile.objects.filter(sport__name__iexact="Running"):
-                    s = getattr(p, "running_stats", None)
-                    s = s.first() if hasattr(s, "first") else None
-                    if s:
-                        all_stats.append({"profile_id": p.id, "total_distance_km": s.total_distance_km, "best_time_seconds": s.best_time_seconds})
-                def rank(metric, reverse=True):
-                    arr = sorted(all_stats, key=lambda x: x.get(metric) or 0, reverse=reverse)
-                    positions = {x["profile_id"]: i+1 for i, x in enumerate(arr)}
-                    return positions.get(profile.id)
-                payload["ranks"] = {
-                    "total_distance_km": rank("total_distance_km", True),
-                    "best_time_seconds": rank("best_time_seconds", False),
-                    "total_players": len(all_stats),
-                }
+        # Stats and ranks come from the shared stats engine (one query per sport)
+        block = stats_blocks.get(profile.id)
+        if block:
+            payload["stats"] = block["stats"]
+            payload["ranks"] = block["ranks"]
         # Achievements filtered by sport
         from .models import Achievement as Ach
         sport_obj = profile.sport
@@ -1040,7 +1174,7 @@ def player_dashboard(request):
     profile_blocks = [get_stats_and_rank(p) for p in profiles]
 
     # Available sports and inferred primary sport
-    all_sports = list(Sport.objects.values("id", "name", "sport_type"))
+    all_sports = [{"id": e.id, "name": e.name, "sport_type": e.sport_type} for e in sport_registry.all()]
     primary_profile = profiles.order_by("joined_date").first() if hasattr(profiles, "order_by") else (profiles[0] if profiles else None)
     primary_sport = primary_profile.sport.name if primary_profile and primary_profile.sport else None
 
@@ -1077,6 +1211,8 @@ def coach_dashboard(request):
         is_active=True
     ).select_related("player__user", "sport", "team").prefetch_related("player__achievements")
     
+    stats_blocks = build_stats(student_profiles)
+
     # Group players by player (since a player can have multiple profiles for different sports)
     players_dict = {}
     for profile in student_profiles:
@@ -1112,45 +1248,9 @@ def coach_dashboard(request):
         }
         
         # Add sport-specific stats if available
-        if profile.sport:
-            sport_name = profile.sport.name.lower()
-            if sport_name == "cricket":
-                cricket_stats = profile.cricket_stats.first()
-                if cricket_stats:
-                    profile_data["stats"] = {
-                        "runs": cricket_stats.runs,
-                        "wickets": cricket_stats.wickets,
-                        "matches_played": cricket_stats.matches_played,
-                        "strike_rate": cricket_stats.strike_rate,
-                        "average": cricket_stats.average,
-                    }
-            elif sport_name == "football":
-                football_stats = profile.football_stats.first()
-                if football_stats:
-                    profile_data["stats"] = {
-                        "goals": football_stats.goals,
-                        "assists": football_stats.assists,
-                        "tackles": football_stats.tackles,
-                        "matches_played": football_stats.matches_played,
-                    }
-            elif sport_name == "basketball":
-                basketball_stats = profile.basketball_stats.first()
-                if basketball_stats:
-                    profile_data["stats"] = {
-                        "points": basketball_stats.points,
-                        "rebounds": basketball_stats.rebounds,
-                        "assists": basketball_stats.assists,
-                        "matches_played": basketball_stats.matches_played,
-                    }
-            elif sport_name == "running":
-                running_stats = profile.running_stats.first()
-                if running_stats:
-                    profile_data["stats"] = {
-                        "total_distance_km": running_stats.total_distance_km,
-                        "best_time_seconds": running_stats.best_time_seconds,
-                        "events_participated": running_stats.events_participated,
-                        "matches_played": running_stats.matches_played,
-                    }
+        block = stats_blocks.get(profile.id)
+        if block:
+            profile_data["stats"] = block["stats"]
         
         players_dict[player.id]["profiles"].append(profile_data)
     
@@ -1164,6 +1264,103 @@ def coach_dashboard(request):
     })
 
 
+# ------------------ PERFORMANCE SERIES ------------------
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def performance_series(request):
+    """
+    GET /api/performance/series/?player=P2500001,P2500002&granularity=week&start=2025-01-01&end=2025-06-30&fill=1
+
+    Average session rating per period, read from the daily/weekly/monthly
+    rollups (quarter and year regroup the monthly rows). Players see their own
+    series, coaches their students', managers and admins anyone's. Defaults:
+    the caller's own player, weekly, the last 365 days.
+    """
+    import datetime
+    from .services.performance_rollups import series, RollupError
+
+    params = request.query_params
+    try:
+        end = datetime.date.fromisoformat(params["end"]) if params.get("end") else timezone.now().date()
+        start = (
+            datetime.date.fromisoformat(params["start"]) if params.get("start")
+            else end - datetime.timedelta(days=365)
+        )
+    except ValueError:
+        return Response({"detail": "start and end must be YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+
+    principal = get_principal(request.user)
+    codes = [c.strip() for c in (params.get("player") or "").split(",") if c.strip()]
+    if codes:
+        players = dict(Player.objects.filter(player_id__in=codes).values_list("id", "player_id"))
+        missing = sorted(set(codes) - set(players.values()))
+        if missing:
+            return Response({"detail": f"Unknown player(s): {', '.join(missing)}"}, status=status.HTTP_404_NOT_FOUND)
+    elif principal.player_id:
+        players = dict(Player.objects.filter(id=principal.player_id).values_list("id", "player_id"))
+    else:
+        return Response({"detail": "player is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+    if principal.role not in (User.Roles.MANAGER, User.Roles.ADMIN):
+        allowed = (
+            get_access_context(request.user).student_player_ids if principal.role == User.Roles.COACH
+            else {principal.player_id}
+        )
+        if not set(players) <= set(allowed):
+            return Response({"detail": "Forbidden"}, status=status.HTTP_403_FORBIDDEN)
+
+    try:
+        data = series(
+            list(players), params.get("granularity", "week"), start, end,
+            fill=params.get("fill") in ("1", "true", "yes"),
+        )
+    except RollupError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response({
+        "granularity": params.get("granularity", "week"),
+        "start": start,
+        "end": end,
+        "series": [{"player_id": players[pk], "points": points} for pk, points in data.items()],
+    })
+
+
+# ------------------ EXPORTS ------------------
+@api_view(["GET"])
+@permission_classes([IsAuthenticatedAndManagerOrAdmin])
+def export_data(request, dataset, fmt, gz=None):
+    """
+    Stream a dataset as CSV or NDJSON, optionally gzip-compressed:
+
+        GET /api/exports/players.csv?sport=cricket&active=1
+        GET /api/exports/attendance.ndjson.gz?start=2025-01-01&end=2025-12-31&coach=C2500001
+        GET /api/exports/match-stats.csv?tournament=<id>
+        GET /api/exports/points.csv?tournament=<id>
+
+    Rows are read with a chunked iterator and written as they are produced,
+    so memory stays flat however large the export. Managers only get rows
+    for the sports they manage.
+    """
+    from django.http import StreamingHttpResponse
+    from .services.exports import build_export, stream, ENCODERS, FORMATS, ExportError
+
+    sport_ids = None
+    if request.user.role == User.Roles.MANAGER:
+        sport_ids = get_access_context(request.user).managed_sport_ids
+    try:
+        columns, rows = build_export(dataset, request.query_params, sport_ids=sport_ids)
+    except ExportError as e:
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    filename = f"{dataset}-{timezone.now():%Y%m%d-%H%M%S}.{fmt}" + (".gz" if gz else "")
+    response = StreamingHttpResponse(
+        stream(ENCODERS[fmt](columns, rows), compress=bool(gz)),
+        content_type="application/gzip" if gz else FORMATS[fmt],
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
 # -----------------------------
 # Sport CRUD ViewSet
 # -----------------------------
@@ -1200,7 +1397,7 @@ class TeamProposalViewSet(viewsets.GenericViewSet):
     permission_classes = [IsAuthenticated]
 
     def get_permissions(self):
-        if self.action in {"create"}:
+        if self.action in {"create", "balance"}:
             return [IsAuthenticatedAndCoach()]
         if self.action in {"approve", "reject", "list"}:
             return [IsAuthenticatedAndManagerOrAdmin()]
@@ -1222,6 +1419,48 @@ class TeamProposalViewSet(viewsets.GenericViewSet):
         except TeamProposalError as e:
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=["post"], url_path="balance")
+    def balance(self, request):
+        """
+        Coach splits unassigned students into balanced teams (strength from
+        career score and stats, cricket roles spread evenly) under size and
+        together/apart constraints. With "submit": true each team is proposed
+        to the manager as "<team_name_prefix> <n>", all or none.
+        """
+        from .services.team_balance import BalanceError, balance, load_pool
+
+        serializer = TeamBalanceSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        try:
+            pool = load_pool(data["coach"], data["sport"].id, data.get("player_ids"))
+            result = balance(
+                pool, data["team_count"], team_size=data.get("team_size"),
+                together=data["together"], apart=data["apart"], min_roles=data["min_roles"],
+            )
+        except BalanceError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if not data["submit"]:
+            return Response(result)
+
+        players = Player.objects.in_bulk([p["player"] for team in result["teams"] for p in team["players"]])
+        try:
+            with transaction.atomic():
+                proposals = [
+                    create_team_proposal(
+                        coach=data["coach"],
+                        manager=data["manager"],
+                        sport=data["sport"],
+                        team_name=f"{data['team_name_prefix']} {team['index']}",
+                        players=[players[p["player"]] for p in team["players"]],
+                    )
+                    for team in result["teams"]
+                ]
+        except TeamProposalError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        result["proposals"] = TeamProposalSerializer(proposals, many=True).data
+        return Response(result, status=status.HTTP_201_CREATED)
+
     def list(self, request):
         """List team proposals (coach sees their own, manager sees their own, admin sees all)."""
         qs = self.get_queryset().order_by("-created_at")
@@ -1246,7 +1485,10 @@ class TeamProposalViewSet(viewsets.GenericViewSet):
         except TeamProposal.DoesNotExist:
             return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
         except TeamProposalError as e:
-            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            payload = {"detail": str(e)}
+            if e.conflicts:
+                payload["conflicts"] = e.conflicts
+            return Response(payload, status=status.HTTP_400_BAD_REQUEST)
         return Response({"detail": "Approved", "team_id": team.id})
 
     @action(detail=True, methods=["post"], url_path="reject")
@@ -1316,7 +1558,7 @@ class TeamAssignmentRequestViewSet(viewsets.GenericViewSet):
             assignment = self.get_queryset().get(pk=pk)
             # Allow admin or assigned coach
             if request.user.role != User.Roles.ADMIN:
-                if not hasattr(request.user, "coach") or request.user.coach_id != assignment.coach_id:
+                if get_principal(request.user).coach_id != assignment.coach_id:
                     return Response({"detail": "Only the assigned coach or admin can accept"}, status=status.HTTP_403_FORBIDDEN)
             team = accept_team_assignment(assignment, decided_by=request.user)
         except TeamAssignmentRequest.DoesNotExist:
@@ -1333,7 +1575,7 @@ class TeamAssignmentRequestViewSet(viewsets.GenericViewSet):
             assignment = self.get_queryset().get(pk=pk)
             # Allow admin or assigned coach
             if request.user.role != User.Roles.ADMIN:
-                if not hasattr(request.user, "coach") or request.user.coach.id != assignment.coach.id:
+                if get_principal(request.user).coach_id != assignment.coach_id:
                     return Response({"detail": "Only the assigned coach or admin can reject"}, status=status.HTTP_403_FORBIDDEN)
             reject_team_assignment(assignment, decided_by=request.user, remarks=remarks)
         except TeamAssignmentRequest.DoesNotExist:
@@ -1365,6 +1607,59 @@ class TournamentViewSet(viewsets.GenericViewSet):
             qs = qs.filter(manager=request.user)
         return Response(TournamentSerializer(qs, many=True).data)
 
+    @action(detail=True, methods=["get"], url_path="live")
+    def live(self, request, pk=None):
+        """
+        Compact live state of all in-progress matches: score, over.ball,
+        striker, bowler and the last balls. Honours If-None-Match; ?since=<as_of>
+        returns only matches changed after that time.
+        """
+        from django.utils.dateparse import parse_datetime
+        from .services.live_scores import etag, live_matches
+
+        if not Tournament.objects.filter(pk=pk).exists():
+            return Response({"detail": "Tournament not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        since = None
+        if request.query_params.get("since"):
+            since = parse_datetime(request.query_params["since"])
+            if since is None:
+                return Response({"detail": "since must be an ISO 8601 datetime"}, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        data = live_matches(int(pk), since=since)
+        tag = etag(data)
+        if tag in [value.strip() for value in request.headers.get("If-None-Match", "").split(",")]:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data)
+        response["ETag"] = tag
+        return response
+
+    @action(detail=True, methods=["get"], url_path="qualification")
+    def qualification(self, request, pk=None):
+        """
+        Each team's chance of finishing in the top ?top= places (default 4) and
+        in every place, from the points table and remaining fixtures simulated
+        ?runs= times. Cached until a match is completed or cancelled.
+        """
+        from .services.qualification import SimulationError, qualification
+
+        try:
+            tournament = self.get_queryset().get(pk=pk)
+        except Tournament.DoesNotExist:
+            return Response({"detail": "Tournament not found"}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            top = int(request.query_params.get("top", 4))
+            runs = int(request.query_params["runs"]) if request.query_params.get("runs") else None
+        except ValueError:
+            return Response({"detail": "top and runs must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            return Response(qualification(tournament, top=top, runs=runs))
+        except SimulationError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
     @action(detail=True, methods=["post"], url_path="add-team")
     def add_team(self, request, pk=None):
         """Add team to tournament."""
@@ -1379,6 +1674,8 @@ class TournamentViewSet(viewsets.GenericViewSet):
             tt, created = TournamentTeam.objects.get_or_create(tournament=tournament, team=team)
             if not created:
                 return Response({"detail": "Team already in tournament"}, status=status.HTTP_400_BAD_REQUEST)
+            from .services.qualification import invalidate
+            invalidate(tournament.pk)
             return Response(TournamentTeamSerializer(tt).data, status=status.HTTP_201_CREATED)
         except Tournament.DoesNotExist:
             return Response({"detail": "Tournament not found"}, status=status.HTTP_404_NOT_FOUND)
@@ -1404,7 +1701,7 @@ class TournamentViewSet(viewsets.GenericViewSet):
                 return Response({"detail": "Tournament can only be started from upcoming status"}, status=status.HTTP_400_BAD_REQUEST)
             
             # Check if cricket, show not implemented for other sports
-            if tournament.sport.name.lower() != "cricket":
+            if not sport_registry.is_match_managed(tournament.sport_id):
                 return Response({"detail": "Tournament management not implemented for this sport. Only cricket is supported."}, status=status.HTTP_400_BAD_REQUEST)
             
             tournament.status = Tournament.Status.ONGOING
@@ -1561,6 +1858,7 @@ class TournamentViewSet(viewsets.GenericViewSet):
 class TournamentMatchViewSet(viewsets.ModelViewSet):
     queryset = TournamentMatch.objects.select_related("tournament", "team1", "team2", "man_of_the_match__user")
     permission_classes = [IsAuthenticatedAndManagerOrAdmin]
+    pagination_class = TournamentMatchPagination
     
     def get_serializer_class(self):
         if self.action in ("create", "update", "partial_update"):
@@ -1578,6 +1876,8 @@ class TournamentMatchViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         """Create match and optionally create achievements on completion."""
         match = serializer.save()
+        from .services.qualification import invalidate
+        invalidate(match.tournament_id)
         # If match is completed, could trigger achievement creation here
         # For now, we'll handle it in the update action
         return match
@@ -1585,6 +1885,8 @@ class TournamentMatchViewSet(viewsets.ModelViewSet):
     def perform_update(self, serializer):
         """Update match and create achievements if completed."""
         match = serializer.save()
+        from .services.qualification import invalidate
+        invalidate(match.tournament_id)
         if match.is_completed and match.man_of_the_match:
             # Create achievement for Man of the Match
             from .models import Achievement
@@ -1603,7 +1905,7 @@ class TournamentMatchViewSet(viewsets.ModelViewSet):
             match = self.get_queryset().get(pk=pk)
             
             # Check if cricket
-            if match.tournament.sport.name.lower() != "cricket":
+            if not sport_registry.is_match_managed(match.tournament.sport_id):
                 return Response({"detail": "Match management only available for cricket"}, status=status.HTTP_400_BAD_REQUEST)
             
             # Check if already started
@@ -1746,7 +2048,7 @@ class TournamentMatchViewSet(viewsets.ModelViewSet):
             state.batsman1 = batsman1
             state.batsman2 = batsman2
             state.current_striker = current_striker
-            state.save(update_fields=["batsman1", "batsman2", "current_striker"])
+            state.save(update_fields=["batsman1", "batsman2", "current_striker", "updated_at"])
             
             return Response(CricketMatchStateSerializer(state).data)
         except TournamentMatch.DoesNotExist:
@@ -1785,7 +2087,7 @@ class TournamentMatchViewSet(viewsets.ModelViewSet):
                 return Response({"detail": "Player must be in current bowling team"}, status=status.HTTP_400_BAD_REQUEST)
             
             state.current_bowler = bowler
-            state.save(update_fields=["current_bowler"])
+            state.save(update_fields=["current_bowler", "updated_at"])
             
             return Response(CricketMatchStateSerializer(state).data)
         except TournamentMatch.DoesNotExist:
@@ -1816,53 +2118,52 @@ class TournamentMatchViewSet(viewsets.ModelViewSet):
             if not state.current_striker or not state.current_bowler:
                 return Response({"detail": "Batsman and bowler must be set"}, status=status.HTTP_400_BAD_REQUEST)
             
-            # Update team score
-            if state.current_batting_team == match.team1:
-                state.team1_runs += runs
-                match.score_team1 = state.team1_runs
-            else:
-                state.team2_runs += runs
-                match.score_team2 = state.team2_runs
-            
-            # Update batsman stats
-            striker_stats, _ = MatchPlayerStats.objects.get_or_create(
-                match=match,
-                player=state.current_striker,
-                team=state.current_batting_team
-            )
-            striker_stats.runs_scored += runs
-            striker_stats.balls_faced += 1
-            if runs == 4:
-                striker_stats.fours += 1
-            elif runs == 6:
-                striker_stats.sixes += 1
-            striker_stats.save()
-            
-            # Update bowler stats
-            bowler_stats, _ = MatchPlayerStats.objects.get_or_create(
-                match=match,
-                player=state.current_bowler,
-                team=state.current_bowling_team
-            )
-            bowler_stats.runs_conceded += runs
-            bowler_stats.overs_bowled = float(state.total_balls_bowled) / 6.0
-            bowler_stats.save()
-            
-            # Update ball count
-            state.current_ball += 1
-            state.total_balls_bowled += 1
-            
-            # Check if over is complete (6 balls)
-            if state.current_ball >= 6:
-                state.current_ball = 0
-                state.current_over += 1
-                # Switch striker on odd runs
-                if runs % 2 == 1:
-                    state.current_striker = state.batsman2 if state.current_striker == state.batsman1 else state.batsman1
-            
-            state.save()
-            match.save(update_fields=["score_team1", "score_team2"])
-            
+            from .services import counters, overs
+            from .services.deliveries import STATE_COUNTERS, log_delivery, next_ball
+
+            side = 1 if state.current_batting_team_id == match.team1_id else 2
+            striker_id, bowler_id = state.current_striker_id, state.current_bowler_id
+            # Every counter moves by a delta in a single UPDATE, so deliveries
+            # scored from two devices (or a retried request) all count
+            with transaction.atomic():
+                new_state = counters.apply(
+                    CricketMatchState.objects.filter(pk=state.pk),
+                    deltas={f"team{side}_runs": runs, "total_balls_bowled": 1},
+                    values=next_ball(),
+                    returning=STATE_COUNTERS,
+                )
+                counters.increment(TournamentMatch, match.pk, **{f"score_team{side}": runs})
+
+                # Update batsman stats
+                striker_stats, _ = MatchPlayerStats.objects.get_or_create(
+                    match=match, player_id=striker_id, team_id=state.current_batting_team_id
+                )
+                counters.increment(
+                    MatchPlayerStats, striker_stats.pk,
+                    runs_scored=runs, balls_faced=1, fours=int(runs == 4), sixes=int(runs == 6),
+                )
+
+                # Update bowler stats
+                bowler_stats, _ = MatchPlayerStats.objects.get_or_create(
+                    match=match, player_id=bowler_id, team_id=state.current_bowling_team_id
+                )
+                bowling = overs.bowled(1)
+                counters.apply(
+                    MatchPlayerStats.objects.filter(pk=bowler_stats.pk),
+                    deltas={"runs_conceded": runs, **bowling["deltas"]},
+                    values=bowling["values"],
+                )
+
+                # Switch striker on odd runs at the end of the over
+                if new_state["current_ball"] == 0 and runs % 2 == 1:
+                    other_id = state.batsman2_id if striker_id == state.batsman1_id else state.batsman1_id
+                    CricketMatchState.objects.filter(pk=state.pk, current_striker_id=striker_id).update(
+                        current_striker_id=other_id
+                    )
+                    new_state["current_striker_id"] = other_id
+                log_delivery(match, state, new_state, runs=runs)
+            counters.assign(state, new_state)
+
             # Check if match should end (all overs completed or 10 wickets)
             max_overs = match.tournament.overs_per_match
             current_wickets = state.team1_wickets if state.current_batting_team == match.team1 else state.team2_wickets
@@ -1892,41 +2193,12 @@ class TournamentMatchViewSet(viewsets.ModelViewSet):
             if not next_batsman_id:
                 return Response({"detail": "next_batsman_id required"}, status=status.HTTP_400_BAD_REQUEST)
             
-            # Mark current striker as out
-            striker_stats, _ = MatchPlayerStats.objects.get_or_create(
-                match=match,
-                player=state.current_striker,
-                team=state.current_batting_team
-            )
-            striker_stats.is_out = True
-            striker_stats.balls_faced += 1
-            striker_stats.save()
-            
-            # Update bowler stats
-            if state.current_bowler:
-                bowler_stats, _ = MatchPlayerStats.objects.get_or_create(
-                    match=match,
-                    player=state.current_bowler,
-                    team=state.current_bowling_team
-                )
-                bowler_stats.wickets_taken += 1
-                bowler_stats.overs_bowled = float(state.total_balls_bowled) / 6.0
-                bowler_stats.save()
-            
-            # Update wickets
-            if state.current_batting_team == match.team1:
-                state.team1_wickets += 1
-                match.wickets_team1 = state.team1_wickets
-            else:
-                state.team2_wickets += 1
-                match.wickets_team2 = state.team2_wickets
-            
             # Set next batsman
             try:
                 next_batsman = Player.objects.get(id=next_batsman_id)
             except Player.DoesNotExist:
                 return Response({"detail": "Next batsman not found"}, status=status.HTTP_404_NOT_FOUND)
-            
+
             # Verify next batsman is in batting team
             team_player_ids = set(
                 PlayerSportProfile.objects.filter(
@@ -1935,29 +2207,57 @@ class TournamentMatchViewSet(viewsets.ModelViewSet):
                     is_active=True
                 ).values_list("player_id", flat=True)
             )
-            
+
             if next_batsman.id not in team_player_ids:
                 return Response({"detail": "Next batsman must be in batting team"}, status=status.HTTP_400_BAD_REQUEST)
-            
+
+            from .services import counters, overs
+            from .services.deliveries import STATE_COUNTERS, log_delivery, next_ball
+
+            side = 1 if state.current_batting_team_id == match.team1_id else 2
+            striker_id = state.current_striker_id
             # Replace the out batsman
-            if state.current_striker == state.batsman1:
-                state.batsman1 = next_batsman
-                state.current_striker = next_batsman
-            else:
-                state.batsman2 = next_batsman
-                state.current_striker = next_batsman
-            
-            # Update ball count
-            state.current_ball += 1
-            state.total_balls_bowled += 1
-            
-            if state.current_ball >= 6:
-                state.current_ball = 0
-                state.current_over += 1
-            
-            state.save()
-            match.save(update_fields=["wickets_team1", "wickets_team2"])
-            
+            replaced = "batsman1" if striker_id == state.batsman1_id else "batsman2"
+            with transaction.atomic():
+                # Mark current striker as out
+                striker_stats, _ = MatchPlayerStats.objects.get_or_create(
+                    match=match, player_id=striker_id, team_id=state.current_batting_team_id
+                )
+                counters.apply(
+                    MatchPlayerStats.objects.filter(pk=striker_stats.pk),
+                    deltas={"balls_faced": 1},
+                    values={"is_out": True},
+                )
+
+                # Wicket, ball count and the new batsman in one UPDATE of the live state
+                new_state = counters.apply(
+                    CricketMatchState.objects.filter(pk=state.pk),
+                    deltas={f"team{side}_wickets": 1, "total_balls_bowled": 1},
+                    values={
+                        **next_ball(),
+                        f"{replaced}_id": next_batsman.id,
+                        "current_striker_id": next_batsman.id,
+                    },
+                    returning=STATE_COUNTERS,
+                )
+                counters.increment(TournamentMatch, match.pk, **{f"wickets_team{side}": 1})
+
+                # Update bowler stats
+                if state.current_bowler_id:
+                    bowler_stats, _ = MatchPlayerStats.objects.get_or_create(
+                        match=match, player_id=state.current_bowler_id, team_id=state.current_bowling_team_id
+                    )
+                    bowling = overs.bowled(1)
+                    counters.apply(
+                        MatchPlayerStats.objects.filter(pk=bowler_stats.pk),
+                        deltas={"wickets_taken": 1, **bowling["deltas"]},
+                        values=bowling["values"],
+                    )
+                log_delivery(match, state, new_state, is_wicket=True, next_batsman_id=next_batsman.id)
+            counters.assign(state, new_state)
+            setattr(state, replaced, next_batsman)
+            state.current_striker = next_batsman
+
             # Check if all out (10 wickets)
             current_wickets = state.team1_wickets if state.current_batting_team == match.team1 else state.team2_wickets
             if current_wickets >= 10:
@@ -1968,6 +2268,47 @@ class TournamentMatchViewSet(viewsets.ModelViewSet):
         except TournamentMatch.DoesNotExist:
             return Response({"detail": "Match not found"}, status=status.HTTP_404_NOT_FOUND)
 
+    @action(detail=True, methods=["post"], url_path="deliveries/batch")
+    def submit_deliveries(self, request, pk=None):
+        """
+        Apply a list of deliveries scored offline in one transaction. Entries
+        carry a client seq and an idempotency key, so a retried upload is safe.
+        """
+        from .services.deliveries import DeliveryError, submit_batch
+
+        try:
+            match = self.get_queryset().get(pk=pk)
+        except TournamentMatch.DoesNotExist:
+            return Response({"detail": "Match not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            entries = request.data if isinstance(request.data, list) else request.data.get("deliveries")
+            state, result = submit_batch(match, entries)
+        except DeliveryError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        status_code = status.HTTP_200_OK if not result["rejected"] else status.HTTP_207_MULTI_STATUS
+        return Response({"state": CricketMatchStateSerializer(state).data, **result}, status=status_code)
+
+    @action(detail=True, methods=["get"], url_path="overs")
+    def over_table(self, request, pk=None):
+        """
+        Over-by-over innings data for the Manhattan, worm and run-rate charts:
+        runs, wickets, bowler and maiden per over with cumulative totals, run
+        rate and (chasing) required rate.
+        """
+        from .services.overs import match_overs
+
+        try:
+            match = self.get_queryset().get(pk=pk)
+        except TournamentMatch.DoesNotExist:
+            return Response({"detail": "Match not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            "match": match.id,
+            "overs_per_match": match.tournament.overs_per_match,
+            "innings": match_overs(match),
+        })
+
     @action(detail=True, methods=["post"], url_path="switch-innings")
     def switch_innings(self, request, pk=None):
         """Switch batting/bowling teams after first innings."""
@@ -2014,60 +2355,77 @@ class TournamentMatchViewSet(viewsets.ModelViewSet):
                 except Player.DoesNotExist:
                     return Response({"detail": "Man of the match player not found"}, status=status.HTTP_404_NOT_FOUND)
             
-            # Determine winner
-            state = match.cricket_state
-            if state:
-                winner = None
-                if state.team1_runs > state.team2_runs:
-                    winner = match.team1
-                elif state.team2_runs > state.team1_runs:
-                    winner = match.team2
-                # else: tie (no winner)
-                
-                # Update points table
-                for team in [match.team1, match.team2]:
-                    points_entry, _ = TournamentPoints.objects.get_or_create(
-                        tournament=match.tournament,
-                        team=team
-                    )
-                    points_entry.matches_played += 1
-                    
-                    if winner:
-                        if team == winner:
-                            points_entry.matches_won += 1
-                            points_entry.points += 2
-                        else:
-                            points_entry.matches_lost += 1
-                    # Tie handling can be added later
-                    
-                    points_entry.save()
-            
-            # Update player career stats from match stats
-            match_stats = MatchPlayerStats.objects.filter(match=match).select_related("player", "team")
-            for stat in match_stats:
-                # Update cricket stats in PlayerSportProfile
-                profile = PlayerSportProfile.objects.filter(
-                    player=stat.player,
-                    sport=match.tournament.sport,
-                    is_active=True
-                ).first()
-                
-                if profile:
-                    # Update cricket-specific stats
-                    from .models import CricketStats
-                    cricket_stats, _ = CricketStats.objects.get_or_create(
-                        profile=profile
+            from django.db.models import F, FloatField
+            from django.db.models.functions import Cast
+            from .models import CricketStats
+            from .services import counters
+            from .services.qualification import invalidate
+            from .services.ratings import record_tournament_match
+
+            with transaction.atomic():
+                # Claim the transition first: a repeated or concurrent request
+                # finds the match already completed and merges nothing
+                claimed = TournamentMatch.objects.filter(pk=match.pk, status=TournamentMatch.Status.IN_PROGRESS).update(
+                    status=TournamentMatch.Status.COMPLETED,
+                    is_completed=True,
+                    man_of_the_match=match.man_of_the_match,
+                )
+                if not claimed:
+                    return Response({"detail": "Match must be in progress to complete"}, status=status.HTTP_400_BAD_REQUEST)
+
+                # Determine winner
+                state = CricketMatchState.objects.filter(match=match).first()
+                if state:
+                    winner_id = None
+                    if state.team1_runs > state.team2_runs:
+                        winner_id = match.team1_id
+                    elif state.team2_runs > state.team1_runs:
+                        winner_id = match.team2_id
+                    # else: tie (no winner)
+
+                    # Update points table
+                    for team_id in [match.team1_id, match.team2_id]:
+                        points_entry, _ = TournamentPoints.objects.get_or_create(
+                            tournament_id=match.tournament_id,
+                            team_id=team_id
+                        )
+                        won = winner_id is not None and team_id == winner_id
+                        lost = winner_id is not None and team_id != winner_id
+                        # Tie handling can be added later
+                        counters.increment(
+                            TournamentPoints, points_entry.pk,
+                            matches_played=1, matches_won=int(won), matches_lost=int(lost), points=2 if won else 0,
+                        )
+
+                    # Rated with the points table, so a match is rated exactly once
+                    record_tournament_match(match)
+
+                # Merge match stats into career cricket stats
+                profile_ids = dict(
+                    PlayerSportProfile.objects.filter(
+                        player_id__in=MatchPlayerStats.objects.filter(match=match).values("player_id"),
+                        sport=match.tournament.sport,
+                        is_active=True,
+                    ).values_list("player_id", "id")
+                )
+                match_stats = MatchPlayerStats.objects.filter(match=match).values_list("player_id", "runs_scored", "wickets_taken")
+                for player_id, runs_scored, wickets_taken in match_stats:
+                    profile_id = profile_ids.get(player_id)
+                    if profile_id is None:
+                        continue
+                    cricket_stats, _ = CricketStats.objects.get_or_create(profile_id=profile_id)
+                    # average = runs / matches_played, computed from the pre-update row
+                    counters.apply(
+                        CricketStats.objects.filter(pk=cricket_stats.pk),
+                        deltas={"runs": runs_scored, "wickets": wickets_taken, "matches_played": 1},
+                        values={
+                            "average": Cast(F("runs") + runs_scored, FloatField()) / (F("matches_played") + 1),
+                        },
                     )
-                    cricket_stats.runs += stat.runs_scored
-                    cricket_stats.wickets += stat.wickets_taken
-                    cricket_stats.matches_played += 1
-                    
-                    # Recalculate averages
-                    if cricket_stats.matches_played > 0:
-                        cricket_stats.average = cricket_stats.runs / cricket_stats.matches_played if cricket_stats.matches_played > 0 else 0
-                    
-                    cricket_stats.save()
-            
+
+                # Points table changed: recompute qualification odds once committed
+                transaction.on_commit(lambda: invalidate(match.tournament_id))
+
             # Create Man of the Match achievement
             if match.man_of_the_match:
                 from .models import Achievement
@@ -2083,8 +2441,7 @@ class TournamentMatchViewSet(viewsets.ModelViewSet):
             
             match.status = TournamentMatch.Status.COMPLETED
             match.is_completed = True
-            match.save(update_fields=["status", "is_completed", "man_of_the_match"])
-            
+
             return Response({
                 "detail": "Match completed",
                 "match": TournamentMatchSerializer(match).data
@@ -2124,17 +2481,19 @@ class TournamentMatchViewSet(viewsets.ModelViewSet):
             match = self.get_queryset().get(pk=pk)
             match.status = TournamentMatch.Status.NO_RESULT
             
+            from .services import counters
+            from .services.qualification import invalidate
+
             # Update points table for no result
             for team in [match.team1, match.team2]:
                 points_entry, _ = TournamentPoints.objects.get_or_create(
                     tournament=match.tournament,
                     team=team
                 )
-                points_entry.matches_played += 1
-                points_entry.matches_no_result += 1
-                points_entry.save()
+                counters.increment(TournamentPoints, points_entry.pk, matches_played=1, matches_no_result=1)
             
             match.save(update_fields=["status"])
+            invalidate(match.tournament_id)
             return Response({"detail": "Match cancelled", "match": TournamentMatchSerializer(match).data})
         except TournamentMatch.DoesNotExist:
             return Response({"detail": "Match not found"}, status=status.HTTP_404_NOT_FOUND)
@@ -2158,10 +2517,7 @@ class ManagerSportAssignmentViewSet(viewsets.GenericViewSet):
         """List manager-sport assignments. Managers see their own, admins see all."""
         qs = self.get_queryset()
         if request.user.role == User.Roles.MANAGER:
-            if hasattr(request.user, 'manager'):
-                qs = qs.filter(manager=request.user.manager)
-            else:
-                qs = qs.none()
+            qs = qs.filter(manager_id=get_principal(request.user).manager_id)
         elif request.user.role != User.Roles.ADMIN:
             qs = qs.none()
         serializer = self.get_serializer(qs, many=True)
@@ -2208,60 +2564,136 @@ class PlayerSportProfileViewSet(viewsets.ModelViewSet):
     """
     queryset = PlayerSportProfile.objects.select_related("player__user", "sport", "team", "coach__user")
     permission_classes = [IsAuthenticated]
+    pagination_class = PlayerSportProfilePagination
 
     def get_serializer_class(self):
         if self.action in ("update", "partial_update"):
             return PlayerSportProfileUpdateSerializer
         return PlayerSportProfileSerializer
 
+    def get_permissions(self):
+        if self.action in ("update", "partial_update", "bulk_assign_team"):
+            return [CanUpdatePlayerSportProfile()]
+        return super().get_permissions()
+
     def get_queryset(self):
         """Filter based on user role"""
         user = self.request.user
         qs = super().get_queryset()
 
+        access = get_access_context(user)
+
         # Managers can see profiles for their sports
         if user.role == user.Roles.MANAGER:
-            if hasattr(user, 'manager'):
-                managed_sports = ManagerSport.objects.filter(manager=user.manager).values_list('sport_id', flat=True)
-                qs = qs.filter(sport_id__in=managed_sports)
+            qs = qs.filter(sport_id__in=access.managed_sport_ids)
 
         # Coaches can see their own players
         elif user.role == user.Roles.COACH:
-            if hasattr(user, 'coach'):
-                qs = qs.filter(coach=user.coach)
+            if access.coach_id is not None:
+                qs = qs.filter(coach_id=access.coach_id)
 
         # Players can see their own profiles
         elif user.role == user.Roles.PLAYER:
-            if hasattr(user, 'player'):
-                qs = qs.filter(player=user.player)
+            if access.player_id is not None:
+                qs = qs.filter(player_id=access.player_id)
 
         return qs
 
     def update(self, request, *args, **kwargs):
         """Allow managers/coaches to update team assignment"""
         partial = kwargs.pop('partial', False)
+        # CanUpdatePlayerSportProfile checks the sport/coach scope in get_object
         instance = self.get_object()
 
-        # Check permissions
-        user = request.user
-        if user.role == user.Roles.MANAGER:
-            # Manager can update if they manage the sport
-            if hasattr(user, 'manager'):
-                if not ManagerSport.objects.filter(manager=user.manager, sport=instance.sport).exists():
-                    return Response({"detail": "You don't manage this sport"}, status=status.HTTP_403_FORBIDDEN)
-        elif user.role == user.Roles.COACH:
-            # Coach can update if it's their player
-            if not hasattr(user, 'coach') or instance.coach_id != user.coach.id:
-                return Response({"detail": "Not your player"}, status=status.HTTP_403_FORBIDDEN)
-        else:
-            return Response({"detail": "Only managers and coaches can update profiles"}, status=status.HTTP_403_FORBIDDEN)
-
         serializer = self.get_serializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
 
         return Response(PlayerSportProfileSerializer(instance).data)
 
+    @action(detail=False, methods=["post"], url_path="bulk-assign-team")
+    def bulk_assign_team(self, request):
+        """
+        Move up to 500 profiles onto a team (team_id=null removes them from
+        their team). All conflicts are reported together and nothing is
+        written unless every profile can move.
+        """
+        from .services.roster import assign_team, remove_from_team, RosterConflictError
+
+        # CanUpdatePlayerSportProfile admits managers and coaches, as for single updates
+        user = request.user
+        serializer = PlayerSportProfileBulkTeamSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        profile_ids = list(dict.fromkeys(serializer.validated_data["profile_ids"]))
+        team = serializer.validated_data["team_id"]
+
+        # Role scoping is the same as for single updates: get_queryset only
+        # contains profiles this user may change.
+        visible = set(self.get_queryset().filter(id__in=profile_ids).values_list("id", flat=True))
+        forbidden = [pid for pid in profile_ids if pid not in visible]
+        if forbidden:
+            return Response({"detail": "Some profiles are not yours to update", "profile_ids": forbidden}, status=status.HTTP_403_FORBIDDEN)
+        if team is not None and user.role == user.Roles.MANAGER:
+            if not get_access_context(user).manages_sport(team.sport_id):
+                return Response({"detail": "You don't manage this sport"}, status=status.HTTP_403_FORBIDDEN)
+
+        if team is None:
+            updated = remove_from_team(profile_ids)
+        else:
+            try:
+                updated = assign_team(profile_ids, team)
+            except RosterConflictError as e:
+                return Response({"detail": str(e), "conflicts": e.conflicts}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"updated": updated, "team_id": team.id if team else None})
+
+    @action(detail=True, methods=["get"], url_path="similar")
+    def similar(self, request, pk=None):
+        """
+        The k (default 10, at most 50) profiles in the same sport most like
+        this one by stats, career score, attendance rate and rating trend.
+        Any public player's profile can be looked up; only public players
+        are returned.
+        """
+        from .services.similarity import SimilarityError, similar
+
+        profile = PlayerSportProfile.objects.filter(pk=pk).select_related("player").first()
+        if profile is None or not (profile.player.is_public or self.get_queryset().filter(pk=pk).exists()):
+            return Response({"detail": "Not found"}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            k = int(request.query_params.get("k", 10))
+        except ValueError:
+            return Response({"detail": "k must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        if not 1 <= k <= 50:
+            return Response({"detail": "k must be between 1 and 50"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            hits, features = similar(profile, k)
+        except SimilarityError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        details = {
+            row["id"]: row
+            for row in PlayerSportProfile.objects.filter(pk__in=[pid for pid, _ in hits]).values(
+                "id", "player__player_id", "player__user__username", "player__college", "team__name", "career_score",
+            )
+        }
+        return Response({
+            "profile_id": profile.pk,
+            "sport_id": profile.sport_id,
+            "features": features,
+            "results": [
+                {
+                    "profile_id": pid,
+                    "player_id": details[pid]["player__player_id"],
+                    "username": details[pid]["player__user__username"],
+                    "college": details[pid]["player__college"],
+                    "team": details[pid]["team__name"],
+                    "career_score": details[pid]["career_score"],
+                    "distance": round(distance, 4),
+                }
+                for pid, distance in hits if pid in details
+            ],
+        })
+
 
 # -----------------------------
 # Coach ViewSet
@@ -2286,3 +2718,171 @@ class CoachViewSet(viewsets.ReadOnlyModelViewSet):
                 # If sport_id is invalid, return empty queryset
                 qs = qs.none()
         return qs
+
+
+# -----------------------------
+# Rating ViewSet
+# -----------------------------
+class RatingViewSet(viewsets.GenericViewSet):
+    """
+    Elo ratings of teams and players (core/services/ratings.py), updated as
+    matches are completed. ?kind=team|player (default team), ?sport=<id>.
+    """
+    permission_classes = [IsAuthenticated]
+
+    MAX_LIMIT = 100
+    MAX_RADIUS = 50
+
+    def _params(self, request):
+        from .models import Rating
+
+        kind = request.query_params.get("kind", Rating.Kind.TEAM.value)
+        if kind not in Rating.Kind.values:
+            raise ValueError("kind must be team or player")
+        sport = request.query_params.get("sport")
+        if sport and not sport.isdigit():
+            raise ValueError("sport must be an integer")
+        return kind, int(sport) if sport else None
+
+    def _int(self, request, name, default, maximum):
+        value = request.query_params.get(name, default)
+        if not str(value).isdigit() or int(value) < 1:
+            raise ValueError(f"{name} must be a positive integer")
+        return min(int(value), maximum)
+
+    def _find(self, request):
+        from .services.ratings import find
+
+        kind, sport = self._params(request)
+        team_id = request.query_params.get("team_id")
+        if team_id and not team_id.isdigit():
+            raise ValueError("team_id must be an integer")
+        return find(kind, team_id=team_id, player_id=request.query_params.get("player_id"), sport_id=sport)
+
+    def list(self, request):
+        """Top ?limit= (default 10) ratings."""
+        from .services.ratings import top
+
+        try:
+            kind, sport = self._params(request)
+            limit = self._int(request, "limit", 10, self.MAX_LIMIT)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"kind": kind, "sport": sport, "results": top(kind, sport, limit)})
+
+    @action(detail=False, methods=["get"], url_path="around")
+    def around(self, request):
+        """Rank of ?team_id= or ?player_id= and the ?radius= (default 5) ratings either side."""
+        from .services.ratings import RatingError, around
+
+        try:
+            row = self._find(request)
+            radius = self._int(request, "radius", 5, self.MAX_RADIUS)
+        except (ValueError, RatingError) as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if row is None:
+            return Response({"detail": "Not rated yet"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(around(row, radius))
+
+    @action(detail=False, methods=["get"], url_path="me")
+    def me(self, request):
+        """The requesting player's rank window in each sport they are rated in (or ?sport=)."""
+        from .models import Rating
+        from .services.ratings import around
+
+        player_id = get_principal(request.user).player_id
+        if player_id is None:
+            return Response({"detail": "Only players have ratings"}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            _, sport = self._params(request)
+            radius = self._int(request, "radius", 5, self.MAX_RADIUS)
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        rows = Rating.objects.filter(kind=Rating.Kind.PLAYER, player_id=player_id).select_related("player__user")
+        if sport:
+            rows = rows.filter(sport_id=sport)
+        return Response([dict(around(row, radius), sport=row.sport_id) for row in rows.order_by("sport_id")])
+
+    @action(detail=False, methods=["get"], url_path="history")
+    def history(self, request):
+        """Rating of ?team_id= or ?player_id= after each rated match, for charts."""
+        from .services.ratings import RatingError, entry, history
+
+        try:
+            row = self._find(request)
+        except (ValueError, RatingError) as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        if row is None:
+            return Response({"detail": "Not rated yet"}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"rating": entry(row), "history": history(row)})
+
+    @action(detail=False, methods=["post"], url_path="recompute")
+    def recompute(self, request):
+        """Rebuild all ratings from match history in the background (admin only)."""
+        from .services.jobs import enqueue
+
+        if request.user.role != User.Roles.ADMIN:
+            return Response({"detail": "Only admins can recompute ratings"}, status=status.HTTP_403_FORBIDDEN)
+        job = enqueue("ratings.recompute")
+        return Response({"detail": "Recompute queued", "job_id": job.id}, status=status.HTTP_202_ACCEPTED)
+
+
+# -----------------------------
+# Scouting ViewSet
+# -----------------------------
+class ScoutingViewSet(viewsets.GenericViewSet):
+    """
+    Talent search over one sport's public players (managers of the sport
+    and admins): ?sport=<id>&q=<query>&sort=<metric>&offset=&limit=.
+
+    q combines metric comparisons with and/or/not and parentheses, e.g.
+    `runs percentile >= 90 and strike_rate >= 130 and attendance_rate_60d >= 0.8`;
+    "percentile" (or "pct") compares the player's percentile in the sport.
+    """
+    permission_classes = [IsAuthenticatedAndManagerOrAdmin]
+
+    def list(self, request):
+        from .services.scouting import ScoutingError, search
+
+        params = request.query_params
+        for name, default in (("sport", None), ("offset", "0"), ("limit", "50")):
+            value = params.get(name, default)
+            if value is None or not value.isdigit():
+                return Response({"detail": f"{name} must be a non-negative integer"}, status=status.HTTP_400_BAD_REQUEST)
+        sport_id = int(params["sport"])
+        if sport_registry.by_id(sport_id) is None:
+            return Response({"detail": "Sport not found"}, status=status.HTTP_404_NOT_FOUND)
+        if request.user.role != User.Roles.ADMIN and not get_access_context(request.user).manages_sport(sport_id):
+            return Response({"detail": "You don't manage this sport"}, status=status.HTTP_403_FORBIDDEN)
+        offset = int(params.get("offset", 0))
+        limit = min(max(int(params.get("limit", 50)), 1), settings.MAX_PAGE_SIZE)
+
+        try:
+            count, metrics, page = search(
+                sport_id, params.get("q", ""), params.get("sort") or "-career_score", offset, limit,
+            )
+        except ScoutingError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        details = {
+            row["id"]: row
+            for row in PlayerSportProfile.objects.filter(pk__in=[pid for pid, _, _ in page]).values(
+                "id", "player__player_id", "player__user__username", "player__college", "team__name",
+            )
+        }
+        return Response({
+            "count": count,
+            "offset": offset,
+            "metrics": metrics,
+            "results": [
+                {
+                    "profile_id": pid,
+                    "player_id": details[pid]["player__player_id"],
+                    "username": details[pid]["player__user__username"],
+                    "college": details[pid]["player__college"],
+                    "team": details[pid]["team__name"],
+                    "metrics": values,
+                    "percentiles": percentiles,
+                }
+                for pid, values, percentiles in page if pid in details
+            ],
+        })
@@ -53,7 +53,7 @@ INSTALLED_APPS = [
 # REST Framework settings - consolidated
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.ClaimsJWTAuthentication',
         'rest_framework.authentication.TokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
@@ -63,10 +63,101 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': [
         'django_filters.rest_framework.DjangoFilterBackend',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.StandardPagination',
     'PAGE_SIZE': 10,
 }
 
+# Largest page a client can ask for via ?page_size=
+MAX_PAGE_SIZE = config('MAX_PAGE_SIZE', default=100, cast=int)
+
+# Notification long-poll (seconds a client is held before an empty response)
+NOTIFICATION_STREAM_TIMEOUT = config('NOTIFICATION_STREAM_TIMEOUT', default=25, cast=int)
+NOTIFICATION_STREAM_BATCH_SIZE = config('NOTIFICATION_STREAM_BATCH_SIZE', default=50, cast=int)
+# Seconds between a process's checks for notifications written by other processes
+NOTIFICATION_STREAM_POLL_INTERVAL = config('NOTIFICATION_STREAM_POLL_INTERVAL', default=2, cast=float)
+
+# Seconds finalized matches are collected before one leaderboard refresh runs
+LEADERBOARD_REFRESH_DELAY = config('LEADERBOARD_REFRESH_DELAY', default=5, cast=float)
+# Month-day the season starts on, for leaderboard/?window=season
+LEADERBOARD_SEASON_START = config('LEADERBOARD_SEASON_START', default='07-01')
+
+# Default cache: access contexts, claims versions, login payloads, qualification
+# odds. Per process unless CACHE_BACKEND names a shared in-memory store (with
+# several workers use django.core.cache.backends.redis.RedisCache and a
+# redis:// CACHE_LOCATION, or a Memcached backend); without one, workers see each
+# other's invalidations only when their entries expire.
+# The profile change log (core/services/profile_changes.py) must be shared for
+# every process's similarity index and scouting tables to see the same changes,
+# so it has its own alias: a database table (migration 0012) unless
+# PROFILE_CHANGES_CACHE_BACKEND points it elsewhere. Only those read it.
+PROFILE_CHANGES_CACHE_BACKEND = config(
+    'PROFILE_CHANGES_CACHE_BACKEND', default='django.core.cache.backends.db.DatabaseCache',
+)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default=''),
+    },
+    'profile_changes': {
+        'BACKEND': PROFILE_CHANGES_CACHE_BACKEND,
+        'LOCATION': config('PROFILE_CHANGES_CACHE_LOCATION', default='profile_changes_cache'),
+        # The database backend culls rows past MAX_ENTRIES (300 by default)
+        'OPTIONS': {
+            'MAX_ENTRIES': config('PROFILE_CHANGES_CACHE_MAX_ENTRIES', default=100000, cast=int),
+        } if PROFILE_CHANGES_CACHE_BACKEND.endswith('DatabaseCache') else {},
+    },
+}
+
+# Seconds a cached per-user access context (managed sports, students, profiles)
+# may be reused; signals invalidate it earlier within the same cache backend
+ACCESS_CONTEXT_TTL = config('ACCESS_CONTEXT_TTL', default=60, cast=int)
+
+# Largest CSV accepted by auth/bulk-register/
+BULK_REGISTRATION_MAX_ROWS = config('BULK_REGISTRATION_MAX_ROWS', default=2000, cast=int)
+
+# CSV rows validated and committed per transaction by session imports; a
+# failed import resumes after the last committed chunk
+SESSION_IMPORT_CHUNK_SIZE = config('SESSION_IMPORT_CHUNK_SIZE', default=500, cast=int)
+
+# Rows fetched per round trip by streaming exports (api/exports/...)
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Seasons simulated by tournaments/<id>/qualification/, and seconds a result is
+# cached; completing or cancelling a match invalidates it earlier
+QUALIFICATION_SIMULATIONS = config('QUALIFICATION_SIMULATIONS', default=100000, cast=int)
+QUALIFICATION_CACHE_TTL = config('QUALIFICATION_CACHE_TTL', default=3600, cast=int)
+
+# player-sport-profiles/<id>/similar/: profiles per sport searched exactly
+# before the index switches to k-means cells, cells probed per query, and
+# seconds before a process rebuilds its index (rescaling the features)
+SIMILARITY_EXACT_LIMIT = config('SIMILARITY_EXACT_LIMIT', default=50000, cast=int)
+SIMILARITY_PROBES = config('SIMILARITY_PROBES', default=8, cast=int)
+SIMILARITY_MAX_AGE = config('SIMILARITY_MAX_AGE', default=3600, cast=int)
+
+# Seconds before a process rebuilds its scouting tables, moving the
+# attendance windows along; profile changes are applied as they happen
+SCOUTING_MAX_AGE = config('SCOUTING_MAX_AGE', default=3600, cast=int)
+
+# JWTs carry role/profile claims (core/authentication.py); the refresh
+# endpoint re-reads them after a role change
+SIMPLE_JWT = {
+    'TOKEN_OBTAIN_SERIALIZER': 'core.authentication.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'core.authentication.ClaimsTokenRefreshSerializer',
+}
+# Seconds a user's claims version is cached when checking access tokens; with a
+# per-process cache, other workers notice a role change within this window
+JWT_CLAIMS_CHECK_TTL = config('JWT_CLAIMS_CHECK_TTL', default=30, cast=int)
+
+# Background job queue (core/services/jobs.py, `manage.py run_worker`)
+JOB_WORKER_THREADS = config('JOB_WORKER_THREADS', default=4, cast=int)
+JOB_POLL_INTERVAL = config('JOB_POLL_INTERVAL', default=1.0, cast=float)
+JOB_MAX_ATTEMPTS = config('JOB_MAX_ATTEMPTS', default=5, cast=int)
+JOB_RETRY_BASE_DELAY = config('JOB_RETRY_BASE_DELAY', default=10, cast=float)
+JOB_RETRY_MAX_DELAY = config('JOB_RETRY_MAX_DELAY', default=600, cast=float)
+JOB_LOCK_TIMEOUT = config('JOB_LOCK_TIMEOUT', default=900, cast=int)
+# Max jobs running at once per queue, across all workers ("queue=n,queue=n")
+JOB_QUEUE_CONCURRENCY = config('JOB_QUEUE_CONCURRENCY', default='leaderboard=1,ai=2')
+
 
 
 MIDDLEWARE = [
@@ -112,6 +203,10 @@ if USE_SQLITE:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # Writers queue for the lock instead of failing with "database is locked";
+            # the file test database lets threaded tests share it
+            'OPTIONS': {'transaction_mode': 'IMMEDIATE', 'timeout': 20},
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
         }
     }
 else:
@@ -149,6 +244,39 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing (core/hashers.py). PASSWORD_HASHER picks the hasher for new
+# and upgraded passwords: argon2 / bcrypt when their library is installed
+# (argon2-cffi / bcrypt), else pbkdf2. Every hasher stays listed so existing
+# hashes still verify and are re-hashed with the preferred one at next login.
+import importlib.util
+
+_HASHERS = {
+    'argon2': ('core.hashers.TunableArgon2PasswordHasher', 'argon2'),
+    'bcrypt': ('core.hashers.TunableBCryptSHA256PasswordHasher', 'bcrypt'),
+    'pbkdf2': ('core.hashers.TunablePBKDF2PasswordHasher', None),
+}
+PASSWORD_HASHER = config('PASSWORD_HASHER', default='argon2').lower()
+if PASSWORD_HASHER not in _HASHERS or (
+    _HASHERS[PASSWORD_HASHER][1] and importlib.util.find_spec(_HASHERS[PASSWORD_HASHER][1]) is None
+):
+    PASSWORD_HASHER = 'pbkdf2'
+PASSWORD_HASHERS = [_HASHERS[PASSWORD_HASHER][0]] + [
+    path for name, (path, _) in _HASHERS.items() if name != PASSWORD_HASHER
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
+PASSWORD_PBKDF2_ITERATIONS = config('PASSWORD_PBKDF2_ITERATIONS', default=1000000, cast=int)
+PASSWORD_ARGON2_TIME_COST = config('PASSWORD_ARGON2_TIME_COST', default=2, cast=int)
+PASSWORD_ARGON2_MEMORY_COST = config('PASSWORD_ARGON2_MEMORY_COST', default=102400, cast=int)  # KiB
+PASSWORD_ARGON2_PARALLELISM = config('PASSWORD_ARGON2_PARALLELISM', default=8, cast=int)
+PASSWORD_BCRYPT_ROUNDS = config('PASSWORD_BCRYPT_ROUNDS', default=12, cast=int)
+
+# Password checks at login run on a bounded pool so a burst of logins cannot
+# take every CPU (and, under ASGI, do not block the event loop)
+AUTHENTICATION_BACKENDS = ['core.backends.HashPoolModelBackend']
+LOGIN_HASH_WORKERS = config('LOGIN_HASH_WORKERS', default=os.cpu_count() or 1, cast=int)
+# Seconds the role/profile part of the login response is cached per user
+LOGIN_PAYLOAD_TTL = config('LOGIN_PAYLOAD_TTL', default=300, cast=int)
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -572,7 +572,14 @@ export default function PlayerDashboard() {
                   try {
                     setAiLoading(true); setAiResult("");
                     const res = await api.post('/api/player-insight/', { player_id: data?.player?.id, context: `sport=${activeSportName}` });
-                    setAiResult(res.data?.insight || '');
+                    // The insight is generated by the background worker; poll its job
+                    let job = res.data;
+                    for (let i = 0; i < 40 && !['succeeded', 'failed'].includes(job?.status); i++) {
+                      await new Promise((resolve) => setTimeout(resolve, 1500));
+                      job = (await api.get(`/api/jobs/${res.data.job_id}/`)).data;
+                    }
+                    if (job?.status === 'succeeded') setAiResult(job.result?.answer || '');
+                    else setAiResult(job?.status === 'failed' ? 'Insight failed' : 'Insight not ready yet, try again shortly');
                   } catch (e) {
                     setAiResult(e?.response?.data?.error || 'Insight failed');
                   } finally {